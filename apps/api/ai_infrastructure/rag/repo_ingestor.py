@@ -1,6 +1,5 @@
 import os
 import shutil
-import subprocess
 import logging
 from uuid import UUID
 from datetime import datetime
@@ -10,6 +9,7 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from apps.api.ai_infrastructure.rag.models import KnowledgeBaseItem
 from apps.api.ai_infrastructure.rag.embeddings import EmbeddingService
+from apps.api.ingestors.github.repo_cache import RepoCacheError, get_repo_cache
 
 logger = logging.getLogger(__name__)
 
@@ -73,19 +73,18 @@ class RepoIngestor:
                 shutil.rmtree(tmp_dir)
 
     def _clone_repo(self, repo_url: str, dest_dir: str, ref: str):
-        """Clones a repository using system git."""
+        """Checks ref out into dest_dir as a worktree of the cached mirror (see RepoCache)."""
         if os.path.exists(dest_dir):
             shutil.rmtree(dest_dir)
             
         os.makedirs(os.path.dirname(dest_dir), exist_ok=True)
         
         try:
-            # Note: We do a shallow clone to save time
-            cmd = ["git", "clone", "--depth", "1", "--branch", ref, repo_url, dest_dir]
-            subprocess.run(cmd, check=True, capture_output=True, text=True)
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Git clone failed: {e.stderr}")
-            raise HTTPException(status_code=400, detail=f"Failed to clone repository. Is the URL public and correct? Error: {e.stderr}")
+            # Only the objects new since the last ingestion of this repo are fetched
+            get_repo_cache().checkout(repo_url, ref, dest_dir)
+        except RepoCacheError as e:
+            logger.error(f"Git clone failed: {e}")
+            raise HTTPException(status_code=400, detail=f"Failed to clone repository. Is the URL public and correct? Error: {e}")
             
     def _is_relevant_file(self, filename: str) -> bool:
         """Determines if a file should be parsed."""
@@ -0,0 +1,28 @@
+"""add last ingested sha and content hash to connected_repository
+
+Revision ID: c3d9e8f1a2b4
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision: str = 'c3d9e8f1a2b4'
+down_revision: Union[str, Sequence[str], None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('connected_repository', sa.Column('last_ingested_branch', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('connected_repository', sa.Column('last_ingested_sha', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('connected_repository', sa.Column('last_content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('connected_repository', 'last_content_hash')
+    op.drop_column('connected_repository', 'last_ingested_sha')
+    op.drop_column('connected_repository', 'last_ingested_branch')
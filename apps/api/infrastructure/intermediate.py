@@ -2,16 +2,16 @@ import logging
 from typing import List, Optional
 from uuid import UUID
 
-from sqlmodel import Session, select, text
+from sqlmodel import Session, select, text, func
 from apps.api.database import engine
 from apps.api.models import Node, Edge, NodeType, EdgeType, Graph, Client
-from apps.api.infrastructure.processor.pipeline import InfrastructurePipeline
+from apps.api.infrastructure.processor.pipeline import InfrastructurePipeline, input_fingerprint
 from apps.api.ingestors.aws.schemas import DiscoveryResult
 from apps.api.ai_infrastructure.rag.embedding_sync import re_embed_graph
 
 logger = logging.getLogger(__name__)
 
-async def ingest_to_all_clients(results: List[DiscoveryResult], original_client_id: str, graph_name: Optional[str] = None, session: Optional[Session] = None):
+async def ingest_to_all_clients(results: List[DiscoveryResult], original_client_id: str, graph_name: Optional[str] = None, session: Optional[Session] = None, force: bool = False):
     """
     Wrapper to ingest discovery results for multiple clients.
     Updates the original client plus two hardcoded demo clients.
@@ -22,18 +22,26 @@ async def ingest_to_all_clients(results: List[DiscoveryResult], original_client_
     
     print(f"DEBUG: Triggering ingestion for clients: {target_clients}")
     
+    summaries = {}
     for client_id in target_clients:
         try:
             # We use a fresh nested session or similar if provided, but ingest_to_graph handles its own session if None
-            await ingest_to_graph(client_id=client_id, results=results, graph_name=graph_name, session=session)
+            summaries[str(client_id)] = await ingest_to_graph(client_id=client_id, results=results, graph_name=graph_name, session=session, force=force)
         except Exception as e:
             logger.error(f"Failed to ingest for client {client_id}: {e}")
             print(f"ERROR: Failed ingestion for {client_id}: {e}")
+            summaries[str(client_id)] = {"error": str(e)}
+    return summaries
 
-async def ingest_to_graph(client_id: str | UUID, results: List[DiscoveryResult], graph_name: Optional[str] = None, session: Optional[Session] = None):
+async def ingest_to_graph(client_id: str | UUID, results: List[DiscoveryResult], graph_name: Optional[str] = None, session: Optional[Session] = None, force: bool = False):
     """
     Main entry point for discovery-to-graph ingestion.
     Runs the modular IR pipeline and saves the results to the specified client's graph.
+    Returns a summary with the pipeline's stage metrics.
+
+    The graph remembers the input fingerprint (pipeline version + per-source
+    content hashes) it was last built from. When it matches, the pipeline,
+    the graph rewrite and re-embedding are skipped unless force is set.
     """
     client_id_uuid = UUID(str(client_id)) if isinstance(client_id, str) else client_id
     target_graph_name = graph_name or "Infrastructure Design"
@@ -48,11 +56,9 @@ async def ingest_to_graph(client_id: str | UUID, results: List[DiscoveryResult],
         elif res.source == "aws":
             raw_aws["sources"].append(_result_to_dict(res))
     
-    # 2. Execute Infrastructure Pipeline
-    pipeline = InfrastructurePipeline()
-    context = pipeline.execute(raw_github, raw_aws)
-    
-    # 3. Persist to Database
+    fingerprint = input_fingerprint(raw_github, raw_aws)
+
+    # 2. Persist to Database
     # Use provided session or create a new one
     _session = session
     if _session is None:
@@ -64,6 +70,17 @@ async def ingest_to_graph(client_id: str | UUID, results: List[DiscoveryResult],
             select(Graph).where(Graph.client_id == client_id_uuid, Graph.name == target_graph_name)
         ).first()
         
+        if graph and not force and fingerprint and (graph.settings or {}).get("ir_fingerprint") == fingerprint:
+            node_count = _session.exec(select(func.count()).select_from(Node).where(Node.graph_id == graph.id)).one()
+            if node_count:
+                logger.info(f"Graph {graph.id} already built from these sources, skipping IR pipeline")
+                return {
+                    "graph_id": str(graph.id),
+                    "nodes": node_count,
+                    "unchanged": True,
+                    "fingerprint": fingerprint,
+                }
+
         if not graph:
              # Ensure the client exists before creating a graph for it
             client = _session.get(Client, client_id_uuid)
@@ -82,6 +99,10 @@ async def ingest_to_graph(client_id: str | UUID, results: List[DiscoveryResult],
             _session.refresh(graph)
         
         graph_id = graph.id
+
+        # 3. Execute Infrastructure Pipeline
+        pipeline = InfrastructurePipeline()
+        context = pipeline.execute(raw_github, raw_aws)
         
         # 4. Get/Create NodeType and EdgeType
         node_type = _session.exec(select(NodeType).where(NodeType.graph_id == graph_id, NodeType.name == "Infrastructure")).first()
@@ -152,9 +173,23 @@ async def ingest_to_graph(client_id: str | UUID, results: List[DiscoveryResult],
                 _session.add(edge)
             else:
                 print(f"DEBUG: Skipping edge {ir_edge.from_node_id} -> {ir_edge.to_node_id} (Nodes not found in mapping)")
+
+        # Reassign rather than mutate so the JSONB column is marked dirty
+        graph.settings = {**(graph.settings or {}), "ir_fingerprint": fingerprint}
+        _session.add(graph)
         
         _session.commit()
         logger.info(f"Ingested {len(context.nodes)} nodes and {len(context.edges)} potential edges to Graph {graph_id} for client {client_id_uuid}")
+        summary = {
+            "graph_id": str(graph_id),
+            "nodes": len(context.nodes),
+            "edges": len(context.edges),
+            "source_completeness": context.graph_metadata["source_completeness"],
+            "stage_metrics": context.graph_metadata.get("stage_metrics", []),
+            "pipeline": context.graph_metadata.get("pipeline", {}),
+            "unchanged": False,
+            "fingerprint": fingerprint,
+        }
         print(f"DEBUG: Successfully ingested {len(context.nodes)} nodes to Graph {graph_id}")
 
         # Post-commit cleanup: Re-embed the updated graph so the vector store stays in sync
@@ -162,6 +197,8 @@ async def ingest_to_graph(client_id: str | UUID, results: List[DiscoveryResult],
             re_embed_graph(graph_id)
         except Exception as embed_e:
             logger.error(f"Post-ingestion embedding synchronization failed: {embed_e}")
+
+        return summary
         
     except Exception as e:
         _session.rollback()
@@ -177,6 +214,7 @@ def _result_to_dict(result: DiscoveryResult) -> dict:
     """Serialize a DiscoveryResult to a JSON-serializable dict."""
     return {
         "source": result.source,
+        "content_hash": result.content_hash(),
         "nodes": [
             {
                 "key": n.key,
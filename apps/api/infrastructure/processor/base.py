@@ -1,9 +1,10 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from uuid import UUID
 from dataclasses import asdict
 
-@dataclass
+@dataclass(frozen=True) # shared between nodes by ValidateStage's WarningPool
 class ValidationWarning:
     type: str # e.g., 'empty_container', 'partial_scan'
     message: str
@@ -51,17 +52,163 @@ class IREdge:
     environment: str = "unknown"
     properties: Dict[str, Any] = field(default_factory=dict)
 
+class NodeStore(dict):
+    """id -> IRNode dict that also indexes node ids by template_id.
+
+    A node's template_id must not change while it is stored; replace the
+    node (store[id] = new_node) instead.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._by_template: Dict[str, Dict[str, None]] = {} # template_id -> ordered ids
+
+    def __setitem__(self, key: str, node: IRNode):
+        old = self.get(key)
+        if old is not None and old.template_id != node.template_id:
+            self._unindex(key, old)
+        super().__setitem__(key, node)
+        self._by_template.setdefault(node.template_id, {})[key] = None
+
+    def __delitem__(self, key: str):
+        self._unindex(key, self[key])
+        super().__delitem__(key)
+
+    def pop(self, key: str, *default):
+        if key in self:
+            self._unindex(key, self[key])
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, node = super().popitem()
+        self._unindex(key, node)
+        return key, node
+
+    def setdefault(self, key: str, default: IRNode = None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, node in dict(*args, **kwargs).items():
+            self[key] = node
+
+    def clear(self):
+        super().clear()
+        self._by_template.clear()
+
+    def _unindex(self, key: str, node: IRNode):
+        ids = self._by_template.get(node.template_id)
+        if ids is not None:
+            ids.pop(key, None)
+            if not ids:
+                del self._by_template[node.template_id]
+
+    def by_template(self, template_id: str) -> List[IRNode]:
+        """Nodes with *template_id*, in insertion order."""
+        return [self[k] for k in self._by_template.get(template_id, ())]
+
+    def first_by_template(self, template_id: str) -> Optional[IRNode]:
+        for k in self._by_template.get(template_id, ()):
+            return self[k]
+        return None
+
+
+class EdgeStore:
+    """Edge list indexed by from_node_id and to_node_id.
+
+    Behaves like the plain list it replaces (append / extend / iteration /
+    len / indexing). Endpoints must only be changed through redirect(),
+    which keeps the indexes in sync.
+    """
+
+    def __init__(self, edges: Optional[Iterable[IREdge]] = None):
+        self._edges: List[IREdge] = []
+        self._out: Dict[str, List[IREdge]] = {}
+        self._in: Dict[str, List[IREdge]] = {}
+        if edges:
+            self.extend(edges)
+
+    def append(self, edge: IREdge):
+        self._edges.append(edge)
+        self._out.setdefault(edge.from_node_id, []).append(edge)
+        self._in.setdefault(edge.to_node_id, []).append(edge)
+
+    def extend(self, edges: Iterable[IREdge]):
+        for edge in edges:
+            self.append(edge)
+
+    def __iter__(self) -> Iterator[IREdge]:
+        return iter(self._edges)
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def __getitem__(self, index):
+        return self._edges[index]
+
+    def __repr__(self) -> str:
+        return f"EdgeStore({len(self._edges)} edges)"
+
+    def outgoing(self, node_id: str) -> List[IREdge]:
+        return self._out.get(node_id, [])
+
+    def incoming(self, node_id: str) -> List[IREdge]:
+        return self._in.get(node_id, [])
+
+    def source_ids(self) -> List[str]:
+        """Ids of nodes with at least one outgoing edge."""
+        return list(self._out)
+
+    def redirect(self, old_id: str, new_id: str) -> int:
+        """Point every edge touching *old_id* at *new_id*. Returns edges changed."""
+        if old_id == new_id:
+            return 0
+        changed = set()
+        outgoing = self._out.pop(old_id, [])
+        for edge in outgoing:
+            edge.from_node_id = new_id
+            changed.add(id(edge))
+        if outgoing:
+            self._out.setdefault(new_id, []).extend(outgoing)
+        incoming = self._in.pop(old_id, [])
+        for edge in incoming:
+            edge.to_node_id = new_id
+            changed.add(id(edge))
+        if incoming:
+            self._in.setdefault(new_id, []).extend(incoming)
+        return len(changed)
+
+
 class ProcessingContext:
     def __init__(self, raw_github: Dict[str, Any], raw_aws: Dict[str, Any]):
         self.raw_github = raw_github
         self.raw_aws = raw_aws
-        self.nodes: Dict[str, IRNode] = {} # id -> Node
-        self.edges: List[IREdge] = []
+        self.nodes: NodeStore = NodeStore() # id -> Node, indexed by template_id
+        self.edges: EdgeStore = EdgeStore() # list view + from/to indexes
+        self.children: Dict[str, List[str]] = {} # parent id -> child ids, set by containment
         self.graph_metadata: Dict[str, Any] = {
             "source_completeness": "full",
             "warnings": []
         }
+        # Set by InfrastructurePipeline; stages fan independent work out via map()
+        self.executor: Optional[Executor] = None
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """Apply *fn* to each item, concurrently when an executor is set.
+
+        Results come back in input order. *fn* must not mutate the context;
+        stages merge the results themselves.
+        """
+        items = list(items)
+        if self.executor is None or len(items) < 2:
+            return [fn(item) for item in items]
+        return list(self.executor.map(fn, items))
 
 class BaseStage:
+    # Stage names this stage must run after (see InfrastructurePipeline)
+    name: str = ""
+    depends_on: Tuple[str, ...] = ()
+
     def run(self, context: ProcessingContext) -> ProcessingContext:
         raise NotImplementedError("Subclasses must implement run()")
\ No newline at end of file
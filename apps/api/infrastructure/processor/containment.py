@@ -0,0 +1,76 @@
+from typing import List, Dict, Iterable, Optional
+
+from .base import IRNode
+
+# resource_type of AWS nodes that contain other resources -> property with their AWS id
+CONTAINER_ID_PROPS: Dict[str, str] = {
+    "network/vpc": "vpc_id",
+    "network/subnet": "subnet_id",
+}
+
+
+class ContainmentIndex:
+    """Parent → children hierarchy of AWS resources, from vpc_id / subnet_id(s).
+
+    Built in one pass over the nodes after indexing VPC and subnet nodes by
+    their AWS id. A resource goes into its subnet when that is unambiguous
+    (subnet_id, or exactly one known subnet in subnet_ids), otherwise into
+    its VPC (vpc_id, or the one VPC all its known subnets belong to).
+    Subnets and security groups go into their VPC. Resources whose VPC or
+    subnet is not in the graph get no parent.
+    """
+
+    def __init__(self):
+        self.parent: Dict[str, str] = {} # child id -> parent id
+        self.children: Dict[str, List[str]] = {} # parent id -> child ids, in node order
+        self.containers: List[str] = [] # VPC / subnet node ids
+
+    @classmethod
+    def build(cls, nodes: Iterable[IRNode]) -> "ContainmentIndex":
+        index = cls()
+        aws_nodes = [n for n in nodes if n.source == "aws"]
+
+        vpcs: Dict[str, str] = {} # vpc-... -> node id
+        subnets: Dict[str, str] = {} # subnet-... -> node id
+        subnet_vpc_ids: Dict[str, str] = {} # subnet node id -> vpc-...
+        for node in aws_nodes:
+            prop = CONTAINER_ID_PROPS.get(node.properties.get("resource_type"))
+            aws_id = node.properties.get(prop) if prop else None
+            if not aws_id:
+                continue
+            if prop == "vpc_id":
+                vpcs.setdefault(aws_id, node.id)
+            else:
+                subnets.setdefault(aws_id, node.id)
+                subnet_vpc_ids[node.id] = node.properties.get("vpc_id")
+            index.containers.append(node.id)
+
+        # VPC node of each subnet node, for resources that only list subnets
+        subnet_vpc = {sid: vpcs[vid] for sid, vid in subnet_vpc_ids.items() if vid in vpcs}
+
+        for node in aws_nodes:
+            parent = index._resolve(node, vpcs, subnets, subnet_vpc)
+            if parent and parent != node.id:
+                index.parent[node.id] = parent
+                index.children.setdefault(parent, []).append(node.id)
+        return index
+
+    @staticmethod
+    def _resolve(node: IRNode, vpcs: Dict[str, str], subnets: Dict[str, str], subnet_vpc: Dict[str, str]) -> Optional[str]:
+        props = node.properties
+        subnet_ids = [props["subnet_id"]] if props.get("subnet_id") else props.get("subnet_ids") or []
+        known = []
+        for subnet_id in subnet_ids:
+            subnet_node = subnets.get(subnet_id) if isinstance(subnet_id, str) else None
+            if subnet_node and subnet_node != node.id and subnet_node not in known:
+                known.append(subnet_node)
+        if len(known) == 1:
+            return known[0]
+
+        vpc_node = vpcs.get(props.get("vpc_id"))
+        if vpc_node:
+            return vpc_node
+        known_vpcs = {subnet_vpc.get(s) for s in known}
+        if len(known_vpcs) == 1:
+            return known_vpcs.pop()
+        return None
@@ -1,15 +1,27 @@
 from .base import BaseStage, ProcessingContext, IRNode, IREdge, ValidationWarning
+from .inference import CrossProviderInference, DEFAULT_THRESHOLD
+from .containment import ContainmentIndex
 
 class EnrichStage(BaseStage):
+    name = "enrich"
+    depends_on = ("resolve",)
+
+    def __init__(self, inference_threshold: float = DEFAULT_THRESHOLD):
+        self.inference = CrossProviderInference(threshold=inference_threshold)
+
     def run(self, context: ProcessingContext) -> ProcessingContext:
         # 1. Ghost nodes for directories (representing inferred services)
         self._generate_ghost_nodes(context)
         
-        # 2. Inferred edges (GitHub -> AWS)
-        self._generate_inferred_edges(context)
-        
-        # 3. Handle resource containment (e.g. RDS inside VPC)
-        self._handle_containment(context)
+        # 2-3. Inferred edges (GitHub -> AWS) and resource containment (e.g. RDS
+        # inside VPC) only read the graph: plan both concurrently, then apply
+        # them in a fixed order so edge ids stay deterministic
+        links, containment = context.map(
+            lambda rule: rule(context),
+            [self._infer_cross_provider_links, self._plan_containment],
+        )
+        self._add_inferred_edges(context, links)
+        self._apply_containment(context, containment)
 
         # 4. Bake UI metadata (labels, icons, categories) for frontend compatibility
         self._apply_ui_metadata(context)
@@ -52,9 +64,11 @@ class EnrichStage(BaseStage):
                     )]
                 )
 
-    def _generate_inferred_edges(self, context):
+    def _infer_cross_provider_links(self, context):
         """
         Infer relationships between GitHub services and AWS resources.
+        Only pairs backed by concrete evidence (ARNs, endpoints, resource
+        names in the service's config) are linked; see inference.py.
         """
         github_services = [
             n for n in context.nodes.values() 
@@ -63,31 +77,37 @@ class EnrichStage(BaseStage):
         
         aws_resources = [
             n for n in context.nodes.values() 
-            if n.source == "aws" and n.node_type in ["storage", "database", "compute"]
+            if n.source == "aws" and n.template_id != "vpc"
         ]
         
         if not github_services or not aws_resources:
-            return
+            return []
 
-        for github_node in github_services:
-            for aws_node in aws_resources:
-                if github_node.id == aws_node.id:
-                    continue
-                
-                edge_type = "accesses"
-                if aws_node.template_id == "sql-db":
-                    edge_type = "connects_to"
-                
-                context.edges.append(IREdge(
-                    id=f"inferred-cross-provider-{len(context.edges)}",
-                    from_node_id=github_node.id,
-                    to_node_id=aws_node.id,
-                    edge_type=edge_type,
-                    source="inferred",
-                    confidence=0.7,
-                    environment="both",
-                    properties={"inference_rule": "cross_provider_dependency"}
-                ))
+        return self.inference.infer(context, github_services, aws_resources)
+
+    def _add_inferred_edges(self, context, links):
+        for link in links:
+            aws_node = context.nodes[link.to_node_id]
+            edge_type = "accesses"
+            if aws_node.template_id == "sql-db":
+                edge_type = "connects_to"
+
+            context.edges.append(IREdge(
+                id=f"inferred-cross-provider-{len(context.edges)}",
+                from_node_id=link.from_node_id,
+                to_node_id=link.to_node_id,
+                edge_type=edge_type,
+                source="inferred",
+                confidence=link.score,
+                environment="both",
+                properties={
+                    "inference_rule": "cross_provider_evidence",
+                    "evidence": [ev.to_dict() for ev in link.evidence],
+                }
+            ))
+
+    def _generate_inferred_edges(self, context):
+        self._add_inferred_edges(context, self._infer_cross_provider_links(context))
 
     def _apply_ui_metadata(self, context: ProcessingContext):
         """
@@ -125,24 +145,28 @@ class EnrichStage(BaseStage):
             # 3. Icon
             node.properties["icon"] = ICON_MAP.get(node.template_id, ICON_MAP["unknown"])
 
-    def _handle_containment(self, context):
+    def _plan_containment(self, context):
         """
-        Assign AWS resources to their containing VPCs if available.
+        Place AWS resources in their subnets / VPCs by vpc_id and subnet_id(s).
+        Returns the ContainmentIndex; _apply_containment writes it.
         """
-        vpc_nodes = [n for n in context.nodes.values() if n.template_id == "vpc"]
-        if not vpc_nodes:
-            return
-            
-        for node in context.nodes.values():
-            if node.source == "aws" and node.template_id != "vpc":
-                if node.template_id in ["vm", "sql-db", "serverless", "container", "security-group"]:
-                    node.parent_id = vpc_nodes[0].id
-                    context.edges.append(IREdge(
-                        id=f"membership-{node.id}",
-                        from_node_id=vpc_nodes[0].id,
-                        to_node_id=node.id,
-                        edge_type="contains",
-                        source="inferred",
-                        confidence=1.0,
-                        environment=node.environment
-                    ))
+        return ContainmentIndex.build(context.nodes.values())
+
+    def _apply_containment(self, context, containment):
+        for node_id, parent_id in containment.parent.items():
+            node = context.nodes[node_id]
+            node.parent_id = parent_id
+            context.edges.append(IREdge(
+                id=f"membership-{node.id}",
+                from_node_id=parent_id,
+                to_node_id=node.id,
+                edge_type="contains",
+                source="inferred",
+                confidence=1.0,
+                environment=node.environment
+            ))
+        # Reused by ValidateStage's empty-container check
+        context.children = containment.children
+
+    def _handle_containment(self, context):
+        self._apply_containment(context, self._plan_containment(context))
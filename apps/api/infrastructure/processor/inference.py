@@ -0,0 +1,259 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .base import ProcessingContext, IRNode
+
+# Weight of each kind of evidence. Scores combine as a noisy-OR, so one
+# strong match (ARN, endpoint) clears the default threshold on its own,
+# while weak matches (env var names) only count alongside something else.
+EVIDENCE_WEIGHTS: Dict[str, float] = {
+    "arn": 1.0,
+    "queue_url": 0.95,
+    "endpoint": 0.9,
+    "resource_name": 0.6,
+    "env_var_name": 0.3,
+}
+
+DEFAULT_THRESHOLD = 0.5
+
+# AWS merge_hints that identify a resource, and the evidence kind each yields
+_HINT_KINDS = {
+    "arn": "arn",
+    "queue_url": "queue_url",
+    "endpoint": "endpoint",
+    "reader_endpoint": "endpoint",
+    "resource_id": "resource_name",
+    "name_tag": "resource_name",
+}
+
+# Names this short or this generic match far too much to count as evidence
+_MIN_NAME_LENGTH = 4
+_GENERIC_NAMES = frozenset({"default", "main", "test", "prod", "staging", "data", "logs", "none", "true", "false"})
+
+_TOKEN_SPLIT_RE = re.compile(r"[^a-z0-9]+")
+_MAX_NGRAM = 4
+
+
+@dataclass
+class Evidence:
+    kind: str
+    value: str
+    github_key: Optional[str] = None # env var / property path the value came from
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "value": self.value, "github_key": self.github_key}
+
+
+@dataclass
+class InferredLink:
+    from_node_id: str
+    to_node_id: str
+    score: float
+    evidence: List[Evidence] = field(default_factory=list)
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN_SPLIT_RE.split(text.lower()) if t]
+
+
+def _host(value: str) -> Optional[str]:
+    if "://" not in value:
+        return None
+    try:
+        return urlsplit(value).hostname
+    except ValueError:
+        return None
+
+
+class AWSEvidenceIndex:
+    """Inverted indexes from identifying strings to AWS IR node ids.
+
+    Built once per pipeline run from the raw AWS sources' merge_hints
+    (source_metadata): exact ARNs, queue URLs, endpoint hosts, resource
+    names, plus resource-name token sequences for env var name matching.
+    """
+
+    def __init__(self):
+        self.exact: Dict[Tuple[str, str], set] = {} # (kind, value) -> node ids
+        self.name_tokens: Dict[str, set] = {} # "orders_queue" -> node ids
+
+    @classmethod
+    def build(cls, context: ProcessingContext, candidates: Dict[str, IRNode]) -> "AWSEvidenceIndex":
+        index = cls()
+        if not context.raw_aws or "sources" not in context.raw_aws:
+            return index
+        for source in context.raw_aws["sources"]:
+            for raw_node in source.get("nodes", []):
+                node_id = raw_node.get("key")
+                if node_id not in candidates:
+                    continue
+                hints = raw_node.get("source_metadata") or {}
+                for hint, kind in _HINT_KINDS.items():
+                    value = hints.get(hint)
+                    if isinstance(value, str) and value:
+                        index._add(kind, value, node_id)
+        return index
+
+    def _add(self, kind: str, value: str, node_id: str):
+        if kind == "endpoint":
+            value = (_host(value) or value.split(":")[0]).lower()
+        elif kind == "resource_name":
+            value = value.lower()
+            if len(value) < _MIN_NAME_LENGTH or value in _GENERIC_NAMES:
+                return
+            tokens = _tokens(value)
+            if 0 < len(tokens) <= _MAX_NGRAM:
+                self.name_tokens.setdefault("_".join(tokens), set()).add(node_id)
+        self.exact.setdefault((kind, value), set()).add(node_id)
+
+    def lookup(self, kind: str, value: str) -> set:
+        return self.exact.get((kind, value), set())
+
+
+class CrossProviderInference:
+    """Scores GitHub service → AWS resource links from concrete evidence.
+
+    Evidence is collected from every string in the GitHub node's
+    properties (compose environment, terraform attributes, ...):
+
+      - arn            value is exactly an AWS resource ARN
+      - queue_url      value is exactly an SQS queue URL
+      - endpoint       host of a URL / DSN value equals an RDS / cache endpoint
+      - resource_name  value (or s3:// host / first path segment) is a
+                       bucket, queue, table, ... name
+      - env_var_name   an env var name contains a resource name as a token
+                       run, e.g. ORDERS_QUEUE_URL → queue "orders-queue"
+
+    Each candidate pair is scored as 1 - Π(1 - weight) over distinct
+    evidence kinds; only pairs at or above the threshold are returned.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, weights: Optional[Dict[str, float]] = None):
+        self.threshold = threshold
+        self.weights = weights or EVIDENCE_WEIGHTS
+
+    def infer(
+        self,
+        context: ProcessingContext,
+        github_nodes: List[IRNode],
+        aws_nodes: List[IRNode],
+    ) -> List[InferredLink]:
+        candidates = {n.id: n for n in aws_nodes}
+        index = AWSEvidenceIndex.build(context, candidates)
+        if not index.exact:
+            return []
+
+        evidence_props = self._evidence_properties(context, github_nodes)
+        links: List[InferredLink] = []
+        for github_node in github_nodes:
+            found: Dict[str, Dict[Tuple[str, str], Evidence]] = {}
+            for ev, node_ids in self._match(evidence_props.get(github_node.id, []), index):
+                for node_id in node_ids:
+                    if node_id != github_node.id:
+                        found.setdefault(node_id, {}).setdefault((ev.kind, ev.value), ev)
+
+            for node_id, evidence in found.items():
+                score = self.score(evidence.values())
+                if score >= self.threshold:
+                    links.append(InferredLink(
+                        from_node_id=github_node.id,
+                        to_node_id=node_id,
+                        score=round(score, 3),
+                        evidence=list(evidence.values()),
+                    ))
+        return links
+
+    def score(self, evidence) -> float:
+        miss = 1.0
+        for kind in {ev.kind for ev in evidence}:
+            miss *= 1.0 - self.weights.get(kind, 0.0)
+        return 1.0 - miss
+
+    # ── Evidence extraction ──
+
+    def _match(self, props: List[Dict[str, Any]], index: AWSEvidenceIndex) -> Iterator[Tuple[Evidence, set]]:
+        seen_env: set = set()
+        for key, value in self._strings(props):
+            if key and key.isupper() and key not in seen_env:
+                seen_env.add(key)
+                yield from self._match_env_name(key, index)
+            if value:
+                yield from self._match_value(key, value, index)
+
+    def _match_value(self, key: Optional[str], value: str, index: AWSEvidenceIndex) -> Iterator[Tuple[Evidence, set]]:
+        if value.startswith("arn:"):
+            hits = index.lookup("arn", value)
+            if hits:
+                yield Evidence("arn", value, key), hits
+            return
+
+        host = _host(value)
+        if host:
+            hits = index.lookup("queue_url", value)
+            if hits:
+                yield Evidence("queue_url", value, key), hits
+            names = [host.lower()] if value.startswith("s3://") else []
+            path = urlsplit(value).path.strip("/")
+            if path:
+                names.append(path.split("/")[-1])
+        else:
+            # bare "host:port" or "bucket/prefix"
+            host = value.split(":")[0] if "." in value else None
+            names = [value, value.split("/")[0]] if "/" in value else [value]
+
+        if host:
+            host = host.lower()
+            hits = index.lookup("endpoint", host)
+            if hits:
+                yield Evidence("endpoint", host, key), hits
+
+        for name in names:
+            name = name.lower()
+            hits = index.lookup("resource_name", name)
+            if hits:
+                yield Evidence("resource_name", name, key), hits
+
+    def _match_env_name(self, key: str, index: AWSEvidenceIndex) -> Iterator[Tuple[Evidence, set]]:
+        tokens = _tokens(key)
+        for size in range(min(_MAX_NGRAM, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                gram = "_".join(tokens[start:start + size])
+                hits = index.name_tokens.get(gram)
+                if hits:
+                    yield Evidence("env_var_name", gram, key), hits
+
+    @staticmethod
+    def _evidence_properties(context: ProcessingContext, github_nodes: List[IRNode]) -> Dict[str, List[Dict[str, Any]]]:
+        """Properties to search per node; ghost api-service nodes borrow their directory's."""
+        ghosts = {n.id.rsplit(":", 1)[-1]: n.id for n in github_nodes if n.template_id == "api-service" and n.source == "inferred"}
+        props = {n.id: [n.properties] for n in github_nodes if n.id not in ghosts.values()}
+        if ghosts:
+            for node in context.nodes.values():
+                if node.source != "github":
+                    continue
+                loc = (node.properties.get("related_files") or [""])[0] or node.properties.get("source_location", "")
+                dir_name = loc.split("/")[0] if "/" in loc else "root"
+                if dir_name in ghosts:
+                    props.setdefault(ghosts[dir_name], []).append(node.properties)
+        return props
+
+    @staticmethod
+    def _strings(data: Any) -> Iterator[Tuple[Optional[str], str]]:
+        """Yield (nearest key, string) pairs; "K=V" list entries become (K, V)."""
+        stack: List[Tuple[Optional[str], Any]] = [(None, data)]
+        while stack:
+            key, item = stack.pop()
+            if isinstance(item, str):
+                if key is None and "=" in item:
+                    name, _, value = item.partition("=")
+                    if name.isidentifier():
+                        yield name, value
+                        continue
+                yield key, item
+            elif isinstance(item, dict):
+                for k, v in item.items():
+                    stack.append((k if isinstance(k, str) else key, v))
+            elif isinstance(item, (list, tuple)):
+                stack.extend((None, v) for v in item)
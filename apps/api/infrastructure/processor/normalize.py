@@ -1,22 +1,37 @@
 from .base import BaseStage, ProcessingContext, IRNode, ValidationWarning
 
 class NormalizeStage(BaseStage):
+    name = "normalize"
+
     def run(self, context: ProcessingContext) -> ProcessingContext:
-        # AWS Normalization
+        # Sources are independent: normalize each one concurrently, then
+        # insert in a fixed order (AWS sources first, then GitHub)
+        jobs = []
         if context.raw_aws and "sources" in context.raw_aws:
-            for source in context.raw_aws["sources"]:
-                for node in source.get("nodes", []):
-                    self._normalize_aws(node, context)
-
-        # GitHub Normalization
+            jobs.extend((self._normalize_aws, source) for source in context.raw_aws["sources"])
         if context.raw_github and "sources" in context.raw_github:
-            for source in context.raw_github["sources"]:
-                for node in source.get("nodes", []):
-                    self._normalize_github(node, context)
-        
+            jobs.extend((self._normalize_github, source) for source in context.raw_github["sources"])
+
+        per_source = context.map(
+            lambda job: [job[0](node) for node in job[1].get("nodes", [])],
+            jobs,
+        )
+        for ir_nodes in per_source:
+            for ir_node in ir_nodes:
+                self._insert(ir_node, context)
+
         return context
 
-    def _normalize_aws(self, raw_node, context):
+    def _insert(self, ir_node, context):
+        # Handle iam-group merging early in normalize or in resolve? 
+        # For singleton groups, we can merge here.
+        key = ir_node.id
+        if key in context.nodes and ir_node.template_id == "iam-group":
+            context.nodes[key].source_metadata.append(ir_node.source_metadata[0])
+        else:
+            context.nodes[key] = ir_node
+
+    def _normalize_aws(self, raw_node):
         props = raw_node.get("properties", {})
         key = raw_node["key"]
         
@@ -77,14 +92,9 @@ class NormalizeStage(BaseStage):
                 severity="info"
             ))
 
-        # Handle iam-group merging early in normalize or in resolve? 
-        # For singleton groups, we can merge here.
-        if key in context.nodes and template_id == "iam-group":
-            context.nodes[key].source_metadata.append(ir_node.source_metadata[0])
-        else:
-            context.nodes[key] = ir_node
+        return ir_node
 
-    def _normalize_github(self, raw_node, context):
+    def _normalize_github(self, raw_node):
         props = raw_node.get("properties", {})
         image = props.get("image", "").lower()
         package = props.get("package", "").lower()
@@ -130,4 +140,4 @@ class NormalizeStage(BaseStage):
                 severity="info"
             ))
 
-        context.nodes[key] = ir_node
+        return ir_node
@@ -1,20 +1,158 @@
-from .base import ProcessingContext
+import json
+import time
+import hashlib
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from .base import BaseStage, ProcessingContext
 from .normalize import NormalizeStage
 from .resolve import ResolveStage
 from .enrich import EnrichStage
 from .validate import ValidateStage
 
+# Bump whenever a stage's output for unchanged input changes, so graphs
+# built by older code are rebuilt instead of skipped as unchanged
+PIPELINE_VERSION = "ir-v3"
+
+
+def input_fingerprint(raw_github: dict, raw_aws: dict) -> Optional[str]:
+    """Hash of PIPELINE_VERSION plus every raw source's content_hash, in order.
+
+    Identical fingerprints mean execute() would build an identical graph.
+    None if any source carries no content_hash.
+    """
+    hashes = []
+    for raw in (raw_aws, raw_github):
+        for source in (raw or {}).get("sources", []):
+            content_hash = source.get("content_hash")
+            if not content_hash:
+                return None
+            hashes.append([source.get("source"), content_hash])
+    body = json.dumps([PIPELINE_VERSION, hashes], separators=(",", ":"))
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _traced_peak_mb() -> float:
+    """tracemalloc's peak since the last reset_peak(), in MB."""
+    return round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+
+
+def schedule(stages: List[BaseStage]) -> List[List[BaseStage]]:
+    """Group stages into waves; each wave depends only on earlier waves.
+
+    Stages in the same wave are independent and run concurrently, so they
+    must not mutate the same parts of the context.
+    """
+    names = {s.name for s in stages}
+    for stage in stages:
+        missing = set(stage.depends_on) - names
+        if missing:
+            raise ValueError(f"Stage {stage.name!r} depends on unknown stage(s): {sorted(missing)}")
+
+    done: set = set()
+    remaining = list(stages)
+    waves = []
+    while remaining:
+        wave = [s for s in remaining if set(s.depends_on) <= done]
+        if not wave:
+            raise ValueError(f"Stage dependency cycle among: {[s.name for s in remaining]}")
+        waves.append(wave)
+        done.update(s.name for s in wave)
+        remaining = [s for s in remaining if s not in wave]
+    return waves
+
+
 class InfrastructurePipeline:
-    def __init__(self):
+    """Runs the IR stages in dependency order.
+
+    Independent work inside a stage (per-source normalization, per-rule
+    enrichment) and independent stages fan out over a thread pool of
+    max_workers (1 = fully sequential). Per-stage duration and node/edge
+    counts in/out are recorded in context.graph_metadata["stage_metrics"].
+    trace_memory adds the tracemalloc peak of each stage (traced_peak_mb),
+    at a noticeable runtime cost; stages that run concurrently in one wave
+    share that wave's combined peak.
+    """
+
+    def __init__(self, max_workers: int = 4, trace_memory: bool = False):
         self.stages = [
             NormalizeStage(),
             ResolveStage(),
             EnrichStage(),
             ValidateStage()
         ]
+        self.max_workers = max_workers
+        self.trace_memory = trace_memory
 
     def execute(self, raw_github: dict, raw_aws: dict) -> ProcessingContext:
         context = ProcessingContext(raw_github, raw_aws)
-        for stage in self.stages:
-            context = stage.run(context)
+        waves = schedule(self.stages)
+        metrics: List[Dict[str, Any]] = []
+
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers) if self.max_workers > 1 else None
+        context.executor = executor
+        start = time.perf_counter()
+        try:
+            for wave in waves:
+                tracing = self.trace_memory and tracemalloc.is_tracing()
+                if len(wave) == 1 or executor is None:
+                    for stage in wave:
+                        if tracing:
+                            tracemalloc.reset_peak()
+                        context = self._run_stage(stage, context, metrics)
+                        if tracing:
+                            metrics[-1]["traced_peak_mb"] = _traced_peak_mb()
+                else:
+                    if tracing:
+                        tracemalloc.reset_peak()
+                    first = len(metrics)
+                    # Own pool for the stages, so their context.map calls on the
+                    # shared pool can never wait behind the stages themselves
+                    with ThreadPoolExecutor(max_workers=len(wave)) as stage_pool:
+                        futures = [stage_pool.submit(self._run_stage, stage, context, metrics) for stage in wave]
+                        for future in futures:
+                            future.result()
+                    if tracing:
+                        peak_mb = _traced_peak_mb()
+                        for entry in metrics[first:]:
+                            entry["traced_peak_mb"] = peak_mb
+        finally:
+            context.executor = None
+            if executor is not None:
+                executor.shutdown(wait=True)
+            if started_tracing:
+                tracemalloc.stop()
+
+        context.graph_metadata["stage_metrics"] = metrics
+        context.graph_metadata["pipeline"] = {
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "max_workers": self.max_workers,
+            "waves": [[s.name for s in wave] for wave in waves],
+        }
+        if self.trace_memory:
+            context.graph_metadata["pipeline"]["traced_peak_mb"] = max(
+                (m["traced_peak_mb"] for m in metrics if "traced_peak_mb" in m), default=None
+            )
+        return context
+
+    def _run_stage(self, stage: BaseStage, context: ProcessingContext, metrics: List[Dict[str, Any]]) -> ProcessingContext:
+        nodes_in, edges_in = len(context.nodes), len(context.edges)
+        start = time.perf_counter()
+
+        context = stage.run(context)
+
+        entry = {
+            "stage": stage.name or type(stage).__name__,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "nodes_in": nodes_in,
+            "nodes_out": len(context.nodes),
+            "edges_in": edges_in,
+            "edges_out": len(context.edges),
+        }
+        metrics.append(entry)
         return context
@@ -1,6 +1,9 @@
 from .base import BaseStage, ProcessingContext, IRNode, IREdge
 
 class ResolveStage(BaseStage):
+    name = "resolve"
+    depends_on = ("normalize",)
+
     def run(self, context: ProcessingContext) -> ProcessingContext:
         nodes_to_remove = []
         
@@ -53,9 +56,9 @@ class ResolveStage(BaseStage):
                 # e.g. "boto3" -> "object-storage"
                 target_node = None
                 if "pgvector" in package or "postgres" in package:
-                    target_node = next((n for n in context.nodes.values() if n.template_id == "sql-db"), None)
+                    target_node = context.nodes.first_by_template("sql-db")
                 elif "minio" in package:
-                    target_node = next((n for n in context.nodes.values() if n.template_id == "object-storage"), None)
+                    target_node = context.nodes.first_by_template("object-storage")
                 
                 if target_node:
                     # Redirect any edges pointing to this package/dependency to the canonical service node
@@ -72,8 +75,4 @@ class ResolveStage(BaseStage):
         return context
 
     def _redirect_edges(self, context, old_id, new_id):
-        for edge in context.edges:
-            if edge.from_node_id == old_id:
-                edge.from_node_id = new_id
-            if edge.to_node_id == old_id:
-                edge.to_node_id = new_id
+        context.edges.redirect(old_id, new_id)
@@ -1,52 +1,177 @@
-from .base import BaseStage, ProcessingContext, ValidationWarning
+import time
+from functools import cached_property
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple
+
+from .base import BaseStage, ProcessingContext, IRNode, ValidationWarning
+from .containment import CONTAINER_ID_PROPS
+
+# A rule reads the columnar view and yields (node row, warning) findings,
+# each at most once
+Rule = Callable[["GraphView", ProcessingContext, "WarningPool"], Iterable[Tuple[int, ValidationWarning]]]
+
+# name -> rule, in registration order (= default run order)
+VALIDATION_RULES: Dict[str, Rule] = {}
+
+
+def validation_rule(name: str):
+    """Register a rule under *name*; ValidateStage runs all registered rules by default."""
+    def register(fn: Rule) -> Rule:
+        if name in VALIDATION_RULES:
+            raise ValueError(f"Validation rule {name!r} already registered")
+        VALIDATION_RULES[name] = fn
+        return fn
+    return register
+
+
+class WarningPool:
+    """Interns warnings so identical ones share a single instance.
+
+    ValidationWarning is frozen, so one instance can safely sit in many
+    nodes' validation_warnings lists.
+    """
+
+    def __init__(self):
+        self._warnings: Dict[ValidationWarning, ValidationWarning] = {}
+
+    def get(self, type: str, message: str, severity: str) -> ValidationWarning:
+        warning = ValidationWarning(type=type, message=message, severity=severity)
+        return self._warnings.setdefault(warning, warning)
+
+    def __len__(self) -> int:
+        return len(self._warnings)
+
+
+class GraphView:
+    """Column-per-attribute snapshot of the graph, shared by all rules.
+
+    Node columns are parallel lists indexed by row; edges are parallel
+    lists of source / target rows (-1 when the endpoint is not a node).
+    Each column is built on first use, so rules only pay for what they read.
+    """
+
+    def __init__(self, context: ProcessingContext):
+        self._context = context
+        self.nodes: List[IRNode] = list(context.nodes.values())
+
+    @cached_property
+    def ids(self) -> List[str]:
+        return [n.id for n in self.nodes]
+
+    @cached_property
+    def row(self) -> Dict[str, int]:
+        return {node_id: i for i, node_id in enumerate(self.ids)}
+
+    @cached_property
+    def source(self) -> List[str]:
+        return [n.source for n in self.nodes]
+
+    @cached_property
+    def environment(self) -> List[str]:
+        return [n.environment for n in self.nodes]
+
+    @cached_property
+    def template_id(self) -> List[str]:
+        return [n.template_id for n in self.nodes]
+
+    @cached_property
+    def node_type(self) -> List[str]:
+        return [n.node_type for n in self.nodes]
+
+    @cached_property
+    def resource_type(self) -> List[Optional[str]]:
+        return [n.properties.get("resource_type") for n in self.nodes]
+
+    @cached_property
+    def edge_from(self) -> List[int]:
+        row = self.row
+        return [row.get(e.from_node_id, -1) for e in self._context.edges]
+
+    @cached_property
+    def edge_to(self) -> List[int]:
+        row = self.row
+        return [row.get(e.to_node_id, -1) for e in self._context.edges]
+
+
+# ── Rules ──
+
+@validation_rule("partial_scan")
+def partial_scan(view: GraphView, context: ProcessingContext, pool: WarningPool):
+    """AWS export with zero edges: mark the graph and every AWS node partial."""
+    if context.raw_aws and any(source.get("edges") for source in context.raw_aws.get("sources", [])):
+        return
+
+    context.graph_metadata["source_completeness"] = "partial"
+    context.graph_metadata["warnings"].append(pool.get(
+        "partial_scan", "AWS export returns zero edges; data may be incomplete", "warn",
+    ))
+    warning = pool.get("partial_scan", "Potential partial scan", "warn")
+    nodes = view.nodes
+    for i, source in enumerate(view.source):
+        if source == "aws":
+            nodes[i].source_completeness = "partial"
+            yield i, warning
+
+
+@validation_rule("empty_container")
+def empty_container(view: GraphView, context: ProcessingContext, pool: WarningPool):
+    """VPCs / subnets (and legacy group nodes) with no children in context.children."""
+    warning = pool.get("empty_container", "Container has no child resources", "warn")
+    children, ids = context.children, view.ids
+    for i, (node_type, template_id, resource_type) in enumerate(zip(view.node_type, view.template_id, view.resource_type)):
+        if (node_type == "group" or template_id == "vpc-group" or resource_type in CONTAINER_ID_PROPS) and not children.get(ids[i]):
+            yield i, warning
+
+
+@validation_rule("cross_environment_edge")
+def cross_environment_edge(view: GraphView, context: ProcessingContext, pool: WarningPool):
+    """Edges between nodes pinned to different environments ("both" spans all).
+    One warning per (source, target) pair, however many edges link them."""
+    env, ids = view.environment, view.ids
+    seen = set()
+    for f, t in zip(view.edge_from, view.edge_to):
+        if f < 0 or t < 0:
+            continue
+        from_env, to_env = env[f], env[t]
+        if from_env != to_env and from_env != "both" and to_env != "both" and (f, t) not in seen:
+            seen.add((f, t))
+            yield f, pool.get("cross_environment_edge", f"Resource links to {to_env} resource: {ids[t]}", "warn")
+
 
 class ValidateStage(BaseStage):
+    """Runs the registered validation rules over a columnar view of the graph.
+
+    rules picks which registered rules run, and in what order (default: all,
+    in registration order). Each rule makes one pass over the columns and
+    yields each (node, warning) finding once; identical warnings are
+    interned, so nodes share warning instances.
+    Per-rule counts and timings go to graph_metadata["validation"].
+    """
+    name = "validate"
+    depends_on = ("enrich",)
+
+    def __init__(self, rules: Optional[List[str]] = None):
+        names = list(VALIDATION_RULES) if rules is None else list(rules)
+        unknown = [n for n in names if n not in VALIDATION_RULES]
+        if unknown:
+            raise ValueError(f"Unknown validation rule(s): {unknown}")
+        self.rules = names
+
     def run(self, context: ProcessingContext) -> ProcessingContext:
-        # 1. Partial Scan Warning (AWS 0 edges)
-        # Assuming we check raw_aws for edges before internal state
-        aws_edges = []
-        if context.raw_aws and "sources" in context.raw_aws:
-            for source in context.raw_aws["sources"]:
-                aws_edges.extend(source.get("edges", []))
-        
-        if not aws_edges:
-            context.graph_metadata["source_completeness"] = "partial"
-            context.graph_metadata["warnings"].append(ValidationWarning(
-                type="partial_scan",
-                message="AWS export returns zero edges; data may be incomplete",
-                severity="warn"
-            ))
-            # Attach to all AWS nodes
-            for node in context.nodes.values():
-                if node.source == "aws":
-                    node.source_completeness = "partial"
-                    node.validation_warnings.append(ValidationWarning(
-                        type="partial_scan",
-                        message="Potential partial scan",
-                        severity="warn"
-                    ))
-
-        # 2. Empty Container Warning
-        containers = [n for n in context.nodes.values() if n.node_type == "group" or n.template_id == "vpc-group"]
-        for container in containers:
-            children = [n for n in context.nodes.values() if n.parent_id == container.id]
-            if not children:
-                container.validation_warnings.append(ValidationWarning(
-                    type="empty_container",
-                    message="Container has no child resources",
-                    severity="warn"
-                ))
-
-        # 3. Cross-Environment Edge Warning
-        for edge in context.edges:
-            from_node = context.nodes.get(edge.from_node_id)
-            to_node = context.nodes.get(edge.to_node_id)
-            if from_node and to_node:
-                if from_node.environment != "both" and to_node.environment != "both" and from_node.environment != to_node.environment:
-                    from_node.validation_warnings.append(ValidationWarning(
-                        type="cross_environment_edge",
-                        message=f"Resource links to {to_node.environment} resource: {to_node.id}",
-                        severity="warn"
-                    ))
+        view = GraphView(context)
+        nodes = view.nodes
+        pool = WarningPool()
+        stats: Dict[str, Dict[str, Any]] = {}
+
+        for name in self.rules:
+            start = time.perf_counter()
+            attached = 0
+            for i, warning in VALIDATION_RULES[name](view, context, pool):
+                nodes[i].validation_warnings.append(warning)
+                attached += 1
+            stats[name] = {
+                "warnings": attached,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
 
+        context.graph_metadata["validation"] = {"rules": stats, "distinct_warnings": len(pool)}
         return context
@@ -225,6 +225,7 @@ class EKSCollector(BaseCollector):
                     "version": cluster.get("version"),
                     "status": cluster.get("status"),
                     "vpc_id": cluster.get("resourcesVpcConfig", {}).get("vpcId"),
+                    "subnet_ids": cluster.get("resourcesVpcConfig", {}).get("subnetIds", []),
                     "platform_version": cluster.get("platformVersion"),
                     "role_arn": cluster.get("roleArn"),
                 },
@@ -49,6 +49,11 @@ class RDSCollector(BaseCollector):
                         "status": db["DBInstanceStatus"],
                         "instance_class": db.get("DBInstanceClass"),
                         "vpc_id": db.get("DBSubnetGroup", {}).get("VpcId"),
+                        "subnet_ids": [
+                            sn.get("SubnetIdentifier")
+                            for sn in db.get("DBSubnetGroup", {}).get("Subnets", [])
+                            if sn.get("SubnetIdentifier")
+                        ],
                         "endpoint": endpoint,
                         "port": db.get("Endpoint", {}).get("Port"),
                         "multi_az": db.get("MultiAZ"),
@@ -1,9 +1,14 @@
 """
 AWS infrastructure detector — thin orchestrator with multi-region scanning.
 
-Discovers active regions via ec2.describe_regions, then scans all regional
-collectors in parallel via asyncio.run_in_executor. Global collectors
-(IAM, CloudFront, S3) run once using the bootstrap region client.
+Discovers active regions via ec2.describe_regions, prunes regions that a
+cheap presence probe classifies as empty (see region_probe.py), then scans
+the remaining regional collectors in parallel. Global collectors (IAM,
+CloudFront, S3) run once using the bootstrap region client, concurrently
+with the regional scans.
+
+Every blocking boto3 call runs on the dedicated AWS executor (see
+executor.py), never on the event loop thread.
 """
 
 from __future__ import annotations
@@ -18,7 +23,11 @@ from apps.api.ingestors.aws.base import BaseDetector
 from apps.api.ingestors.aws.schemas import DiscoveryResult
 from apps.api.ingestors.aws.schema import TopologyNode, TopologyEdge, TopologyScan
 from apps.api.ingestors.aws.client_factory import AWSClientFactory
+from apps.api.ingestors.aws.executor import run_blocking
 from apps.api.ingestors.aws.relationships import RelationshipDetector
+from apps.api.ingestors.aws.region_probe import SCAN_MODES, ScanPlanner
+from apps.api.ingestors.aws.raw_store import RAW_SPILL_SUFFIX, RawPayloadStore
+from apps.api.ingestors.aws.ndjson import write_ndjson
 
 # Collectors
 from apps.api.ingestors.aws.collectors.compute import (
@@ -98,23 +107,39 @@ class AWSDetector(BaseDetector):
     - bootstrap_region (region_name) is used only for STS, describe_regions,
       and global collectors.
     - Regional collectors are instantiated per-region in parallel threads.
+    - scan_mode="pruned" skips regions probed as empty; "full" scans every
+      opted-in region. region_allowlist / region_denylist override the probe.
+    - raw_payload_policy controls what is kept of each node's raw API
+      response ("full" | "none" | "hashed" | "spill", see raw_store.py).
+    - SDK-direct relationship lookups for a region start as soon as that
+      region's collectors finish (see sdk_direct.py).
+    - Construction makes no AWS calls; the account ID is resolved (on the
+      AWS executor) when the first scan starts.
     """
 
-    def __init__(self, region_name: str | None = "us-east-1", credentials: dict | None = None) -> None:
+    def __init__(
+        self,
+        region_name: str | None = "us-east-1",
+        credentials: dict | None = None,
+        scan_mode: str = "pruned",
+        region_allowlist: list[str] | None = None,
+        region_denylist: list[str] | None = None,
+        raw_payload_policy: str = "full",
+    ) -> None:
+        if scan_mode not in SCAN_MODES:
+            raise ValueError(f"Unknown scan mode {scan_mode!r}; expected one of {SCAN_MODES}")
         self.region_name = region_name or "us-east-1"  # bootstrap region
         self.credentials = credentials or {}
+        self.scan_mode = scan_mode
+        self.region_allowlist = region_allowlist or []
+        self.region_denylist = region_denylist or []
+        self._raw_store = RawPayloadStore(raw_payload_policy)
 
         # Bootstrap factory — used for STS, describe_regions, and global collectors
         self._factory = AWSClientFactory(region_name=region_name, credentials=self.credentials)
 
-        # Resolve account ID eagerly
-        self.account_id = self._get_account_id()
-
-        # Global collectors (run once with bootstrap factory)
-        self._global_collectors = [
-            Cls(self._factory, region_name, self.account_id)
-            for Cls in GLOBAL_COLLECTORS
-        ]
+        # Resolved lazily by the first scan (STS call)
+        self.account_id: str | None = None
 
         # Relationship detector
         self._relationship_detector = RelationshipDetector(self._factory, self.credentials)
@@ -126,26 +151,61 @@ class AWSDetector(BaseDetector):
         return "aws"
 
     async def discover(self, include_relationships: bool = True, **kwargs: Any) -> DiscoveryResult:
-        """Run full multi-region scan and return legacy DiscoveryResult."""
-        scan = await self._run_scan(include_relationships)
-        return scan.to_discovery_result()
+        """Run full multi-region scan and return legacy DiscoveryResult.
+
+        The legacy result carries no raw payloads, so any spill file is
+        deleted once it is built.
+        """
+        try:
+            scan = await self._run_scan(include_relationships)
+            return scan.to_discovery_result()
+        finally:
+            self._raw_store.cleanup()
 
     async def scan_to_json(self, output_path: str | None = None, **kwargs: Any) -> str:
         """Run full multi-region scan and return the TopologyScan JSON snapshot.
 
-        If *output_path* is provided, also writes the JSON file.
+        If *output_path* is provided, the JSON is streamed to that file and
+        the path is returned instead of the JSON (earlier versions returned
+        the JSON in both cases). Spilled raw payloads then go to
+        ``{output_path}.raw.jsonl``, which the references in the file point
+        at; without *output_path* they are inlined into the returned JSON.
         This is the primary output method for the datalake pipeline.
         """
         include_relationships = kwargs.get("include_relationships", True)
-        scan = await self._run_scan(include_relationships)
-        json_str = scan.to_json()
+        if not output_path:
+            try:
+                scan = await self._run_scan(include_relationships)
+                self._raw_store.inline(scan.nodes)
+                return scan.to_json()
+            finally:
+                self._raw_store.cleanup()
 
-        if output_path:
+        self._raw_store.spill_to(f"{output_path}{RAW_SPILL_SUFFIX}")
+        try:
+            scan = await self._run_scan(include_relationships)
             with open(output_path, "w") as f:
-                f.write(json_str)
+                scan.write_json(f)
             logger.info(f"Scan JSON written to {output_path}")
+            return output_path
+        finally:
+            self._raw_store.hand_off()
 
-        return json_str
+    async def scan_to_ndjson(self, output_path: str, compression: str | None = None, **kwargs: Any) -> str:
+        """Run full multi-region scan and stream it to *output_path* as NDJSON.
+
+        Compression ("none" | "gzip" | "zstd") defaults to the file extension.
+        Unlike scan_to_json, no serialized copy of the scan is held in memory.
+        Spilled raw payloads go to ``{output_path}.raw.jsonl``.
+        """
+        include_relationships = kwargs.get("include_relationships", True)
+        self._raw_store.spill_to(f"{output_path}{RAW_SPILL_SUFFIX}")
+        try:
+            scan = await self._run_scan(include_relationships)
+            write_ndjson(scan, output_path, compression)
+            return output_path
+        finally:
+            self._raw_store.hand_off()
 
     # -- Internals -----------------------------------------------------------
 
@@ -159,38 +219,54 @@ class AWSDetector(BaseDetector):
             return "000000000000"
 
     async def _run_scan(self, include_relationships: bool) -> TopologyScan:
-        """Core scanning logic: parallel regional + synchronous global."""
+        """Core scanning logic: regional and global collectors, all concurrent."""
         all_nodes: list[TopologyNode] = []
         edges: list[TopologyEdge] = []
+        scan_plan: dict = {}
+
+        if self.account_id is None:
+            self.account_id = await run_blocking(self._get_account_id)
 
         try:
-            # Discover active regions
-            active_regions = RegionDiscovery(self._factory).get_active_regions()
+            # Discover opted-in regions, then prune the empty ones
+            opted_in = await run_blocking(RegionDiscovery(self._factory).get_active_regions)
+            plan = await ScanPlanner(
+                self.credentials,
+                mode=self.scan_mode,
+                allowlist=self.region_allowlist,
+                denylist=self.region_denylist,
+                collectors_per_region=len(REGIONAL_COLLECTORS),
+            ).plan(opted_in)
+            scan_plan = plan.to_dict()
+            active_regions = plan.regions_to_scan
             logger.info(f"Scanning {len(active_regions)} regions: {active_regions}")
 
-            # --- Regional collectors: run concurrently across regions ---
-            loop = asyncio.get_event_loop()
-            regional_tasks = [
-                loop.run_in_executor(None, self._scan_region, region)
-                for region in active_regions
+            # --- Regional and global collectors: all concurrent ---
+            async def scan_region(region: str) -> list[TopologyNode]:
+                nodes = await run_blocking(self._scan_region, region)
+                if include_relationships:
+                    # Start SDK-direct lookups while other regions are still scanning
+                    self._relationship_detector.prefetch(nodes)
+                return nodes
+
+            global_collectors = [
+                Cls(self._factory, self.region_name, self.account_id)
+                for Cls in GLOBAL_COLLECTORS
             ]
-            regional_results = await asyncio.gather(*regional_tasks, return_exceptions=True)
-
-            for region, result in zip(active_regions, regional_results):
+            outcomes = await asyncio.gather(
+                *[scan_region(region) for region in active_regions],
+                *[run_blocking(self._collect_global, collector) for collector in global_collectors],
+                return_exceptions=True,
+            )
+            labels = active_regions + [type(c).__name__ for c in global_collectors]
+
+            for label, result in zip(labels, outcomes):
                 if isinstance(result, Exception):
-                    logger.error(f"Region {region} scan failed: {result}")
+                    logger.error(f"{label} scan failed: {result}")
                     continue
-                logger.info(f"Region {region}: {len(result)} nodes")
+                logger.info(f"{label}: {len(result)} nodes")
                 all_nodes.extend(result)
 
-            # --- Global collectors: run once (synchronously — they're fast) ---
-            for collector in self._global_collectors:
-                name = type(collector).__name__
-                logger.info(f"Running {name} (global)...")
-                collected = collector.collect()
-                logger.info(f"  {name}: {len(collected)} nodes")
-                all_nodes.extend(collected)
-
             # Deduplicate by uid (guards against edge cases)
             seen: dict[str, TopologyNode] = {}
             for node in all_nodes:
@@ -201,7 +277,8 @@ class AWSDetector(BaseDetector):
 
             if include_relationships:
                 logger.info("Detecting resource relationships...")
-                edges = self._relationship_detector.detect(all_nodes)
+                # Waits on SDK-direct lookups and scans every node: keep it off the loop
+                edges = await run_blocking(self._relationship_detector.detect, all_nodes)
                 logger.info(f"  Detected {len(edges)} relationships")
             else:
                 logger.info("Skipping relationship detection for datalake population.")
@@ -209,6 +286,11 @@ class AWSDetector(BaseDetector):
         except Exception as e:
             logger.error(f"AWS discovery failed: {e}", exc_info=True)
             active_regions = [self.region_name]
+        finally:
+            # Spilled payloads stay on disk; the public scan methods decide their fate
+            self._raw_store.close()
+            # No-op after detect(); drops prefetched lookups if the scan failed
+            self._relationship_detector.close()
 
         return TopologyScan(
             scan_id=str(uuid.uuid4()),
@@ -218,10 +300,17 @@ class AWSDetector(BaseDetector):
             scanned_at=datetime.now(timezone.utc).isoformat(),
             nodes=all_nodes,
             edges=edges,
+            scan_plan=scan_plan,
         )
 
+    def _collect_global(self, collector: Any) -> list[TopologyNode]:
+        """Run one global collector — runs on the AWS executor."""
+        collected = collector.collect()
+        self._raw_store.apply(collected)
+        return collected
+
     def _scan_region(self, region: str) -> list[TopologyNode]:
-        """Scan a single region — runs in a thread via run_in_executor."""
+        """Scan a single region — runs on the AWS executor."""
         regional_factory = AWSClientFactory(region, self.credentials)
         nodes: list[TopologyNode] = []
 
@@ -230,6 +319,7 @@ class AWSDetector(BaseDetector):
             name = CollectorClass.__name__
             try:
                 collected = collector.collect()
+                self._raw_store.apply(collected)
                 if collected:
                     logger.info(f"  {region}/{name}: {len(collected)} nodes")
                 nodes.extend(collected)
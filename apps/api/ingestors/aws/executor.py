@@ -0,0 +1,44 @@
+"""
+Dedicated thread pool for blocking boto3 calls.
+
+boto3 is synchronous, so AWS discovery runs every API call (STS, region
+listing, presence probes, collectors, relationship detection) in worker
+threads. They get their own bounded pool rather than the event loop's
+default executor, so a large scan cannot starve unrelated
+run_in_executor work elsewhere in the API, and concurrent scans queue
+instead of spawning unbounded threads.
+
+Size it with OPSCRIBE_AWS_EXECUTOR_WORKERS (default 32).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_AWS_EXECUTOR_WORKERS = 32
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def get_aws_executor() -> ThreadPoolExecutor:
+    """Return the process-wide AWS executor, creating it on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            workers = int(os.environ.get("OPSCRIBE_AWS_EXECUTOR_WORKERS", DEFAULT_AWS_EXECUTOR_WORKERS))
+            _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="aws-discovery")
+        return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking (boto3) call on the AWS executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_aws_executor(), functools.partial(fn, *args, **kwargs))
@@ -1,6 +1,10 @@
-from typing import List, Dict, Type
+from typing import List, Dict, Set, Type
+import asyncio
 import logging
-from uuid import UUID
+from datetime import datetime
+from uuid import UUID, uuid4
+from sqlalchemy import insert, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import Session, select
 from apps.api.ingestors.aws.base import BaseDetector
 from apps.api.ingestors.aws.schemas import DiscoveryResult, DiscoveryNode, DiscoveryEdge
@@ -8,113 +12,203 @@ from apps.api.models import Node, Edge, NodeType, EdgeType
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on one detector's discover() in run_discovery
+DEFAULT_DISCOVERY_TIMEOUT_S = 30 * 60
+# Node upserts conflict on this (client_id, graph_id, key) constraint; see models.Node
+NODE_KEY_CONSTRAINT = "unique_node_client_graph_key"
+
 class DiscoveryManager:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, batch_size: int = 1000, timeout: float = DEFAULT_DISCOVERY_TIMEOUT_S):
         self.session = session
+        self.batch_size = batch_size # rows per INSERT; nodes bind 11 params each
+        self.timeout = timeout # seconds per detector
         self.detectors: Dict[str, BaseDetector] = {}
 
     def register_detector(self, detector: BaseDetector):
         self.detectors[detector.source_name] = detector
 
-    async def run_discovery(self, client_id: UUID, graph_id: UUID, source_names: List[str] = None, **kwargs):
-        sources = source_names or self.detectors.keys()
-        
-        for name in sources:
+    async def run_discovery(self, client_id: UUID, graph_id: UUID, source_names: List[str] = None, **kwargs) -> Dict[str, str]:
+        """
+        Run the detectors concurrently, each bounded by self.timeout, then
+        merge their results one at a time (they share this manager's session).
+        A source that fails or times out is skipped without affecting the others.
+
+        Returns source name -> "merged" or the error that stopped it.
+        """
+        detectors: Dict[str, BaseDetector] = {}
+        for name in source_names or self.detectors.keys():
             detector = self.detectors.get(name)
             if not detector:
                 logger.warning(f"Detector {name} not found")
                 continue
-            
+            detectors[name] = detector
+
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(d.discover(**kwargs), timeout=self.timeout) for d in detectors.values()),
+            return_exceptions=True,
+        )
+
+        status: Dict[str, str] = {}
+        for name, outcome in zip(detectors, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                logger.error(f"Discovery timed out for {name} after {self.timeout}s")
+                status[name] = "timed out"
+                continue
+            if isinstance(outcome, BaseException):
+                logger.error(f"Discovery failed for {name}: {outcome}")
+                status[name] = str(outcome) or type(outcome).__name__
+                continue
             try:
-                result = await detector.discover(**kwargs)
-                await self._merge_result(client_id, graph_id, result)
+                await self._merge_result(client_id, graph_id, outcome)
+                status[name] = "merged"
             except Exception as e:
-                logger.error(f"Discovery failed for {name}: {e}")
+                # Leave the session usable for the remaining sources
+                self.session.rollback()
+                logger.error(f"Merging {name} results failed: {e}")
+                status[name] = str(e) or type(e).__name__
+        return status
 
     async def _merge_result(self, client_id: UUID, graph_id: UUID, result: DiscoveryResult):
-        # 1. Identity Resolution & Node Merging
-        for d_node in result.nodes:
-            # Check if node exists by key
-            statement = select(Node).where(
-                Node.client_id == client_id,
-                Node.graph_id == graph_id,
-                Node.key == d_node.key
-            )
-            existing_node = self.session.exec(statement).first()
-            
-            # Find or infer NodeType ID (simplified)
-            node_type_id = await self._get_node_type_id(client_id, graph_id, d_node.node_type)
-            
-            if existing_node:
-                # Update properties if needed (merge logic)
-                existing_node.properties.update(d_node.properties)
-                existing_node.source = result.source
-                existing_node.source_metadata.update(d_node.source_metadata)
-                self.session.add(existing_node)
-            else:
-                new_node = Node(
-                    client_id=client_id,
-                    graph_id=graph_id,
-                    node_type_id=node_type_id,
-                    key=d_node.key,
-                    display_name=d_node.display_name or d_node.key,
-                    properties=d_node.properties,
-                    source=result.source,
-                    source_metadata=d_node.source_metadata
+        """
+        Bulk-merge a DiscoveryResult into the graph in O(batches) round trips:
+        node/edge types are preloaded (missing ones inserted together), nodes
+        are upserted on (client_id, graph_id, key) with their properties and
+        source_metadata merged into existing rows, edge endpoints resolve
+        through the returned key -> id map, and new edges are bulk-inserted
+        after checking them against the stored edges leaving those nodes.
+        Everything is committed once at the end.
+        """
+        now = datetime.utcnow()
+
+        # 1. Types used by this result
+        node_type_ids = self._ensure_types(NodeType, client_id, graph_id, {n.node_type for n in result.nodes})
+        edge_type_ids = self._ensure_types(EdgeType, client_id, graph_id, {e.edge_type for e in result.edges})
+
+        # 2. Identity Resolution & Node Merging (upsert by key)
+        key_to_id = self._upsert_nodes(client_id, graph_id, result, node_type_ids, now)
+
+        # 3. Edge Merging
+        edges = [e for e in result.edges if e.edge_type in edge_type_ids]
+        missing = {k for e in edges for k in (e.from_node_key, e.to_node_key)} - key_to_id.keys()
+        key_to_id.update(self._node_ids_by_key(graph_id, missing))
+
+        # Only edges leaving this result's resolvable endpoints can collide
+        from_ids = sorted({
+            key_to_id[e.from_node_key] for e in edges
+            if e.from_node_key in key_to_id and e.to_node_key in key_to_id
+        })
+        existing = set()
+        for batch in _batches(from_ids, self.batch_size):
+            existing.update(self.session.exec(
+                select(Edge.from_node_id, Edge.to_node_id, Edge.edge_type_id).where(
+                    Edge.graph_id == graph_id,
+                    Edge.edge_type_id.in_(set(edge_type_ids.values())),
+                    Edge.from_node_id.in_(batch),
                 )
-                self.session.add(new_node)
-        
-        self.session.commit()
+            ).all())
 
-        # 2. Edge Merging
-        for d_edge in result.edges:
-            # Find from/to nodes
-            from_node = self.session.exec(select(Node).where(Node.key == d_edge.from_node_key, Node.graph_id == graph_id)).first()
-            to_node = self.session.exec(select(Node).where(Node.key == d_edge.to_node_key, Node.graph_id == graph_id)).first()
-            
-            if not from_node or not to_node:
+        new_edges = []
+        for d_edge in edges:
+            from_id = key_to_id.get(d_edge.from_node_key)
+            to_id = key_to_id.get(d_edge.to_node_key)
+            if not from_id or not to_id:
                 continue
-            
-            edge_type_id = await self._get_edge_type_id(client_id, graph_id, d_edge.edge_type)
-            
-            # Check if edge exists
-            statement = select(Edge).where(
-                Edge.from_node_id == from_node.id,
-                Edge.to_node_id == to_node.id,
-                Edge.edge_type_id == edge_type_id
-            )
-            existing_edge = self.session.exec(statement).first()
-            
-            if not existing_edge:
-                new_edge = Edge(
-                    client_id=client_id,
-                    graph_id=graph_id,
-                    edge_type_id=edge_type_id,
-                    from_node_id=from_node.id,
-                    to_node_id=to_node.id,
-                    properties=d_edge.properties
-                )
-                self.session.add(new_edge)
-        
+            triple = (from_id, to_id, edge_type_ids[d_edge.edge_type])
+            if triple in existing:
+                continue
+            existing.add(triple)
+            new_edges.append({
+                "id": uuid4(),
+                "client_id": client_id,
+                "graph_id": graph_id,
+                "edge_type_id": triple[2],
+                "from_node_id": from_id,
+                "to_node_id": to_id,
+                "properties": d_edge.properties,
+                "created_at": now,
+                "updated_at": now,
+            })
+        for batch in _batches(new_edges, self.batch_size):
+            self.session.exec(insert(Edge), params=batch)
+
         self.session.commit()
+        logger.info(
+            f"Merged {result.source} result into graph {graph_id}: "
+            f"{len(result.nodes)} nodes upserted, {len(new_edges)} new edges"
+        )
+
+    def _ensure_types(self, model, client_id: UUID, graph_id: UUID, names: Set[str]) -> Dict[str, UUID]:
+        """name -> id for NodeType / EdgeType rows of the graph, creating the missing ones."""
+        if not names:
+            return {}
+        type_ids: Dict[str, UUID] = {}
+        for name, type_id in self.session.exec(
+            select(model.name, model.id).where(model.graph_id == graph_id, model.name.in_(names))
+        ).all():
+            type_ids.setdefault(name, type_id)
+
+        # Few and small: plain ORM objects keep the model defaults, one flush inserts them all
+        created = [model(client_id=client_id, graph_id=graph_id, name=name) for name in sorted(names - type_ids.keys())]
+        if created:
+            self.session.add_all(created)
+            self.session.flush()
+            type_ids.update((t.name, t.id) for t in created)
+        return type_ids
+
+    def _upsert_nodes(self, client_id: UUID, graph_id: UUID, result: DiscoveryResult, node_type_ids: Dict[str, UUID], now: datetime) -> Dict[str, UUID]:
+        # Fold duplicate keys first: one statement cannot touch a row twice
+        rows: Dict[str, dict] = {}
+        for d_node in result.nodes:
+            row = rows.get(d_node.key)
+            if row is None:
+                rows[d_node.key] = {
+                    "id": uuid4(),
+                    "client_id": client_id,
+                    "graph_id": graph_id,
+                    "node_type_id": node_type_ids[d_node.node_type],
+                    "key": d_node.key,
+                    "display_name": d_node.display_name or d_node.key,
+                    "properties": dict(d_node.properties),
+                    "source": result.source,
+                    "source_metadata": dict(d_node.source_metadata),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            else:
+                row["properties"].update(d_node.properties)
+                row["source_metadata"].update(d_node.source_metadata)
+
+        table = Node.__table__
+        empty = text("'{}'::jsonb")
+        stmt = pg_insert(table)
+        # One statement for every batch: compiled once, sent as multi-row
+        # VALUES pages by the driver's executemany (insertmanyvalues)
+        stmt = stmt.on_conflict_do_update(
+            constraint=NODE_KEY_CONSTRAINT,
+            set_={
+                # Existing nodes keep their type and name; properties merge
+                "properties": func.coalesce(table.c.properties, empty).op("||")(stmt.excluded.properties),
+                "source_metadata": func.coalesce(table.c.source_metadata, empty).op("||")(stmt.excluded.source_metadata),
+                "source": stmt.excluded.source,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ).returning(table.c.key, table.c.id)
+
+        key_to_id: Dict[str, UUID] = {}
+        for batch in _batches(list(rows.values()), self.batch_size):
+            key_to_id.update(self.session.exec(stmt, params=batch).all())
+        return key_to_id
+
+    def _node_ids_by_key(self, graph_id: UUID, keys: Set[str]) -> Dict[str, UUID]:
+        """Ids of nodes from earlier runs that this result's edges point at."""
+        found: Dict[str, UUID] = {}
+        for batch in _batches(sorted(keys), self.batch_size):
+            found.update(self.session.exec(
+                select(Node.key, Node.id).where(Node.graph_id == graph_id, Node.key.in_(batch))
+            ).all())
+        return found
+
 
-    async def _get_node_type_id(self, client_id, graph_id, type_name) -> UUID:
-        statement = select(NodeType).where(NodeType.name == type_name, NodeType.graph_id == graph_id)
-        nt = self.session.exec(statement).first()
-        if not nt:
-            # Fallback: create if not exists or return generic
-            nt = NodeType(client_id=client_id, graph_id=graph_id, name=type_name)
-            self.session.add(nt)
-            self.session.commit()
-            self.session.refresh(nt)
-        return nt.id
-
-    async def _get_edge_type_id(self, client_id, graph_id, type_name) -> UUID:
-        statement = select(EdgeType).where(EdgeType.name == type_name, EdgeType.graph_id == graph_id)
-        et = self.session.exec(statement).first()
-        if not et:
-            et = EdgeType(client_id=client_id, graph_id=graph_id, name=type_name)
-            self.session.add(et)
-            self.session.commit()
-            self.session.refresh(et)
-        return et.id
+def _batches(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
@@ -0,0 +1,175 @@
+"""
+Streaming NDJSON serialization for TopologyScan snapshots.
+
+Layout — one JSON record per line:
+
+    {"type": "header", "schema_version": "1.0", "scan": {...}}
+    {"type": "node", "data": {...TopologyNode...}}
+    ...
+    {"type": "edge", "data": {...TopologyEdge...}}
+
+The writer never holds more than one record in memory, optionally
+gzip- or zstd-compresses on the fly, and can either write a local file or
+yield byte chunks (e.g. to feed a multipart upload). The reader parses the
+header eagerly and streams nodes/edges lazily.
+
+Compression is inferred from the file extension (.gz / .zst) unless given
+explicitly. zstd needs the optional ``zstandard`` package.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import gzip
+import zlib
+import logging
+from typing import Any, IO, Iterator
+
+from apps.api.ingestors.aws.schema import TopologyNode, TopologyEdge, TopologyScan, _json_default
+
+logger = logging.getLogger(__name__)
+
+NDJSON_SCHEMA_VERSION = "1.0"
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+# Records are buffered up to this size before being compressed / yielded.
+_CHUNK_BYTES = 256 * 1024
+
+
+def _zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compression requires the 'zstandard' package") from e
+    return zstandard
+
+
+def compression_for_path(path: str) -> str:
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def _dumps(record: dict) -> bytes:
+    return json.dumps(record, separators=(",", ":"), default=_json_default).encode("utf-8") + b"\n"
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+def iter_records(scan: TopologyScan) -> Iterator[bytes]:
+    """Yield one encoded NDJSON line per header / node / edge."""
+    yield _dumps({"type": "header", "schema_version": NDJSON_SCHEMA_VERSION, "scan": scan.header()})
+    for n in scan.nodes:
+        yield _dumps({"type": "node", "data": n.to_dict()})
+    for e in scan.edges:
+        yield _dumps({"type": "edge", "data": e.to_dict()})
+
+
+def iter_ndjson(scan: TopologyScan, compression: str = "none", level: int | None = None) -> Iterator[bytes]:
+    """Yield the (optionally compressed) NDJSON stream in ~256 KiB chunks."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}")
+
+    if compression == "gzip":
+        # wbits=31 → gzip container, readable by gzip.open / gunzip
+        compressor = zlib.compressobj(level if level is not None else 6, zlib.DEFLATED, 31)
+    elif compression == "zstd":
+        compressor = _zstd().ZstdCompressor(level=level if level is not None else 3).compressobj()
+    else:
+        compressor = None
+
+    buf = bytearray()
+    for line in iter_records(scan):
+        buf += line
+        if len(buf) >= _CHUNK_BYTES:
+            out = compressor.compress(bytes(buf)) if compressor else bytes(buf)
+            buf.clear()
+            if out:
+                yield out
+
+    tail = compressor.compress(bytes(buf)) + compressor.flush() if compressor else bytes(buf)
+    if tail:
+        yield tail
+
+
+def write_ndjson(scan: TopologyScan, path: str, compression: str | None = None) -> int:
+    """Stream *scan* to *path*. Returns the number of bytes written."""
+    compression = compression or compression_for_path(path)
+    written = 0
+    with open(path, "wb") as f:
+        for chunk in iter_ndjson(scan, compression):
+            f.write(chunk)
+            written += len(chunk)
+    logger.info(f"NDJSON scan ({compression}) written to {path}: {written} bytes")
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+class NDJSONScanReader:
+    """Lazily reads an NDJSON scan written by write_ndjson.
+
+    The header is read on construction; nodes and edges are streamed from
+    disk on each iteration, so a reader can be iterated repeatedly without
+    the whole scan ever being resident.
+    """
+
+    def __init__(self, path: str, compression: str | None = None) -> None:
+        self.path = path
+        self.compression = compression or compression_for_path(path)
+        if self.compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {self.compression!r}; expected one of {COMPRESSIONS}")
+
+        first = next(self._iter_raw(), None)
+        if not first or first.get("type") != "header":
+            raise ValueError(f"{path} is not an NDJSON topology scan (missing header record)")
+        self.schema_version: str = first.get("schema_version", "")
+        self.header: dict = first["scan"]
+
+    def _open(self) -> IO[bytes]:
+        if self.compression == "gzip":
+            return gzip.open(self.path, "rb")
+        if self.compression == "zstd":
+            raw = open(self.path, "rb")
+            return io.BufferedReader(_zstd().ZstdDecompressor().stream_reader(raw, closefd=True))
+        return open(self.path, "rb")
+
+    def _iter_raw(self) -> Iterator[dict]:
+        with self._open() as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def iter_nodes(self) -> Iterator[TopologyNode]:
+        for record in self._iter_raw():
+            kind = record.get("type")
+            if kind == "node":
+                yield TopologyNode(**record["data"])
+            elif kind == "edge":
+                return  # nodes always precede edges
+
+    def iter_edges(self) -> Iterator[TopologyEdge]:
+        for record in self._iter_raw():
+            if record.get("type") == "edge":
+                yield TopologyEdge(**record["data"])
+
+    def to_scan(self) -> TopologyScan:
+        """Materialize the full TopologyScan."""
+        h = self.header
+        return TopologyScan(
+            scan_id=h["id"],
+            provider=h["provider"],
+            account_id=h["account_id"],
+            regions_scanned=h.get("regions_scanned", []),
+            scanned_at=h["scanned_at"],
+            nodes=list(self.iter_nodes()),
+            edges=list(self.iter_edges()),
+            scan_plan=h.get("scan_plan", {}),
+        )
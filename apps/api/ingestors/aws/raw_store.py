@@ -0,0 +1,162 @@
+"""
+Retention policy for the raw API payloads carried on TopologyNode.raw.
+
+Collectors attach the complete boto3 response to every node, which on
+large accounts dominates the scan's memory footprint. The detector
+passes each collector's output through a RawPayloadStore, which replaces
+``node.raw`` according to the configured policy:
+
+  - full    keep the payload in memory (default, previous behaviour)
+  - none    drop it: ``{}``
+  - hashed  keep only a fingerprint: ``{"$raw": "hashed", "sha256": ..., "size": ...}``
+  - spill   append it to a temp JSONL file and keep a reference:
+            ``{"$raw": "spill", "path": ..., "offset": ..., "length": ...}``
+
+Spilled payloads can be read back with ``RawPayloadStore.load`` for as
+long as the spill file exists. AWSDetector writes it next to the output
+file of scan_to_json / scan_to_ndjson (``{output_path}.raw.jsonl``), which
+the caller then owns; scans that return in-memory results inline the
+payloads (or drop them, for discover) and delete the file.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Iterable
+
+from apps.api.ingestors.aws.schema import TopologyNode, _json_default
+
+logger = logging.getLogger(__name__)
+
+RAW_POLICIES = ("full", "none", "hashed", "spill")
+# Spill file written next to a scan output file
+RAW_SPILL_SUFFIX = ".raw.jsonl"
+
+
+class RawPayloadStore:
+    """Applies a raw-payload retention policy to collected nodes.
+
+    Thread-safe: regional collectors run in executor threads and share
+    one store (and one spill file) per scan.
+    """
+
+    def __init__(self, policy: str = "full", spill_dir: str | None = None) -> None:
+        if policy not in RAW_POLICIES:
+            raise ValueError(f"Unknown raw payload policy {policy!r}; expected one of {RAW_POLICIES}")
+        self.policy = policy
+        self._spill_dir = spill_dir
+        self._spill_target: str | None = None
+        self._spill_path: str | None = None
+        self._spill_file: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def spill_path(self) -> str | None:
+        return self._spill_path
+
+    # -- Policy application --------------------------------------------------
+
+    def apply(self, nodes: Iterable[TopologyNode]) -> None:
+        """Replace ``raw`` on each node in place according to the policy."""
+        if self.policy == "full":
+            return
+        for node in nodes:
+            node.raw = self._retain(node.raw)
+
+    def _retain(self, raw: dict) -> dict:
+        if not raw or self.policy == "none":
+            return {}
+
+        encoded = json.dumps(raw, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+        if self.policy == "hashed":
+            return {
+                "$raw": "hashed",
+                "sha256": hashlib.sha256(encoded).hexdigest(),
+                "size": len(encoded),
+            }
+
+        # spill
+        with self._lock:
+            f = self._open_spill()
+            offset = f.tell()
+            f.write(encoded + b"\n")
+        return {"$raw": "spill", "path": self._spill_path, "offset": offset, "length": len(encoded)}
+
+    def spill_to(self, path: str | None) -> None:
+        """Spill to *path* from the next spill file on (None: a temp file in spill_dir)."""
+        with self._lock:
+            self._spill_target = os.path.abspath(path) if path else None
+
+    def _open_spill(self) -> Any:
+        if self._spill_file is None:
+            if self._spill_target is not None:
+                path = self._spill_target
+                self._spill_file = open(path, "wb")
+            else:
+                fd, path = tempfile.mkstemp(prefix="opscribe-raw-", suffix=".jsonl", dir=self._spill_dir)
+                self._spill_file = os.fdopen(fd, "wb")
+            self._spill_path = path
+            logger.info(f"Spilling raw AWS payloads to {path}")
+        return self._spill_file
+
+    # -- Reading back --------------------------------------------------------
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+
+    def hand_off(self) -> str | None:
+        """Close the spill file and forget it: whoever holds its references owns it now."""
+        self.close()
+        with self._lock:
+            path, self._spill_path = self._spill_path, None
+            self._spill_target = None
+        return path
+
+    def inline(self, nodes: Iterable[TopologyNode]) -> None:
+        """Replace spilled references on *nodes* with the payloads themselves."""
+        self.flush()
+        for node in nodes:
+            if node.raw and node.raw.get("$raw") == "spill":
+                node.raw = self.load(node.raw)
+
+    def cleanup(self) -> None:
+        """Close and delete the spill file; its references no longer resolve."""
+        self.close()
+        with self._lock:
+            path, self._spill_path = self._spill_path, None
+        if path is not None:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            logger.info(f"Removed raw payload spill file {path}")
+
+    @staticmethod
+    def load(raw_ref: dict) -> dict | None:
+        """Resolve a spilled reference back to its payload.
+
+        Returns the dict itself for in-memory payloads and None when the
+        payload was dropped or only hashed.
+        """
+        kind = raw_ref.get("$raw") if raw_ref else None
+        if kind is None:
+            return raw_ref or None
+        if kind != "spill":
+            return None
+        with open(raw_ref["path"], "rb") as f:
+            f.seek(raw_ref["offset"])
+            return json.loads(f.read(raw_ref["length"]))
@@ -0,0 +1,161 @@
+"""
+Reference extraction for the property cross-reference strategy.
+
+A node references another when one of its property strings is exactly
+another node's ARN, a resource id (vpc-…, i-…, sg-…), or an SQS queue URL
+ending in a known queue name. Matches are exact, so every candidate is
+resolved with a single dict lookup against the ARN or id index; the
+regex only runs on strings whose prefix already looks like a resource id.
+
+Extraction is split from resolution so it can be cached: the candidate
+strings of a node depend only on its own properties, so they are cached
+per node uid, keyed by a hash of the properties. On an incremental rescan
+only nodes whose properties changed are walked again; every node is still
+resolved against the current index. Detectors are built per scan, so they
+share one process-wide extractor (get_reference_extractor) by default.
+"""
+
+from __future__ import annotations
+
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from apps.api.ingestors.aws.schema import TopologyNode
+
+logger = logging.getLogger(__name__)
+
+# Accounts whose candidates the shared extractor keeps (least recently scanned go first)
+DEFAULT_MAX_ACCOUNTS = 32
+
+# Keys to skip during property cross-reference scan
+SKIP_KEYS = frozenset({
+    "service", "state", "status", "tags", "description",
+    "name", "type", "region", "account_id",
+})
+
+# Regex for AWS resource ID patterns
+RESOURCE_ID_RE = re.compile(r"^(vpc|subnet|sg|i|vol|igw|rtb|acl|eni|nat)-[a-f0-9]+$")
+_RESOURCE_ID_PREFIXES = frozenset({"vpc", "subnet", "sg", "i", "vol", "igw", "rtb", "acl", "eni", "nat"})
+
+
+def candidate_keys(data: Any) -> list[str]:
+    """Return lookup keys for every string in *data* that could be a reference.
+
+    Iterative (explicit stack) so no intermediate set is built per level.
+    ARNs and resource ids are returned as-is; SQS queue URLs are reduced to
+    the queue name, which is how queues are indexed.
+    """
+    keys: list[str] = []
+    stack = [data]
+    pop, push, extend = stack.pop, stack.append, stack.extend
+    match = RESOURCE_ID_RE.match
+    while stack:
+        item = pop()
+        if isinstance(item, str):
+            if item.startswith("arn:aws:"):
+                keys.append(item)
+            elif item.partition("-")[0] in _RESOURCE_ID_PREFIXES and match(item):
+                keys.append(item)
+            elif "sqs." in item and "amazonaws.com" in item:
+                keys.append(item.rstrip("/").split("/")[-1])
+        elif isinstance(item, dict):
+            for key, val in item.items():
+                if key not in SKIP_KEYS:
+                    push(val)
+        elif isinstance(item, (list, tuple)):
+            extend(item)
+    return keys
+
+
+class ReferenceExtractor:
+    """Extracts and caches candidate reference keys per node.
+
+    Entries are kept per account, so scans of different accounts sharing
+    one extractor (see get_reference_extractor) neither collide on uids
+    nor prune each other. Only the max_accounts most recently scanned
+    accounts are kept. Thread-safe.
+    """
+
+    def __init__(self, max_accounts: int = DEFAULT_MAX_ACCOUNTS) -> None:
+        self.max_accounts = max(1, max_accounts)
+        self._cache: OrderedDict[str, dict[str, tuple[bytes, tuple[str, ...]]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def properties_hash(properties: dict) -> bytes:
+        # repr is deterministic for the plain dict/list/str payloads collectors
+        # build and ~30% cheaper than a sorted json.dumps; a spurious miss only
+        # costs one extra walk.
+        return hashlib.blake2b(repr(properties).encode("utf-8"), digest_size=16).digest()
+
+    def candidates(self, node: TopologyNode) -> tuple[str, ...]:
+        digest = self.properties_hash(node.properties)
+        with self._lock:
+            cached = self._account(node.account_id).get(node.uid)
+            if cached is not None and cached[0] == digest:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        keys = tuple(dict.fromkeys(candidate_keys(node.properties)))
+        with self._lock:
+            self._account(node.account_id)[node.uid] = (digest, keys)
+        return keys
+
+    def _account(self, account_id: str) -> dict[str, tuple[bytes, tuple[str, ...]]]:
+        # Caller holds the lock; evicts the least recently used accounts
+        entries = self._cache.get(account_id)
+        if entries is not None:
+            self._cache.move_to_end(account_id)
+            return entries
+        entries = self._cache[account_id] = {}
+        while len(self._cache) > self.max_accounts:
+            evicted, _ = self._cache.popitem(last=False)
+            logger.debug(f"Reference cache: evicted account {evicted}")
+        return entries
+
+    def references(
+        self,
+        node: TopologyNode,
+        id_index: dict[str, str],
+        arn_index: dict[str, str],
+    ) -> set[str]:
+        """Resolve *node*'s candidate keys to target uids (excluding itself)."""
+        targets: set[str] = set()
+        for key in self.candidates(node):
+            uid = (arn_index if key.startswith("arn:aws:") else id_index).get(key)
+            if uid and uid != node.uid:
+                targets.add(uid)
+        return targets
+
+    def prune(self, live_uids: set[str], account_id: str | None = None) -> None:
+        """Drop cache entries for nodes that no longer exist (in *account_id*, or anywhere)."""
+        with self._lock:
+            accounts = [account_id] if account_id is not None else list(self._cache)
+            for account in accounts:
+                entries = self._cache.get(account)
+                if entries is None:
+                    continue
+                for uid in [u for u in entries if u not in live_uids]:
+                    del entries[uid]
+                if not entries:
+                    del self._cache[account]
+
+
+_extractor: ReferenceExtractor | None = None
+_extractor_lock = threading.Lock()
+
+
+def get_reference_extractor() -> ReferenceExtractor:
+    """Return the process-wide extractor, so its cache outlives each scan's detector."""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = ReferenceExtractor()
+        return _extractor
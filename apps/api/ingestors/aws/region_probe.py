@@ -0,0 +1,263 @@
+"""
+Pre-scan region probing and scan planning.
+
+Most accounts only use a handful of the regions they are opted into, yet
+every regional collector runs in every region. Before the full scan we
+issue a few low-cost presence probes per region (in parallel across
+regions: the tagging API, then one-page lists of EC2 instances, custom
+VPCs, Lambda functions, RDS instances, SQS queues and DynamoDB tables)
+and classify each one as active, empty, or unknown:
+
+  - active   at least one probe found a resource → scan
+  - empty    every probe answered and found nothing → skip
+  - unknown  a probe failed (permissions, throttling) → scan, to be safe
+
+The resulting ScanPlan tells the detector which regions regional
+collectors should run in and records how many API calls were saved; the
+skipped regions are also reported in DiscoveryResult.metadata. Resources
+of other services in an otherwise empty region are missed — use
+mode="full" where that matters.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from apps.api.ingestors.aws.client_factory import AWSClientFactory
+from apps.api.ingestors.aws.executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+SCAN_MODES = ("pruned", "full")
+
+REGION_ACTIVE = "active"
+REGION_EMPTY = "empty"
+REGION_UNKNOWN = "unknown"
+
+
+# ---------------------------------------------------------------------------
+# Presence probes — each returns True if the region holds resources
+# ---------------------------------------------------------------------------
+
+def _probe_tagged_resources(factory: AWSClientFactory) -> bool:
+    """Any resource that has ever been tagged shows up in the tagging API."""
+    client = factory.get_client("resourcegroupstaggingapi")
+    resp = client.get_resources(ResourcesPerPage=1)
+    return bool(resp.get("ResourceTagMappingList"))
+
+
+def _probe_custom_vpcs(factory: AWSClientFactory) -> bool:
+    """Every region has a default VPC; only non-default ones indicate usage."""
+    client = factory.get_client("ec2")
+    resp = client.describe_vpcs(
+        Filters=[{"Name": "is-default", "Values": ["false"]}],
+        MaxResults=5,
+    )
+    return bool(resp.get("Vpcs"))
+
+
+def _probe_lambda_functions(factory: AWSClientFactory) -> bool:
+    """Lambda functions are often untagged and live outside any VPC."""
+    client = factory.get_client("lambda")
+    resp = client.list_functions(MaxItems=1)
+    return bool(resp.get("Functions"))
+
+
+def _probe_ec2_instances(factory: AWSClientFactory) -> bool:
+    """Untagged instances in the default VPC escape the two probes above."""
+    client = factory.get_client("ec2")
+    resp = client.describe_instances(
+        # Terminated instances stay listed for a while but are not scanned
+        Filters=[{"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]}],
+        MaxResults=5,
+    )
+    return any(r.get("Instances") for r in resp.get("Reservations", []))
+
+
+def _probe_rds_instances(factory: AWSClientFactory) -> bool:
+    client = factory.get_client("rds")
+    resp = client.describe_db_instances(MaxRecords=20)
+    return bool(resp.get("DBInstances"))
+
+
+def _probe_sqs_queues(factory: AWSClientFactory) -> bool:
+    client = factory.get_client("sqs")
+    resp = client.list_queues(MaxResults=1)
+    return bool(resp.get("QueueUrls"))
+
+
+def _probe_dynamodb_tables(factory: AWSClientFactory) -> bool:
+    client = factory.get_client("dynamodb")
+    resp = client.list_tables(Limit=1)
+    return bool(resp.get("TableNames"))
+
+
+# Ordered cheapest / most likely to hit first — probing stops at the first hit.
+# A region is only skipped when every probe answers empty, so services that
+# are commonly left untagged each get their own one-page list call.
+PRESENCE_PROBES: list[tuple[str, Callable[[AWSClientFactory], bool]]] = [
+    ("tagging", _probe_tagged_resources),
+    ("ec2", _probe_ec2_instances),
+    ("vpc", _probe_custom_vpcs),
+    ("lambda", _probe_lambda_functions),
+    ("rds", _probe_rds_instances),
+    ("sqs", _probe_sqs_queues),
+    ("dynamodb", _probe_dynamodb_tables),
+]
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RegionProbeResult:
+    region: str
+    status: str                  # "active" | "empty" | "unknown"
+    calls: int = 0               # probe API calls issued for this region
+    evidence: str | None = None  # name of the probe that found resources
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ScanPlan:
+    mode: str
+    candidate_regions: list[str]
+    regions_to_scan: list[str]
+    skipped_regions: list[str] = field(default_factory=list)
+    region_status: dict[str, str] = field(default_factory=dict)
+    probe_calls: int = 0
+    collectors_per_region: int = 0
+
+    @property
+    def collector_runs_skipped(self) -> int:
+        return len(self.skipped_regions) * self.collectors_per_region
+
+    @property
+    def api_calls_saved(self) -> int:
+        """Net API calls saved by pruning.
+
+        Every collector issues at least one list/describe call, so this is
+        a lower bound; it goes negative when probing found nothing to skip.
+        """
+        return self.collector_runs_skipped - self.probe_calls
+
+    def to_dict(self) -> dict:
+        return {
+            "mode": self.mode,
+            "candidate_regions": self.candidate_regions,
+            "regions_to_scan": self.regions_to_scan,
+            "skipped_regions": self.skipped_regions,
+            "region_status": self.region_status,
+            "probe_calls": self.probe_calls,
+            "collector_runs_skipped": self.collector_runs_skipped,
+            "api_calls_saved": self.api_calls_saved,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Probe + planner
+# ---------------------------------------------------------------------------
+
+class RegionProbe:
+    """Runs the presence probes against a single region."""
+
+    def __init__(self, credentials: dict[str, Any] | None = None) -> None:
+        self._credentials = credentials or {}
+
+    def probe(self, region: str) -> RegionProbeResult:
+        """Classify *region*. Runs on the AWS executor (see executor.py)."""
+        factory = AWSClientFactory(region, self._credentials)
+        result = RegionProbeResult(region=region, status=REGION_EMPTY)
+
+        for name, probe_fn in PRESENCE_PROBES:
+            result.calls += 1
+            try:
+                found = probe_fn(factory)
+            except Exception as e:
+                result.errors.append(f"{name}: {e}")
+                continue
+            if found:
+                result.status = REGION_ACTIVE
+                result.evidence = name
+                return result
+
+        if result.errors:
+            result.status = REGION_UNKNOWN
+        return result
+
+
+class ScanPlanner:
+    """Decides which regions regional collectors should run in.
+
+    - mode="pruned" (default) probes every candidate region and skips the
+      ones classified as empty.
+    - mode="full" skips probing and scans every candidate region — use it
+      for audits where a missed resource is worse than a slow scan.
+    - allowlist regions are always scanned (no probe); denylist regions
+      are never scanned, in either mode.
+    """
+
+    def __init__(
+        self,
+        credentials: dict[str, Any] | None = None,
+        mode: str = "pruned",
+        allowlist: Iterable[str] | None = None,
+        denylist: Iterable[str] | None = None,
+        collectors_per_region: int = 0,
+    ) -> None:
+        if mode not in SCAN_MODES:
+            raise ValueError(f"Unknown scan mode {mode!r}; expected one of {SCAN_MODES}")
+        self.mode = mode
+        self.allowlist = set(allowlist or [])
+        self.denylist = set(denylist or [])
+        self.collectors_per_region = collectors_per_region
+        self._probe = RegionProbe(credentials)
+
+    async def plan(self, regions: list[str]) -> ScanPlan:
+        candidates = [r for r in regions if r not in self.denylist]
+        status: dict[str, str] = {r: "denied" for r in regions if r in self.denylist}
+
+        forced = [r for r in candidates if self.mode == "full" or r in self.allowlist]
+        to_probe = [r for r in candidates if r not in forced]
+        for r in forced:
+            status[r] = "forced"
+
+        probe_calls = 0
+        if to_probe:
+            probe_results = await asyncio.gather(
+                *[run_blocking(self._probe.probe, r) for r in to_probe],
+                return_exceptions=True,
+            )
+            for region, result in zip(to_probe, probe_results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Region probe for {region} failed: {result}")
+                    status[region] = REGION_UNKNOWN
+                    continue
+                probe_calls += result.calls
+                status[region] = result.status
+                if result.errors:
+                    logger.info(f"Region probe {region}: {result.status} ({'; '.join(result.errors)})")
+
+        regions_to_scan = [r for r in candidates if status.get(r) != REGION_EMPTY]
+        skipped = [r for r in regions if r not in regions_to_scan]
+
+        plan = ScanPlan(
+            mode=self.mode,
+            candidate_regions=list(regions),
+            regions_to_scan=regions_to_scan,
+            skipped_regions=skipped,
+            region_status=status,
+            probe_calls=probe_calls,
+            collectors_per_region=self.collectors_per_region,
+        )
+        logger.info(
+            f"Scan plan ({self.mode}): scanning {len(regions_to_scan)}/{len(regions)} regions, "
+            f"{plan.probe_calls} probe calls, ~{plan.api_calls_saved} API calls saved"
+        )
+        if skipped:
+            logger.info(f"Skipping regions: {skipped}")
+        return plan
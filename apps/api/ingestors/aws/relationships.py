@@ -7,40 +7,50 @@ Strategies run in order:
 
 Results are merged and deduplicated by (source_uid, target_uid, relation).
 When duplicates exist, "explicit" confidence wins over "inferred".
+
+SDK-direct API lookups run concurrently on a bounded pool (sdk_direct.py)
+and can be started per region via prefetch() while other regions are
+still being scanned.
 """
 
 from __future__ import annotations
 
-import re
-import json
 import logging
-import asyncio
-from typing import Any
-from concurrent.futures import ThreadPoolExecutor
-
-from botocore.exceptions import ClientError
 
 from apps.api.ingestors.aws.schema import TopologyNode, TopologyEdge
 from apps.api.ingestors.aws.client_factory import AWSClientFactory
+from apps.api.ingestors.aws.references import ReferenceExtractor, get_reference_extractor
+from apps.api.ingestors.aws.sdk_direct import SDKDirectFetcher
 
 logger = logging.getLogger(__name__)
 
-# Keys to skip during property cross-reference scan
-_SKIP_KEYS = frozenset({
-    "service", "state", "status", "tags", "description",
-    "name", "type", "region", "account_id",
-})
-
-# Regex for AWS resource ID patterns
-_RESOURCE_ID_RE = re.compile(r"^(vpc|subnet|sg|i|vol|igw|rtb|acl|eni|nat)-[a-f0-9]+$")
-
 
 class RelationshipDetector:
     """Detects edges between collected topology nodes."""
 
-    def __init__(self, factory: AWSClientFactory, credentials: dict | None = None) -> None:
+    def __init__(
+        self,
+        factory: AWSClientFactory,
+        credentials: dict | None = None,
+        max_workers: int = 16,
+        extractor: ReferenceExtractor | None = None,
+    ) -> None:
         self._factory = factory
         self._credentials = credentials or {}
+        # Per-node candidate cache; process-wide unless the caller passes one
+        self._extractor = extractor or get_reference_extractor()
+        self._sdk = SDKDirectFetcher(self._credentials, max_workers=max_workers)
+
+    def prefetch(self, nodes: list[TopologyNode]) -> int:
+        """Start SDK-direct lookups for *nodes* without waiting for the full scan.
+
+        Returns the number of lookups scheduled. detect() reuses the results.
+        """
+        return self._sdk.submit(nodes)
+
+    def close(self) -> None:
+        """Discard pending SDK-direct lookups (e.g. after a failed scan)."""
+        self._sdk.close()
 
     def detect(
         self,
@@ -49,6 +59,10 @@ class RelationshipDetector:
         """Run all strategies, merge, and deduplicate."""
         edges: list[TopologyEdge] = []
 
+        # Kick off any SDK-direct lookups not prefetched yet, so they overlap
+        # with indexing and the property scan below
+        self._sdk.submit(nodes)
+
         # Build lookup indexes
         id_index: dict[str, str] = {}    # raw resource id -> node uid
         arn_index: dict[str, str] = {}   # full ARN -> node uid
@@ -69,11 +83,14 @@ class RelationshipDetector:
             if len(parts) >= 4:
                 id_index[parts[-1]] = n.uid
 
-        # Strategy 1: Property cross-reference
-        edges.extend(self._from_property_scan(nodes, id_index, arn_index))
+        try:
+            # Strategy 1: Property cross-reference
+            edges.extend(self._from_property_scan(nodes, id_index, arn_index))
 
-        # Strategy 2: SDK-direct
-        edges.extend(self._from_sdk_direct(nodes, id_index, arn_index))
+            # Strategy 2: SDK-direct
+            edges.extend(self._from_sdk_direct(nodes, id_index, arn_index))
+        finally:
+            self.close()
 
         return self._deduplicate(edges)
 
@@ -87,66 +104,30 @@ class RelationshipDetector:
         id_index: dict[str, str],
         arn_index: dict[str, str],
     ) -> list[TopologyEdge]:
-        """Walk every node's properties recursively looking for ARN / resource-ID references."""
+        """Match every node's property strings against the ARN / resource-ID indexes."""
         edges: list[TopologyEdge] = []
 
         for node in nodes:
-            found = self._scan_dict(node.properties, id_index, arn_index)
-            for target_uid in found:
-                if target_uid != node.uid:
-                    edges.append(TopologyEdge(
-                        uid=TopologyEdge.make_uid(node.uid, target_uid, "references"),
-                        source_uid=node.uid,
-                        target_uid=target_uid,
-                        relation="references",
-                        confidence="inferred",
-                        source="property_scan",
-                        metadata={},
-                    ))
+            for target_uid in self._extractor.references(node, id_index, arn_index):
+                edges.append(TopologyEdge(
+                    uid=TopologyEdge.make_uid(node.uid, target_uid, "references"),
+                    source_uid=node.uid,
+                    target_uid=target_uid,
+                    relation="references",
+                    confidence="inferred",
+                    source="property_scan",
+                    metadata={},
+                ))
 
+        live_uids = {n.uid for n in nodes}
+        for account_id in {n.account_id for n in nodes}:
+            self._extractor.prune(live_uids, account_id)
+        logger.debug(
+            f"Property scan: {len(edges)} references "
+            f"(cache hits={self._extractor.hits}, misses={self._extractor.misses})"
+        )
         return edges
 
-    def _scan_dict(
-        self,
-        data: dict | list | Any,
-        id_index: dict[str, str],
-        arn_index: dict[str, str],
-    ) -> set[str]:
-        """Recursively scan a dict/list for references. Returns set of target uids."""
-        targets: set[str] = set()
-
-        if isinstance(data, dict):
-            for key, val in data.items():
-                if key in _SKIP_KEYS:
-                    continue
-                targets.update(self._scan_dict(val, id_index, arn_index))
-
-        elif isinstance(data, list):
-            for item in data:
-                targets.update(self._scan_dict(item, id_index, arn_index))
-
-        elif isinstance(data, str):
-            # ARN reference
-            if data.startswith("arn:aws:"):
-                uid = arn_index.get(data)
-                if uid:
-                    targets.add(uid)
-
-            # Resource ID reference (vpc-xxx, i-xxx, etc.)
-            elif _RESOURCE_ID_RE.match(data):
-                uid = id_index.get(data)
-                if uid:
-                    targets.add(uid)
-
-            # SQS queue URL pattern
-            elif "sqs." in data and "amazonaws.com" in data:
-                qname = data.rstrip("/").split("/")[-1]
-                uid = id_index.get(qname)
-                if uid:
-                    targets.add(uid)
-
-        return targets
-
     # -----------------------------------------------------------------------
     # Strategy 2: SDK-direct
     # -----------------------------------------------------------------------
@@ -176,52 +157,29 @@ class RelationshipDetector:
         arn_index: dict[str, str],
     ) -> list[TopologyEdge]:
         edges: list[TopologyEdge] = []
-        elb_nodes = [n for n in nodes if n.service == "ELB"]
-        if not elb_nodes:
-            return edges
+        for lb_node in nodes:
+            if lb_node.service != "ELB":
+                continue
+
+            for tg_arn, health in self._sdk.result(lb_node) or []:
+                try:
+                    target_ids = health.result()
+                except Exception as e:
+                    logger.warning(f"ELB→EC2 target health lookup failed for {tg_arn}: {e}")
+                    continue
 
-        # Group ELBs by region so we use the correct regional client
-        elb_by_region: dict[str, list[TopologyNode]] = {}
-        for lb in elb_nodes:
-            elb_by_region.setdefault(lb.region, []).append(lb)
-
-        for region, lbs in elb_by_region.items():
-            try:
-                regional_factory = AWSClientFactory(region, self._credentials)
-                elbv2 = regional_factory.get_client("elbv2")
-
-                for lb_node in lbs:
-                    lb_arn = lb_node.merge_hints.get("arn")
-                    if not lb_arn:
-                        continue
-
-                    try:
-                        tg_resp = elbv2.describe_target_groups(LoadBalancerArn=lb_arn)
-                    except ClientError:
-                        continue
-
-                    for tg in tg_resp.get("TargetGroups", []):
-                        tg_arn = tg["TargetGroupArn"]
-                        try:
-                            health_resp = elbv2.describe_target_health(TargetGroupArn=tg_arn)
-                        except ClientError:
-                            continue
-
-                        for desc in health_resp.get("TargetHealthDescriptions", []):
-                            target_id = desc.get("Target", {}).get("Id", "")
-                            target_uid = id_index.get(target_id)
-                            if target_uid and target_uid != lb_node.uid:
-                                edges.append(TopologyEdge(
-                                    uid=TopologyEdge.make_uid(lb_node.uid, target_uid, "routes_to"),
-                                    source_uid=lb_node.uid,
-                                    target_uid=target_uid,
-                                    relation="routes_to",
-                                    confidence="explicit",
-                                    source="sdk_direct",
-                                    metadata={"target_group_arn": tg_arn},
-                                ))
-            except Exception as e:
-                logger.warning(f"ELB→EC2 SDK-direct detection error in {region}: {e}")
+                for target_id in target_ids:
+                    target_uid = id_index.get(target_id)
+                    if target_uid and target_uid != lb_node.uid:
+                        edges.append(TopologyEdge(
+                            uid=TopologyEdge.make_uid(lb_node.uid, target_uid, "routes_to"),
+                            source_uid=lb_node.uid,
+                            target_uid=target_uid,
+                            relation="routes_to",
+                            confidence="explicit",
+                            source="sdk_direct",
+                            metadata={"target_group_arn": tg_arn},
+                        ))
 
         return edges
 
@@ -289,45 +247,23 @@ class RelationshipDetector:
         arn_index: dict[str, str],
     ) -> list[TopologyEdge]:
         edges: list[TopologyEdge] = []
-        eb_nodes = [n for n in nodes if n.service == "EventBridge"]
-        if not eb_nodes:
-            return edges
+        for eb_node in nodes:
+            if eb_node.service != "EventBridge":
+                continue
 
-        # Group by region for correct regional client
-        eb_by_region: dict[str, list[TopologyNode]] = {}
-        for eb in eb_nodes:
-            eb_by_region.setdefault(eb.region, []).append(eb)
-
-        for region, ebs in eb_by_region.items():
-            try:
-                regional_factory = AWSClientFactory(region, self._credentials)
-                events = regional_factory.get_client("events")
-
-                for eb_node in ebs:
-                    rule_name = eb_node.properties.get("rule_name")
-                    if not rule_name:
-                        continue
-
-                    try:
-                        resp = events.list_targets_by_rule(Rule=rule_name)
-                    except ClientError:
-                        continue
-
-                    for target in resp.get("Targets", []):
-                        target_arn = target.get("Arn", "")
-                        target_uid = arn_index.get(target_arn)
-                        if target_uid and target_uid != eb_node.uid:
-                            edges.append(TopologyEdge(
-                                uid=TopologyEdge.make_uid(eb_node.uid, target_uid, "routes_to"),
-                                source_uid=eb_node.uid,
-                                target_uid=target_uid,
-                                relation="routes_to",
-                                confidence="explicit",
-                                source="sdk_direct",
-                                metadata={"target_id": target.get("Id")},
-                            ))
-            except Exception as e:
-                logger.warning(f"EventBridge→targets SDK-direct detection error in {region}: {e}")
+            for target in self._sdk.result(eb_node) or []:
+                target_arn = target.get("Arn", "")
+                target_uid = arn_index.get(target_arn)
+                if target_uid and target_uid != eb_node.uid:
+                    edges.append(TopologyEdge(
+                        uid=TopologyEdge.make_uid(eb_node.uid, target_uid, "routes_to"),
+                        source_uid=eb_node.uid,
+                        target_uid=target_uid,
+                        relation="routes_to",
+                        confidence="explicit",
+                        source="sdk_direct",
+                        metadata={"target_id": target.get("Id")},
+                    ))
 
         return edges
 
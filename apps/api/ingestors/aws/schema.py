@@ -4,6 +4,10 @@ Topology dataclasses for the AWS ingestor JSON output.
 These are the NEW schema types used for the datalake JSON snapshot.
 The legacy DiscoveryNode / DiscoveryEdge / DiscoveryResult in schemas.py
 are preserved for backwards compatibility — see to_discovery_result().
+
+Nodes and edges are ``__slots__`` dataclasses (tens of thousands of them
+live in memory during a scan), and their to_dict() is shallow — the
+serializers only read it, so there is no need for asdict()'s deep copy.
 """
 
 from __future__ import annotations
@@ -11,9 +15,9 @@ from __future__ import annotations
 import json
 import uuid
 import hashlib
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, IO, Iterator
 
 from apps.api.ingestors.aws.schemas import DiscoveryResult, DiscoveryNode, DiscoveryEdge
 
@@ -22,7 +26,7 @@ from apps.api.ingestors.aws.schemas import DiscoveryResult, DiscoveryNode, Disco
 # TopologyNode
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class TopologyNode:
     uid: str                   # aws::{region}::{service_prefix}::{resource_id}
     provider: str
@@ -35,17 +39,30 @@ class TopologyNode:
     tags: dict = field(default_factory=dict)
     merge_hints: dict = field(default_factory=dict)
     properties: dict = field(default_factory=dict)
-    raw: dict = field(default_factory=dict)
+    raw: dict = field(default_factory=dict)  # full payload, or a reference — see raw_store.py
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "uid": self.uid,
+            "provider": self.provider,
+            "service": self.service,
+            "resource_type": self.resource_type,
+            "category": self.category,
+            "name": self.name,
+            "region": self.region,
+            "account_id": self.account_id,
+            "tags": self.tags,
+            "merge_hints": self.merge_hints,
+            "properties": self.properties,
+            "raw": self.raw,
+        }
 
 
 # ---------------------------------------------------------------------------
 # TopologyEdge
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class TopologyEdge:
     uid: str                   # deterministic hash of (source_uid, target_uid, relation)
     source_uid: str
@@ -56,7 +73,15 @@ class TopologyEdge:
     metadata: dict = field(default_factory=dict)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "uid": self.uid,
+            "source_uid": self.source_uid,
+            "target_uid": self.target_uid,
+            "relation": self.relation,
+            "confidence": self.confidence,
+            "source": self.source,
+            "metadata": self.metadata,
+        }
 
     @staticmethod
     def make_uid(source_uid: str, target_uid: str, relation: str) -> str:
@@ -85,6 +110,7 @@ class TopologyScan:
     scanned_at: str              # ISO-8601
     nodes: list[TopologyNode] = field(default_factory=list)
     edges: list[TopologyEdge] = field(default_factory=list)
+    scan_plan: dict = field(default_factory=dict)  # region pruning summary (ScanPlan.to_dict)
 
     @property
     def region_count(self) -> int:
@@ -92,25 +118,68 @@ class TopologyScan:
 
     # -- Serialization -------------------------------------------------------
 
+    def header(self) -> dict:
+        return {
+            "id": self.scan_id,
+            "provider": self.provider,
+            "account_id": self.account_id,
+            "regions_scanned": self.regions_scanned,
+            "region_count": self.region_count,
+            "scanned_at": self.scanned_at,
+            "node_count": len(self.nodes),
+            "edge_count": len(self.edges),
+            "scan_plan": self.scan_plan,
+        }
+
     def to_dict(self) -> dict:
         return {
             "schema_version": "1.0",
-            "scan": {
-                "id": self.scan_id,
-                "provider": self.provider,
-                "account_id": self.account_id,
-                "regions_scanned": self.regions_scanned,
-                "region_count": self.region_count,
-                "scanned_at": self.scanned_at,
-                "node_count": len(self.nodes),
-                "edge_count": len(self.edges),
-            },
+            "scan": self.header(),
             "nodes": [n.to_dict() for n in self.nodes],
             "edges": [e.to_dict() for e in self.edges],
         }
 
+    def iter_json(self, indent: int | None = 2) -> Iterator[str]:
+        """Yield the to_json() document in chunks, one node/edge at a time.
+
+        Produces output identical to ``json.dumps(self.to_dict(), indent=indent)``
+        without materializing the full dict or string.
+        """
+        def dump(obj: Any) -> str:
+            return json.dumps(obj, indent=indent, default=_json_default)
+
+        if indent is None:
+            nl, pad, item_pad, sep = "", "", "", ", "
+        else:
+            nl, pad, item_pad, sep = "\n", " " * indent, " " * indent * 2, ","
+
+        def nested(obj: Any) -> str:
+            # Re-indent a standalone dump so it sits two levels deep
+            return item_pad + dump(obj).replace("\n", "\n" + item_pad)
+
+        yield "{" + nl
+        yield f'{pad}"schema_version": {dump("1.0")}{sep}{nl}'
+        yield f'{pad}"scan": ' + dump(self.header()).replace("\n", "\n" + pad) + sep + nl
+
+        for name, items, last in (("nodes", self.nodes, False), ("edges", self.edges, True)):
+            tail = "" if last else sep
+            if not items:
+                yield f'{pad}"{name}": []{tail}{nl}'
+                continue
+            yield f'{pad}"{name}": [{nl}'
+            for i, item in enumerate(items):
+                yield nested(item.to_dict()) + (sep if i < len(items) - 1 else "") + nl
+            yield f"{pad}]{tail}{nl}"
+
+        yield "}"
+
+    def write_json(self, fp: IO[str], indent: int | None = 2) -> None:
+        """Stream the JSON snapshot into an open text file."""
+        for chunk in self.iter_json(indent=indent):
+            fp.write(chunk)
+
     def to_json(self, indent: int = 2) -> str:
-        return json.dumps(self.to_dict(), indent=indent, default=_json_default)
+        return "".join(self.iter_json(indent=indent))
 
     # -- Backwards-compat bridge ---------------------------------------------
 
@@ -156,5 +225,8 @@ class TopologyScan:
                 "regions_scanned": self.regions_scanned,
                 "account_id": self.account_id,
                 "scan_id": self.scan_id,
+                "scan_plan": self.scan_plan,
+                # Regions no regional collector ran in (probed empty or denylisted)
+                "skipped_regions": self.scan_plan.get("skipped_regions", []),
             },
         )
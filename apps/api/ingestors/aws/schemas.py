@@ -8,6 +8,8 @@ to avoid circular imports (aws.schemas ↔ pipeline.base ↔ aws.schemas).
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 
+from apps.api.ingestors.content_hash import ContentHashMixin
+
 
 class DiscoveryNode(BaseModel):
     key: str
@@ -26,7 +28,7 @@ class DiscoveryEdge(BaseModel):
     properties: Dict[str, Any] = {}
 
 
-class DiscoveryResult(BaseModel):
+class DiscoveryResult(ContentHashMixin, BaseModel):
     source: str
     nodes: List[DiscoveryNode] = []
     edges: List[DiscoveryEdge] = []
@@ -0,0 +1,188 @@
+"""
+Concurrent SDK-direct lookups for relationship detection.
+
+Some relationships are only visible through extra API calls made per
+resource (ELB target groups and their health, EventBridge rule targets).
+SDKDirectFetcher runs those calls on a bounded thread pool — across
+regions, resources and strategies at once — and retries throttled calls
+with exponential backoff and jitter.
+
+Fetching is split from resolution: the detector submits nodes as soon as
+a region's collectors finish (prefetch), and RelationshipDetector later
+resolves the fetched ids/ARNs against the full node index. Nodes that
+were never prefetched are submitted on demand.
+"""
+
+from __future__ import annotations
+
+import time
+import random
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+from botocore.exceptions import ClientError
+
+from apps.api.ingestors.aws.schema import TopologyNode
+from apps.api.ingestors.aws.client_factory import AWSClientFactory
+
+logger = logging.getLogger(__name__)
+
+# Services with SDK-direct fetchers
+SDK_DIRECT_SERVICES = frozenset({"ELB", "EventBridge"})
+
+THROTTLING_ERROR_CODES = frozenset({
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "SlowDown",
+    "ProvisionedThroughputExceededException",
+})
+
+
+def is_throttling_error(error: Exception) -> bool:
+    if not isinstance(error, ClientError):
+        return False
+    return error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+def call_with_backoff(
+    fn: Callable[..., Any],
+    *args: Any,
+    attempts: int = 5,
+    base_delay: float = 0.2,
+    max_delay: float = 5.0,
+    **kwargs: Any,
+) -> Any:
+    """Call *fn*, retrying throttling errors with full-jitter exponential backoff.
+
+    Any other error, or a throttling error on the last attempt, is raised.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn(*args, **kwargs)
+        except ClientError as e:
+            if not is_throttling_error(e) or attempt == attempts - 1:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            logger.debug(f"Throttled on {getattr(fn, '__name__', fn)}, retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+
+class SDKDirectFetcher:
+    """Fetches SDK-direct relationship data on a bounded thread pool.
+
+    Results are futures keyed by node uid:
+      - ELB:         list of (target_group_arn, Future[list[target_id]])
+      - EventBridge: list of target dicts from list_targets_by_rule
+    """
+
+    def __init__(
+        self,
+        credentials: dict[str, Any] | None = None,
+        max_workers: int = 16,
+        retry_attempts: int = 5,
+    ) -> None:
+        self._credentials = credentials or {}
+        self.max_workers = max_workers
+        self.retry_attempts = retry_attempts
+        self._pool: ThreadPoolExecutor | None = None
+        self._futures: dict[str, Future] = {}
+        self._clients: dict[tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    # -- Public API ----------------------------------------------------------
+
+    def submit(self, nodes: Iterable[TopologyNode]) -> int:
+        """Schedule lookups for every supported node not yet submitted."""
+        fetchers = {"ELB": self._fetch_elb, "EventBridge": self._fetch_eventbridge}
+        submitted = 0
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="sdk-direct",
+                )
+            for node in nodes:
+                fetch = fetchers.get(node.service)
+                if fetch is None or node.uid in self._futures:
+                    continue
+                self._futures[node.uid] = self._pool.submit(fetch, node)
+                submitted += 1
+        return submitted
+
+    def result(self, node: TopologyNode) -> Any:
+        """Wait for *node*'s lookup. Returns None if it failed or was skipped."""
+        future = self._futures.get(node.uid)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning(f"{node.service} SDK-direct lookup failed for {node.uid} in {node.region}: {e}")
+            return None
+
+    def close(self) -> None:
+        """Drop results and release the pool; the next submit starts fresh."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._futures = {}
+            self._clients = {}
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    # -- Internals -----------------------------------------------------------
+
+    def _client(self, region: str, service: str) -> Any:
+        # boto3's default session is not thread-safe; create clients under the lock.
+        # The clients themselves are safe to share between threads.
+        key = (region, service)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = AWSClientFactory(region, self._credentials).get_client(service)
+                self._clients[key] = client
+            return client
+
+    def _call(self, fn: Callable[..., Any], **kwargs: Any) -> Any:
+        return call_with_backoff(fn, attempts=self.retry_attempts, **kwargs)
+
+    def _fetch_elb(self, lb_node: TopologyNode) -> list[tuple[str, Future]]:
+        lb_arn = lb_node.merge_hints.get("arn")
+        if not lb_arn:
+            return []
+
+        elbv2 = self._client(lb_node.region, "elbv2")
+        resp = self._call(elbv2.describe_target_groups, LoadBalancerArn=lb_arn)
+
+        # Fan target-health lookups back out to the pool without waiting on
+        # them here, so a busy pool can never deadlock on its own tasks.
+        # Submit under the lock, as submit() does, so close() cannot drop the
+        # pool in between; a lookup that outlived close() schedules nothing.
+        results: list[tuple[str, Future]] = []
+        with self._lock:
+            if self._pool is None:
+                return []
+            for tg in resp.get("TargetGroups", []):
+                tg_arn = tg["TargetGroupArn"]
+                results.append((tg_arn, self._pool.submit(self._fetch_target_health, elbv2, tg_arn)))
+        return results
+
+    def _fetch_target_health(self, elbv2: Any, tg_arn: str) -> list[str]:
+        resp = self._call(elbv2.describe_target_health, TargetGroupArn=tg_arn)
+        return [
+            desc.get("Target", {}).get("Id", "")
+            for desc in resp.get("TargetHealthDescriptions", [])
+        ]
+
+    def _fetch_eventbridge(self, eb_node: TopologyNode) -> list[dict]:
+        rule_name = eb_node.properties.get("rule_name")
+        if not rule_name:
+            return []
+        events = self._client(eb_node.region, "events")
+        resp = self._call(events.list_targets_by_rule, Rule=rule_name)
+        return resp.get("Targets", [])
@@ -0,0 +1,28 @@
+"""
+Content fingerprint shared by the pipeline and AWS DiscoveryResult models.
+
+Lives outside both packages so aws/schemas.py can use it without importing
+the pipeline package (whose base module imports aws.schemas).
+"""
+
+import json
+import hashlib
+
+
+class ContentHashMixin:
+    """content_hash() for result models with source, nodes and edges."""
+
+    def content_hash(self) -> str:
+        """
+        Stable sha256 of the source's nodes and edges.
+
+        Metadata (ingestion ids, timestamps, elapsed times) is excluded, so
+        two runs over unchanged infrastructure hash the same.
+        """
+        payload = {
+            "source": self.source,
+            "nodes": [n.model_dump() for n in self.nodes],
+            "edges": [e.model_dump() for e in self.edges],
+        }
+        body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
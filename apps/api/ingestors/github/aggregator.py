@@ -1,66 +1,128 @@
-from typing import List, Dict
-from thefuzz import fuzz
+from typing import List, Dict, Optional
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 from apps.api.ingestors.github.models import InfrastructureSignal
 
+NGRAM = 3        # blocking keys: character n-grams of the name with separators removed, plus its tokens
+FIRST_CHUNK = 16 # candidates scored in the first rapidfuzz call; each further call doubles it
+
+# thefuzz's full_process(force_ascii=True), which its token_set_ratio ran on both names
+_DROP_LATIN1 = {i: None for i in range(128, 256)}
+
+
+def _process_name(name: str) -> str:
+    return default_process(name.lower().translate(_DROP_LATIN1))
+
+
+def _keys(processed: str) -> set:
+    """
+    Blocking keys for a processed name. N-grams of the name without separators
+    let 'apigateway' find 'api-gateway'; whole tokens let short names ('db')
+    find longer names containing them.
+    """
+    tokens = processed.split()
+    joined = "".join(tokens)
+    keys = {f" {token}" for token in tokens}
+    keys.update(joined[i:i + NGRAM] for i in range(max(1, len(joined) - NGRAM + 1)))
+    keys.discard("")
+    return keys
+
+
 class SignalAggregator:
     """
     Consolidates InfrastructureSignals from all strategies (A, B, C).
     Deduplicates overlapping signals (e.g., 'redis' package from B and 'redis_instance' from A)
     using fuzzy string matching and weighted confidence scoring.
+
+    A signal is scored only against merged signals sharing a blocking key with
+    it (see _keys): large Terraform repos put thousands of signals in one
+    component type. Names sharing neither a token nor a character n-gram
+    rarely reach a useful threshold; below ~50, some that do are missed.
     """
-    
+
     def __init__(self, match_threshold: int = 85):
         self.match_threshold = match_threshold
-        
+
     def aggregate(self, signals: List[InfrastructureSignal]) -> List[InfrastructureSignal]:
         if not signals:
             return []
-            
+
         # Group signals implicitly by their architecture 'component_type' (e.g. Database, Cache)
         grouped_signals: Dict[str, List[InfrastructureSignal]] = {}
         for sig in signals:
             grouped_signals.setdefault(sig.component_type, []).append(sig)
-            
+
         final_signals: List[InfrastructureSignal] = []
-        
+
         for comp_type, group in grouped_signals.items():
             merged_group = self._deduplicate_group(group)
             final_signals.extend(merged_group)
-            
+
         return final_signals
 
     def _deduplicate_group(self, group: List[InfrastructureSignal]) -> List[InfrastructureSignal]:
         """
         Takes a list of signals of the SAME component_type and merges duplicates.
-        O(N^2) comparison is acceptable here because groups are typically small (1-10 items).
+        Each signal merges into the first merged signal it matches, in input order;
+        only the merged signals sharing a blocking key with it are scored, a chunk
+        per rapidfuzz call.
         """
         merged: List[InfrastructureSignal] = []
-        
+        names: List[str] = []               # processed name of each merged signal
+        blocks: Dict[str, List[int]] = {}   # blocking key -> positions in merged
+
         for incoming in group:
-            matched = False
-            for existing in merged:
-                # Compare semantic names using token_set_ratio for partial word matching (e.g. 'dep-sqlalchemy' vs 'prod_db')
-                # We use token_set_ratio because it handles differences in string lengths better
-                similarity = fuzz.token_set_ratio(incoming.name.lower(), existing.name.lower())
-                
-                # If they are the identical component type and their names share a high semantic similarity
-                # OR if they are just generically named dependencies that match the component type, merge them
-                if similarity >= self.match_threshold or ("dep" in incoming.name.lower() and existing.component_type == incoming.component_type):
-                    matched = True
-                    # A match is found! We need to merge them.
-                    # 1. Keep the highest confidence score
-                    # 2. Prefer the name of the higher confidence signal
-                    # 3. Merge configs together
-                    
-                    if incoming.confidence_score > existing.confidence_score:
-                        existing.name = incoming.name
-                        existing.confidence_score = incoming.confidence_score
-                        existing.source_location = f"{incoming.source_location}, {existing.source_location}"
-                    
-                    existing.config.update(incoming.config)
-                    break 
-            
-            if not matched:
+            # Generically named dependencies that match the component type merge into the first signal
+            if merged and ("dep" in incoming.name.lower() or self.match_threshold <= 0):
+                position = 0
+            else:
+                position = self._first_match(_process_name(incoming.name), names, blocks)
+
+            if position is None:
                 merged.append(incoming)
-                
+                names.append(_process_name(incoming.name))
+                for key in _keys(names[-1]):
+                    blocks.setdefault(key, []).append(len(merged) - 1)
+                continue
+
+            # A match is found! We need to merge them.
+            # 1. Keep the highest confidence score
+            # 2. Prefer the name of the higher confidence signal
+            # 3. Merge configs together
+            existing = merged[position]
+            if incoming.confidence_score > existing.confidence_score:
+                existing.name = incoming.name
+                existing.confidence_score = incoming.confidence_score
+                existing.source_location = f"{incoming.source_location}, {existing.source_location}"
+                names[position] = _process_name(existing.name)
+                for key in _keys(names[position]):
+                    block = blocks.setdefault(key, [])
+                    if position not in block:
+                        block.append(position)
+
+            existing.config.update(incoming.config)
+
         return merged
+
+    def _first_match(self, name: str, names: List[str], blocks: Dict[str, List[int]]) -> Optional[int]:
+        """Position of the first merged name scoring at least match_threshold against name, if any."""
+        found = [blocks[key] for key in _keys(name) if key in blocks]
+        if not found:
+            return None
+        candidates = sorted(set().union(*found))
+        # Only the first match counts: score in growing chunks, earliest merged signals first
+        start, size = 0, FIRST_CHUNK
+        while start < len(candidates):
+            chunk = candidates[start:start + size]
+            # Compare semantic names using token_set_ratio for partial word matching (e.g. 'dep-sqlalchemy' vs 'prod_db');
+            # thefuzz rounded the score, hence the half-point cutoff
+            scores = process.cdist(
+                [name], [names[i] for i in chunk], scorer=fuzz.token_set_ratio,
+                score_cutoff=self.match_threshold - 0.5, dtype=np.float64,
+            )[0]
+            passing = np.flatnonzero(np.round(scores) >= self.match_threshold)
+            if len(passing):
+                return chunk[passing[0]]
+            start, size = start + size, size * 2
+        return None
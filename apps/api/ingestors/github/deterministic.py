@@ -32,7 +32,9 @@ DEPENDENCY_MAPPING: Dict[str, str] = {
 
 class IaCParser:
     """Parses explicit Infrastructure-as-Code (IaC) files like Terraform and Docker Compose deterministically."""
-    
+
+    VERSION = 1 # bump when the signals produced for the same input change (keys the parse cache)
+
     def __init__(self) -> None:
         self.yaml = YAML(typ="safe")
         
@@ -114,7 +116,9 @@ class IaCParser:
 
 class DependencyParser:
     """Parses application manifests (e.g. package.json, requirements.txt) to infer infrastructure needs."""
-    
+
+    VERSION = 1 # bump when the signals produced for the same input change (keys the parse cache)
+
     def parse_package_json(self, file_path: str, content: str) -> List[InfrastructureSignal]:
         signals: List[InfrastructureSignal] = []
         try:
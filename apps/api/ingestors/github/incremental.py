@@ -9,6 +9,7 @@ from apps.api.models import Node, Edge, ConnectedRepository, Client
 from apps.api.ai_infrastructure.rag.models import KnowledgeBaseItem
 from apps.api.ingestors.github.client import GitHubClient
 from apps.api.ingestors.github.deterministic import IaCParser, DependencyParser
+from apps.api.ingestors.github.parse_cache import get_parse_cache
 from apps.api.ingestors.github.semantic import SemanticParser
 from apps.api.ingestors.github.app_auth import get_installation_token
 from apps.api.ai_infrastructure.rag.embeddings import EmbeddingService
@@ -32,6 +33,7 @@ class IncrementalUpdater:
         self.embedding_service = EmbeddingService()
         self.iac_parser = IaCParser()
         self.dep_parser = DependencyParser()
+        self.parse_cache = get_parse_cache()
         self.semantic_parser = SemanticParser(model="llama3.2")
 
     async def _get_github_client(self) -> GitHubClient:
@@ -77,16 +79,18 @@ class IncrementalUpdater:
             # Chunk and Embed for Vector DB (RAG)
             self._ingest_file_to_vector_db(filename, file_content)
                 
-            # Parse for Graph DB (Nodes / Edges)
+            # Parse for Graph DB (Nodes / Edges), reusing results for content parsed before
             fname_lower = filename.lower()
+            cached = self.parse_cache.get_or_parse
             if filename.endswith(".tf"):
-                new_signals.extend(self.iac_parser.parse_terraform(filename, file_content))
+                new_signals.extend(cached("terraform", filename, file_content, self.iac_parser.parse_terraform))
             elif "docker-compose" in fname_lower and (filename.endswith(".yml") or filename.endswith(".yaml")):
-                new_signals.extend(self.iac_parser.parse_compose(filename, file_content))
+                new_signals.extend(cached("compose", filename, file_content, self.iac_parser.parse_compose))
             elif "package.json" in fname_lower:
-                new_signals.extend(self.dep_parser.parse_package_json(filename, file_content))
+                new_signals.extend(cached("package_json", filename, file_content, self.dep_parser.parse_package_json))
             elif "requirements" in fname_lower and filename.endswith(".txt"):
-                new_signals.extend(self.dep_parser.parse_requirements_txt(filename, file_content))
+                new_signals.extend(cached("requirements", filename, file_content,
+                                          self.dep_parser.parse_requirements_txt))
             elif filename.endswith(('.py', '.js', '.ts', '.go', '.java')):
                 tier_2_files_content.append({"path": filename, "content": file_content})
                 
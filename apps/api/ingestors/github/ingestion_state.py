@@ -0,0 +1,90 @@
+"""
+Per-repository state of the last GitHub ingestion, kept next to the mirrors.
+
+One JSON file per (repository, branch) under {repo cache}/state/ holding
+the commit SHA that was ingested, the payload's content_hash, the signals
+extracted from every tier-1 file and the resulting DiscoveryResult.
+GitHubIngestionPipeline uses it to
+
+  - return the previous result without cloning or parsing when the
+    branch has not moved (and the DB agrees this was the last successful
+    ingestion, see ConnectedRepository.last_ingested_sha), and
+  - reparse only the files `git diff --name-only` reports between the
+    recorded commit and the new one, reusing the recorded signals for
+    every other file.
+
+Files that could not be parsed (timed out, or lost with a broken parse
+pool) are listed in unparsed_files and have no recorded signals, so the
+next run does not short-circuit and parses them again.
+
+The file is only a cache: when it is missing or unreadable the pipeline
+does a full parse.
+"""
+
+from __future__ import annotations
+
+import os
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import orjson
+
+from apps.api.ingestors.github.models import InfrastructureSignal
+from apps.api.ingestors.github.repo_cache import RepoCache
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+
+class IngestionStateStore:
+    def __init__(self, root: str | os.PathLike):
+        self.root = Path(root)
+
+    def _path(self, repo_url: str, branch: str) -> Path:
+        branch_id = hashlib.sha1(branch.encode()).hexdigest()[:12]
+        return self.root / RepoCache.mirror_name(repo_url) / f"{branch_id}.json"
+
+    def load(self, repo_url: str, branch: str) -> Optional[dict]:
+        """{commit_sha, content_hash, files: {path: [InfrastructureSignal]}, unparsed_files, result}, or None."""
+        try:
+            state = orjson.loads(self._path(repo_url, branch).read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable ingestion state for {repo_url}@{branch}: {e}")
+            return None
+        if state.get("version") != STATE_VERSION or state.get("branch") != branch:
+            return None
+        state["files"] = {
+            path: [InfrastructureSignal(**s) for s in signals] for path, signals in state["files"].items()
+        }
+        return state
+
+    def save(
+        self,
+        repo_url: str,
+        branch: str,
+        commit_sha: str,
+        content_hash: str,
+        files: Dict[str, List[InfrastructureSignal]],
+        result: dict,
+        unparsed_files: Sequence[str] = (),
+    ) -> None:
+        path = self._path(repo_url, branch)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        body = orjson.dumps({
+            "version": STATE_VERSION,
+            "branch": branch,
+            "commit_sha": commit_sha,
+            "content_hash": content_hash,
+            "files": {p: [s.model_dump() for s in signals] for p, signals in files.items()},
+            "unparsed_files": list(unparsed_files),
+            "result": result,
+        }, default=str)
+        tmp = path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
@@ -9,6 +9,7 @@ class FileMetadata:
     path: str
     extension: str
     size_bytes: int
+    blob_sha: Optional[str] = None # git blob id, when listed from the commit's trees
 
 @dataclass
 class ParseableFileSet:
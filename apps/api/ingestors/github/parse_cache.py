@@ -0,0 +1,279 @@
+"""
+Parser result cache: tier-1 signals keyed by git blob SHA and parser version.
+
+The same Terraform modules, compose files and package.json files are
+parsed again and again — on every branch, every PR, and for every tenant
+that connects a fork of the same repository. ParseCache keeps the signals
+IaCParser and DependencyParser produced for a file's content in a local
+SQLite database, keyed by
+
+    (git blob SHA of the content, file type, parser version)
+
+The blob SHA comes free from `git ls-tree` for ingested commits (see
+RepoCache.list_blobs) and is computed from the content otherwise
+(git_blob_sha), so a file fetched through the GitHub API for a PR and the
+same file in a later full ingestion share one entry. The parser version
+combines the parser's VERSION with the version of the library it wraps
+(python-hcl2, ruamel.yaml). Signals are stored without their
+source_location, which is filled in with the path being parsed on a hit.
+
+Entries carry a last-used time; past the size budget the least recently
+used are deleted. Hit and miss counts per file type are kept for this
+process (stats()). The cache is best-effort: on any SQLite error it
+behaves as a miss.
+
+Configure with OPSCRIBE_PARSE_CACHE_PATH (default
+/tmp/opscribe/parse-cache.sqlite3) and OPSCRIBE_PARSE_CACHE_MAX_MB
+(default 512).
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+from pathlib import Path
+from dataclasses import dataclass, field
+from importlib.metadata import PackageNotFoundError, version
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+
+from apps.api.ingestors.github.deterministic import IaCParser, DependencyParser
+from apps.api.ingestors.github.models import FileMetadata, InfrastructureSignal
+from apps.api.ingestors.github.parse_pool import file_type
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "/tmp/opscribe/parse-cache.sqlite3"
+DEFAULT_MAX_MB = 512
+EVICT_TO = 0.9          # evict down to 90% of the budget, not just under it
+_BATCH = 500            # keys per IN (...) query
+
+
+def git_blob_sha(data: bytes) -> str:
+    """The id git gives a blob with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def file_blob_sha(root: str, file_meta: FileMetadata) -> Optional[str]:
+    """file_meta.blob_sha, or the blob id of the file's content on disk; None if unreadable."""
+    if file_meta.blob_sha:
+        return file_meta.blob_sha
+    try:
+        with open(os.path.join(root, file_meta.path), "rb") as f:
+            return git_blob_sha(f.read())
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def parser_version(kind: str) -> str:
+    """Version tag for the parser handling a file type (see parse_pool.file_type)."""
+    def dist(name: str) -> str:
+        try:
+            return version(name)
+        except PackageNotFoundError:
+            return "unknown"
+
+    if kind == "terraform":
+        return f"iac{IaCParser.VERSION}/python-hcl2-{dist('python-hcl2')}"
+    if kind == "compose":
+        return f"iac{IaCParser.VERSION}/ruamel.yaml-{dist('ruamel.yaml')}"
+    return f"dep{DependencyParser.VERSION}"
+
+
+@dataclass
+class CacheLookup:
+    signals: Dict[str, List[InfrastructureSignal]]  # by path, for every hit
+    misses: List[FileMetadata]                      # to parse; blob_sha filled in where readable
+    counts: Dict[str, dict] = field(default_factory=dict) # {file_type: {hits, misses}}
+
+
+class ParseCache:
+    def __init__(self, path: Optional[str | os.PathLike] = None, max_bytes: Optional[int] = None):
+        self.path = Path(path or os.environ.get("OPSCRIBE_PARSE_CACHE_PATH") or DEFAULT_CACHE_PATH)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("OPSCRIBE_PARSE_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._counts: Dict[str, dict] = {}
+        self._counts_lock = threading.Lock()
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, file_type TEXT NOT NULL, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread; WAL so API workers in other processes can read while one writes."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @staticmethod
+    def key(blob_sha: str, kind: str) -> str:
+        return f"{blob_sha}:{kind}:{parser_version(kind)}"
+
+    # ── Reads ──
+
+    def lookup(self, root: str, files: Sequence[FileMetadata]) -> CacheLookup:
+        """Split tier-1 files under root into cache hits (signals by path) and files still to parse."""
+        result = CacheLookup(signals={}, misses=[])
+        keyed: Dict[str, Tuple[str, List[FileMetadata]]] = {}
+        for file_meta in files:
+            kind = file_type(file_meta)
+            if kind != "other":
+                file_meta.blob_sha = file_blob_sha(root, file_meta)
+            if kind == "other" or not file_meta.blob_sha: # nothing to parse, or unreadable
+                result.misses.append(file_meta)
+                continue
+            keyed.setdefault(self.key(file_meta.blob_sha, kind), (kind, []))[1].append(file_meta)
+
+        rows = self._get_many(list(keyed))
+        for key, (kind, metas) in keyed.items():
+            entry = result.counts.setdefault(kind, {"hits": 0, "misses": 0})
+            for file_meta in metas:
+                if key in rows:
+                    result.signals[file_meta.path] = self._decode(rows[key], file_meta.path)
+                    entry["hits"] += 1
+                else:
+                    result.misses.append(file_meta)
+                    entry["misses"] += 1
+        self._record(result.counts)
+        return result
+
+    def get_or_parse(
+        self,
+        kind: str,
+        path: str,
+        content: str,
+        parse: Callable[[str, str], List[InfrastructureSignal]],
+    ) -> List[InfrastructureSignal]:
+        """Signals for one file whose content is already in hand (e.g. from the GitHub API)."""
+        key = self.key(git_blob_sha(content.encode()), kind)
+        rows = self._get_many([key])
+        self._record({kind: {"hits": int(key in rows), "misses": int(key not in rows)}})
+        if key in rows:
+            return self._decode(rows[key], path)
+        signals = parse(path, content)
+        self._put_many([(key, kind, signals)])
+        return signals
+
+    def _get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        rows: Dict[str, bytes] = {}
+        try:
+            db = self._connect()
+            now = time.time()
+            for i in range(0, len(keys), _BATCH):
+                batch = keys[i:i + _BATCH]
+                marks = ",".join("?" * len(batch))
+                rows.update(db.execute(f"SELECT key, value FROM entries WHERE key IN ({marks})", batch).fetchall())
+                hits = [k for k in batch if k in rows]
+                if hits:
+                    db.execute(f"UPDATE entries SET last_used = ? WHERE key IN ({','.join('?' * len(hits))})",
+                               [now, *hits])
+            db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"[PARSE CACHE] Lookup failed, parsing instead: {e}")
+        return rows
+
+    @staticmethod
+    def _decode(value: bytes, path: str) -> List[InfrastructureSignal]:
+        return [
+            InfrastructureSignal(**s, source_location=path)
+            for s in orjson.loads(zlib.decompress(value))
+        ]
+
+    # ── Writes ──
+
+    def store(self, entries: Iterable[Tuple[FileMetadata, List[InfrastructureSignal]]]) -> None:
+        """Record freshly parsed signals for files returned in CacheLookup.misses."""
+        rows = []
+        for file_meta, signals in entries:
+            kind = file_type(file_meta)
+            if kind != "other" and file_meta.blob_sha:
+                rows.append((self.key(file_meta.blob_sha, kind), kind, signals))
+        if rows:
+            self._put_many(rows)
+
+    def _put_many(self, rows: List[Tuple[str, str, List[InfrastructureSignal]]]) -> None:
+        now = time.time()
+        values = []
+        for key, kind, signals in rows:
+            body = zlib.compress(orjson.dumps(
+                [s.model_dump(exclude={"source_location"}) for s in signals], default=str,
+            ))
+            values.append((key, kind, body, len(key) + len(body), now))
+        try:
+            db = self._connect()
+            db.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", values)
+            db.commit()
+            self.evict()
+        except sqlite3.Error as e:
+            logger.warning(f"[PARSE CACHE] Failed to store {len(values)} entries: {e}")
+
+    def evict(self) -> int:
+        """Delete least recently used entries past max_bytes; returns how many."""
+        db = self._connect()
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        excess = total - int(self.max_bytes * EVICT_TO)
+        victims, freed = [], 0
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if freed >= excess:
+                break
+            victims.append((key,))
+            freed += size
+        db.executemany("DELETE FROM entries WHERE key = ?", victims)
+        db.commit()
+        logger.info(f"[PARSE CACHE] Evicted {len(victims)} entries ({freed} bytes)")
+        return len(victims)
+
+    # ── Metrics ──
+
+    def _record(self, counts: Dict[str, dict]) -> None:
+        with self._counts_lock:
+            for kind, c in counts.items():
+                entry = self._counts.setdefault(kind, {"hits": 0, "misses": 0})
+                entry["hits"] += c["hits"]
+                entry["misses"] += c["misses"]
+
+    def stats(self) -> dict:
+        """Hits, misses and hit rate per file type since this process started, plus entries and bytes on disk."""
+        with self._counts_lock:
+            parsers = {
+                kind: {**c, "hit_rate": round(c["hits"] / max(1, c["hits"] + c["misses"]), 4)}
+                for kind, c in self._counts.items()
+            }
+        try:
+            entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        except sqlite3.Error:
+            entries, size = None, None
+        return {"parsers": parsers, "entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+
+_cache: ParseCache | None = None
+_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """Return the process-wide parse cache, creating it on first use."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = ParseCache()
+        return _cache
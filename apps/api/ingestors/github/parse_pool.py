@@ -0,0 +1,243 @@
+"""
+Process pool for tier-1 file parsing.
+
+hcl2.loads and ruamel YAML are pure Python and CPU-bound: parsing the
+tier-1 files of a large Terraform monorepo on the event loop thread held
+up every other request to the API for the duration. ParsePool.parse()
+
+  - splits the files into chunks and parses them in a process-wide
+    ProcessPoolExecutor (spawned workers, one IaCParser/DependencyParser
+    per worker), keeping the event loop free,
+  - yields each chunk's ParsedFile results as soon as that chunk is done,
+    so the caller collects signals while other chunks are still running,
+  - bounds every file with a per-file timeout (SIGALRM in the worker) —
+    a pathological file yields no signals instead of stalling the run —
+    and replaces the pool if no chunk finishes within a whole chunk's
+    worth of timeouts (a hang SIGALRM cannot interrupt, e.g. in C code),
+  - times every file; summarize_timings() groups the times by file type.
+
+Configure with OPSCRIBE_PARSE_WORKERS (default: CPU count; 0 parses on a
+worker thread of this process, without timeouts) and
+OPSCRIBE_PARSE_TIMEOUT_S (default 30).
+"""
+
+from __future__ import annotations
+
+import os
+import math
+import signal
+import asyncio
+import logging
+import threading
+import multiprocessing
+from time import perf_counter
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from apps.api.ingestors.github.deterministic import IaCParser, DependencyParser
+from apps.api.ingestors.github.models import FileMetadata, InfrastructureSignal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARSE_TIMEOUT_S = 30.0
+MAX_CHUNK_FILES = 32
+CHUNKS_PER_WORKER = 4       # smaller chunks near the end keep every worker busy
+STALL_GRACE_S = 30.0
+
+
+@dataclass
+class ParsedFile:
+    path: str
+    file_type: str                                  # see file_type()
+    signals: Optional[List[InfrastructureSignal]]   # None: unreadable or timed out
+    seconds: float
+    timed_out: bool = False
+
+
+def file_type(file_meta: FileMetadata) -> str:
+    """Which parser handles a tier-1 file: terraform, compose, package_json, requirements or other."""
+    filename = os.path.basename(file_meta.path).lower()
+    if file_meta.extension in (".tf", ".hcl"):
+        return "terraform"
+    if "docker-compose" in filename and file_meta.extension in (".yml", ".yaml"):
+        return "compose"
+    if filename == "package.json":
+        return "package_json"
+    if "requirements" in filename and file_meta.extension == ".txt":
+        return "requirements"
+    return "other"
+
+
+# ── Parsing (runs in the workers) ──
+
+_parsers: Optional[tuple[IaCParser, DependencyParser]] = None
+
+
+def parse_file(root: str, file_meta: FileMetadata) -> Optional[List[InfrastructureSignal]]:
+    """Signals from one tier-1 file; None if it cannot be read."""
+    global _parsers
+    full_path = os.path.join(root, file_meta.path)
+    if not os.path.isfile(full_path):
+        return None
+    kind = file_type(file_meta)
+    if kind == "other":
+        return []
+
+    try:
+        with open(full_path, "r", errors="replace") as f:
+            content = f.read()
+    except Exception:
+        return None
+
+    if _parsers is None:
+        _parsers = (IaCParser(), DependencyParser())
+    iac_parser, dep_parser = _parsers
+    if kind == "terraform":
+        return iac_parser.parse_terraform(file_meta.path, content)
+    if kind == "compose":
+        return iac_parser.parse_compose(file_meta.path, content)
+    if kind == "package_json":
+        return dep_parser.parse_package_json(file_meta.path, content)
+    return dep_parser.parse_requirements_txt(file_meta.path, content)
+
+
+class _ParseTimeout(BaseException):
+    """Raised by SIGALRM; a BaseException so the parsers' `except Exception` cannot swallow it."""
+
+
+def _on_alarm(signum, frame):
+    raise _ParseTimeout()
+
+
+def _init_worker() -> None:
+    signal.signal(signal.SIGALRM, _on_alarm)
+
+
+def _parse_chunk(root: str, files: Sequence[FileMetadata], timeout: Optional[float]) -> List[ParsedFile]:
+    results = []
+    for file_meta in files:
+        timed_out = False
+        start = perf_counter()
+        try:
+            if timeout:
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            try:
+                signals = parse_file(root, file_meta)
+            finally:
+                if timeout:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+        except _ParseTimeout:
+            signals, timed_out = None, True
+        results.append(ParsedFile(file_meta.path, file_type(file_meta), signals, perf_counter() - start, timed_out))
+    return results
+
+
+def summarize_timings(results: Sequence[ParsedFile]) -> Dict[str, dict]:
+    """{file_type: {files, seconds, max_seconds, timeouts}} over parse results."""
+    summary: Dict[str, dict] = {}
+    for r in results:
+        entry = summary.setdefault(r.file_type, {"files": 0, "seconds": 0.0, "max_seconds": 0.0, "timeouts": 0})
+        entry["files"] += 1
+        entry["seconds"] += r.seconds
+        entry["max_seconds"] = max(entry["max_seconds"], r.seconds)
+        entry["timeouts"] += r.timed_out
+    for entry in summary.values():
+        entry["seconds"] = round(entry["seconds"], 3)
+        entry["max_seconds"] = round(entry["max_seconds"], 3)
+    return summary
+
+
+# ── Pool ──
+
+class ParsePool:
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = None):
+        if workers is None:
+            workers = int(os.environ.get("OPSCRIBE_PARSE_WORKERS", os.cpu_count() or 1))
+        if timeout is None:
+            timeout = float(os.environ.get("OPSCRIBE_PARSE_TIMEOUT_S", DEFAULT_PARSE_TIMEOUT_S))
+        self.workers = max(0, workers)
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the API process has threads (and an event loop) that fork would copy mid-flight
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _replace_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Kill a stuck pool's workers; the next parse starts a new pool."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+
+    def chunk_size(self, n_files: int) -> int:
+        return max(1, min(MAX_CHUNK_FILES, math.ceil(n_files / (max(1, self.workers) * CHUNKS_PER_WORKER))))
+
+    async def parse(self, root: str, files: Sequence[FileMetadata]) -> AsyncIterator[List[ParsedFile]]:
+        """Parse files under root, yielding each chunk's results as it completes (in no particular order)."""
+        size = self.chunk_size(len(files))
+        chunks = [list(files[i:i + size]) for i in range(0, len(files), size)]
+        if not chunks:
+            return
+        if self.workers == 0:
+            for chunk in chunks:
+                yield await asyncio.to_thread(_parse_chunk, root, chunk, None)
+            return
+
+        executor = self._get_executor()
+        pending = {
+            asyncio.wrap_future(executor.submit(_parse_chunk, root, chunk, self.timeout)): chunk
+            for chunk in chunks
+        }
+        stall_after = self.timeout * size + STALL_GRACE_S
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=stall_after, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    lost = [f for chunk in pending.values() for f in chunk]
+                    logger.error(f"[PARSE] No chunk finished in {stall_after:.0f}s; replacing the parse pool, "
+                                 f"{len(lost)} files left unparsed")
+                    self._replace_executor(executor)
+                    pending.clear()
+                    yield [ParsedFile(f.path, file_type(f), None, stall_after, True) for f in lost]
+                    return
+                for future in done:
+                    chunk = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except (Exception, asyncio.CancelledError) as e:
+                        # a worker died (OOM kill, crash in a C extension), or a concurrent parse replaced the pool
+                        logger.error(f"[PARSE] Chunk of {len(chunk)} files failed: {e!r}")
+                        if isinstance(e, BrokenProcessPool):
+                            self._replace_executor(executor)
+                        results = [ParsedFile(f.path, file_type(f), None, 0.0) for f in chunk]
+                    yield results
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+_pool: ParsePool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ParsePool:
+    """Return the process-wide parse pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParsePool()
+        return _pool
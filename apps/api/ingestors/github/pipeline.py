@@ -7,7 +7,7 @@ DiscoveryResult conforming to the raw_v1 schema spec.
 Pipeline Steps:
   [1] Authenticate with GitHub App
   [2] Retrieve installation repos
-  [3] Clone repository
+  [3] Clone repository (worktree of the cached mirror, see repo_cache.py)
   [4] Walk file tree
   [5] Parse IaC + dependency files
   [6] Aggregate signals
@@ -16,19 +16,20 @@ Pipeline Steps:
   [9] Return DiscoveryResult
 """
 
-import os
 import asyncio
 import hashlib
 import tempfile
-import subprocess
 import logging
 from time import time
 from typing import List, Optional, Dict, Any
 
 from apps.api.ingestors.github.walker import RepositoryWalker
-from apps.api.ingestors.github.deterministic import IaCParser, DependencyParser
+from apps.api.ingestors.github.repo_cache import RepoCache, get_repo_cache
+from apps.api.ingestors.github.parse_pool import ParsedFile, ParsePool, get_parse_pool, summarize_timings
+from apps.api.ingestors.github.parse_cache import ParseCache, get_parse_cache
 from apps.api.ingestors.github.aggregator import SignalAggregator
 from apps.api.ingestors.github.models import InfrastructureSignal
+from apps.api.ingestors.github.ingestion_state import IngestionStateStore
 from apps.api.ingestors.pipeline.schemas import DiscoveryNode, DiscoveryEdge, DiscoveryResult
 from apps.api.models import ConnectedRepository
 from sqlmodel import Session
@@ -75,6 +76,11 @@ class GitHubIngestionPipeline:
         semantic_model: str = "llama3.2",
         session: Optional[Session] = None,
         connected_repo_id: Optional[str] = None,
+        repo_cache: Optional[RepoCache] = None,
+        last_commit_sha: Optional[str] = None,
+        last_content_hash: Optional[str] = None,
+        parse_pool: Optional[ParsePool] = None,
+        parse_cache: Optional[ParseCache] = None,
     ):
         self.repo_url = repo_url.rstrip("/")
         self.branch = branch
@@ -83,6 +89,13 @@ class GitHubIngestionPipeline:
         self.semantic_model = semantic_model
         self.session = session
         self.connected_repo_id = connected_repo_id
+        self.repo_cache = repo_cache or get_repo_cache()
+        self.state_store = IngestionStateStore(self.repo_cache.root / "state")
+        self.parse_pool = parse_pool or get_parse_pool()
+        self.parse_cache = parse_cache or get_parse_cache()
+        # Last successful ingestion of this branch, as recorded on ConnectedRepository
+        self.last_commit_sha = last_commit_sha
+        self.last_content_hash = last_content_hash
 
         # Derive repo_full_name for globally unique node keys (Spec §7)
         self.repo_full_name = (
@@ -117,20 +130,12 @@ class GitHubIngestionPipeline:
 
     # ── Remote SHA ───────────────────────────────────────────────────
     async def get_remote_sha(self) -> Optional[str]:
-        auth_url = self._get_auth_url()
+        """Fetch the branch into the local mirror (see RepoCache) and return its head SHA."""
         try:
-            process = await asyncio.create_subprocess_exec(
-                "git", "ls-remote", auth_url, self.branch,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+            stats = await asyncio.to_thread(
+                self.repo_cache.update, self.repo_url, self.branch, self._get_auth_url(),
             )
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(), timeout=10.0
-            )
-            if process.returncode == 0:
-                output = stdout.decode().strip()
-                if output:
-                    return output.split()[0]
+            return stats.sha
         except Exception as e:
             logger.warning(f"Failed to get remote SHA for {self.repo_url}: {e}")
         return None
@@ -145,6 +150,23 @@ class GitHubIngestionPipeline:
             f"Starting GitHub ingestion for {self.repo_url} "
             f"on branch {self.branch} (SHA: {commit_sha})"
         )
+        state = await asyncio.to_thread(self.state_store.load, self.repo_url, self.branch)
+
+        # ── Unchanged since the last successful ingestion ────────────
+        if (
+            commit_sha and state
+            and commit_sha == self.last_commit_sha == state["commit_sha"]
+            and state["content_hash"] == self.last_content_hash
+            and not state.get("unparsed_files") # else reparse the files that failed last time
+        ):
+            result = DiscoveryResult(**state["result"])
+            result.metadata.update({
+                "unchanged": True,
+                "reparsed_files": 0,
+                "pipeline_elapsed_s": round(time() - t0, 2),
+            })
+            self._update_step(9, f"Unchanged at {commit_sha[:12]} — reused the last ingestion")
+            return result
 
         self._update_step(2, "Retrieved installation repos")
         self._update_step(3, "Cloning repository")
@@ -153,43 +175,80 @@ class GitHubIngestionPipeline:
             repo_url=self.repo_url,
             branch=self.branch,
             auth_url=self._get_auth_url(),
+            commit_sha=commit_sha,
+            repo_cache=self.repo_cache,
+            infra_only=True, # only tier-1 files are parsed: don't fetch or write anything else
         )
 
         with tempfile.TemporaryDirectory() as temp_dir:
             file_set = await walker.walk(temp_dir)
+            commit_sha = walker.fetch_stats.sha
             self._update_step(4, f"Walked file tree — {len(file_set.tier_1_files)} tier-1 files")
 
-            iac_parser = IaCParser()
-            dep_parser = DependencyParser()
-            all_signals: List[InfrastructureSignal] = []
-
-            self._update_step(5, "Parsing IaC + dependency files")
-            for file_meta in file_set.tier_1_files:
-                full_path = os.path.join(temp_dir, file_meta.path)
-                if not os.path.isfile(full_path):
-                    continue
-
-                try:
-                    with open(full_path, "r", errors="replace") as f:
-                        content = f.read()
-                except Exception:
-                    continue
-
-                filename = os.path.basename(file_meta.path).lower()
-
-                if file_meta.extension in (".tf", ".hcl"):
-                    all_signals.extend(iac_parser.parse_terraform(file_meta.path, content))
-                elif "docker-compose" in filename and file_meta.extension in (".yml", ".yaml"):
-                    all_signals.extend(iac_parser.parse_compose(file_meta.path, content))
-                elif filename == "package.json":
-                    all_signals.extend(dep_parser.parse_package_json(file_meta.path, content))
-                elif "requirements" in filename and file_meta.extension == ".txt":
-                    all_signals.extend(dep_parser.parse_requirements_txt(file_meta.path, content))
-
-            self._update_step(6, f"Extracted {len(all_signals)} raw signals")
+            # Signals recorded at the last ingested commit stay valid for every
+            # file git reports unchanged since then
+            reusable: Dict[str, List[InfrastructureSignal]] = {}
+            if state and state["commit_sha"] == commit_sha:
+                reusable = state["files"]
+            elif state:
+                changed = await asyncio.to_thread(
+                    self.repo_cache.changed_files, self.repo_url, state["commit_sha"], commit_sha,
+                )
+                if changed is not None:
+                    changed_set = set(changed)
+                    reusable = {p: sigs for p, sigs in state["files"].items() if p not in changed_set}
+                    logger.info(f"[STEP 5] {len(changed)} files changed since {state['commit_sha'][:12]}")
+
+            # Then the parse cache (same blob parsed before, on any branch or repository);
+            # everything else goes to the parse pool, chunks streaming back as they finish
+            cached = await asyncio.to_thread(
+                self.parse_cache.lookup, temp_dir, [f for f in file_set.tier_1_files if f.path not in reusable],
+            )
+            self._update_step(5, f"Parsing IaC + dependency files ({len(cached.misses)} of "
+                                 f"{len(file_set.tier_1_files)}, {len(cached.signals)} cached)")
+            parsed: Dict[str, ParsedFile] = {}
+            async for results in self.parse_pool.parse(temp_dir, cached.misses):
+                for r in results:
+                    parsed[r.path] = r
+                    if r.timed_out:
+                        logger.warning(f"[STEP 5] Gave up parsing {r.path} after {r.seconds:.1f}s")
+            parse_timing = summarize_timings(list(parsed.values()))
+            await asyncio.to_thread(self.parse_cache.store, [
+                (f, parsed[f.path].signals) for f in cached.misses
+                if f.path in parsed and parsed[f.path].signals is not None
+            ])
 
+            all_signals: List[InfrastructureSignal] = []
+            file_signals: Dict[str, List[InfrastructureSignal]] = {}
+            unparsed: List[str] = [] # timed out, or lost with a broken or replaced pool
+            reparsed = 0
+            for file_meta in file_set.tier_1_files: # walk order, so aggregation is deterministic
+                signals = reusable.get(file_meta.path)
+                if signals is None:
+                    signals = cached.signals.get(file_meta.path)
+                if signals is None:
+                    r = parsed.get(file_meta.path)
+                    if r is None or r.signals is None:
+                        unparsed.append(file_meta.path)
+                        continue
+                    signals = r.signals
+                    reparsed += 1
+                file_signals[file_meta.path] = signals
+                all_signals.extend(signals)
+
+            self._update_step(6, f"Extracted {len(all_signals)} raw signals ({reparsed} files parsed, "
+                                 f"{len(cached.signals)} from the parse cache, "
+                                 f"{len(file_signals) - reparsed - len(cached.signals)} reused)")
+            if unparsed:
+                logger.warning(f"[STEP 6] {len(unparsed)} files could not be parsed and are left out "
+                               f"until the next run: {unparsed[:10]}")
+            for kind, timing in parse_timing.items():
+                logger.info(f"[STEP 6] {kind}: {timing['files']} files in {timing['seconds']}s "
+                            f"(slowest {timing['max_seconds']}s, {timing['timeouts']} timed out)")
+
+            # The aggregator merges signals in place; keep the per-file ones pristine for reuse
             aggregator = SignalAggregator(match_threshold=70)
-            final_signals = aggregator.aggregate(all_signals)
+            final_signals = aggregator.aggregate([s.model_copy(deep=True) for s in all_signals])
             self._update_step(7, f"Aggregated to {len(final_signals)} deduplicated signals")
 
             # ── Build RAW nodes & edges (Spec §4, §5) ───────────────
@@ -208,7 +267,7 @@ class GitHubIngestionPipeline:
             elapsed = round(time() - t0, 2)
             self._update_step(9, f"Pipeline complete in {elapsed}s")
 
-            return DiscoveryResult(
+            result = DiscoveryResult(
                 source="github",
                 nodes=nodes,
                 edges=edges,
@@ -220,10 +279,23 @@ class GitHubIngestionPipeline:
                     "content_hash": content_hash,
                     "raw_signal_count": len(all_signals),
                     "deduplicated_count": len(final_signals),
+                    "reparsed_files": reparsed,
+                    "unparsed_files": unparsed,
+                    "parse_timing": parse_timing,
+                    "parse_cache": cached.counts,
                     "pipeline_elapsed_s": elapsed,
                 },
             )
 
+        try:
+            await asyncio.to_thread(
+                self.state_store.save, self.repo_url, self.branch, commit_sha, content_hash,
+                file_signals, result.model_dump(), unparsed,
+            )
+        except OSError as e:
+            logger.warning(f"Failed to record ingestion state for {self.repo_url}: {e}")
+        return result
+
     # ── Node & Edge construction ─────────────────────────────────────
     def _signals_to_nodes_and_edges(
         self, signals: List[InfrastructureSignal]
@@ -0,0 +1,376 @@
+"""
+Repository cache: one bare git mirror per repository on local disk.
+
+Ingestion used to `git clone` every repository from scratch into a fresh
+temp dir on every export and webhook push. Instead, RepoCache keeps a bare
+mirror per repository URL and:
+
+  - update()    fetches just the target branch into the mirror (the whole
+                repository the first time, only new objects afterwards)
+                and returns its commit SHA
+  - checkout()  materialises a commit as a detached worktree of the
+                mirror, optionally sparse (only paths matching a set of
+                patterns) — objects are shared with the mirror
+  - list_blobs()     every path in a commit, from its trees alone
+  - changed_files()  `git diff --name-only` between two cached commits
+
+Mirrors are blobless partial clones (`--filter=blob:none`): fetches bring
+commits and trees only, and file contents are fetched from the remote in
+one batch when a checkout first needs them. A sparse checkout of the
+infrastructure files of a repository full of binary assets therefore
+never downloads the assets, nor any blob from the branch's history.
+
+Access tokens are passed on each git command's command line (as the URL
+of the mirror's `origin` remote) and never stored in the mirror's config.
+Each mirror has a lock file (fcntl.flock), so concurrent jobs in this or
+other worker processes serialise their fetches and worktree changes per
+repository. When the cache grows past
+its disk budget, least-recently-used mirrors are deleted, skipping ones
+that are locked or still have a worktree checked out.
+
+Configure with OPSCRIBE_REPO_CACHE_DIR (default /tmp/opscribe/repo-cache)
+and OPSCRIBE_REPO_CACHE_MAX_MB (default 5120).
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import fcntl
+import shutil
+import hashlib
+import logging
+import threading
+import subprocess
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "/tmp/opscribe/repo-cache"
+DEFAULT_MAX_MB = 5120
+DEFAULT_GIT_TIMEOUT = 300.0
+_LAST_USED = "opscribe-last-used"
+
+
+class RepoCacheError(Exception):
+    """A git command against the cache or the remote failed."""
+
+
+@dataclass
+class FetchStats:
+    repo_url: str
+    branch: str
+    sha: str
+    cloned: bool            # the mirror was created by this call
+    fetched: bool           # False when the requested commit was already cached
+    seconds: float
+    bytes_received: int     # growth of the mirror's object store (branch fetch + blobs checked out)
+
+
+def _redact(text: str, auth_url: Optional[str], repo_url: str) -> str:
+    return text.replace(auth_url, repo_url) if auth_url and auth_url != repo_url else text
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class RepoCache:
+    def __init__(
+        self,
+        root: Optional[str | os.PathLike] = None,
+        max_bytes: Optional[int] = None,
+        timeout: float = DEFAULT_GIT_TIMEOUT,
+    ):
+        self.root = Path(root or os.environ.get("OPSCRIBE_REPO_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("OPSCRIBE_REPO_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        (self.root / "mirrors").mkdir(parents=True, exist_ok=True)
+        (self.root / "locks").mkdir(parents=True, exist_ok=True)
+
+    # ── Paths & locking ──
+
+    @staticmethod
+    def mirror_name(repo_url: str) -> str:
+        """Stable directory name for a repository URL (credentials and .git suffix ignored)."""
+        parsed = urlparse(repo_url.rstrip("/"))
+        netloc = parsed.hostname or parsed.netloc
+        if parsed.port:
+            netloc = f"{netloc}:{parsed.port}"
+        path = parsed.path[:-4] if parsed.path.endswith(".git") else parsed.path
+        normalized = parsed._replace(netloc=netloc.lower(), path=path).geturl()
+        name = path.rstrip("/").rsplit("/", 1)[-1] or "repo"
+        return f"{hashlib.sha1(normalized.encode()).hexdigest()[:12]}-{name}.git"
+
+    def mirror_path(self, repo_url: str) -> Path:
+        return self.root / "mirrors" / self.mirror_name(repo_url)
+
+    @contextmanager
+    def _locked(self, name: str, blocking: bool = True) -> Iterator[bool]:
+        """Exclusive per-mirror lock; yields False if non-blocking and already held."""
+        with open(self.root / "locks" / f"{name}.lock", "a+") as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _git(self, *args: str, cwd: Optional[Path] = None, auth_url: Optional[str] = None,
+             repo_url: str = "") -> str:
+        """
+        Run git. auth_url, when given, is the URL of the mirror's `origin`
+        remote for this one command — branch fetches and lazy blob fetches
+        during checkouts — and is redacted from errors.
+        """
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        remote = ["-c", f"remote.origin.url={auth_url}"] if auth_url else []
+        try:
+            process = subprocess.run(
+                ["git", *remote, *args], cwd=cwd, env=env, capture_output=True, text=True, timeout=self.timeout,
+            )
+        except subprocess.TimeoutExpired:
+            raise RepoCacheError(f"git {args[0]} timed out after {self.timeout:.0f}s for {repo_url}")
+        if process.returncode != 0:
+            raise RepoCacheError(_redact(process.stderr.strip(), auth_url, repo_url))
+        return process.stdout.strip()
+
+    # ── Mirrors ──
+
+    def update(
+        self,
+        repo_url: str,
+        branch: str,
+        auth_url: Optional[str] = None,
+        sha: Optional[str] = None,
+    ) -> FetchStats:
+        """
+        Bring the mirror's copy of `branch` up to date and return its SHA.
+        `branch` may also name a tag, as with `git clone --branch`.
+        When `sha` is given and already in the mirror, nothing is fetched.
+        """
+        mirror = self.mirror_path(repo_url)
+        start = time.perf_counter()
+        with self._locked(mirror.name):
+            stats = self._update_locked(mirror, repo_url, branch, auth_url or repo_url, sha, start)
+        self.evict(keep=mirror.name)
+        return stats
+
+    def _update_locked(self, mirror: Path, repo_url: str, branch: str, auth_url: str,
+                       sha: Optional[str], start: float) -> FetchStats:
+        cloned = not (mirror / "HEAD").exists()
+        if cloned:
+            shutil.rmtree(mirror, ignore_errors=True) # a half-initialised mirror from a crash
+            self._git("init", "--bare", "--quiet", str(mirror))
+            self._git("config", "gc.auto", "0", cwd=mirror) # no gc stalls under the lock; eviction bounds size
+        else:
+            self._git("worktree", "prune", cwd=mirror)
+        self._make_blobless(mirror, new=cloned)
+        (mirror / _LAST_USED).touch()
+
+        if sha and not cloned and self._has_commit(mirror, sha):
+            return FetchStats(repo_url, branch, sha, False, False, time.perf_counter() - start, 0)
+
+        before = _dir_size(mirror / "objects")
+        # Like `git clone --branch`: a branch of that name, else a tag
+        for ref in (f"refs/heads/{branch}", f"refs/tags/{branch}"):
+            try:
+                self._git("fetch", "--quiet", "--no-tags", "--filter=blob:none", "origin",
+                          f"+{ref}:{ref}", cwd=mirror, auth_url=auth_url, repo_url=repo_url)
+                break
+            except RepoCacheError as e:
+                if ref.startswith("refs/heads/") and "couldn't find remote ref" in str(e):
+                    continue
+                if cloned:
+                    shutil.rmtree(mirror, ignore_errors=True)
+                raise
+        head = self._git("rev-parse", f"{ref}^{{commit}}", cwd=mirror)
+        received = max(0, _dir_size(mirror / "objects") - before)
+        elapsed = time.perf_counter() - start
+        logger.info(f"[REPO CACHE] {'Cloned' if cloned else 'Fetched'} {repo_url}@{branch} -> {head[:12]} "
+                    f"({received} bytes, {elapsed:.2f}s)")
+        return FetchStats(repo_url, branch, head, cloned, True, elapsed, received)
+
+    def _make_blobless(self, mirror: Path, new: bool) -> None:
+        """
+        Configure `origin` as the mirror's promisor remote, without a URL
+        (see _git). Mirrors created before partial clones were used are
+        converted in place; the blobs they already hold stay.
+        """
+        if not new:
+            try:
+                self._git("config", "--get", "extensions.partialclone", cwd=mirror)
+                return
+            except RepoCacheError:
+                pass
+        for key, value in (
+            ("core.repositoryformatversion", "1"),
+            ("remote.origin.promisor", "true"),
+            ("remote.origin.partialclonefilter", "blob:none"),
+            ("extensions.partialclone", "origin"),
+        ):
+            self._git("config", key, value, cwd=mirror)
+
+    def _has_commit(self, mirror: Path, sha: str) -> bool:
+        try:
+            self._git("cat-file", "-e", f"{sha}^{{commit}}", cwd=mirror)
+            return True
+        except RepoCacheError:
+            return False
+
+    def changed_files(self, repo_url: str, old_sha: str, new_sha: str) -> Optional[List[str]]:
+        """
+        Paths added, modified or deleted between two cached commits (renames
+        count as a delete plus an add). None if either commit is not in the
+        mirror, e.g. after a force push dropped old_sha.
+        """
+        mirror = self.mirror_path(repo_url)
+        if not (mirror / "HEAD").exists():
+            return None
+        with self._locked(mirror.name):
+            try:
+                output = self._git("diff", "--name-only", "--no-renames", "-z", old_sha, new_sha, "--", cwd=mirror)
+            except RepoCacheError:
+                return None
+        return [path for path in output.split("\0") if path]
+
+    def list_blobs(self, repo_url: str, sha: str) -> Dict[str, Optional[str]]:
+        """
+        Every file path in a cached commit with its blob id (None for
+        symlinks), read from the commit's trees — no blob is fetched.
+        """
+        mirror = self.mirror_path(repo_url)
+        with self._locked(mirror.name):
+            output = self._git("ls-tree", "-r", "-z", "--full-tree", sha, cwd=mirror)
+        blobs: Dict[str, Optional[str]] = {}
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            info, path = entry.split("\t", 1) # "<mode> <type> <oid>\t<path>"
+            mode, kind, oid = info.split(" ")
+            if kind == "blob": # not submodules
+                blobs[path] = None if mode == "120000" else oid
+        return blobs
+
+    # ── Worktrees ──
+
+    def checkout(
+        self,
+        repo_url: str,
+        branch: str,
+        dest: str | os.PathLike,
+        auth_url: Optional[str] = None,
+        sha: Optional[str] = None,
+        sparse_patterns: Optional[List[str]] = None,
+    ) -> FetchStats:
+        """
+        Update the mirror (see update) and check its commit out at dest as a
+        detached worktree. dest must be missing or empty. Delete it with
+        remove_checkout(), or just delete the directory — stale worktree
+        entries are pruned on the mirror's next update.
+
+        With sparse_patterns (non-cone sparse-checkout patterns, gitignore
+        syntax) only matching files are written, and only their blobs are
+        fetched if the mirror lacks them.
+        """
+        mirror = self.mirror_path(repo_url)
+        auth_url = auth_url or repo_url
+        worktree = str(Path(dest).resolve())
+        start = time.perf_counter()
+        with self._locked(mirror.name): # one critical section, so eviction cannot run in between
+            stats = self._update_locked(mirror, repo_url, branch, auth_url, sha, start)
+            before = _dir_size(mirror / "objects")
+            if sparse_patterns:
+                self._git("worktree", "add", "--detach", "--no-checkout", "--quiet", worktree, stats.sha, cwd=mirror)
+                self._git("sparse-checkout", "set", "--no-cone", *sparse_patterns, cwd=worktree)
+                self._git("read-tree", "-mu", "HEAD", cwd=worktree, auth_url=auth_url, repo_url=repo_url)
+            else:
+                self._git("worktree", "add", "--detach", "--quiet", worktree, stats.sha, cwd=mirror,
+                          auth_url=auth_url, repo_url=repo_url)
+            stats.bytes_received += max(0, _dir_size(mirror / "objects") - before)
+            stats.seconds = time.perf_counter() - start
+        self.evict(keep=mirror.name)
+        return stats
+
+    def remove_checkout(self, repo_url: str, dest: str | os.PathLike) -> None:
+        mirror = self.mirror_path(repo_url)
+        shutil.rmtree(dest, ignore_errors=True)
+        if mirror.exists():
+            with self._locked(mirror.name):
+                self._git("worktree", "prune", cwd=mirror)
+
+    # ── Eviction ──
+
+    def mirrors(self) -> List[dict]:
+        """Every cached mirror: name, bytes on disk, last use (epoch seconds), live worktrees."""
+        entries = []
+        for path in (self.root / "mirrors").iterdir():
+            if not path.is_dir():
+                continue
+            marker = path / _LAST_USED
+            entries.append({
+                "name": path.name,
+                "bytes": _dir_size(path),
+                "last_used": marker.stat().st_mtime if marker.exists() else path.stat().st_mtime,
+                "worktrees": self._live_worktrees(path),
+            })
+        return entries
+
+    @staticmethod
+    def _live_worktrees(mirror: Path) -> int:
+        live = 0
+        for entry in (mirror / "worktrees").glob("*/gitdir"):
+            try:
+                if Path(entry.read_text().strip()).exists():
+                    live += 1
+            except OSError:
+                pass
+        return live
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Delete least-recently-used mirrors until the cache fits max_bytes; returns their names."""
+        entries = self.mirrors()
+        total = sum(e["bytes"] for e in entries)
+        evicted = []
+        for entry in sorted(entries, key=lambda e: e["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if entry["name"] == keep or entry["worktrees"]:
+                continue
+            with self._locked(entry["name"], blocking=False) as acquired:
+                if not acquired:
+                    continue
+                shutil.rmtree(self.root / "mirrors" / entry["name"], ignore_errors=True)
+            total -= entry["bytes"]
+            evicted.append(entry["name"])
+            logger.info(f"[REPO CACHE] Evicted {entry['name']} ({entry['bytes']} bytes)")
+        return evicted
+
+
+_cache: RepoCache | None = None
+_lock = threading.Lock()
+
+
+def get_repo_cache() -> RepoCache:
+    """Return the process-wide repository cache, creating it on first use."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = RepoCache()
+        return _cache
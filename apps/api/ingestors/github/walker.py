@@ -1,64 +1,131 @@
 import os
 import asyncio
-import subprocess
 import logging
 from typing import List, Optional
 from pathlib import Path
 from apps.api.ingestors.github.models import FileMetadata, ParseableFileSet
+from apps.api.ingestors.github.repo_cache import FetchStats, RepoCache, RepoCacheError, get_repo_cache
 
 logger = logging.getLogger(__name__)
 
+# ── File classification ──
+
+TIER_1_EXTENSIONS = {".tf", ".hcl", ".yaml", ".yml", ".json"}
+TIER_1_NAMES = {"docker-compose", "package.json", "requirements.txt", "go.mod", "pom.xml"}
+TIER_2_EXTENSIONS = {".py", ".ts", ".js", ".go", ".java", ".cs", ".rb"}
+SKIP_DIRS = {".git", "node_modules", "venv", "__pycache__", "tests", "test"}
+
+
+def _tier(filename: str) -> Optional[int]:
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in TIER_1_EXTENSIONS or any(n in filename.lower() for n in TIER_1_NAMES):
+        return 1
+    if ext in TIER_2_EXTENSIONS:
+        return 2
+    return None
+
+
+def _any_case(text: str) -> str:
+    return "".join(f"[{c.lower()}{c.upper()}]" if c.isalpha() else c for c in text)
+
+
+# Non-cone sparse-checkout patterns covering every file _tier() puts in tier 1
+# outside SKIP_DIRS (gitignore syntax, case-insensitive like _tier)
+TIER_1_SPARSE_PATTERNS = [
+    *(f"*{_any_case(ext)}" for ext in sorted(TIER_1_EXTENSIONS)),
+    *(f"*{_any_case(name)}*" for name in sorted(TIER_1_NAMES)),
+    *(f"!**/{_any_case(d)}/**" for d in sorted(SKIP_DIRS)),
+]
+
+
 class RepositoryWalker:
-    def __init__(self, repo_url: str, branch: str, auth_url: Optional[str] = None):
+    """
+    Checks a repository out from the local mirror (see RepoCache) and sorts
+    its files into tier 1 (IaC, manifests) and tier 2 (application code).
+
+    With infra_only=True the checkout is sparse: paths are listed from the
+    commit's trees with `git ls-tree` and only tier-1 files are written —
+    and fetched, the mirror being blobless. Tier-2 files are still listed
+    but not materialised, so their size_bytes is 0.
+    """
+
+    def __init__(
+        self,
+        repo_url: str,
+        branch: str,
+        auth_url: Optional[str] = None,
+        commit_sha: Optional[str] = None,
+        repo_cache: Optional[RepoCache] = None,
+        infra_only: bool = False,
+    ):
         self.repo_url = repo_url
         self.branch = branch
         self.auth_url = auth_url or repo_url
+        self.commit_sha = commit_sha
+        self.repo_cache = repo_cache or get_repo_cache()
+        self.infra_only = infra_only
+        self.fetch_stats: Optional[FetchStats] = None
 
     async def _clone_repo(self, temp_dir: str):
-        """Clone the repository into the specified directory."""
+        """Check the branch (or commit_sha) out into the specified directory from the local mirror."""
         try:
-            process = await asyncio.create_subprocess_exec(
-                "git", "clone", "--depth=1", "--branch", self.branch, self.auth_url, ".",
-                cwd=temp_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+            self.fetch_stats = await asyncio.to_thread(
+                self.repo_cache.checkout, self.repo_url, self.branch, temp_dir, self.auth_url, self.commit_sha,
+                TIER_1_SPARSE_PATTERNS if self.infra_only else None,
             )
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=60.0)
-            if process.returncode != 0:
-                error_msg = stderr.decode().strip()
-                logger.error(f"Git clone failed: {error_msg}")
-                raise Exception(f"Failed to clone repository: {error_msg}")
-            
-            logger.info(f"Successfully cloned {self.repo_url} (branch: {self.branch}) to {temp_dir}")
-        except asyncio.TimeoutError:
-            logger.error(f"Git clone timed out for {self.repo_url}")
-            raise Exception("Git clone timed out")
+        except RepoCacheError as e:
+            logger.error(f"Git checkout failed: {e}")
+            raise Exception(f"Failed to clone repository: {e}")
+
+        logger.info(
+            f"Checked out {self.repo_url} (branch: {self.branch}, {self.fetch_stats.sha[:12]}"
+            f"{', tier-1 files only' if self.infra_only else ''}) to {temp_dir} "
+            f"({'cached' if not self.fetch_stats.fetched else f'{self.fetch_stats.bytes_received} bytes fetched'})"
+        )
 
     async def walk(self, temp_dir: str) -> ParseableFileSet:
         """Walk the repository and categorize files."""
         await self._clone_repo(temp_dir)
+        if self.infra_only:
+            return await self._walk_tree(temp_dir)
+
         tier_1_files: List[FileMetadata] = []
         tier_2_files: List[FileMetadata] = []
-        t1_extensions = {".tf", ".hcl", ".yaml", ".yml", ".json"}
-        t1_names = {"docker-compose", "package.json", "requirements.txt", "go.mod", "pom.xml"}
-        skip_dirs = {".git", "node_modules", "venv", "__pycache__", "tests", "test"}
-
         for root, dirs, files in os.walk(temp_dir):
-            dirs[:] = [d for d in dirs if d.lower() not in skip_dirs]
+            dirs[:] = [d for d in dirs if d.lower() not in SKIP_DIRS]
             for file in files:
-                rel_path = os.path.relpath(os.path.join(root, file), temp_dir)
-                ext = os.path.splitext(file)[1].lower()
-                is_t1 = ext in t1_extensions or any(n in file.lower() for n in t1_names)
-                if is_t1:
-                    tier_1_files.append(FileMetadata(
-                        path=rel_path,
-                        extension=ext,
-                        size_bytes=os.path.getsize(os.path.join(root, file))
-                    ))
-                elif ext in {".py", ".ts", ".js", ".go", ".java", ".cs", ".rb"}:
-                    tier_2_files.append(FileMetadata(
-                        path=rel_path,
-                        extension=ext,
-                        size_bytes=os.path.getsize(os.path.join(root, file))
-                    ))
+                tier = _tier(file)
+                if tier is None:
+                    continue
+                (tier_1_files if tier == 1 else tier_2_files).append(FileMetadata(
+                    path=os.path.relpath(os.path.join(root, file), temp_dir),
+                    extension=os.path.splitext(file)[1].lower(),
+                    size_bytes=os.path.getsize(os.path.join(root, file))
+                ))
+        return ParseableFileSet(tier_1_files=tier_1_files, tier_2_files=tier_2_files)
+
+    async def _walk_tree(self, temp_dir: str) -> ParseableFileSet:
+        """Categorize the commit's paths from `git ls-tree`; only tier-1 files are on disk."""
+        blobs = await asyncio.to_thread(self.repo_cache.list_blobs, self.repo_url, self.fetch_stats.sha)
+        tier_1_files: List[FileMetadata] = []
+        tier_2_files: List[FileMetadata] = []
+        for rel_path, blob_sha in blobs.items():
+            *dirs, file = rel_path.split("/")
+            if any(d.lower() in SKIP_DIRS for d in dirs):
+                continue
+            tier = _tier(file)
+            if tier == 1:
+                tier_1_files.append(FileMetadata(
+                    path=rel_path,
+                    extension=os.path.splitext(file)[1].lower(),
+                    size_bytes=os.path.getsize(os.path.join(temp_dir, rel_path)),
+                    blob_sha=blob_sha,
+                ))
+            elif tier == 2:
+                tier_2_files.append(FileMetadata(
+                    path=rel_path,
+                    extension=os.path.splitext(file)[1].lower(),
+                    size_bytes=0,
+                    blob_sha=blob_sha,
+                ))
         return ParseableFileSet(tier_1_files=tier_1_files, tier_2_files=tier_2_files)
@@ -1,4 +1,4 @@
-from apps.api.ingestors.pipeline.base import BaseIngestor, BaseExporter
+from apps.api.ingestors.pipeline.base import BaseIngestor, BaseExporter, run_ingestors
 from apps.api.ingestors.pipeline.schemas import DiscoveryNode, DiscoveryEdge, DiscoveryResult
 
-__all__ = ["BaseIngestor", "BaseExporter", "DiscoveryNode", "DiscoveryEdge", "DiscoveryResult"]
+__all__ = ["BaseIngestor", "BaseExporter", "run_ingestors", "DiscoveryNode", "DiscoveryEdge", "DiscoveryResult"]
@@ -1,11 +1,21 @@
 """
 Base classes for the ingestion pipeline architecture.
 """
+import asyncio
+import logging
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from apps.api.ingestors.aws.schemas import DiscoveryResult
 
+logger = logging.getLogger(__name__)
+
+# Upper bound on a single source's ingest() when run through run_ingestors
+DEFAULT_INGEST_TIMEOUT_S = 30 * 60
+
 class BaseIngestor(ABC):
+    # Per-source override of run_ingestors' timeout (seconds)
+    timeout: Optional[float] = None
+
     @property
     @abstractmethod
     def source_name(self) -> str:
@@ -57,3 +67,41 @@ class BaseExporter(ABC):
             List[DiscoveryResult]: Combined list of results from all sources
         """
         ...
+
+
+async def run_ingestors(
+    ingestors: List[BaseIngestor],
+    timeout: float = DEFAULT_INGEST_TIMEOUT_S,
+) -> Tuple[List[DiscoveryResult], Dict[str, str]]:
+    """
+    Run independent ingestors concurrently.
+
+    Each ingestor gets its own timeout (ingestor.timeout, else *timeout*);
+    one source timing out or raising does not affect the others.
+
+    Returns:
+        (results in ingestor order, {label: error} for failed sources)
+
+    A failed ingestor is labelled with its source_name, or with
+    "{source_name}[{index}]" when several ingestors share that name, so
+    their errors do not overwrite each other.
+    """
+    async def run_one(ingestor: BaseIngestor) -> List[DiscoveryResult]:
+        return await asyncio.wait_for(ingestor.ingest(), timeout=ingestor.timeout or timeout)
+
+    outcomes = await asyncio.gather(*(run_one(i) for i in ingestors), return_exceptions=True)
+
+    names = [i.source_name for i in ingestors]
+    results: List[DiscoveryResult] = []
+    errors: Dict[str, str] = {}
+    for index, (ingestor, outcome) in enumerate(zip(ingestors, outcomes)):
+        name = names[index] if names.count(names[index]) == 1 else f"{names[index]}[{index}]"
+        if isinstance(outcome, asyncio.TimeoutError):
+            logger.error(f"Ingestor {name} timed out after {ingestor.timeout or timeout}s")
+            errors[name] = "timed out"
+        elif isinstance(outcome, BaseException):
+            logger.error(f"Ingestor {name} failed: {outcome}")
+            errors[name] = str(outcome) or type(outcome).__name__
+        elif outcome:
+            results.extend(outcome)
+    return results, errors
@@ -0,0 +1,367 @@
+"""
+Columnar snapshot format for raw_v1 DiscoveryResults: Arrow IPC files.
+
+One snapshot per source, as two Arrow IPC (Feather v2) files sharing a
+stem, so pyarrow, pandas, polars or DuckDB can read them directly:
+
+    {stem}.arrow        nodes table
+    {stem}.edges.arrow  edges table
+
+Column types:
+
+  - utf8 columns (keys, display names): string
+  - dictionary columns (node_type, node_subtype, edge_type, direction):
+    dictionary<int32, string>
+  - json columns (properties, source_metadata): large_string holding one
+    JSON document per row (field metadata {"encoding": "json"}); a whole
+    column is joined and decoded with a single orjson parse
+
+Heavy node properties (HEAVY_PROPERTIES: raw API payloads, file bodies)
+live in their own column, so readers that project them away never touch
+those pages.
+
+The nodes file's schema metadata ("opscribe" key) holds the snapshot
+header: format and schema version, source, envelope, and the node/edge
+row ranges of each DiscoveryResult.
+
+ColumnarSnapshot memory-maps both files (pa.memory_map) and decodes
+columns on demand. raw_v1_to_columnar / columnar_to_raw_v1 convert
+between the layout and the raw_v1 JSON payload.
+"""
+
+import os
+from pathlib import Path
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult
+from apps.api.ingestors.pipeline.s3_exporter import HEAVY_PROPERTIES, PROJECTIONS
+
+FORMAT_VERSION = 2
+SNAPSHOT_EXTENSION = ".arrow"
+EDGES_SUFFIX = ".edges"
+METADATA_KEY = b"opscribe"
+
+# table -> column -> kind
+NODE_COLUMNS = {
+    "key": "utf8",
+    "display_name": "utf8",
+    "node_type": "dictionary",
+    "node_subtype": "dictionary",
+    "properties": "json",
+    "heavy_properties": "json",
+    "source_metadata": "json",
+}
+EDGE_COLUMNS = {
+    "from_node_key": "utf8",
+    "to_node_key": "utf8",
+    "edge_type": "dictionary",
+    "direction": "dictionary",
+    "properties": "json",
+}
+_COLUMNS = {"nodes": NODE_COLUMNS, "edges": EDGE_COLUMNS}
+_COMMA = pa.scalar(",", pa.large_string())
+
+PathLike = Union[str, Path]
+EncodedSnapshot = Tuple[bytes, bytes]  # (nodes file, edges file)
+
+
+def _json_bytes(value: Any) -> bytes:
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def edges_path(path: PathLike) -> Path:
+    """The edges file belonging to the snapshot whose nodes file is path."""
+    path = Path(path)
+    return path.with_name(f"{path.name[:-len(SNAPSHOT_EXTENSION)]}{EDGES_SUFFIX}{SNAPSHOT_EXTENSION}")
+
+
+# ── Writing ──────────────────────────────────────────────────────────
+
+def _field(name: str, kind: str) -> pa.Field:
+    if kind == "dictionary":
+        return pa.field(name, pa.dictionary(pa.int32(), pa.string()))
+    if kind == "json":
+        return pa.field(name, pa.large_string(), nullable=False, metadata={"encoding": "json"})
+    return pa.field(name, pa.string(), nullable=False)
+
+
+def _array(kind: str, values: List[Any]) -> pa.Array:
+    if kind == "dictionary":
+        return pa.array(values, pa.string()).dictionary_encode()
+    if kind == "json":
+        return pa.array([_json_bytes(v).decode("utf-8") for v in values], pa.large_string())
+    return pa.array(values, pa.string())
+
+
+def _ipc_file(columns: Dict[str, str], values: Dict[str, list], metadata: dict) -> bytes:
+    schema = pa.schema([_field(name, kind) for name, kind in columns.items()],
+                       metadata={METADATA_KEY: _json_bytes(metadata)})
+    table = pa.Table.from_arrays([_array(kind, values[name]) for name, kind in columns.items()], schema=schema)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _split_heavy(properties: dict):
+    if HEAVY_PROPERTIES.isdisjoint(properties):
+        return properties, None
+    light = {k: v for k, v in properties.items() if k not in HEAVY_PROPERTIES}
+    return light, {k: v for k, v in properties.items() if k in HEAVY_PROPERTIES}
+
+
+def encode_blocks(blocks: List[dict], envelope: Optional[dict] = None) -> EncodedSnapshot:
+    """
+    Encode raw_v1 source blocks ({"source", "nodes", "edges", "metadata"}, as
+    in a payload's "sources" list) of a single source into one snapshot.
+    """
+    sources = {b["source"] for b in blocks}
+    if len(sources) != 1:
+        raise ValueError(f"A snapshot holds exactly one source, got {sorted(sources)}")
+
+    nodes: Dict[str, list] = {name: [] for name in NODE_COLUMNS}
+    edges: Dict[str, list] = {name: [] for name in EDGE_COLUMNS}
+    results = []
+    for block in blocks:
+        node_start, edge_start = len(nodes["key"]), len(edges["from_node_key"])
+        for n in block.get("nodes", []):
+            light, heavy = _split_heavy(n.get("properties") or {})
+            nodes["key"].append(n["key"])
+            nodes["display_name"].append(n["display_name"])
+            nodes["node_type"].append(n["node_type"])
+            nodes["node_subtype"].append(n.get("node_subtype"))
+            nodes["properties"].append(light)
+            nodes["heavy_properties"].append(heavy)
+            nodes["source_metadata"].append(n.get("source_metadata") or {})
+        for e in block.get("edges", []):
+            edges["from_node_key"].append(e["from_node_key"])
+            edges["to_node_key"].append(e["to_node_key"])
+            edges["edge_type"].append(e["edge_type"])
+            edges["direction"].append(e.get("direction", "outbound"))
+            edges["properties"].append(e.get("properties") or {})
+        results.append({
+            "metadata": block.get("metadata") or {},
+            "nodes": [node_start, len(nodes["key"])],
+            "edges": [edge_start, len(edges["from_node_key"])],
+        })
+
+    source = sources.pop()
+    header = {
+        "format_version": FORMAT_VERSION,
+        "schema_version": "raw_v1",
+        "source": source,
+        "envelope": envelope or {},
+        "results": results,
+    }
+    return (
+        _ipc_file(NODE_COLUMNS, nodes, header),
+        _ipc_file(EDGE_COLUMNS, edges, {"format_version": FORMAT_VERSION, "source": source}),
+    )
+
+
+def result_to_block(result: DiscoveryResult) -> dict:
+    """A raw_v1 source block sharing the result's property dicts (nothing is copied)."""
+    return {
+        "source": result.source,
+        "nodes": [
+            {"key": n.key, "display_name": n.display_name, "node_type": n.node_type,
+             "node_subtype": n.node_subtype, "properties": n.properties, "source_metadata": n.source_metadata}
+            for n in result.nodes
+        ],
+        "edges": [
+            {"from_node_key": e.from_node_key, "to_node_key": e.to_node_key, "edge_type": e.edge_type,
+             "direction": e.direction, "properties": e.properties}
+            for e in result.edges
+        ],
+        "metadata": result.metadata,
+    }
+
+
+def encode_snapshot(results: List[DiscoveryResult], envelope: Optional[dict] = None) -> EncodedSnapshot:
+    return encode_blocks([result_to_block(r) for r in results], envelope)
+
+
+def write_atomic(path: PathLike, body: bytes) -> int:
+    """Write a file atomically (temp file + rename); returns its size."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+    return len(body)
+
+
+def write_snapshot(path: PathLike, encoded: EncodedSnapshot) -> int:
+    """Write an encoded snapshot to path (nodes) and edges_path(path); returns the bytes written."""
+    nodes, edges = encoded
+    # Edges first: a nodes file on disk means the snapshot is complete
+    return write_atomic(edges_path(path), edges) + write_atomic(path, nodes)
+
+
+def snapshot_size(path: PathLike) -> Optional[int]:
+    """Bytes on disk of the snapshot at path, or None if it is missing or incomplete."""
+    try:
+        return Path(path).stat().st_size + edges_path(path).stat().st_size
+    except FileNotFoundError:
+        return None
+
+
+# ── Reading ──────────────────────────────────────────────────────────
+
+def _open_table(path: Path) -> pa.Table:
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+class ColumnarSnapshot:
+    """
+    A memory-mapped snapshot. Columns are decoded only when asked for,
+    so untouched columns (e.g. heavy_properties) are never paged in.
+    """
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        try:
+            nodes = _open_table(self.path)
+            header = orjson.loads((nodes.schema.metadata or {})[METADATA_KEY])
+        except (pa.ArrowInvalid, KeyError, orjson.JSONDecodeError) as e:
+            raise ValueError(f"{self.path} is not a {SNAPSHOT_EXTENSION} snapshot: {e}") from e
+        if header.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format_version {header.get('format_version')}")
+        self._tables = {"nodes": nodes, "edges": _open_table(edges_path(self.path))}
+
+        self.header: dict = header
+        self.source: str = header["source"]
+        self.envelope: dict = header["envelope"]
+        self.num_nodes: int = nodes.num_rows
+        self.num_edges: int = self._tables["edges"].num_rows
+
+    def close(self) -> None:
+        self._tables = {}
+
+    def __enter__(self) -> "ColumnarSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def table(self, name: str) -> pa.Table:
+        """The memory-mapped nodes or edges table itself."""
+        return self._tables[name]
+
+    def column(self, table: str, name: str) -> List[Any]:
+        """Decode a whole column into a list."""
+        return self._column(table, name)
+
+    def _column(self, table: str, name: str) -> List[Any]:
+        values = self._tables[table].column(name)
+        kind = _COLUMNS[table][name]
+        if kind == "dictionary":
+            # Look codes up in the (short) value list instead of boxing a str per row
+            decoded = []
+            for chunk in values.chunks:
+                lookup = chunk.dictionary.to_pylist() + [None]
+                decoded += [lookup[c] for c in chunk.indices.fill_null(len(lookup) - 1).to_pylist()]
+            return decoded
+        if kind == "utf8":
+            return values.to_pylist()
+        if not len(values):
+            return []
+        # One list cell holding the whole column, joined with commas: a single parse
+        joined = pc.binary_join(pa.LargeListArray.from_arrays([0, len(values)], values.combine_chunks()), _COMMA)
+        return orjson.loads(b"[" + joined[0].as_buffer().to_pybytes() + b"]")
+
+    def value(self, table: str, name: str, row: int) -> Any:
+        """Decode a single cell without reading the rest of its column."""
+        cell = self._tables[table].column(name)[row].as_py()
+        return orjson.loads(cell) if _COLUMNS[table][name] == "json" else cell
+
+    def to_blocks(self, projection: str = "full") -> List[dict]:
+        """raw_v1 source blocks, with node properties projected per PROJECTIONS."""
+        if projection not in PROJECTIONS:
+            raise ValueError(f"Unknown projection {projection!r}; expected one of {PROJECTIONS}")
+
+        columns = ["key", "display_name", "node_type", "node_subtype"]
+        if projection != "structure":
+            columns += ["properties", "source_metadata"]
+        n = {name: self._column("nodes", name) for name in columns}
+        if projection == "full":
+            for properties, heavy in zip(n["properties"], self._column("nodes", "heavy_properties")):
+                if heavy:
+                    properties.update(heavy)
+        e = {name: self._column("edges", name) for name in EDGE_COLUMNS}
+
+        blocks = []
+        for r in self.header["results"]:
+            rows = range(*r["nodes"])
+            nodes = [
+                {"key": n["key"][i], "display_name": n["display_name"][i],
+                 "node_type": n["node_type"][i], "node_subtype": n["node_subtype"][i]}
+                for i in rows
+            ]
+            if projection != "structure":
+                for node, i in zip(nodes, rows):
+                    node["properties"] = n["properties"][i]
+                    node["source_metadata"] = n["source_metadata"][i]
+            blocks.append({
+                "source": self.source,
+                "nodes": nodes,
+                "edges": [
+                    {"from_node_key": e["from_node_key"][i], "to_node_key": e["to_node_key"][i],
+                     "edge_type": e["edge_type"][i], "direction": e["direction"][i],
+                     "properties": e["properties"][i]}
+                    for i in range(*r["edges"])
+                ],
+                "metadata": r["metadata"],
+            })
+        return blocks
+
+    def to_results(self, projection: str = "full") -> List[DiscoveryResult]:
+        return [DiscoveryResult(**block) for block in self.to_blocks(projection)]
+
+
+def read_snapshot(path: PathLike, projection: str = "full") -> List[DiscoveryResult]:
+    with ColumnarSnapshot(path) as snapshot:
+        return snapshot.to_results(projection)
+
+
+# ── raw_v1 JSON <-> columnar ─────────────────────────────────────────
+
+def raw_v1_to_columnar(payload: dict, out_dir: PathLike) -> List[Path]:
+    """
+    Write one {source}.arrow snapshot (plus its edges file) per source of a
+    raw_v1 payload (the {"schema_version": ..., "sources": [...]} document)
+    into out_dir; returns the nodes file paths. Everything besides
+    "sources" is kept as the snapshot envelope.
+    """
+    envelope = {k: v for k, v in payload.items() if k != "sources"}
+    by_source: Dict[str, List[dict]] = defaultdict(list)
+    for block in payload.get("sources", []):
+        by_source[block["source"]].append(block)
+
+    paths = []
+    for source, blocks in by_source.items():
+        path = Path(out_dir) / f"{source}{SNAPSHOT_EXTENSION}"
+        write_snapshot(path, encode_blocks(blocks, envelope))
+        paths.append(path)
+    return paths
+
+
+def columnar_to_raw_v1(paths: Iterable[PathLike]) -> dict:
+    """Rebuild a raw_v1 payload from snapshots; the envelope comes from the first one."""
+    payload: Dict[str, Any] = {}
+    sources: List[dict] = []
+    for path in paths:
+        with ColumnarSnapshot(path) as snapshot:
+            if not payload:
+                payload.update(snapshot.envelope)
+            sources.extend(snapshot.to_blocks())
+    payload.setdefault("schema_version", "raw_v1")
+    payload["sources"] = sources
+    return payload
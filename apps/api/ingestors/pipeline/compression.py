@@ -0,0 +1,50 @@
+"""
+Compression helpers shared by the data lake writers and readers.
+
+S3Exporter (history/ blobs), SnapshotHistory (timeline/ documents) and
+DatalakeBrowser all store zstd- or gzip-compressed bodies; zstd needs the
+optional 'zstandard' package, imported on first use.
+"""
+
+import io
+import gzip
+import zlib
+from typing import Any, IO, Optional
+
+COMPRESSIONS = ("zstd", "gzip")
+
+
+def zstd() -> Any:
+    """The zstandard module, or ImportError naming the missing package."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compression requires the 'zstandard' package") from e
+    return zstandard
+
+
+def compressor(compression: str) -> Any:
+    """An object with compress(chunk) / flush() producing one compressed stream."""
+    if compression == "zstd":
+        return zstd().ZstdCompressor(level=3).compressobj()
+    if compression == "gzip":
+        # wbits=31 → gzip container
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    raise ValueError(f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}")
+
+
+def decompress(data: bytes, compression: Optional[str]) -> bytes:
+    if compression == "zstd":
+        return zstd().ZstdDecompressor().decompressobj().decompress(data)
+    if compression == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+def open_decompressed(body: IO[bytes], compression: Optional[str]) -> IO[bytes]:
+    """Wrap a (streaming) object body so it reads back decompressed."""
+    if compression == "zstd":
+        return io.BufferedReader(zstd().ZstdDecompressor().stream_reader(body))
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=body, mode="rb")
+    return body
@@ -0,0 +1,371 @@
+"""
+Datalake Browser — Read-Only View of a Client's S3 Prefix
+
+Backs the GET /github/datalake endpoints. Implements:
+
+  - Cursor pagination: one list_objects_v2 page per call, the S3
+    continuation token handed back as next_cursor
+  - Folder aggregation: "/"-delimited listing, each folder annotated with
+    its object count, total size and newest object (one paginated walk
+    of the client prefix, capped at MAX_TOTALS_KEYS keys and cached)
+  - Short-TTL metadata cache: listing pages, folder totals, head_object
+    results and current/ manifests are kept for cache_ttl seconds, so a
+    UI polling the same view does not re-list the bucket
+  - Range-read previews: the first N nodes of a source's current blob
+    are decoded from ranged GETs of the compressed NDJSON stream
+    (see S3Exporter.iter_payload_records) instead of downloading it
+
+One browser is shared per process (get_browser), so the boto3 client is
+built once rather than per request.
+"""
+
+import json
+import time
+import zlib
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+import orjson
+from botocore.exceptions import ClientError
+
+from apps.api.ingestors.pipeline.compression import zstd
+from apps.api.ingestors.pipeline.s3_exporter import BLOB_FORMAT, S3Exporter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+DEFAULT_CACHE_TTL = 30.0
+# Folder totals read at most this many keys per client; history/ and
+# timeline/ grow with every export, so larger prefixes report truncated totals.
+MAX_TOTALS_KEYS = 10_000
+PREVIEW_RANGE_BYTES = 64 * 1024
+# Old layouts store the whole payload as one JSON document; those are only
+# previewed when small enough to fetch in full.
+MAX_DOCUMENT_PREVIEW_BYTES = 4 * 1024 * 1024
+
+_MISSING_CODES = ("NoSuchKey", "404", "NotFound")
+
+
+class TTLCache:
+    """Thread-safe dict whose entries expire ttl seconds after being set."""
+
+    def __init__(self, ttl: float, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key: Any, compute: Callable[[], Any]) -> Any:
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: e for k, e in self._entries.items() if e[0] > now}
+                while len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _stream_decompressor(compression: Optional[str]) -> Any:
+    """An object whose decompress(chunk) accepts a compressed stream piece by piece."""
+    if compression == "zstd":
+        return zstd().ZstdDecompressor().decompressobj()
+    if compression == "gzip":
+        return zlib.decompressobj(47) # gzip or zlib header, auto-detected
+    return None
+
+
+class DatalakeBrowser:
+    """Paginated, cached listing and previews of {client_id}/ in one bucket."""
+
+    def __init__(
+        self,
+        s3: Any,
+        bucket: str,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+        max_totals_keys: int = MAX_TOTALS_KEYS,
+    ):
+        self.s3 = s3
+        self.bucket = bucket
+        self.cache = TTLCache(cache_ttl, clock=clock)
+        self.max_totals_keys = max(1, max_totals_keys)
+
+    # ── Listing ──
+
+    def list(
+        self,
+        client_id: str,
+        path: str = "",
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> dict:
+        """
+        One page of the folder `path` (relative to the client prefix):
+        sub-folders with their totals, then objects, and next_cursor when
+        there is more. total covers the whole client prefix, from the same
+        walk as the folder totals.
+        """
+        prefix = self._prefix(client_id, path)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        page = self.cache.get_or_set(("page", prefix, cursor, limit), lambda: self._list_page(prefix, cursor, limit))
+        walk = self._client_totals(client_id)
+
+        return {
+            "prefix": prefix,
+            "folders": [
+                {"prefix": folder, "name": folder[len(prefix):].rstrip("/"), **self._totals_entry(walk, folder)}
+                for folder in page["folders"]
+            ],
+            "files": page["files"],
+            "next_cursor": page["next_cursor"],
+            "total": self._totals_entry(walk, self._prefix(client_id, "")),
+        }
+
+    def _list_page(self, prefix: str, cursor: Optional[str], limit: int) -> dict:
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix, "Delimiter": "/", "MaxKeys": limit}
+        if cursor:
+            kwargs["ContinuationToken"] = cursor
+        response = self.s3.list_objects_v2(**kwargs)
+        return {
+            "folders": [p["Prefix"] for p in response.get("CommonPrefixes", [])],
+            "files": [self._file_entry(obj) for obj in response.get("Contents", [])],
+            "next_cursor": response.get("NextContinuationToken") if response.get("IsTruncated") else None,
+        }
+
+    def folder_totals(self, client_id: str, path: str = "") -> Dict[str, dict]:
+        """Object count, bytes and newest object per direct sub-folder of path (plus "" for path itself)."""
+        prefix = self._prefix(client_id, path)
+        walk = self._client_totals(client_id)
+        totals = {"": self._totals_entry(walk, prefix)}
+        for folder in walk["folders"]:
+            if folder.startswith(prefix) and folder[len(prefix):].count("/") == 1:
+                totals[folder] = self._totals_entry(walk, folder)
+        return totals
+
+    def _client_totals(self, client_id: str) -> dict:
+        # One cached walk per client serves every path's folder totals
+        prefix = self._prefix(client_id, "")
+        return self.cache.get_or_set(("totals", prefix), lambda: self._folder_totals(prefix))
+
+    def _folder_totals(self, prefix: str) -> dict:
+        """
+        Walk prefix once, reading at most max_totals_keys keys, and total
+        every folder at or below it. last_key is the last key read when the
+        walk stopped early, else None.
+        """
+        folders: Dict[str, dict] = {}
+
+        def add(folder: str, obj: dict) -> None:
+            entry = folders.setdefault(folder, {"objects": 0, "size_bytes": 0, "last_modified": None})
+            entry["objects"] += 1
+            entry["size_bytes"] += obj["Size"]
+            modified = obj["LastModified"].isoformat()
+            if entry["last_modified"] is None or modified > entry["last_modified"]:
+                entry["last_modified"] = modified
+
+        paginator = self.s3.get_paginator("list_objects_v2")
+        objects = (
+            obj
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix)
+            for obj in page.get("Contents", [])
+        )
+        read, last_key = 0, None
+        for obj in objects:
+            if read == self.max_totals_keys:
+                logger.info(f"Folder totals for {prefix} stopped after {read} keys")
+                break
+            key = obj["Key"]
+            add(prefix, obj)
+            slash = key.find("/", len(prefix))
+            while slash != -1:
+                add(key[:slash + 1], obj)
+                slash = key.find("/", slash + 1)
+            read += 1
+            last_key = key
+        else:
+            last_key = None # walked the whole prefix
+        return {"folders": folders, "last_key": last_key}
+
+    @staticmethod
+    def _totals_entry(walk: dict, folder: str) -> dict:
+        """Totals for one folder; truncated when the walk stopped before reaching its last key."""
+        entry = walk["folders"].get(folder, {"objects": 0, "size_bytes": 0, "last_modified": None})
+        last_key = walk["last_key"]
+        # Keys come back sorted, so the folder is complete once the walk has moved past it
+        complete = last_key is None or (last_key > folder and not last_key.startswith(folder))
+        return {**entry, "truncated": not complete}
+
+    @staticmethod
+    def _file_entry(obj: dict) -> dict:
+        return {"key": obj["Key"], "size_bytes": obj["Size"], "last_modified": obj["LastModified"].isoformat()}
+
+    @staticmethod
+    def _prefix(client_id: str, path: str) -> str:
+        path = path.strip("/")
+        if ".." in path.split("/"):
+            raise ValueError(f"Invalid datalake path {path!r}")
+        return f"{client_id}/{path}/" if path else f"{client_id}/"
+
+    # ── Metadata ──
+
+    def stat(self, key: str) -> Optional[dict]:
+        """Cached head_object: size, content type, user metadata; None if missing."""
+        return self.cache.get_or_set(("head", key), lambda: self._head(key))
+
+    def _head(self, key: str) -> Optional[dict]:
+        try:
+            head = self.s3.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in _MISSING_CODES:
+                return None
+            raise
+        return {
+            "key": key,
+            "size_bytes": head.get("ContentLength", 0),
+            "content_type": head.get("ContentType"),
+            "metadata": head.get("Metadata", {}),
+            "last_modified": head["LastModified"].isoformat() if head.get("LastModified") else None,
+        }
+
+    def sources(self, client_id: str) -> List[dict]:
+        """The current/{source}.json manifest of every source, in key order."""
+        return self.cache.get_or_set(("sources", client_id), lambda: self._sources(client_id))
+
+    def _sources(self, client_id: str) -> List[dict]:
+        prefix = f"{client_id}/current/"
+        paginator = self.s3.get_paginator("list_objects_v2")
+        manifests = []
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                if not obj["Key"].endswith(".json"):
+                    continue
+                manifest = self._current_document(obj["Key"], obj["Size"])
+                if manifest is not None:
+                    manifests.append(manifest)
+        return manifests
+
+    def _current_document(self, key: str, size: int) -> Optional[dict]:
+        """A manifest, or for the old full-payload layout its envelope without the sources."""
+        source = key.rsplit("/", 1)[-1][:-len(".json")]
+        if size > MAX_DOCUMENT_PREVIEW_BYTES: # manifests are a few KB; this is an old full payload
+            return {"source": source, "format": "document", "current_key": key, "stored_bytes": size}
+        document = self._get_json(key)
+        if document is None:
+            return None
+        if "blob_key" not in document:
+            document = {k: v for k, v in document.items() if k != "sources"}
+            document.update(source=source, format="document", stored_bytes=size)
+        document["current_key"] = key
+        return document
+
+    # ── Previews ──
+
+    def preview(self, client_id: str, source: str, nodes: int = 20) -> Optional[dict]:
+        """
+        The current manifest of source plus its first `nodes` nodes (with
+        properties), read with ranged GETs of PREVIEW_RANGE_BYTES until
+        enough records have been decoded. None if the source has no
+        current snapshot.
+        """
+        manifest = next((m for m in self.sources(client_id) if m.get("source") == source), None)
+        if manifest is None:
+            return None
+        return self.cache.get_or_set(
+            ("preview", manifest.get("blob_key") or manifest["current_key"], nodes),
+            lambda: self._preview(manifest, nodes),
+        )
+
+    def _preview(self, manifest: dict, limit: int) -> dict:
+        preview = {**manifest, "nodes": [], "truncated": False, "bytes_read": 0}
+        if manifest.get("format") == "document":
+            return self._document_preview(preview, limit)
+        if manifest.get("format") != BLOB_FORMAT:
+            # single-document blob from before the NDJSON layout
+            preview["truncated"] = True
+            return preview
+
+        decompressor = _stream_decompressor(manifest.get("compression"))
+        size = manifest.get("stored_bytes") or self.stat(manifest["blob_key"])["size_bytes"]
+        pending, offset = b"", 0
+        nodes = preview["nodes"]
+
+        while offset < size:
+            chunk = self._get_range(manifest["blob_key"], offset, PREVIEW_RANGE_BYTES)
+            if not chunk:
+                break
+            offset += len(chunk)
+            preview["bytes_read"] += len(chunk)
+            data = decompressor.decompress(chunk) if decompressor is not None else chunk
+            lines = (pending + data).split(b"\n")
+            pending = lines.pop()
+
+            for line in lines:
+                if not line:
+                    continue
+                record = orjson.loads(line)
+                kind = record.get("type")
+                if kind == "node":
+                    if len(nodes) == limit:
+                        preview["truncated"] = True
+                        return preview
+                    nodes.append(record["data"])
+                elif kind == "node_properties" and nodes:
+                    nodes[-1].update(record["data"])
+                elif kind == "edge" and len(nodes) == limit:
+                    preview["truncated"] = True
+                    return preview
+        return preview
+
+    def _document_preview(self, preview: dict, limit: int) -> dict:
+        if (preview.get("stored_bytes") or 0) > MAX_DOCUMENT_PREVIEW_BYTES:
+            preview["truncated"] = True
+            return preview
+        document = self._get_json(preview["current_key"]) or {}
+        preview["bytes_read"] = preview.get("stored_bytes") or 0
+        for block in document.get("sources", []):
+            for node in block.get("nodes", []):
+                if len(preview["nodes"]) == limit:
+                    preview["truncated"] = True
+                    return preview
+                preview["nodes"].append(node)
+        return preview
+
+    # ── S3 helpers ──
+
+    def _get_range(self, key: str, start: int, length: int) -> bytes:
+        response = self.s3.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{start + length - 1}")
+        return response["Body"].read()
+
+    def _get_json(self, key: str) -> Optional[dict]:
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in _MISSING_CODES:
+                return None
+            raise
+        return json.loads(response["Body"].read())
+
+
+@lru_cache(maxsize=1)
+def get_browser() -> DatalakeBrowser:
+    """The process-wide browser over the S3Exporter's client and bucket."""
+    exporter = S3Exporter(record_history=False)
+    return DatalakeBrowser(exporter.s3, exporter.bucket)
@@ -0,0 +1,25 @@
+"""
+Exporter backend selection.
+
+OPSCRIBE_EXPORT_BACKEND picks where pipeline runs export to: "s3"
+(default, S3/MinIO) or "local" (columnar snapshots on disk, see
+LocalExporter).
+"""
+
+import os
+from typing import Optional
+
+from apps.api.ingestors.pipeline.base import BaseExporter
+from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
+from apps.api.ingestors.pipeline.local_exporter import LocalExporter
+
+EXPORT_BACKENDS = ("s3", "local")
+
+
+def get_exporter(backend: Optional[str] = None) -> BaseExporter:
+    backend = (backend or os.environ.get("OPSCRIBE_EXPORT_BACKEND") or "s3").lower()
+    if backend == "s3":
+        return S3Exporter()
+    if backend == "local":
+        return LocalExporter()
+    raise ValueError(f"Unknown export backend {backend!r}; expected one of {EXPORT_BACKENDS}")
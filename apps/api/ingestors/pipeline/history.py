@@ -0,0 +1,478 @@
+"""
+Snapshot History — base + delta timeline per source, with time-travel reads
+
+Each change to a source's nodes/edges is recorded on a timeline instead of
+as another full snapshot:
+
+  {client_id}/timeline/{source}/index.json                 (entry list, see timeline())
+  {client_id}/timeline/{source}/g{gen}/{seq}-base.json.zst  (full state)
+  {client_id}/timeline/{source}/g{gen}/{seq}-delta.json.zst (changes since the previous entry)
+
+(.json.gz with compression="gzip"; each index entry records the
+compression its object was written with, so a timeline can mix both.)
+
+A state is nodes by key plus edges by (from, edge_type, to, direction).
+A new base is written once the chain since the last one reaches
+max_chain deltas or its deltas outweigh the base, which bounds how much
+load_at has to replay. compact() thins old entries (e.g. daily → weekly
+past 90 days) and rewrites the timeline under a new generation.
+
+load_at(client_id, timestamp) rebuilds the state in effect at a moment by
+applying deltas to the nearest base in memory; diff(client_id, t1, t2)
+compares two such states.
+
+The store is anything with put/get/list/delete; S3ObjectStore and
+LocalObjectStore adapt a boto3 client and a directory.
+"""
+
+import os
+import bisect
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import orjson
+from botocore.exceptions import ClientError
+
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult
+from apps.api.ingestors.pipeline.compression import COMPRESSIONS, compressor, decompress
+from apps.api.ingestors.pipeline.s3_exporter import source_content_hash
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_FORMAT = "timeline_v1"
+DEFAULT_MAX_CHAIN = 30
+DEFAULT_DELTA_RATIO = 1.0
+DEFAULT_FETCH_CONCURRENCY = 8
+_EXTENSIONS = {"zstd": ".json.zst", "gzip": ".json.gz"}
+
+State = Dict[str, Any] # {"metadata": dict, "nodes": {key: node}, "edges": {edge_id: edge}}
+
+
+# ── Stores ───────────────────────────────────────────────────────────
+
+class S3ObjectStore:
+    """History storage on an S3/MinIO bucket."""
+
+    def __init__(self, s3_client: Any, bucket: str):
+        self.s3 = s3_client
+        self.bucket = bucket
+
+    def put(self, key: str, body: bytes) -> None:
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=body, ContentType="application/json")
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.s3.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+
+    def list(self, prefix: str) -> List[str]:
+        paginator = self.s3.get_paginator("list_objects_v2")
+        return [
+            obj["Key"]
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix)
+            for obj in page.get("Contents", [])
+        ]
+
+    def delete(self, keys: List[str]) -> None:
+        # delete_objects takes at most 1000 keys per call
+        for start in range(0, len(keys), 1000):
+            self.s3.delete_objects(Bucket=self.bucket, Delete={
+                "Objects": [{"Key": k} for k in keys[start:start + 1000]], "Quiet": True,
+            })
+
+
+class LocalObjectStore:
+    """History storage in a local directory (keys are relative paths)."""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def put(self, key: str, body: bytes) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return (self.root / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def list(self, prefix: str) -> List[str]:
+        base = self.root / prefix.rsplit("/", 1)[0] if "/" in prefix else self.root
+        if not base.is_dir():
+            return []
+        keys = (p.relative_to(self.root).as_posix() for p in base.rglob("*") if p.is_file())
+        return sorted(k for k in keys if k.startswith(prefix) and not Path(k).name.startswith("."))
+
+    def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            (self.root / key).unlink(missing_ok=True)
+
+
+# ── State helpers ────────────────────────────────────────────────────
+
+def edge_id(edge: dict) -> str:
+    return "\x1f".join((edge["from_node_key"], edge["edge_type"], edge["to_node_key"], edge.get("direction", "outbound")))
+
+
+def _plain(value: Any) -> Any:
+    """JSON-normalised copy, so states read back compare equal to freshly built ones."""
+    return orjson.loads(orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS))
+
+
+def state_from_results(results: List[DiscoveryResult]) -> State:
+    nodes: Dict[str, dict] = {}
+    edges: Dict[str, dict] = {}
+    for r in results:
+        for n in r.nodes:
+            nodes[n.key] = n.model_dump()
+        for e in r.edges:
+            d = e.model_dump()
+            edges[edge_id(d)] = d
+    return _plain({"metadata": results[0].metadata if results else {}, "nodes": nodes, "edges": edges})
+
+
+def state_to_result(source: str, state: State) -> DiscoveryResult:
+    return DiscoveryResult(
+        source=source,
+        nodes=list(state["nodes"].values()),
+        edges=list(state["edges"].values()),
+        metadata=state["metadata"],
+    )
+
+
+def make_delta(old: State, new: State) -> dict:
+    old_nodes, new_nodes = old["nodes"], new["nodes"]
+    old_edges, new_edges = old["edges"], new["edges"]
+    return {
+        "metadata": new["metadata"],
+        "nodes_upserted": [n for k, n in new_nodes.items() if old_nodes.get(k) != n],
+        "nodes_removed": [k for k in old_nodes if k not in new_nodes],
+        "edges_upserted": [e for k, e in new_edges.items() if old_edges.get(k) != e],
+        "edges_removed": [k for k in old_edges if k not in new_edges],
+    }
+
+
+def apply_delta(state: State, delta: dict) -> State:
+    """Apply in place. Node/edge dicts are replaced, never mutated, so shallow copies stay valid."""
+    nodes, edges = state["nodes"], state["edges"]
+    for key in delta["nodes_removed"]:
+        nodes.pop(key, None)
+    for node in delta["nodes_upserted"]:
+        nodes[node["key"]] = node
+    for key in delta["edges_removed"]:
+        edges.pop(key, None)
+    for edge in delta["edges_upserted"]:
+        edges[edge_id(edge)] = edge
+    state["metadata"] = delta["metadata"]
+    return state
+
+
+def _copy_state(state: State) -> State:
+    return {"metadata": state["metadata"], "nodes": dict(state["nodes"]), "edges": dict(state["edges"])}
+
+
+def _parse_at(value: Union[str, datetime]) -> datetime:
+    at = datetime.fromisoformat(value) if isinstance(value, str) else value
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class HistoryDiff:
+    """What changed between two points in time (node keys and edge ids)."""
+    nodes_added: List[str] = field(default_factory=list)
+    nodes_removed: List[str] = field(default_factory=list)
+    nodes_changed: List[str] = field(default_factory=list)
+    edges_added: List[str] = field(default_factory=list)
+    edges_removed: List[str] = field(default_factory=list)
+    edges_changed: List[str] = field(default_factory=list)
+
+    def extend(self, old: State, new: State) -> None:
+        for table in ("nodes", "edges"):
+            before, after = old[table], new[table]
+            getattr(self, f"{table}_added").extend(k for k in after if k not in before)
+            getattr(self, f"{table}_removed").extend(k for k in before if k not in after)
+            getattr(self, f"{table}_changed").extend(k for k, v in after.items() if k in before and before[k] != v)
+
+    @property
+    def is_empty(self) -> bool:
+        return not any((self.nodes_added, self.nodes_removed, self.nodes_changed,
+                        self.edges_added, self.edges_removed, self.edges_changed))
+
+
+# ── Timeline ─────────────────────────────────────────────────────────
+
+class SnapshotHistory:
+    """Base + delta snapshot timelines for every source of every client."""
+
+    def __init__(
+        self,
+        store: Any,
+        max_chain: int = DEFAULT_MAX_CHAIN,
+        delta_ratio: float = DEFAULT_DELTA_RATIO,
+        compression: str = "zstd",
+        fetch_concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}")
+        self.store = store
+        self.max_chain = max_chain
+        self.delta_ratio = delta_ratio
+        self.compression = compression
+        self.fetch_concurrency = fetch_concurrency
+        # Latest state per timeline, so consecutive records need not replay the chain
+        self._heads: Dict[str, Tuple[int, State]] = {}
+
+    # ── Keys and encoding ──
+
+    @staticmethod
+    def _prefix(client_id: str, source: str) -> str:
+        return f"{client_id}/timeline/{source}"
+
+    def _encode(self, document: dict) -> bytes:
+        stream = compressor(self.compression)
+        return stream.compress(orjson.dumps(document)) + stream.flush()
+
+    @staticmethod
+    def _decode(body: bytes, compression: str) -> dict:
+        return orjson.loads(decompress(body, compression))
+
+    def _read_index(self, client_id: str, source: str) -> dict:
+        body = self.store.get(f"{self._prefix(client_id, source)}/index.json")
+        if body is None:
+            return {"format": TIMELINE_FORMAT, "source": source, "generation": 0, "entries": []}
+        return orjson.loads(body)
+
+    def _write_index(self, client_id: str, source: str, index: dict) -> int:
+        body = orjson.dumps(index, option=orjson.OPT_INDENT_2)
+        self.store.put(f"{self._prefix(client_id, source)}/index.json", body)
+        return len(body)
+
+    def sources(self, client_id: str) -> List[str]:
+        prefix = f"{client_id}/timeline/"
+        return sorted(
+            key[len(prefix):-len("/index.json")]
+            for key in self.store.list(prefix) if key.endswith("/index.json")
+        )
+
+    def timeline(self, client_id: str, source: str) -> List[dict]:
+        """Index entries, oldest first: seq, at, kind, key, compression, content_hash, nodes, edges, stored_bytes."""
+        return self._read_index(client_id, source)["entries"]
+
+    # ── Writing ──
+
+    def record(
+        self,
+        client_id: str,
+        source: str,
+        results: List[DiscoveryResult],
+        at: Optional[datetime] = None,
+    ) -> Optional[dict]:
+        """
+        Append one source's state at time `at` (default now). Returns the new
+        index entry plus the bytes written, or None when nothing changed.
+        """
+        at = _parse_at(at or datetime.now(timezone.utc))
+        content_hash = source_content_hash(results)
+        index = self._read_index(client_id, source)
+        entries = index["entries"]
+        if entries:
+            if at < _parse_at(entries[-1]["at"]):
+                raise ValueError(f"Timeline for {source} already has an entry after {at.isoformat()}")
+            if entries[-1]["content_hash"] == content_hash:
+                return None
+
+        state = state_from_results(results)
+        written = self._append(client_id, source, index, state, at, content_hash)
+        written += self._write_index(client_id, source, index)
+        entry = index["entries"][-1]
+        logger.info(f"[HISTORY] {client_id}/{source}: {entry['kind']} #{entry['seq']} at {entry['at']} "
+                    f"({entry['stored_bytes']} bytes)")
+        return {**entry, "bytes_written": written}
+
+    def _append(self, client_id: str, source: str, index: dict, state: State, at: datetime, content_hash: str) -> int:
+        """Write state as the next base or delta of index (in memory); returns bytes written."""
+        entries = index["entries"]
+        seq = entries[-1]["seq"] + 1 if entries else 0
+        kind, document = "base", None
+
+        if entries:
+            base_pos = max(i for i, e in enumerate(entries) if e["kind"] == "base")
+            chain = entries[base_pos + 1:]
+            delta_bytes = sum(e["stored_bytes"] for e in chain)
+            if len(chain) < self.max_chain and delta_bytes < entries[base_pos]["stored_bytes"] * self.delta_ratio:
+                previous = self._head_state(client_id, source, index)
+                kind, document = "delta", make_delta(previous, state)
+
+        if document is None:
+            document = {"metadata": state["metadata"], "nodes": list(state["nodes"].values()),
+                        "edges": list(state["edges"].values())}
+        body = self._encode({"format": TIMELINE_FORMAT, "kind": kind, "at": at.isoformat(), **document})
+        key = f"{self._prefix(client_id, source)}/g{index['generation']:04d}/{seq:08d}-{kind}{_EXTENSIONS[self.compression]}"
+        self.store.put(key, body)
+
+        entries.append({
+            "seq": seq, "at": at.isoformat(), "kind": kind, "key": key, "compression": self.compression,
+            "content_hash": content_hash,
+            "nodes": len(state["nodes"]), "edges": len(state["edges"]), "stored_bytes": len(body),
+        })
+        self._heads[self._prefix(client_id, source)] = (seq, state)
+        return len(body)
+
+    def _head_state(self, client_id: str, source: str, index: dict) -> State:
+        seq, state = self._heads.get(self._prefix(client_id, source), (None, None))
+        if seq == index["entries"][-1]["seq"] and index["entries"][-1]["key"].startswith(
+                f"{self._prefix(client_id, source)}/g{index['generation']:04d}/"):
+            return state
+        return self._replay(index["entries"], len(index["entries"]) - 1)
+
+    # ── Reading ──
+
+    def _load(self, entry: dict) -> dict:
+        body = self.store.get(entry["key"])
+        if body is None:
+            raise FileNotFoundError(f"Timeline object {entry['key']} is missing")
+        # Entries from before the index recorded it were written with the instance's setting
+        return self._decode(body, entry.get("compression", self.compression))
+
+    def _load_many(self, entries: List[dict]) -> List[dict]:
+        """Fetch a chain's objects concurrently (the keys are all known from the index)."""
+        if len(entries) <= 1 or self.fetch_concurrency <= 1:
+            return [self._load(e) for e in entries]
+        with ThreadPoolExecutor(max_workers=min(self.fetch_concurrency, len(entries)),
+                                thread_name_prefix="history-fetch") as pool:
+            return list(pool.map(self._load, entries))
+
+    def _replay(self, entries: List[dict], position: int, start: Optional[Tuple[int, State]] = None) -> State:
+        """
+        State as of entries[position]. With start=(i, state) for an earlier
+        position on the same chain, only the deltas after it are applied.
+        """
+        base_pos = max(i for i in range(position + 1) if entries[i]["kind"] == "base")
+        if start is not None and base_pos <= start[0] <= position:
+            state = _copy_state(start[1])
+            deltas = self._load_many(entries[start[0] + 1:position + 1])
+        else:
+            base, *deltas = self._load_many(entries[base_pos:position + 1])
+            state = {
+                "metadata": base["metadata"],
+                "nodes": {n["key"]: n for n in base["nodes"]},
+                "edges": {edge_id(e): e for e in base["edges"]},
+            }
+        for delta in deltas:
+            apply_delta(state, delta)
+        return state
+
+    @staticmethod
+    def _position(entries: List[dict], at: datetime) -> int:
+        """Index of the last entry at or before `at`, or -1."""
+        return bisect.bisect_right([_parse_at(e["at"]) for e in entries], at) - 1
+
+    def state_at(self, client_id: str, source: str, at: Union[str, datetime]) -> Optional[State]:
+        entries = self.timeline(client_id, source)
+        position = self._position(entries, _parse_at(at))
+        return self._replay(entries, position) if position >= 0 else None
+
+    def load_at(
+        self,
+        client_id: str,
+        at: Union[str, datetime],
+        sources: Optional[Iterable[str]] = None,
+    ) -> List[DiscoveryResult]:
+        """One DiscoveryResult per source that had been recorded by `at`, as it was then."""
+        results = []
+        for source in sources or self.sources(client_id):
+            state = self.state_at(client_id, source, at)
+            if state is not None:
+                results.append(state_to_result(source, state))
+        return results
+
+    def diff(
+        self,
+        client_id: str,
+        t1: Union[str, datetime],
+        t2: Union[str, datetime],
+        sources: Optional[Iterable[str]] = None,
+    ) -> HistoryDiff:
+        """Changes from the state at t1 to the state at t2 (sources missing at a time count as empty)."""
+        t1, t2 = _parse_at(t1), _parse_at(t2)
+        result = HistoryDiff()
+        empty: State = {"metadata": {}, "nodes": {}, "edges": {}}
+        for source in sources or self.sources(client_id):
+            entries = self.timeline(client_id, source)
+            p1, p2 = self._position(entries, t1), self._position(entries, t2)
+            if p1 == p2:
+                continue
+            old = self._replay(entries, p1) if p1 >= 0 else empty
+            new = self._replay(entries, p2, start=(p1, old) if p1 >= 0 else None) if p2 >= 0 else empty
+            result.extend(old, new)
+        return result
+
+    # ── Compaction ──
+
+    def compact(
+        self,
+        client_id: str,
+        source: str,
+        older_than: datetime,
+        keep_every: timedelta = timedelta(days=7),
+    ) -> dict:
+        """
+        Thin entries before `older_than` to the last one in each `keep_every`
+        window, and rewrite the timeline (fresh bases and deltas) under a new
+        generation. The index is swapped before old objects are deleted, so
+        readers see either the old timeline or the new one.
+        """
+        older_than = _parse_at(older_than)
+        index = self._read_index(client_id, source)
+        entries = index["entries"]
+        before_bytes = sum(e["stored_bytes"] for e in entries)
+        if not entries:
+            return {"entries_before": 0, "entries_after": 0, "bytes_before": 0, "bytes_after": 0}
+
+        origin = _parse_at(entries[0]["at"])
+        keep = []
+        for i, entry in enumerate(entries):
+            at = _parse_at(entry["at"])
+            if at >= older_than or i == len(entries) - 1:
+                keep.append(i)
+                continue
+            window = (at - origin) // keep_every
+            next_at = _parse_at(entries[i + 1]["at"])
+            if next_at >= older_than or (next_at - origin) // keep_every != window:
+                keep.append(i)
+
+        new_index = {**index, "generation": index["generation"] + 1, "entries": []}
+        state: Optional[State] = None
+        kept = iter(keep)
+        target = next(kept, None)
+        for i, entry in enumerate(entries):
+            if state is None or entry["kind"] == "base":
+                state = self._replay(entries, i)
+            else:
+                apply_delta(state, self._load(entry))
+            if i == target:
+                snapshot = _copy_state(state)
+                self._append(client_id, source, new_index, snapshot, _parse_at(entry["at"]), entry["content_hash"])
+                target = next(kept, None)
+
+        self._write_index(client_id, source, new_index)
+        old_keys = [e["key"] for e in entries]
+        self.store.delete(old_keys)
+
+        stats = {
+            "entries_before": len(entries), "entries_after": len(new_index["entries"]),
+            "bytes_before": before_bytes, "bytes_after": sum(e["stored_bytes"] for e in new_index["entries"]),
+        }
+        logger.info(f"[HISTORY] Compacted {client_id}/{source}: {stats}")
+        return stats
@@ -2,8 +2,9 @@
 Concrete ingestor implementations wrapping various data sources.
 """
 
+import asyncio
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from sqlmodel import Session, select
 
 from apps.api.models import utc_now, ConnectedRepository
@@ -18,9 +19,19 @@ logger = logging.getLogger(__name__)
 
 
 class AWSIngestor(BaseIngestor):
-    def __init__(self, region_name: str | None = "us-east-1", credentials: dict = None):
+    def __init__(
+        self,
+        region_name: str | None = "us-east-1",
+        credentials: dict = None,
+        scan_mode: str = "pruned",
+        region_allowlist: Optional[List[str]] = None,
+        region_denylist: Optional[List[str]] = None,
+    ):
         self.region_name = region_name or "us-east-1"
         self.credentials = credentials or {}
+        self.scan_mode = scan_mode
+        self.region_allowlist = region_allowlist
+        self.region_denylist = region_denylist
 
     @property
     def source_name(self) -> str:
@@ -28,19 +39,44 @@ class AWSIngestor(BaseIngestor):
 
     async def ingest(self) -> List[DiscoveryResult]:
         try:
-            detector = AWSDetector(region_name=self.region_name, credentials=self.credentials)
+            detector = AWSDetector(
+                region_name=self.region_name,
+                credentials=self.credentials,
+                scan_mode=self.scan_mode,
+                region_allowlist=self.region_allowlist,
+                region_denylist=self.region_denylist,
+                # discover() returns a DiscoveryResult, which never carries raw payloads
+                raw_payload_policy="none",
+            )
             result = await detector.discover()
             return [result]
         except Exception as e:
+            # run_ingestors records the failure in source_errors
             logger.error(f"AWSIngestor failed: {e}")
-            return []
+            raise
 
 
 class GitHubIngestor(BaseIngestor):
-    def __init__(self, client_id: str, session: Session, repo_url: Optional[str] = None):
+    """
+    Ingests a client's connected repositories (all of them, or only
+    repo_url / repo_urls), at most max_concurrency at a time.
+
+    Only clones, fetches and parses run concurrently; every use of the
+    session stays on the ingest() coroutine, one repo at a time.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        session: Session,
+        repo_url: Optional[str] = None,
+        repo_urls: Optional[List[str]] = None,
+        max_concurrency: int = 4,
+    ):
         self.client_id = client_id
         self.session = session
-        self.repo_url = repo_url
+        self.repo_urls = list(repo_urls or []) + ([repo_url] if repo_url else [])
+        self.max_concurrency = max(1, max_concurrency)
 
     @property
     def source_name(self) -> str:
@@ -50,59 +86,118 @@ class GitHubIngestor(BaseIngestor):
         statement = select(ConnectedRepository).where(
             ConnectedRepository.client_id == self.client_id,
         )
-        if self.repo_url:
-            statement = statement.where(ConnectedRepository.repo_url == self.repo_url)
+        if self.repo_urls:
+            statement = statement.where(ConnectedRepository.repo_url.in_(self.repo_urls))
         
         repos = self.session.exec(statement).all()
+        if not repos:
+            return []
 
-        results: List[DiscoveryResult] = []
+        # The (synchronous) session is only used from this coroutine, one
+        # step at a time; the repo tasks get plain values and only clone,
+        # fetch and parse.
+        jobs = [self._job(repo) for repo in repos]
         for repo in repos:
-            logger.info(f"Processing repo: {repo.repo_url}")
             repo.ingestion_status = "running"
-            self.session.add(repo)
-            self.session.commit()
+            self._save(repo)
 
+        tokens: Dict[str, Any] = {}
+        for installation_id in dict.fromkeys(job["installation_id"] for job in jobs):
             try:
-                token = await get_installation_token(repo.installation_id, str(self.client_id), self.session)
-                pipeline = GitHubIngestionPipeline(
-                    repo_url=repo.repo_url,
-                    branch=repo.default_branch or "main",
-                    access_token=token,
-                )
-                result = await pipeline.run()
-                
-                # Enrich metadata with client-specific context (Spec §2)
-                repo_full_name = (
-                    repo.repo_url.split("github.com/")[-1]
-                    if "github.com/" in repo.repo_url
-                    else repo.repo_url
+                tokens[installation_id] = await get_installation_token(
+                    installation_id, str(self.client_id), self.session,
                 )
-                result.metadata.update({
-                    "installation_id": repo.installation_id,
-                    "repo_full_name": repo_full_name,
-                    "repo_url": repo.repo_url,
-                    "repo_id": str(getattr(repo, "repo_id", "")),
-                    "ingestion_type": "manual",
-                })
-                
-                logger.info(
-                    f"Pipeline complete for {repo.repo_url}: "
-                    f"{len(result.nodes)} nodes, {len(result.edges)} edges"
-                )
-                results.append(result)
-                
-                repo.ingestion_status = "success"
-                repo.last_ingested_at = utc_now()
-                self.session.add(repo)
-                self.session.commit()
-
             except Exception as e:
-                repo.ingestion_status = "failed"
-                self.session.add(repo)
-                self.session.commit()
-                logger.error(f"GitHub ingestion failed for {repo.repo_url}: {e}")
+                tokens[installation_id] = e
 
-        return results
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(job: Dict[str, Any]) -> DiscoveryResult:
+            token = tokens[job["installation_id"]]
+            if isinstance(token, Exception):
+                raise token
+            async with semaphore:
+                return await self._run_pipeline(job, token)
+
+        pending = {asyncio.ensure_future(bounded(job)): i for i, job in enumerate(jobs)}
+        outcomes: List[Optional[DiscoveryResult]] = [None] * len(jobs)
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    i = pending.pop(task)
+                    outcomes[i] = self._finish(repos[i], jobs[i], task)
+        finally:
+            for task in pending:
+                task.cancel()
+        return [result for result in outcomes if result is not None]
+
+    @staticmethod
+    def _job(repo: ConnectedRepository) -> Dict[str, Any]:
+        branch = repo.default_branch or "main"
+        same_branch = repo.last_ingested_branch == branch
+        return {
+            "repo_url": repo.repo_url,
+            "branch": branch,
+            "installation_id": repo.installation_id,
+            "repo_id": str(getattr(repo, "repo_id", "")),
+            "last_commit_sha": repo.last_ingested_sha if same_branch else None,
+            "last_content_hash": repo.last_content_hash if same_branch else None,
+        }
+
+    async def _run_pipeline(self, job: Dict[str, Any], token: str) -> DiscoveryResult:
+        logger.info(f"Processing repo: {job['repo_url']}")
+        pipeline = GitHubIngestionPipeline(
+            repo_url=job["repo_url"],
+            branch=job["branch"],
+            access_token=token,
+            last_commit_sha=job["last_commit_sha"],
+            last_content_hash=job["last_content_hash"],
+        )
+        result = await pipeline.run()
+
+        # Enrich metadata with client-specific context (Spec §2)
+        repo_url = job["repo_url"]
+        repo_full_name = repo_url.split("github.com/")[-1] if "github.com/" in repo_url else repo_url
+        result.metadata.update({
+            "installation_id": job["installation_id"],
+            "repo_full_name": repo_full_name,
+            "repo_url": repo_url,
+            "repo_id": job["repo_id"],
+            "ingestion_type": "manual",
+        })
+        logger.info(
+            f"Pipeline complete for {repo_url}: "
+            f"{len(result.nodes)} nodes, {len(result.edges)} edges"
+        )
+        return result
+
+    def _finish(self, repo: ConnectedRepository, job: Dict[str, Any], task: "asyncio.Future") -> Optional[DiscoveryResult]:
+        """Record one repo's outcome on its row; returns the result, or None if it failed."""
+        error = task.exception()
+        if error is not None:
+            logger.error(f"GitHub ingestion failed for {job['repo_url']}: {error}")
+            repo.ingestion_status = "failed"
+            self._save(repo)
+            return None
+
+        result = task.result()
+        repo.ingestion_status = "success"
+        repo.last_ingested_at = utc_now()
+        repo.last_ingested_branch = job["branch"]
+        repo.last_ingested_sha = result.metadata.get("commit_sha")
+        repo.last_content_hash = result.metadata.get("content_hash")
+        self._save(repo)
+        return result
+
+    def _save(self, repo: ConnectedRepository) -> None:
+        self.session.add(repo)
+        try:
+            self.session.commit()
+        except Exception:
+            # Leave the session usable for the remaining repos
+            self.session.rollback()
+            raise
 
 
 class GitHubLinkIngestor(BaseIngestor):
@@ -129,5 +224,6 @@ class GitHubLinkIngestor(BaseIngestor):
             )
             return [result]
         except Exception as e:
+            # run_ingestors records the failure in source_errors
             logger.error(f"GitHub link ingestion failed for {self.repo_url}: {e}")
-            return []
+            raise
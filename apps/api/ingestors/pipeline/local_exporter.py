@@ -0,0 +1,191 @@
+"""
+Local Exporter — Filesystem Data Lake Export
+
+Writes DiscoveryResult payloads to a directory instead of S3/MinIO, for
+development and tests. Same layout and skip-unchanged behaviour as the
+S3 exporter, with columnar snapshots (see columnar.py) as the payload:
+
+  - Content-addressed history: {root}/{client_id}/history/{source}/{content_hash}.arrow
+                               (+ {content_hash}.edges.arrow: Arrow IPC files)
+  - Latest pointer:            {root}/{client_id}/current/{source}.json
+    (manifest naming the current snapshot, same fields as S3Exporter's)
+
+load_current memory-maps the current snapshots and only decodes the
+columns the requested projection needs; open_current hands out the
+snapshots themselves for column-level access.
+
+root defaults to OPSCRIBE_LOCAL_EXPORT_DIR, else ./data/exports.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import uuid
+from pathlib import Path
+from datetime import datetime, timezone
+from collections import defaultdict
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional, Union
+
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult
+from apps.api.ingestors.pipeline.base import BaseExporter
+from apps.api.ingestors.pipeline.s3_exporter import PROJECTIONS, build_envelope, source_content_hash
+from apps.api.ingestors.pipeline.columnar import (
+    SNAPSHOT_EXTENSION, ColumnarSnapshot, encode_snapshot, snapshot_size, write_atomic, write_snapshot,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = "data/exports"
+BLOB_FORMAT = "arrow_ipc"
+
+
+class LocalExporter(BaseExporter):
+    """Exports DiscoveryResult data to a local directory per client_id.
+
+    After each export, last_export holds the bytes written and what
+    happened to each source, as with S3Exporter.
+    """
+
+    def __init__(self, root: Union[str, Path, None] = None):
+        self.root = Path(root or os.environ.get("OPSCRIBE_LOCAL_EXPORT_DIR") or DEFAULT_ROOT)
+        self.last_export: Dict[str, Any] = {}
+        logger.info(f"LocalExporter initialized: root={self.root}")
+
+    @property
+    def backend_name(self) -> str:
+        return "local"
+
+    # ── Export ────────────────────────────────────────────────────────
+
+    async def export(
+        self,
+        client_id: str,
+        results: List[DiscoveryResult],
+        label: Optional[str] = None,
+    ) -> str:
+        """
+        Export DiscoveryResults under root for a given client_id.
+
+        A source whose content hash matches its current manifest is skipped;
+        a hash seen before only moves the manifest back to that snapshot.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._export, client_id, results, label)
+
+    def _export(self, client_id: str, results: List[DiscoveryResult], label: Optional[str]) -> str:
+        now = datetime.now(timezone.utc)
+        ingestion_id = str(uuid.uuid4())
+
+        grouped_results: Dict[str, List[DiscoveryResult]] = defaultdict(list)
+        for r in results:
+            grouped_results[r.source].append(r)
+
+        current_paths: List[str] = []
+        stats: Dict[str, Any] = {"bytes_written": 0, "sources": {}}
+
+        for source, source_results in grouped_results.items():
+            manifest_path = self.root / client_id / "current" / f"{source}.json"
+            snapshot_hash = source_content_hash(source_results)
+            current_paths.append(str(manifest_path))
+
+            previous = self._read_manifest(manifest_path)
+            if previous and previous.get("content_hash") == snapshot_hash:
+                logger.info(f"[STEP 7] {source} unchanged ({snapshot_hash[:12]}), skipping write")
+                stats["sources"][source] = {"status": "unchanged", "content_hash": snapshot_hash, "bytes_written": 0}
+                continue
+
+            envelope = build_envelope(client_id, source, source_results, label, ingestion_id, now)
+            blob_key = f"{client_id}/history/{source}/{snapshot_hash}{SNAPSHOT_EXTENSION}"
+            blob_path = self.root / blob_key
+            written = 0
+
+            stored_bytes = snapshot_size(blob_path)
+            if stored_bytes is not None:
+                logger.info(f"[STEP 7] Reusing archived snapshot {blob_path}")
+            else:
+                stored_bytes = write_snapshot(blob_path, encode_snapshot(source_results, envelope))
+                written += stored_bytes
+                logger.info(f"[STEP 7] Archived to {blob_path} ({stored_bytes} bytes)")
+
+            manifest = {
+                **envelope,
+                "manifest_version": 1,
+                "source": source,
+                "content_hash": snapshot_hash,
+                "blob_key": blob_key,
+                "format": BLOB_FORMAT,
+                "compression": None,
+                "raw_bytes": stored_bytes,
+                "stored_bytes": stored_bytes,
+                "previous_content_hash": (previous or {}).get("content_hash"),
+            }
+            written += write_atomic(manifest_path, json.dumps(manifest, indent=2, default=str).encode("utf-8"))
+            logger.info(f"[STEP 7] Wrote {manifest_path}")
+
+            stats["bytes_written"] += written
+            stats["sources"][source] = {
+                "status": "written", "content_hash": snapshot_hash, "bytes_written": written,
+                "stored_bytes": stored_bytes,
+            }
+
+        self.last_export = stats
+        logger.info(f"Export for client {client_id}: {stats['bytes_written']} bytes written")
+        return ",".join(current_paths)
+
+    # ── Load ──────────────────────────────────────────────────────────
+
+    async def load_current(self, client_id: str, projection: str = "full") -> List[DiscoveryResult]:
+        """
+        Load the combined 'current' state of all sources for a client from disk.
+
+        projection is one of PROJECTIONS; "structure" never reads the
+        property columns, "no_heavy" never reads the heavy ones.
+        """
+        if projection not in PROJECTIONS:
+            raise ValueError(f"Unknown projection {projection!r}; expected one of {PROJECTIONS}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._load_current, client_id, projection)
+
+    def _load_current(self, client_id: str, projection: str) -> List[DiscoveryResult]:
+        blobs = self._current_blobs(client_id)
+        if not blobs:
+            logger.warning(f"No 'current' data found in {self.root} for client {client_id}")
+            return []
+
+        # One snapshot mapped at a time, unmapped even if decoding it fails
+        results: List[DiscoveryResult] = []
+        for path in blobs.values():
+            with ColumnarSnapshot(path) as snapshot:
+                results.extend(snapshot.to_results(projection))
+        logger.info(f"Loaded {len(results)} DiscoveryResults from {self.root} for client {client_id}")
+        return results
+
+    def open_current(self, client_id: str) -> Dict[str, ColumnarSnapshot]:
+        """Memory-mapped current snapshot per source, in source order. The caller closes them."""
+        with ExitStack() as stack:
+            snapshots = {
+                source: stack.enter_context(ColumnarSnapshot(path))
+                for source, path in self._current_blobs(client_id).items()
+            }
+            # All opened: hand them over instead of closing them on exit
+            stack.pop_all()
+        return snapshots
+
+    def _current_blobs(self, client_id: str) -> Dict[str, Path]:
+        """Snapshot path per source named by the current/ manifests, in source order."""
+        blobs: Dict[str, Path] = {}
+        for manifest_path in sorted((self.root / client_id / "current").glob("*.json")):
+            manifest = self._read_manifest(manifest_path)
+            if manifest is not None:
+                blobs[manifest["source"]] = self.root / manifest["blob_key"]
+        return blobs
+
+    @staticmethod
+    def _read_manifest(path: Path) -> Optional[dict]:
+        try:
+            manifest = json.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        return manifest if "blob_key" in manifest else None
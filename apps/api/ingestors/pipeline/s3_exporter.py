@@ -4,37 +4,198 @@ S3 Exporter — Per-Tenant Data Lake Export
 Exports DiscoveryResult payloads to S3/MinIO as JSON, conforming to the
 raw_v1 schema spec. Implements:
 
-  - Partitioned storage: {client_id}/history/{source}/YYYY-MM-DD-HH-MM-SS.json
-  - Latest pointer:      {client_id}/current/{source}.json
+  - Content-addressed history: {client_id}/history/{source}/{content_hash}.ndjson.{zst|gz}
+    (compressed raw_v1 payload as NDJSON records, see iter_payload_records;
+    the hash covers the nodes and edges only)
+  - Latest pointer:            {client_id}/current/{source}.json
+    (small manifest naming the current blob, see _manifest)
+  - Snapshot timeline:         {client_id}/timeline/{source}/...
+    (base + delta history behind load_at / diff / compact_history,
+    see history.py)
+  - Unchanged sources are not uploaded again; large blobs go up as
+    multipart uploads
   - Full ingestion_metadata envelope (Spec §2)
   - Real content_hash fingerprinting (Spec §3)
   - DiscoveryEdge serialization (Spec §5)
 
+load_current paginates the listing, fetches sources concurrently, decodes
+NDJSON blobs as a stream and can project away heavy properties. It also
+reads the earlier layouts: single-document JSON blobs, and current/{source}.json
+holding the full uncompressed payload.
+
 Auth: Uses env vars or .env file for S3 credentials.
 """
 
+import io
 import os
 import json
+import asyncio
+import functools
+import hashlib
 import logging
 import uuid
-from datetime import datetime, timezone
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional, List, Tuple
 from collections import defaultdict
 from dotenv import dotenv_values
 
 import boto3
+import orjson
 from botocore.exceptions import ClientError
 
 from apps.api.ingestors.pipeline.schemas import DiscoveryResult, DiscoveryNode, DiscoveryEdge
 from apps.api.ingestors.pipeline.base import BaseExporter
+from apps.api.ingestors.pipeline.compression import COMPRESSIONS, compressor, decompress, open_decompressed
 
 logger = logging.getLogger(__name__)
 
+BLOB_FORMAT = "ndjson"
+_EXTENSIONS = {"zstd": ".ndjson.zst", "gzip": ".ndjson.gz"}
+_CHUNK_BYTES = 256 * 1024
+
+# What load_current keeps of each node:
+#   full      — everything
+#   no_heavy  — properties minus HEAVY_PROPERTIES (raw API payloads, file bodies)
+#   structure — key, names and types only; property records are skipped unparsed
+PROJECTIONS = ("full", "no_heavy", "structure")
+HEAVY_PROPERTIES = frozenset({"raw", "raw_ref", "raw_payload", "content", "file_content"})
+_PROPERTIES_PREFIX = b'{"type":"node_properties"'
+
+# S3 requires parts of at least 5 MiB (except the last)
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
+
+def _dumps(record: dict) -> bytes:
+    return json.dumps(record, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+
+def _project_properties(node: dict, projection: str) -> dict:
+    if projection == "structure":
+        node["properties"], node["source_metadata"] = {}, {}
+    elif projection == "no_heavy" and not HEAVY_PROPERTIES.isdisjoint(node.get("properties") or ()):
+        node["properties"] = {k: v for k, v in node["properties"].items() if k not in HEAVY_PROPERTIES}
+    return node
+
+
+def read_payload_records(lines: Iterable[bytes], projection: str = "full") -> List[DiscoveryResult]:
+    """Rebuild DiscoveryResults from NDJSON payload records, one line at a time.
+
+    With projection="structure" the node_properties lines are skipped
+    without being parsed.
+    """
+    results: List[DiscoveryResult] = []
+    block: Optional[dict] = None
+
+    def close_block() -> None:
+        if block is not None:
+            results.append(DiscoveryResult(**block))
+
+    for line in lines:
+        if projection == "structure" and line.startswith(_PROPERTIES_PREFIX):
+            continue
+        if not line.strip():
+            continue
+        record = orjson.loads(line)
+        kind = record["type"]
+        if kind == "node":
+            block["nodes"].append(record["data"])
+        elif kind == "node_properties":
+            block["nodes"][-1].update(record["data"])
+            if projection != "full":
+                _project_properties(block["nodes"][-1], projection)
+        elif kind == "edge":
+            block["edges"].append(record["data"])
+        elif kind == "source":
+            close_block()
+            block = {**record["data"], "nodes": [], "edges": []}
+    close_block()
+    return results
+
+
+def source_content_hash(results: List[DiscoveryResult]) -> str:
+    """Hash of one source's nodes and edges (run metadata excluded), in result order."""
+    digest = hashlib.sha256()
+    for r in results:
+        digest.update(r.content_hash().encode())
+    return digest.hexdigest()
+
+
+def build_envelope(
+    client_id: str,
+    source: str,
+    source_results: List[DiscoveryResult],
+    label: Optional[str],
+    ingestion_id: str,
+    now: datetime,
+) -> dict:
+    """The raw_v1 ingestion_metadata envelope (Spec §2) for one source's export."""
+    first_meta = source_results[0].metadata if source_results else {}
+    repo_url = first_meta.get("repo_url", "")
+    commit_sha = first_meta.get("commit_sha", "")
+    content_hash = first_meta.get("content_hash", "")
+
+    return {
+        "schema_version": "raw_v1",
+        "ingestion_metadata": {
+            "ingestion_id": ingestion_id,
+            "pipeline_version": "v1",
+            "source": source,
+            "client_id": client_id,
+            "repo_full_name": first_meta.get("repo_full_name", ""),
+            "repo_url": repo_url,
+            "repo_id": first_meta.get("repo_id", ""),
+            "installation_id": first_meta.get("installation_id", ""),
+            "branch": first_meta.get("branch", "main"),
+            "commit_sha": commit_sha,
+            "ingestion_type": first_meta.get("ingestion_type", "manual"),
+            "triggered_at": now.isoformat(),
+        },
+        # ── Fingerprint (Spec §3) ──
+        "fingerprint": {
+            "repo": repo_url,
+            "commit_sha": commit_sha,
+            "content_hash": content_hash,
+        },
+        "label": label or f"{source}_export",
+        "exported_at": now.isoformat(),
+        # ── Summary (Spec §8) ──
+        "summary": {
+            "total_nodes": sum(len(r.nodes) for r in source_results),
+            "total_edges": sum(len(r.edges) for r in source_results),
+            "sources": [source],
+        },
+    }
+
 
 class S3Exporter(BaseExporter):
-    """Exports DiscoveryResult data to S3 per client_id."""
+    """Exports DiscoveryResult data to S3 per client_id.
+
+    s3_client / bucket default to the env configuration; compression is
+    "zstd" (default) or "gzip". After each export, last_export holds the
+    bytes uploaded and what happened to each source.
+    """
+
+    def __init__(
+        self,
+        s3_client: Any = None,
+        bucket: Optional[str] = None,
+        compression: str = "zstd",
+        record_history: bool = True,
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}; expected one of {COMPRESSIONS}")
+        self.compression = compression
+        self.last_export: Dict[str, Any] = {}
+        self.record_history = record_history
+        self._history = None
+
+        if s3_client is not None:
+            self.s3 = s3_client
+            self.bucket = bucket or "opscribe-data"
+            return
 
-    def __init__(self):
         env = dotenv_values("apps/api/.env")
 
         endpoint_url = env.get("AWS_S3_ENDPOINT_URL") or os.environ.get("AWS_S3_ENDPOINT_URL")
@@ -54,13 +215,23 @@ class S3Exporter(BaseExporter):
             client_kwargs["endpoint_url"] = endpoint_url
 
         self.s3 = boto3.client(**client_kwargs)
-        self.bucket = env.get("OPSCRIBE_S3_BUCKET") or os.environ.get("OPSCRIBE_S3_BUCKET", "opscribe-data")
+        self.bucket = bucket or env.get("OPSCRIBE_S3_BUCKET") or os.environ.get("OPSCRIBE_S3_BUCKET", "opscribe-data")
         logger.info(f"S3Exporter initialized: bucket={self.bucket}, endpoint={endpoint_url}")
 
     @property
     def backend_name(self) -> str:
         return "s3"
 
+    @property
+    def history(self):
+        """SnapshotHistory on this bucket (timeline/ prefix), or None when record_history is off."""
+        if not self.record_history:
+            return None
+        if self._history is None:
+            from apps.api.ingestors.pipeline.history import SnapshotHistory, S3ObjectStore
+            self._history = SnapshotHistory(S3ObjectStore(self.s3, self.bucket))
+        return self._history
+
     # ── Serialization helpers ────────────────────────────────────────
 
     @staticmethod
@@ -99,6 +270,45 @@ class S3Exporter(BaseExporter):
             "metadata": result.metadata,
         }
 
+    def iter_payload_records(self, envelope: dict, results: List[DiscoveryResult]) -> Iterator[bytes]:
+        """
+        Yield the NDJSON lines of a history blob:
+
+            {"type": "header", "envelope": {...}}
+            {"type": "source", "data": {"source": ..., "metadata": {...}}}
+            {"type": "node", "data": {key, display_name, node_type[, node_subtype]}}
+            {"type": "node_properties", "data": {"properties": ..., "source_metadata": ...}}
+            ...
+            {"type": "edge", "data": {...}}
+
+        Each node's properties sit on their own line right after it, so
+        structure-only readers can skip them without parsing.
+        """
+        yield _dumps({"type": "header", "schema_version": envelope["schema_version"], "envelope": envelope})
+        for r in results:
+            yield _dumps({"type": "source", "data": {"source": r.source, "metadata": r.metadata}})
+            for n in r.nodes:
+                d = self._node_to_dict(n)
+                details = {"properties": d.pop("properties"), "source_metadata": d.pop("source_metadata")}
+                yield _dumps({"type": "node", "data": d})
+                yield _dumps({"type": "node_properties", "data": details})
+            for e in r.edges:
+                yield _dumps({"type": "edge", "data": self._edge_to_dict(e)})
+
+    def _encode_payload(self, envelope: dict, results: List[DiscoveryResult]) -> Tuple[int, bytes]:
+        """Compress the payload records as they are produced; returns (raw bytes, body)."""
+        stream = compressor(self.compression)
+        body, buf, raw_bytes = bytearray(), bytearray(), 0
+        for line in self.iter_payload_records(envelope, results):
+            buf += line
+            if len(buf) >= _CHUNK_BYTES:
+                raw_bytes += len(buf)
+                body += stream.compress(bytes(buf))
+                buf.clear()
+        raw_bytes += len(buf)
+        body += stream.compress(bytes(buf)) + stream.flush()
+        return raw_bytes, bytes(body)
+
     # ── Export ────────────────────────────────────────────────────────
 
     async def export(
@@ -111,125 +321,277 @@ class S3Exporter(BaseExporter):
         Export DiscoveryResults to S3 for a given client_id.
 
         S3 key structure (Spec §9):
-            {client_id}/current/{source}.json
-            {client_id}/history/{source}/{YYYY-MM-DD-HH-MM-SS}.json
+            {client_id}/current/{source}.json                          (manifest)
+            {client_id}/history/{source}/{content_hash}.ndjson.{zst|gz}  (payload)
+
+        A source whose content hash matches its current manifest is skipped
+        entirely; a hash seen before (e.g. after a revert) only moves the
+        manifest back to the existing blob. Each source is encoded and
+        uploaded in a worker thread, one source at a time.
         """
         now = datetime.now(timezone.utc)
-        timestamp_str = now.strftime("%Y-%m-%d-%H-%M-%S")
         ingestion_id = str(uuid.uuid4())
+        loop = asyncio.get_running_loop()
 
         grouped_results: dict[str, list[DiscoveryResult]] = defaultdict(list)
         for r in results:
             grouped_results[r.source].append(r)
 
-        uploaded_keys: List[str] = []
+        current_keys: List[str] = []
+        stats: Dict[str, Any] = {"bytes_uploaded": 0, "sources": {}}
 
         for source, source_results in grouped_results.items():
-            first_meta = source_results[0].metadata if source_results else {}
-
-            repo_url = first_meta.get("repo_url", "")
-            commit_sha = first_meta.get("commit_sha", "")
-            content_hash = first_meta.get("content_hash", "")
-
-            # ── Full ingestion_metadata envelope (Spec §2) ───────────
-            payload = {
-                "schema_version": "raw_v1",
-                "ingestion_metadata": {
-                    "ingestion_id": ingestion_id,
-                    "pipeline_version": "v1",
-                    "source": source,
-                    "client_id": client_id,
-                    "repo_full_name": first_meta.get("repo_full_name", ""),
-                    "repo_url": repo_url,
-                    "repo_id": first_meta.get("repo_id", ""),
-                    "installation_id": first_meta.get("installation_id", ""),
-                    "branch": first_meta.get("branch", "main"),
-                    "commit_sha": commit_sha,
-                    "ingestion_type": first_meta.get("ingestion_type", "manual"),
-                    "triggered_at": now.isoformat(),
-                },
-                # ── Fingerprint (Spec §3) ────────────────────────────
-                "fingerprint": {
-                    "repo": repo_url,
-                    "commit_sha": commit_sha,
-                    "content_hash": content_hash,
-                },
-                "label": label or f"{source}_export",
-                "exported_at": now.isoformat(),
-                # ── Source data ───────────────────────────────────────
-                "sources": [self._result_to_dict(r) for r in source_results],
-                # ── Summary (Spec §8) ────────────────────────────────
-                "summary": {
-                    "total_nodes": sum(len(r.nodes) for r in source_results),
-                    "total_edges": sum(len(r.edges) for r in source_results),
-                    "sources": [source],
-                },
-            }
-
-            body = json.dumps(payload, indent=2, default=str)
-
-            latest_key = f"{client_id}/current/{source}.json"
-            history_key = f"{client_id}/history/{source}/{timestamp_str}.json"
-
+            current_keys.append(f"{client_id}/current/{source}.json")
             try:
-                # Upload latest pointer
-                self.s3.put_object(
-                    Bucket=self.bucket,
-                    Key=latest_key,
-                    Body=body.encode("utf-8"),
-                    ContentType="application/json",
-                )
-                logger.info(f"[STEP 7] Uploaded to s3://{self.bucket}/{latest_key}")
-
-                # Archive immutable snapshot
-                self.s3.put_object(
-                    Bucket=self.bucket,
-                    Key=history_key,
-                    Body=body.encode("utf-8"),
-                    ContentType="application/json",
-                )
-                logger.info(f"[STEP 7] Archived to s3://{self.bucket}/{history_key}")
-
-                uploaded_keys.append(latest_key)
-
+                source_stats = await loop.run_in_executor(None, functools.partial(
+                    self._export_source, client_id, source, source_results, label, ingestion_id, now,
+                ))
             except ClientError as e:
                 logger.error(f"S3 upload failed for {source} client {client_id}: {e}")
                 raise
+            stats["bytes_uploaded"] += source_stats["bytes_uploaded"]
+            stats["sources"][source] = source_stats
 
-        return ",".join(uploaded_keys)
+        self.last_export = stats
+        logger.info(f"Export for client {client_id}: {stats['bytes_uploaded']} bytes uploaded")
+        return ",".join(current_keys)
 
-    async def load_current(self, client_id: str) -> List[DiscoveryResult]:
-        """
-        Load the combined 'current' state of all sources for a client from MinIO/S3.
-        """
+    def _export_source(
+        self,
+        client_id: str,
+        source: str,
+        source_results: List[DiscoveryResult],
+        label: Optional[str],
+        ingestion_id: str,
+        now: datetime,
+    ) -> Dict[str, Any]:
+        """Upload one source's blob, manifest and timeline entry (blocking); returns its stats."""
+        latest_key = f"{client_id}/current/{source}.json"
+        snapshot_hash = source_content_hash(source_results)
+
+        previous = self._read_manifest(latest_key)
+        if previous and previous.get("content_hash") == snapshot_hash:
+            logger.info(f"[STEP 7] {source} unchanged ({snapshot_hash[:12]}), skipping upload")
+            return {"status": "unchanged", "content_hash": snapshot_hash, "bytes_uploaded": 0}
+
+        envelope = build_envelope(client_id, source, source_results, label, ingestion_id, now)
+        blob_key = f"{client_id}/history/{source}/{snapshot_hash}{_EXTENSIONS[self.compression]}"
+        uploaded = 0
+
+        archived = self._head(blob_key)
+        if archived is not None:
+            logger.info(f"[STEP 7] Reusing archived snapshot s3://{self.bucket}/{blob_key}")
+            stored_bytes = archived.get("ContentLength", 0)
+            raw_bytes = int(archived.get("Metadata", {}).get("raw-bytes", stored_bytes))
+        else:
+            raw_bytes, body = self._encode_payload(envelope, source_results)
+            self._upload(blob_key, body, {
+                "raw-bytes": str(raw_bytes), "content-hash": snapshot_hash,
+            })
+            stored_bytes = len(body)
+            uploaded += stored_bytes
+            logger.info(
+                f"[STEP 7] Archived to s3://{self.bucket}/{blob_key} "
+                f"({raw_bytes} bytes -> {stored_bytes} {self.compression})"
+            )
+
+        manifest = self._manifest(envelope, source, snapshot_hash, blob_key, raw_bytes, stored_bytes, previous)
+        manifest_body = json.dumps(manifest, indent=2, default=str).encode("utf-8")
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=latest_key,
+            Body=manifest_body,
+            ContentType="application/json",
+        )
+        uploaded += len(manifest_body)
+        logger.info(f"[STEP 7] Uploaded to s3://{self.bucket}/{latest_key}")
+
+        source_stats = {
+            "status": "uploaded", "content_hash": snapshot_hash,
+            "raw_bytes": raw_bytes, "stored_bytes": stored_bytes,
+        }
+        if self.history is not None:
+            recorded = self.history.record(client_id, source, source_results, at=now)
+            if recorded is not None:
+                uploaded += recorded["bytes_written"]
+                source_stats["timeline"] = {"kind": recorded["kind"], "seq": recorded["seq"]}
 
-        prefix = f"{client_id}/current/"
-        logger.info(f"Loading current state from S3: bucket={self.bucket}, prefix={prefix}")
+        return {**source_stats, "bytes_uploaded": uploaded}
+
+    # ── Storage helpers ──────────────────────────────────────────────
 
-        results: List[DiscoveryResult] = []
+    def _manifest(
+        self,
+        envelope: dict,
+        source: str,
+        snapshot_hash: str,
+        blob_key: str,
+        raw_bytes: int,
+        stored_bytes: int,
+        previous: Optional[dict],
+    ) -> dict:
+        """The current/{source}.json pointer: envelope fields plus where the payload lives."""
+        return {
+            **envelope,
+            "manifest_version": 1,
+            "source": source,
+            "content_hash": snapshot_hash,
+            "blob_key": blob_key,
+            "format": BLOB_FORMAT,
+            "compression": self.compression,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            "previous_content_hash": (previous or {}).get("content_hash"),
+        }
+
+    def _read_manifest(self, key: str) -> Optional[dict]:
+        """Current manifest for a source, or None (missing, or an old full-payload object)."""
+        try:
+            body = self.s3.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        manifest = json.loads(body)
+        return manifest if "blob_key" in manifest else None
 
+    def _head(self, key: str) -> Optional[dict]:
         try:
-            response = self.s3.list_objects_v2(Bucket=self.bucket, Prefix=prefix)
+            return self.s3.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound"):
+                return None
+            raise
+
+    def _upload(self, key: str, body: bytes, metadata: Dict[str, str]) -> None:
+        """put_object, or a multipart upload once the body passes MULTIPART_THRESHOLD."""
+        extra = {"ContentType": "application/json", "Metadata": metadata}
+        if len(body) < MULTIPART_THRESHOLD:
+            self.s3.put_object(Bucket=self.bucket, Key=key, Body=body, **extra)
+            return
+
+        upload_id = self.s3.create_multipart_upload(Bucket=self.bucket, Key=key, **extra)["UploadId"]
+        try:
+            parts = []
+            for number, offset in enumerate(range(0, len(body), MULTIPART_PART_SIZE), start=1):
+                part = self.s3.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number,
+                    Body=body[offset:offset + MULTIPART_PART_SIZE],
+                )
+                parts.append({"ETag": part["ETag"], "PartNumber": number})
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
 
-            if "Contents" not in response:
-                logger.warning(f"No 'current' data found in S3 for client {client_id}")
-                return results
+    async def load_at(self, client_id: str, at: datetime) -> List[DiscoveryResult]:
+        """State of every source as of `at`, rebuilt from the snapshot timeline."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._require_history().load_at, client_id, at)
 
-            for obj in response["Contents"]:
-                key = obj["Key"]
-                if not key.endswith(".json"):
-                    continue
+    async def diff(self, client_id: str, t1: datetime, t2: datetime):
+        """HistoryDiff of node keys / edge ids between the states at t1 and t2."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._require_history().diff, client_id, t1, t2)
 
-                logger.info(f"Fetching current state: {key}")
-                res = self.s3.get_object(Bucket=self.bucket, Key=key)
-                payload = json.loads(res["Body"].read().decode("utf-8"))
+    async def compact_history(
+        self,
+        client_id: str,
+        older_than: datetime,
+        keep_every: timedelta = timedelta(days=7),
+        prune_blobs: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Compact every source's timeline (see SnapshotHistory.compact). With
+        prune_blobs, also delete the content-addressed history/ blobs other
+        than the ones the current manifests point to: the timeline keeps
+        the past states.
+        """
+        history = self._require_history()
+        loop = asyncio.get_running_loop()
+
+        def compact() -> Dict[str, Any]:
+            stats: Dict[str, Any] = {}
+            for source in history.sources(client_id):
+                stats[source] = history.compact(client_id, source, older_than, keep_every)
+                if prune_blobs:
+                    manifest = self._read_manifest(f"{client_id}/current/{source}.json") or {}
+                    stale = [k for k in history.store.list(f"{client_id}/history/{source}/")
+                             if k != manifest.get("blob_key")]
+                    history.store.delete(stale)
+                    stats[source]["blobs_pruned"] = len(stale)
+            return stats
+
+        return await loop.run_in_executor(None, compact)
+
+    def _require_history(self):
+        if self.history is None:
+            raise RuntimeError("This S3Exporter was created with record_history=False")
+        return self.history
+
+    async def load_current(
+        self,
+        client_id: str,
+        projection: str = "full",
+        max_concurrency: int = 8,
+    ) -> List[DiscoveryResult]:
+        """
+        Load the combined 'current' state of all sources for a client from MinIO/S3.
 
-                for source_data in payload.get("sources", []):
-                    results.append(DiscoveryResult(**source_data))
+        Lists current/ page by page, then fetches and decodes up to
+        max_concurrency sources at a time in worker threads; results come
+        back in key order. projection is one of PROJECTIONS.
+        """
+        if projection not in PROJECTIONS:
+            raise ValueError(f"Unknown projection {projection!r}; expected one of {PROJECTIONS}")
 
-            logger.info(f"Loaded {len(results)} DiscoveryResults from S3 for client {client_id}")
-            return results
+        prefix = f"{client_id}/current/"
+        logger.info(f"Loading current state from S3: bucket={self.bucket}, prefix={prefix}")
 
+        loop = asyncio.get_running_loop()
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="s3-load") as pool:
+                keys = await loop.run_in_executor(pool, self._list_current, prefix)
+                if not keys:
+                    logger.warning(f"No 'current' data found in S3 for client {client_id}")
+                    return []
+                loaded = await asyncio.gather(
+                    *[loop.run_in_executor(pool, self._load_source, key, projection) for key in keys]
+                )
         except ClientError as e:
             logger.error(f"Failed to load current state from S3 for client {client_id}: {e}")
             raise
+
+        results = [r for source_results in loaded for r in source_results]
+        logger.info(f"Loaded {len(results)} DiscoveryResults from S3 for client {client_id}")
+        return results
+
+    def _list_current(self, prefix: str) -> List[str]:
+        paginator = self.s3.get_paginator("list_objects_v2")
+        return [
+            obj["Key"]
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix)
+            for obj in page.get("Contents", [])
+            if obj["Key"].endswith(".json")
+        ]
+
+    def _load_source(self, key: str, projection: str) -> List[DiscoveryResult]:
+        """Read one current/ object (manifest or old full payload) into DiscoveryResults."""
+        logger.info(f"Fetching current state: {key}")
+        payload = json.loads(self.s3.get_object(Bucket=self.bucket, Key=key)["Body"].read())
+        if "blob_key" in payload:
+            body = self.s3.get_object(Bucket=self.bucket, Key=payload["blob_key"])["Body"]
+            compression = payload.get("compression")
+            if payload.get("format") == BLOB_FORMAT:
+                with open_decompressed(body, compression) as stream:
+                    return read_payload_records(stream, projection)
+            payload = json.loads(decompress(body.read(), compression))
+
+        results = []
+        for source_data in payload.get("sources", []):
+            if projection != "full":
+                source_data["nodes"] = [_project_properties(n, projection) for n in source_data.get("nodes", [])]
+            results.append(DiscoveryResult(**source_data))
+        return results
@@ -10,6 +10,8 @@ Schema version: raw_v1
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 
+from apps.api.ingestors.content_hash import ContentHashMixin
+
 
 class DiscoveryNode(BaseModel):
     """
@@ -65,7 +67,7 @@ class DiscoveryEdge(BaseModel):
     )
 
 
-class DiscoveryResult(BaseModel):
+class DiscoveryResult(ContentHashMixin, BaseModel):
     """
     The output of a single ingestion run for one source.
 
@@ -73,6 +73,10 @@ class ConnectedRepository(SQLModel, table=True):
     target_repo_id: str
     last_ingested_at: Optional[datetime] = None
     ingestion_status: Optional[str] = None
+    # Last successful ingestion: commit and payload fingerprint, and the branch they belong to
+    last_ingested_branch: Optional[str] = None
+    last_ingested_sha: Optional[str] = None
+    last_content_hash: Optional[str] = None
     created_at: datetime = Field(default_factory=utc_now)
     updated_at: datetime = Field(default_factory=utc_now, sa_column_kwargs={"onupdate": utc_now})
 
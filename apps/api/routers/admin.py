@@ -7,7 +7,7 @@ import os
 
 from apps.api.database import get_session
 from apps.api.models import Client, ConnectedRepository, PlatformConfig
-from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
+from apps.api.ingestors.pipeline.exporters import get_exporter
 from apps.api.ingestors.pipeline.ingestors import GitHubIngestor
 from apps.api.routers.pipeline import run_export
 from apps.api.utils.auth import get_current_client_id
@@ -148,7 +148,7 @@ async def scaffold_organization(
         session.refresh(repo)
 
     ingestor = GitHubIngestor(client_id=str(client_id), session=session, repo_url=request.target_repo_url)
-    exporter = S3Exporter()
+    exporter = get_exporter()
     background_tasks.add_task(
         run_export,
         client_id=str(client_id),
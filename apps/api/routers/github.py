@@ -3,14 +3,17 @@ from fastapi.responses import RedirectResponse
 from sqlmodel import Session, select
 import httpx
 import os
-import json
+import asyncio
+from typing import Optional
 from uuid import UUID
 
 from apps.api.database import get_session
 from apps.api.models import Client, ConnectedRepository, PlatformConfig
 from apps.api.ingestors.github.app_auth import get_installation_token
 from apps.api.ingestors.github.client import GitHubClient
-from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
+from apps.api.ingestors.github.parse_cache import get_parse_cache
+from apps.api.ingestors.pipeline.datalake import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, get_browser
+from apps.api.ingestors.pipeline.exporters import get_exporter
 from apps.api.ingestors.pipeline.ingestors import GitHubIngestor
 from apps.api.ingestors.github.incremental import IncrementalUpdater
 from apps.api.routers.pipeline import run_export
@@ -261,7 +264,7 @@ async def github_webhook(
                 
                 print(f"Scheduling background App ingestion for {connected.repo_url}")
                 ingestor = GitHubIngestor(client_id=str(connected.client_id), session=session, repo_url=connected.repo_url)
-                exporter = S3Exporter()
+                exporter = get_exporter()
                 background_tasks.add_task(
                     run_export,
                     client_id=str(connected.client_id),
@@ -293,45 +296,72 @@ async def github_webhook(
 
 
 @router.get("/datalake")
-async def get_datalake_preview(client_id: UUID):
+async def get_datalake_preview(
+    client_id: UUID,
+    path: str = Query("", description="Folder below the client prefix, e.g. 'history/github'"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    preview_nodes: int = Query(20, ge=0, le=500),
+):
     """
     Returns a preview of the MinIO data lake for a given client, including:
-    - The file tree of all stored objects
-    - The latest.json payload (if it exists)
+    - One page of the folder `path`: sub-folders (with object count and
+      size) and objects, plus next_cursor
+    - file_count / total_bytes for the whole client prefix; totals stop
+      after MAX_TOTALS_KEYS keys, flagged by totals_truncated
+    - The current manifest of every source
+    - latest_payload: the github source's manifest (or the first source's)
+      with its first preview_nodes nodes, read with ranged GETs
+    Listings and manifests are cached for a few seconds.
     """
+    browser = get_browser()
     try:
-        exporter = S3Exporter()
-        s3 = exporter.s3
-        bucket = exporter.bucket
-        prefix = f"{client_id}/"
-
-        response = s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-        files = []
-        for obj in response.get("Contents", []):
-            key = obj["Key"]
-            files.append({
-                "key": key,
-                "size_bytes": obj["Size"],
-                "last_modified": obj["LastModified"].isoformat(),
-            })
-
-        # Try to read the latest.json
+        # list() walks the client prefix once for both its folders and the overall total
+        page, sources = await asyncio.gather(
+            asyncio.to_thread(browser.list, str(client_id), path, cursor, limit),
+            asyncio.to_thread(browser.sources, str(client_id)),
+        )
+        latest = next((m for m in sources if m.get("source") == "github"), sources[0] if sources else None)
         latest_payload = None
-        latest_key = f"{client_id}/github/latest.json"
-        try:
-            body = s3.get_object(Bucket=bucket, Key=latest_key)["Body"].read().decode()
-            latest_payload = json.loads(body)
-        except Exception:
-            pass  # No latest.json yet
+        if latest is not None and preview_nodes:
+            latest_payload = await asyncio.to_thread(browser.preview, str(client_id), latest["source"], preview_nodes)
 
+        overall = page.pop("total")
         return {
-            "bucket": bucket,
+            "bucket": browser.bucket,
             "client_id": str(client_id),
-            "file_count": len(files),
-            "files": files,
-            "latest_payload": latest_payload,
+            "file_count": overall["objects"],
+            "total_bytes": overall["size_bytes"],
+            "totals_truncated": overall["truncated"],
+            **page,
+            "sources": sources,
+            "latest_payload": latest_payload or latest,
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to read data lake for client {client_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to read data lake: {str(e)}")
 
+
+@router.get("/datalake/preview")
+async def get_datalake_source_preview(
+    client_id: UUID,
+    source: str,
+    nodes: int = Query(50, ge=1, le=1000),
+):
+    """The current manifest of one source plus its first `nodes` nodes, without downloading the whole snapshot."""
+    try:
+        preview = await asyncio.to_thread(get_browser().preview, str(client_id), source, nodes)
+    except Exception as e:
+        logger.error(f"Failed to preview {source} for client {client_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to read data lake: {str(e)}")
+    if preview is None:
+        raise HTTPException(status_code=404, detail=f"No current snapshot for source '{source}'")
+    return preview
+
+
+@router.get("/parse-cache")
+async def get_parse_cache_stats():
+    """Parser result cache: hit rate per parser (this API process) and size on disk."""
+    return await asyncio.to_thread(get_parse_cache().stats)
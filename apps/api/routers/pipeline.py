@@ -5,8 +5,9 @@ Pipeline Router — Triggers per-tenant data export to S3.
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlmodel import Session, select
 from pydantic import BaseModel
-from typing import Optional, List
-from uuid import UUID
+from typing import Optional, List, Dict, Any, Literal
+from uuid import UUID, uuid4
+from datetime import datetime, timezone
 
 from apps.api.database import engine, get_session
 from apps.api.models import Client, ConnectedRepository, ClientIntegration
@@ -15,8 +16,8 @@ from apps.api.utils.encryption import decrypt_dict
 import logging
 from apps.api.routers.integrations import SENSITIVE_KEYS
 from apps.api.ingestors.pipeline.ingestors import AWSIngestor, GitHubIngestor, GitHubLinkIngestor
-from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
-from apps.api.ingestors.pipeline.base import BaseIngestor, BaseExporter
+from apps.api.ingestors.pipeline.exporters import get_exporter
+from apps.api.ingestors.pipeline.base import BaseIngestor, BaseExporter, run_ingestors
 from apps.api.infrastructure.intermediate import ingest_to_all_clients
 
 logger = logging.getLogger(__name__)
@@ -36,6 +37,9 @@ class ExportRequest(BaseModel):
     include_aws: bool = True
     include_github: bool = True
     aws_region: str = "us-east-1"
+    aws_scan_mode: Literal["pruned", "full"] = "pruned"  # "pruned" skips regions probed as empty; "full" for audits
+    aws_region_allowlist: Optional[List[str]] = None
+    aws_region_denylist: Optional[List[str]] = None
     graph_name: Optional[str] = None
     repositories: Optional[List[RepositorySelection]] = None
 
@@ -48,20 +52,57 @@ class GithubLinkRequest(BaseModel):
 class ExportResponse(BaseModel):
     status: str
     message: str
+    job_id: Optional[str] = None
+
+class ExportJobResponse(BaseModel):
+    job_id: str
+    client_id: str
+    status: str  # "started" | "running" | "completed" | "failed"
+    started_at: str
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+    sources: List[str] = []
+    # Sources that failed or timed out: source name -> error
+    source_errors: Dict[str, str] = {}
+    # Per-client IR pipeline summary: stage_metrics, pipeline totals, node/edge counts
+    graphs: Dict[str, Any] = {}
+
+# Export jobs run as in-process background tasks, so their status lives in
+# process memory. Only the most recent jobs are kept.
+_EXPORT_JOBS: Dict[str, Dict[str, Any]] = {}
+_MAX_EXPORT_JOBS = 200
+
+def create_export_job(client_id: str) -> str:
+    job_id = str(uuid4())
+    _EXPORT_JOBS[job_id] = {
+        "job_id": job_id,
+        "client_id": str(client_id),
+        "status": "started",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+    }
+    while len(_EXPORT_JOBS) > _MAX_EXPORT_JOBS:
+        _EXPORT_JOBS.pop(next(iter(_EXPORT_JOBS)))
+    return job_id
+
+def _finish_export_job(job_id: str, status: str, **fields: Any) -> None:
+    job = _EXPORT_JOBS.get(job_id)
+    if job is not None:
+        job.update(status=status, finished_at=datetime.now(timezone.utc).isoformat(), **fields)
 
 async def run_export(
     client_id: str,
     ingestors: List[BaseIngestor],
     exporter: BaseExporter,
     graph_name: Optional[str] = None,
+    job_id: Optional[str] = None,
 ):
+    job_id = job_id or create_export_job(client_id)
+    _EXPORT_JOBS.get(job_id, {})["status"] = "running"
     try:
-        results = []
-        for ingestor in ingestors:
-            ingestor_results = await ingestor.ingest()
-            if ingestor_results:
-                results.extend(ingestor_results)
+        # Sources are independent: run them concurrently, each with its own timeout
+        results, source_errors = await run_ingestors(ingestors)
         
+        graphs: Dict[str, Any] = {}
         if results:
             await exporter.export(client_id=client_id, results=results, label="export")
             
@@ -70,11 +111,22 @@ async def run_export(
             combined_results = await exporter.load_current(client_id=client_id)
             if combined_results:
                 with Session(engine) as session:
-                    await ingest_to_all_clients(results=combined_results, original_client_id=client_id, graph_name=graph_name, session=session)
+                    graphs = await ingest_to_all_clients(results=combined_results, original_client_id=client_id, graph_name=graph_name, session=session)
             else:
                 logger.warning(f"No current state results found for client {client_id} despite successful export.")
+        _finish_export_job(job_id, "completed", sources=[r.source for r in results], graphs=graphs,
+                           source_errors=source_errors)
     except Exception as e:
         logger.error(f"Pipeline export failed: {e}")
+        _finish_export_job(job_id, "failed", error=str(e))
+
+@router.get("/export/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(job_id: str):
+    """Status of an export job, with IR pipeline stage metrics once completed."""
+    job = _EXPORT_JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return ExportJobResponse(**job)
 
 @router.post("/export", response_model=ExportResponse)
 async def trigger_export(
@@ -100,7 +152,13 @@ async def trigger_export(
     ingestors: List[BaseIngestor] = []
     if request.include_aws:
         aws_creds = decrypt_dict(aws_integration.credentials, SENSITIVE_KEYS) if aws_integration else {}
-        ingestors.append(AWSIngestor(region_name="us-east-1", credentials=aws_creds))
+        ingestors.append(AWSIngestor(
+            region_name="us-east-1",
+            credentials=aws_creds,
+            scan_mode=request.aws_scan_mode,
+            region_allowlist=request.aws_region_allowlist,
+            region_denylist=request.aws_region_denylist,
+        ))
     
     if request.include_github:
         if request.repositories:
@@ -130,13 +188,17 @@ async def trigger_export(
             
             session.commit()
 
-            # Now add ingestors for the requested repos
-            for repo_info in request.repositories:
-                ingestors.append(GitHubIngestor(client_id=request.client_id, session=session, repo_url=repo_info.repo_url))
+            # One ingestor for the requested repos: it bounds how many run at once
+            ingestors.append(GitHubIngestor(
+                client_id=request.client_id,
+                session=session,
+                repo_urls=[repo_info.repo_url for repo_info in request.repositories],
+            ))
         else:
             ingestors.append(GitHubIngestor(client_id=request.client_id, session=session))
 
-    exporter = S3Exporter()
+    exporter = get_exporter()
+    job_id = create_export_job(request.client_id)
 
     background_tasks.add_task(
         run_export,
@@ -144,11 +206,13 @@ async def trigger_export(
         ingestors=ingestors,
         exporter=exporter,
         graph_name=request.graph_name,
+        job_id=job_id,
     )
 
     return ExportResponse(
         status="started",
         message=f"Export pipeline started for client {request.client_id}. Data will be exported to S3.",
+        job_id=job_id,
     )
 
 @router.post("/github-link", response_model=ExportResponse)
@@ -180,7 +244,8 @@ async def trigger_github_link(
         GitHubLinkIngestor(repo_url=request.repo_url, branch=request.branch),
         AWSIngestor(region_name="us-east-1", credentials=aws_creds)
     ]
-    exporter = S3Exporter()
+    exporter = get_exporter()
+    job_id = create_export_job(str(request.client_id))
 
     background_tasks.add_task(
         run_export, # Use run_export instead of run_github_link to handle multiple ingestors
@@ -188,9 +253,11 @@ async def trigger_github_link(
         ingestors=ingestors,
         exporter=exporter,
         graph_name=request.graph_name,
+        job_id=job_id,
     )
 
     return ExportResponse(
         status="started",
         message=f"GitHub link ingestion started for client {request.client_id}. Data will be exported to S3.",
+        job_id=job_id,
     )
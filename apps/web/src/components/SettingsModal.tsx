@@ -501,6 +501,13 @@ export default function SettingsModal({ isOpen, onClose, initialTab }: SettingsM
 
                                                 {datalakeExpanded && (
                                                     <div className="bg-gray-950 rounded-lg border border-gray-800 p-3 max-h-40 overflow-y-auto">
+                                                        {datalake.folders?.map((f: any) => (
+                                                            <div key={f.prefix} className="flex items-center gap-2 py-1 text-[11px] font-mono text-gray-300">
+                                                                <HardDrive className="w-3 h-3 text-emerald-500 shrink-0" />
+                                                                <span className="truncate">{f.name}/</span>
+                                                                <span className="text-gray-600 ml-auto shrink-0">{f.objects} · {f.size_bytes > 1024 ? `${(f.size_bytes / 1024).toFixed(1)}KB` : `${f.size_bytes}B`}</span>
+                                                            </div>
+                                                        ))}
                                                         {datalake.files.map((f: any, i: number) => (
                                                             <div key={i} className="flex items-center gap-2 py-1 text-[11px] font-mono text-gray-400 hover:text-gray-200 transition-colors">
                                                                 <FileJson className="w-3 h-3 text-emerald-600 shrink-0" />
@@ -517,7 +524,7 @@ export default function SettingsModal({ isOpen, onClose, initialTab }: SettingsM
                                                         <button onClick={() => setJsonExpanded(!jsonExpanded)} className="flex items-center gap-2 text-xs text-gray-300 hover:text-white transition-colors w-full">
                                                             {jsonExpanded ? <ChevronDown className="w-3.5 h-3.5" /> : <ChevronRight className="w-3.5 h-3.5" />}
                                                             <FileJson className="w-3.5 h-3.5 text-blue-500" />
-                                                            <span>latest.json</span>
+                                                            <span>current/{datalake.latest_payload.source}.json</span>
                                                             <span className="ml-auto text-[10px] text-gray-600">schema: {datalake.latest_payload.schema_version} · {datalake.latest_payload.ingestion_metadata?.commit_sha?.slice(0, 7)}</span>
                                                         </button>
                                                         {jsonExpanded && (
@@ -0,0 +1,62 @@
+"""
+SignalAggregator deduplication benchmark: scoring every merged signal vs blocking.
+
+Generates --signals signals (default 5000 and 50000) named the way
+Terraform, compose and dependency signals are in large monorepos —
+environment, service and role words joined with '-' or '_' in varying
+order, plus instance tokens (--unique of them, e.g. 'pay042'), numbers
+and a share of 'dep-' package signals —
+spread over six component types, and deduplicates them at the pipeline's
+threshold (70) with:
+
+  * greedy      — what SignalAggregator did before: each signal compared
+                  with thefuzz against every merged signal so far, first
+                  match wins (skipped past --greedy-max signals)
+  * blocked     — SignalAggregator now: scored only against merged signals
+                  sharing a blocking key, in one rapidfuzz call per chunk
+
+Each run reports the merged signal count and how many merged signals
+differ (name, confidence, sources or config) from greedy's where greedy
+ran: any difference comes from a match blocking missed.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_aggregator [--signals 5000 50000]
+"""
+
+import time
+import random
+import argparse
+
+from apps.api.ingestors.github.aggregator import SignalAggregator
+from tests.fixtures.signals import greedy, make_signals, signal_names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--signals", type=int, nargs="+", default=[5000, 50000])
+    parser.add_argument("--threshold", type=int, default=70)
+    parser.add_argument("--unique", type=float, default=0.5)
+    parser.add_argument("--greedy-max", type=int, default=5000)
+    args = parser.parse_args()
+
+    for n in args.signals:
+        names = signal_names(random.Random(n), n, args.unique)
+        print(f"{n} signals, {len(set(names))} distinct (type, name)")
+        print(f"{'':<10}{'seconds':>9}{'signals out':>13}{'differ':>8}")
+        runs = [("blocked", lambda s: SignalAggregator(args.threshold).aggregate(s))]
+        if n <= args.greedy_max:
+            runs.insert(0, ("greedy", lambda s: greedy(s, args.threshold)))
+        reference = None
+        for name, run in runs:
+            signals = make_signals(names)
+            start = time.perf_counter()
+            out = {s.source_location: s.model_dump() for s in run(signals)}
+            elapsed = time.perf_counter() - start
+            if reference is None and name == "greedy":
+                reference = out
+            differ = "" if reference is None else sum(reference.get(k) != v for k, v in out.items())
+            print(f"{name:<10}{elapsed:>9.2f}{len(out):>13}{differ:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Columnar (Arrow IPC) snapshots vs raw_v1 JSON: load/parse benchmark.
+
+Builds a synthetic AWS result (default 100k nodes, each with its boto3
+``raw`` payload under properties) and writes it to a temp directory both
+as an indent-free raw_v1 JSON document and as a columnar snapshot. Then
+times, best of --repeat:
+
+  * parse — file to plain dicts (json.loads vs ColumnarSnapshot.to_blocks)
+  * load  — file to DiscoveryResults (what load_current returns; JSON
+            as S3Exporter reads single-document payloads, columnar via
+            read_snapshot)
+
+for the full, no_heavy and structure projections (JSON has to parse
+everything whatever the projection), plus opening the snapshot and
+reading one cell, which pa.memory_map makes independent of file size.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_columnar [--nodes 100000] [--repeat 3]
+"""
+
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+from apps.api.ingestors.pipeline.columnar import (
+    ColumnarSnapshot, encode_snapshot, read_snapshot, snapshot_size, write_snapshot,
+)
+from apps.api.ingestors.pipeline.s3_exporter import PROJECTIONS, _project_properties
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult
+from tests.fixtures.synthetic import make_scan
+
+
+def make_result(nodes: int) -> DiscoveryResult:
+    scan = make_scan(nodes)
+    result = scan.to_discovery_result()
+    for node, topology_node in zip(result.nodes, scan.nodes):
+        node.properties["raw"] = topology_node.raw
+    return result
+
+
+def json_blocks(path: Path, projection: str) -> list:
+    blocks = json.loads(path.read_bytes())["sources"]
+    if projection != "full":
+        for block in blocks:
+            block["nodes"] = [_project_properties(n, projection) for n in block["nodes"]]
+    return blocks
+
+
+def columnar_blocks(path: Path, projection: str) -> list:
+    with ColumnarSnapshot(path) as snapshot:
+        return snapshot.to_blocks(projection)
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    result = make_result(args.nodes)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, col_path = Path(tmp) / "aws.json", Path(tmp) / "aws.arrow"
+        payload = {"schema_version": "raw_v1", "sources": [json.loads(result.model_dump_json())]}
+        start = time.perf_counter()
+        json_path.write_text(json.dumps(payload, separators=(",", ":")))
+        json_write = time.perf_counter() - start
+        start = time.perf_counter()
+        write_snapshot(col_path, encode_snapshot([result]))
+        col_write = time.perf_counter() - start
+        del payload
+
+        print(f"{args.nodes} nodes, {len(result.edges)} edges")
+        print(f"write    json {json_write:6.2f}s {json_path.stat().st_size / 2**20:7.1f} MB"
+              f"   columnar {col_write:6.2f}s {snapshot_size(col_path) / 2**20:7.1f} MB")
+        del result
+
+        print(f"{'projection':<11}{'json parse':>11}{'col parse':>11}{'json load':>11}{'col load':>11}")
+        for projection in PROJECTIONS:
+            row = [
+                best_of(args.repeat, json_blocks, json_path, projection),
+                best_of(args.repeat, columnar_blocks, col_path, projection),
+                best_of(args.repeat, lambda: [DiscoveryResult(**b) for b in json_blocks(json_path, projection)]),
+                best_of(args.repeat, read_snapshot, col_path, projection),
+            ]
+            print(f"{projection:<11}" + "".join(f"{t:>10.2f}s" for t in row))
+
+        def one_cell():
+            with ColumnarSnapshot(col_path) as snapshot:
+                return snapshot.value("nodes", "properties", args.nodes // 2)
+
+        print(f"open + read one cell: {best_of(args.repeat, one_cell) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Containment benchmark: first-VPC assignment vs ContainmentIndex.
+
+Normalizes a synthetic AWS inventory (default 200 VPCs with 4 subnets
+each, 20k resources) and times:
+
+  * legacy — every vm / sql-db / serverless / container to vpc_nodes[0]
+  * index  — ContainmentIndex.build from vpc_id / subnet_id(s)
+
+plus the ValidateStage empty-container check on the resulting hierarchy.
+"placed correctly" counts resources whose parent is their own subnet or
+VPC per their properties.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_containment [--vpcs 200] [--resources 20000]
+"""
+
+import time
+import argparse
+
+from apps.api.infrastructure.processor.base import ProcessingContext
+from apps.api.infrastructure.processor.normalize import NormalizeStage
+from apps.api.infrastructure.processor.containment import ContainmentIndex
+from apps.api.infrastructure.processor.enrich import EnrichStage
+from apps.api.infrastructure.processor.validate import ValidateStage
+from tests.fixtures.synthetic import make_raw_sources
+
+
+def legacy_plan(context):
+    vpc_nodes = context.nodes.by_template("vpc")
+    if not vpc_nodes:
+        return {}
+    return {
+        n.id: vpc_nodes[0].id for n in context.nodes.values()
+        if n.source == "aws" and n.template_id in ["vm", "sql-db", "serverless", "container", "security-group"]
+    }
+
+
+def correct(context, parents: dict) -> int:
+    ok = 0
+    for node_id, parent_id in parents.items():
+        props = context.nodes[node_id].properties
+        parent = context.nodes[parent_id].properties
+        if parent.get("resource_type") == "network/subnet":
+            ok += parent["subnet_id"] in ([props.get("subnet_id")] + list(props.get("subnet_ids") or []))
+        else:
+            ok += parent.get("vpc_id") == props.get("vpc_id")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vpcs", type=int, default=200)
+    parser.add_argument("--subnets", type=int, default=4)
+    parser.add_argument("--resources", type=int, default=20_000)
+    args = parser.parse_args()
+
+    network = args.vpcs * (1 + args.subnets)
+    raw_github, raw_aws = make_raw_sources(
+        network + args.resources, 0, 0, vpcs=args.vpcs, containers=0, subnets_per_vpc=args.subnets,
+    )
+    context = NormalizeStage().run(ProcessingContext(raw_github, raw_aws))
+
+    start = time.perf_counter()
+    legacy = legacy_plan(context)
+    legacy_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = ContainmentIndex.build(context.nodes.values())
+    index_secs = time.perf_counter() - start
+
+    stage = EnrichStage()
+    stage._apply_containment(context, index)
+    start = time.perf_counter()
+    ValidateStage().run(context)
+    validate_secs = time.perf_counter() - start
+
+    resources = sum(1 for n in context.nodes.values()
+                    if n.properties.get("resource_type") not in ("network/vpc", "network/subnet"))
+    print(f"Containment, {args.vpcs} VPCs x {args.subnets} subnets, {resources} resources")
+    print(f"{'variant':<10}{'seconds':>10}{'placed':>9}{'correct':>9}{'parents':>9}")
+    print(f"{'legacy':<10}{legacy_secs:>10.4f}{len(legacy):>9}{correct(context, legacy):>9}{len(set(legacy.values())):>9}")
+    print(f"{'index':<10}{index_secs:>10.4f}{len(index.parent):>9}{correct(context, index.parent):>9}{len(index.children):>9}")
+    print(f"validate (whole stage, reusing children map): {validate_secs:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
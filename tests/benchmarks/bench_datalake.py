@@ -0,0 +1,88 @@
+"""
+Datalake preview benchmark: old handler vs DatalakeBrowser.
+
+Exports one synthetic AWS source (default 50k nodes) through S3Exporter
+into the in-memory S3 with --latency-ms per request, adds --objects
+filler objects under the client prefix and limits reads to --mbps, then
+times:
+
+  * old     — what GET /github/datalake used to do: a new exporter, one
+              1000-key list_objects_v2 and a full GET of the current
+              payload (here the current blob, the only payload that exists)
+  * cold    — DatalakeBrowser: first page, folder totals, current
+              manifests and a 20-node range-read preview, empty cache
+  * warm    — the same calls again within the TTL
+
+reporting wall time, requests and bytes downloaded for each.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_datalake [--nodes 50000] [--objects 5000] [--latency-ms 20] [--mbps 100]
+"""
+
+import json
+import time
+import asyncio
+import argparse
+
+from apps.api.ingestors.pipeline.datalake import DatalakeBrowser
+from apps.api.ingestors.pipeline.s3_exporter import S3Exporter, decompress
+from tests.fixtures.fake_s3 import InMemoryS3
+from tests.fixtures.synthetic import make_scan
+
+CLIENT_ID = "bench-client"
+
+
+def old_handler(s3: InMemoryS3) -> int:
+    """Returns how many objects the old single list call saw."""
+    response = s3.list_objects_v2(Bucket="bench", Prefix=f"{CLIENT_ID}/")
+    manifest = s3.get_object(Bucket="bench", Key=f"{CLIENT_ID}/current/aws.json")["Body"].read()
+    blob_key = json.loads(manifest)["blob_key"]
+    decompress(s3.get_object(Bucket="bench", Key=blob_key)["Body"].read(), "zstd")
+    return len(response.get("Contents", []))
+
+
+def browse(browser: DatalakeBrowser) -> int:
+    page = browser.list(CLIENT_ID)
+    browser.sources(CLIENT_ID)
+    browser.preview(CLIENT_ID, "aws", nodes=20)
+    return page["total"]["objects"]
+
+
+def measure(s3: InMemoryS3, fn, *args):
+    s3.reset_counters()
+    start = time.perf_counter()
+    seen = fn(*args)
+    return time.perf_counter() - start, sum(s3.requests.values()), s3.bytes_downloaded, seen
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=50_000)
+    parser.add_argument("--objects", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--mbps", type=float, default=100)
+    args = parser.parse_args()
+
+    s3 = InMemoryS3()
+    scan = make_scan(args.nodes)
+    result = scan.to_discovery_result()
+    for node, topology_node in zip(result.nodes, scan.nodes):
+        node.properties["raw"] = topology_node.raw
+    asyncio.run(S3Exporter(s3_client=s3, bucket="bench", record_history=False).export(CLIENT_ID, [result]))
+    for i in range(args.objects):
+        s3.put_object(Bucket="bench", Key=f"{CLIENT_ID}/exports/{i % 50:02d}/{i:06d}.json", Body=b"{}")
+    blob = next(v for (b, k), v in s3.objects.items() if "/history/" in k)
+    print(f"{args.nodes} nodes ({len(blob['Body']) / 2**20:.1f} MB blob), "
+          f"{len(s3.objects)} objects, {args.latency_ms:g}ms per request, {args.mbps:g} Mbit/s")
+
+    s3.latency_s = args.latency_ms / 1000
+    s3.bandwidth_bps = args.mbps * 1e6 / 8
+    browser = DatalakeBrowser(s3, "bench")
+    print(f"{'':<8}{'seconds':>9}{'requests':>10}{'KB read':>10}{'objects counted':>17}")
+    for name, fn, fn_args in (("old", old_handler, (s3,)), ("cold", browse, (browser,)), ("warm", browse, (browser,))):
+        secs, requests, downloaded, seen = measure(s3, fn, *fn_args)
+        print(f"{name:<8}{secs:>9.2f}{requests:>10}{downloaded / 1024:>10.1f}{seen:>17}")
+
+
+if __name__ == "__main__":
+    main()
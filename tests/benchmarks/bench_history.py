@@ -0,0 +1,171 @@
+"""
+Snapshot history benchmark: full snapshot per run vs base + delta timeline.
+
+Simulates --days daily scans of one AWS source (default 500 days, 2000
+nodes to start; each day ~1% of nodes change, ~0.3% appear and ~0.2% go
+away, with their edges) and reports:
+
+  * storage — the old exporter's timestamped indent=2 JSON per run, the
+    content-addressed compressed NDJSON blobs (one per distinct state), and
+    the SnapshotHistory timeline before and after compact() (older than
+    90 days thinned to weekly)
+  * load_at latency — random days, full snapshot GET + parse vs timeline
+    replay (base + deltas), against the in-memory S3 with --latency-ms
+    per request
+  * diff latency — random (t1, t2) pairs
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_history [--days 500] [--nodes 2000] [--latency-ms 10]
+"""
+
+import json
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta, timezone
+
+from apps.api.ingestors.pipeline.history import SnapshotHistory, S3ObjectStore, edge_id
+from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult
+from tests.fixtures.fake_s3 import InMemoryS3
+
+CLIENT_ID = "bench-client"
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_node(i: int, rng: random.Random, version: int = 0) -> dict:
+    return {
+        "key": f"aws:i-{i:07d}", "display_name": f"i-{i}", "node_type": "compute",
+        "node_subtype": "compute/instance",
+        "properties": {
+            "state": rng.choice(["running", "stopped"]), "instance_type": rng.choice(["t3.micro", "m5.large"]),
+            "vpc_id": f"vpc-{i % 20}", "version": version,
+            "raw": {"InstanceId": f"i-{i:07d}", "ImageId": f"ami-{rng.getrandbits(32):08x}",
+                    "Tags": [{"Key": "Name", "Value": f"i-{i}"}, {"Key": "team", "Value": "platform"}]},
+        },
+        "source_metadata": {"arn": f"arn:aws:ec2:us-east-1:123456789012:instance/i-{i:07d}"},
+    }
+
+
+def make_edge(a: int, b: int) -> dict:
+    return {"from_node_key": f"aws:i-{a:07d}", "to_node_key": f"aws:i-{b:07d}", "edge_type": "references",
+            "direction": "outbound", "properties": {}}
+
+
+def simulate(days: int, nodes: int, seed: int = 11):
+    """Daily (nodes, edges) dicts; unchanged node dicts are shared between days."""
+    rng = random.Random(seed)
+    current = {i: make_node(i, rng) for i in range(nodes)}
+    edges = {edge_id(e): e for e in (make_edge(i, (i + 1) % nodes) for i in range(nodes))}
+    next_id = nodes
+    for day in range(days):
+        if day:
+            current, edges = dict(current), dict(edges)
+            ids = list(current)
+            for i in rng.sample(ids, max(1, len(ids) // 100)):
+                current[i] = make_node(i, rng, version=day)
+            for i in rng.sample(ids, max(1, len(ids) // 500)):
+                del current[i]
+                key = f"aws:i-{i:07d}"
+                edges = {k: e for k, e in edges.items() if key not in (e["from_node_key"], e["to_node_key"])}
+            for _ in range(max(1, len(ids) * 3 // 1000)):
+                current[next_id] = make_node(next_id, rng)
+                e = make_edge(next_id, rng.choice(ids))
+                edges[edge_id(e)] = e
+                next_id += 1
+        yield START + timedelta(days=day), list(current.values()), list(edges.values())
+
+
+def result_for(nodes, edges) -> DiscoveryResult:
+    return DiscoveryResult(source="aws", nodes=nodes, edges=edges, metadata={})
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.95) - 1] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=500)
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=10)
+    parser.add_argument("--samples", type=int, default=30)
+    args = parser.parse_args()
+    rng = random.Random(5)
+
+    s3 = InMemoryS3()
+    history = SnapshotHistory(S3ObjectStore(s3, "bench"))
+    exporter = S3Exporter(s3_client=s3, bucket="bench", record_history=False)
+    sample_days = set(rng.sample(range(args.days), min(args.samples, args.days)))
+    legacy_bytes = blob_bytes = 0
+    blob_hashes = set()
+
+    start = time.perf_counter()
+    for day, (at, nodes, edges) in enumerate(simulate(args.days, args.nodes)):
+        result = result_for(nodes, edges)
+        payload = {"schema_version": "raw_v1", "sources": [exporter._result_to_dict(result)]}
+        legacy = json.dumps(payload, indent=2, default=str).encode("utf-8")
+        legacy_bytes += len(legacy)
+        if day in sample_days: # only the days read back below are kept
+            s3.put_object(Bucket="bench", Key=f"legacy/{at:%Y-%m-%d}.json", Body=legacy)
+        content_hash = result.content_hash()
+        if content_hash not in blob_hashes:
+            blob_hashes.add(content_hash)
+            blob_bytes += len(exporter._encode_payload({"schema_version": "raw_v1"}, [result])[1])
+        history.record(CLIENT_ID, "aws", [result], at=at)
+    record_secs = time.perf_counter() - start
+
+    entries = history.timeline(CLIENT_ID, "aws")
+    timeline_bytes = sum(e["stored_bytes"] for e in entries)
+    bases = sum(e["kind"] == "base" for e in entries)
+    print(f"{args.days} daily snapshots, {args.nodes} nodes at the start, {entries[-1]['nodes']} at the end "
+          f"(recorded in {record_secs:.1f}s)")
+    print(f"{'storage':<34}{'MB':>9}")
+    print(f"{'full JSON per run (old exporter)':<34}{legacy_bytes / 2**20:>9.1f}")
+    print(f"{'content-addressed ndjson.zst':<34}{blob_bytes / 2**20:>9.1f}")
+    print(f"{'timeline (' + str(bases) + ' bases, ' + str(len(entries) - bases) + ' deltas)':<34}"
+          f"{timeline_bytes / 2**20:>9.1f}")
+
+    # ── Reads ──
+    s3.latency_s = args.latency_ms / 1000
+    days = sorted(sample_days)
+
+    legacy_times, replay_times = [], []
+    for day in days:
+        t = time.perf_counter()
+        key = f"legacy/{START + timedelta(days=day):%Y-%m-%d}.json"
+        payload = json.loads(s3.get_object(Bucket="bench", Key=key)["Body"].read())
+        [DiscoveryResult(**b) for b in payload["sources"]]
+        legacy_times.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        history.load_at(CLIENT_ID, START + timedelta(days=day, hours=12))
+        replay_times.append(time.perf_counter() - t)
+
+    diff_times = []
+    for _ in range(len(days)):
+        t1, t2 = sorted(rng.sample(range(args.days), 2))
+        t = time.perf_counter()
+        history.diff(CLIENT_ID, START + timedelta(days=t1), START + timedelta(days=t2))
+        diff_times.append(time.perf_counter() - t)
+
+    print(f"\n{args.latency_ms:g}ms per GET, {len(days)} random days   p50 ms   p95 ms")
+    for name, samples in (("load_at, full snapshot", legacy_times), ("load_at, timeline replay", replay_times),
+                          ("diff(t1, t2), timeline", diff_times)):
+        p50, p95 = percentiles(samples)
+        print(f"{name:<38}{p50:>8.1f}{p95:>9.1f}")
+
+    # ── Compaction ──
+    s3.latency_s = 0
+    cutoff = START + timedelta(days=args.days - 90)
+    t = time.perf_counter()
+    stats = history.compact(CLIENT_ID, "aws", cutoff, timedelta(days=7))
+    print(f"\ncompact (older than 90 days -> weekly): {stats['entries_before']} -> {stats['entries_after']} "
+          f"entries, {stats['bytes_before'] / 2**20:.1f} -> {stats['bytes_after'] / 2**20:.1f} MB "
+          f"in {time.perf_counter() - t:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+GitHub ingestion benchmark: full run vs changed-files-only vs unchanged.
+
+Builds the same local bare repository as bench_repo_cache (default 1000
+Terraform files), then times GitHubIngestionPipeline.run:
+
+  * full       — empty repo cache and no recorded state (what every run
+                 used to cost, minus the clone now served by the mirror)
+  * push       — after a push touching --changed files: git diff on the
+                 mirror, only those files reparsed
+  * unchanged  — same commit, with the SHA and content_hash the
+                 ingestor records on ConnectedRepository: no checkout or
+                 parsing at all
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_incremental_ingestion [--files 1000] [--changed 10]
+"""
+
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+from apps.api.ingestors.github.pipeline import GitHubIngestionPipeline
+from apps.api.ingestors.github.repo_cache import RepoCache
+from tests.benchmarks.bench_repo_cache import build_remote, git
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--changed", type=int, default=10)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        remote, work, paths, rng, write = build_remote(root, args.files, commits=2)
+        url = f"file://{remote}"
+        cache = RepoCache(root / "cache")
+        print(f"{args.files} Terraform files, {args.changed} changed by the push")
+        print(f"{'':<11}{'seconds':>9}{'files parsed':>14}{'nodes':>8}")
+
+        last = {}
+        for name in ("full", "push", "unchanged"):
+            if name == "push":
+                write(rng.sample(paths, args.changed))
+                git("push", "--quiet", str(remote), "main", cwd=work)
+            pipeline = GitHubIngestionPipeline(url, "main", repo_cache=cache, **last)
+            start = time.perf_counter()
+            result = asyncio.run(pipeline.run())
+            elapsed = time.perf_counter() - start
+            print(f"{name:<11}{elapsed:>9.2f}{result.metadata['reparsed_files']:>14}{len(result.nodes):>8}")
+            last = {"last_commit_sha": result.metadata["commit_sha"],
+                    "last_content_hash": result.metadata["content_hash"]}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Cross-provider inference benchmark: Cartesian product vs evidence rules.
+
+Builds G GitHub compose services and A AWS resources (S3 / SQS / RDS).
+Every service references two resources through its environment (a
+bucket name and a queue URL or DSN) and carries a few unrelated vars.
+Times EnrichStage._generate_inferred_edges against the previous
+every-service-to-every-resource loop and reports edges emitted.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_inferred_edges [--sizes 10x100,50x500,100x1000,200x2000]
+"""
+
+import time
+import argparse
+
+from apps.api.infrastructure.processor.base import ProcessingContext, IREdge
+from apps.api.infrastructure.processor.normalize import NormalizeStage
+from apps.api.infrastructure.processor.resolve import ResolveStage
+from apps.api.infrastructure.processor.enrich import EnrichStage
+
+ACCOUNT = "123456789012"
+
+
+def make_inputs(services: int, resources: int) -> tuple[dict, dict]:
+    aws = []
+    for i in range(resources):
+        kind = ("S3", "SQS", "RDS")[i % 3]
+        name = f"app{i}-{kind.lower()}"
+        hints = {"arn": f"arn:aws:{kind.lower()}:us-east-1:{ACCOUNT}:{name}", "resource_id": name, "name_tag": name}
+        if kind == "SQS":
+            hints["queue_url"] = f"https://sqs.us-east-1.amazonaws.com/{ACCOUNT}/{name}"
+        if kind == "RDS":
+            hints["endpoint"] = f"{name}.abc123.us-east-1.rds.amazonaws.com"
+        aws.append({"key": f"aws::us-east-1::{kind.lower()}::{name}", "display_name": name,
+                    "properties": {"service": kind}, "source_metadata": hints})
+
+    github = []
+    for s in range(services):
+        bucket = aws[(s * 3) % resources]["source_metadata"]
+        other = aws[(s * 3 + 1 + (s % 2)) % resources]["source_metadata"]
+        ref = other.get("queue_url") or f"postgresql://app:pw@{other.get('endpoint')}:5432/app"
+        github.append({"key": f"github:org/repo:compute:svc{s}", "display_name": f"svc{s}", "properties": {
+            "image": "python:3.11",
+            "environment": {"BUCKET": bucket["resource_id"], "BACKEND_URL": ref,
+                            "LOG_LEVEL": "info", "PORT": "8080", "FEATURE_FLAGS": "a,b,c"},
+        }})
+    return ({"sources": [{"nodes": github, "edges": []}]},
+            {"sources": [{"nodes": aws, "edges": [{"from_node_key": aws[0]["key"], "to_node_key": aws[1]["key"]}]}]})
+
+
+def legacy_edges(context: ProcessingContext) -> int:
+    github_services = [n for n in context.nodes.values()
+                       if n.source == "github" and n.node_type == "compute" or n.template_id == "api-service"]
+    aws_resources = [n for n in context.nodes.values()
+                     if n.source == "aws" and n.node_type in ["storage", "database", "compute"]]
+    edges = []
+    for g in github_services:
+        for a in aws_resources:
+            edges.append(IREdge(id=f"inferred-cross-provider-{len(edges)}", from_node_id=g.id, to_node_id=a.id,
+                                edge_type="accesses", source="inferred", confidence=0.7, environment="both",
+                                properties={"inference_rule": "cross_provider_dependency"}))
+    return len(edges)
+
+
+def prepared(services: int, resources: int) -> ProcessingContext:
+    raw_github, raw_aws = make_inputs(services, resources)
+    context = ProcessingContext(raw_github, raw_aws)
+    for stage in (NormalizeStage(), ResolveStage()):
+        context = stage.run(context)
+    return context
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10x100,50x500,100x1000,200x2000")
+    args = parser.parse_args()
+
+    print(f"{'G x A':<12}{'legacy edges':>14}{'legacy s':>10}{'rule edges':>12}{'rule s':>10}")
+    for size in args.sizes.split(","):
+        g, a = (int(x) for x in size.split("x"))
+
+        context = prepared(g, a)
+        start = time.perf_counter()
+        old = legacy_edges(context)
+        old_secs = time.perf_counter() - start
+
+        context = prepared(g, a)
+        before = len(context.edges)
+        start = time.perf_counter()
+        EnrichStage()._generate_inferred_edges(context)
+        new_secs = time.perf_counter() - start
+
+        print(f"{size:<12}{old:>14}{old_secs:>10.3f}{len(context.edges) - before:>12}{new_secs:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
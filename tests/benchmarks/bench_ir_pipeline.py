@@ -0,0 +1,44 @@
+"""
+IR pipeline benchmark: InfrastructurePipeline.execute end to end.
+
+Reports the per-stage metrics the pipeline records in
+graph_metadata["stage_metrics"] on a synthetic raw_github / raw_aws
+payload (default 10k nodes, 50k edges), for each --workers setting,
+with trace_memory on so each stage reports its tracemalloc peak.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_ir_pipeline [--nodes 10000] [--edges 50000] [--workers 1,4]
+"""
+
+import argparse
+
+from apps.api.infrastructure.processor.pipeline import InfrastructurePipeline
+from tests.fixtures.synthetic import make_raw_sources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=10_000)
+    parser.add_argument("--edges", type=int, default=50_000)
+    parser.add_argument("--github-share", type=float, default=0.4)
+    parser.add_argument("--workers", default="1,4")
+    args = parser.parse_args()
+
+    github_nodes = int(args.nodes * args.github_share)
+    raw_github, raw_aws = make_raw_sources(args.nodes - github_nodes, github_nodes, args.edges)
+
+    print(f"InfrastructurePipeline.execute, {args.nodes} nodes / {args.edges} edges in")
+    for workers in (int(w) for w in args.workers.split(",")):
+        context = InfrastructurePipeline(max_workers=workers, trace_memory=True).execute(raw_github, raw_aws)
+        print(f"max_workers={workers}")
+        for m in context.graph_metadata["stage_metrics"]:
+            print(
+                f"  {m['stage']:<10}{m['duration_ms'] / 1000:>9.3f}s"
+                f"  nodes {m['nodes_in']:>6} -> {m['nodes_out']:<6}"
+                f"  edges {m['edges_in']:>6} -> {m['edges_out']:<6}  peak {m['traced_peak_mb']} MB"
+            )
+        print(f"  {'total':<10}{context.graph_metadata['pipeline']['duration_ms'] / 1000:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
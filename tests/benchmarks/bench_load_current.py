@@ -0,0 +1,131 @@
+"""
+S3Exporter.load_current benchmark: serial full-document loads vs the
+paginated, concurrent, streaming loader.
+
+Stores --sources sources of roughly --mb MB each (as the previous
+exporter wrote them: indent=2 JSON with the full payload in current/)
+and the same results exported by S3Exporter (manifest + compressed NDJSON
+blob), then loads the client's current state with:
+
+  * legacy    — one list call, serial get_object + json.loads per source
+  * full      — load_current(projection="full")
+  * no_heavy  — load_current(projection="no_heavy"), drops raw payloads
+  * structure — load_current(projection="structure"), skips property records
+
+The in-memory S3 adds --latency-ms per request and a --mbps bandwidth
+cap so transfer size and concurrency matter as they would against S3.
+Each variant runs in a fresh process so one does not warm up the next.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_load_current [--sources 20] [--mb 50] [--latency-ms 20] [--mbps 100]
+"""
+
+import sys
+import json
+import time
+import pickle
+import asyncio
+import argparse
+import subprocess
+
+from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult, DiscoveryNode, DiscoveryEdge
+from tests.fixtures.fake_s3 import InMemoryS3
+
+CLIENT_ID = "bench-client"
+BUCKET = "bench"
+NODE_BYTES = 2300 # approx. indent=2 JSON size of one generated node
+
+
+def make_result(source: str, nodes: int) -> DiscoveryResult:
+    return DiscoveryResult(source=source, nodes=[
+        DiscoveryNode(
+            key=f"{source}:i-{i:07d}", display_name=f"i-{i}", node_type="compute", node_subtype="compute/instance",
+            properties={
+                "state": "running", "instance_type": "m5.large", "vpc_id": f"vpc-{i % 50}",
+                "raw": {
+                    "InstanceId": f"i-{i:07d}", "ImageId": f"ami-{i * 7919 % 10**8:08d}",
+                    "BlockDeviceMappings": [{"DeviceName": f"/dev/xvd{c}", "Ebs": {"VolumeId": f"vol-{i}{c}"}}
+                                            for c in "abcd"],
+                    "Tags": [{"Key": f"tag-{t}", "Value": f"value-{i}-{t}"} for t in range(6)],
+                },
+            },
+            source_metadata={"arn": f"arn:aws:ec2:us-east-1:123456789012:instance/i-{i:07d}"},
+        )
+        for i in range(nodes)
+    ], edges=[
+        DiscoveryEdge(from_node_key=f"{source}:i-{i:07d}", to_node_key=f"{source}:i-{(i + 1) % nodes:07d}",
+                      edge_type="references")
+        for i in range(nodes)
+    ])
+
+
+def legacy_load(s3: InMemoryS3, client_id: str):
+    results = []
+    response = s3.list_objects_v2(Bucket=BUCKET, Prefix=f"{client_id}/current/")
+    for obj in response.get("Contents", []):
+        payload = json.loads(s3.get_object(Bucket=BUCKET, Key=obj["Key"])["Body"].read().decode("utf-8"))
+        for source_data in payload.get("sources", []):
+            results.append(DiscoveryResult(**source_data))
+    return results
+
+
+def build_bucket(sources: int, mb: float, path: str) -> None:
+    nodes = int(mb * 2**20 / NODE_BYTES)
+    legacy, current = InMemoryS3(), InMemoryS3()
+    exporter = S3Exporter(s3_client=current, bucket=BUCKET)
+    for s in range(sources):
+        result = make_result(f"aws-{s:02d}", nodes)
+        body = json.dumps({"schema_version": "raw_v1", "sources": [exporter._result_to_dict(result)]},
+                          indent=2, default=str)
+        legacy.put_object(Bucket=BUCKET, Key=f"{CLIENT_ID}/current/{result.source}.json", Body=body)
+        asyncio.run(exporter.export(CLIENT_ID, [result]))
+    with open(path, "wb") as f:
+        pickle.dump({"legacy": legacy.objects, "current": current.objects, "nodes": nodes}, f)
+
+
+def run_variant(path: str, variant: str, latency_s: float, bandwidth_bps: float) -> None:
+    with open(path, "rb") as f:
+        stored = pickle.load(f)
+    s3 = InMemoryS3(latency_s=latency_s, bandwidth_bps=bandwidth_bps)
+    s3.objects = stored["legacy" if variant == "legacy" else "current"]
+    stored_mb = sum(len(o["Body"]) for o in s3.objects.values()) / 2**20
+    del stored
+
+    start = time.perf_counter()
+    if variant == "legacy":
+        results = legacy_load(s3, CLIENT_ID)
+    else:
+        results = asyncio.run(S3Exporter(s3_client=s3, bucket=BUCKET).load_current(CLIENT_ID, projection=variant))
+    secs = time.perf_counter() - start
+    nodes = sum(len(r.nodes) for r in results)
+    print(f"{variant:<10}{secs:>9.2f}{s3.bytes_downloaded / 2**20:>12.1f}{stored_mb:>11.1f}{nodes:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sources", type=int, default=20)
+    parser.add_argument("--mb", type=float, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--mbps", type=float, default=100, help="download bandwidth, MB/s")
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    parser.add_argument("--data", default="/tmp/bench_load_current.pkl", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.data, args.variant, args.latency_ms / 1000, args.mbps * 2**20)
+        return
+
+    build_bucket(args.sources, args.mb, args.data)
+    print(f"load_current, {args.sources} sources x ~{args.mb:g} MB, "
+          f"{args.latency_ms:g}ms/request, {args.mbps:g} MB/s")
+    print(f"{'variant':<10}{'seconds':>9}{'fetched MB':>12}{'stored MB':>11}{'nodes':>10}")
+    sys.stdout.flush()
+    for variant in ("legacy", "full", "no_heavy", "structure"):
+        subprocess.run([sys.executable, "-m", "tests.benchmarks.bench_load_current", "--variant", variant,
+                        "--data", args.data, "--latency-ms", str(args.latency_ms), "--mbps", str(args.mbps)],
+                       check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+DiscoveryManager._merge_result benchmark: per-row merge vs bulk upsert.
+
+Merges a synthetic DiscoveryResult (default 10k nodes, 30k edges) twice
+into the same graph — a first import and a re-scan of the same
+resources — with:
+
+  * legacy — the previous merge: a select per node, a type lookup (and
+             commit) per node, two node selects plus an existence check
+             per edge
+  * bulk   — preloaded types, batched INSERT ... ON CONFLICT DO UPDATE
+             for nodes, key -> id map and batched edge inserts
+
+Both run against tests.fixtures.fake_db.RecordingSession, which counts
+round trips. Reported time is the measured in-process time plus
+--latency-ms per round trip, standing in for the network hop to
+PostgreSQL (server-side execution is not modelled).
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_merge_result [--nodes 10000] [--edges 30000] [--latency-ms 0.5]
+"""
+
+import time
+import random
+import asyncio
+import argparse
+from uuid import uuid4
+
+from sqlmodel import select
+
+from apps.api.ingestors.aws.manager import DiscoveryManager
+from apps.api.ingestors.aws.schemas import DiscoveryResult, DiscoveryNode, DiscoveryEdge
+from apps.api.models import Node, Edge, NodeType, EdgeType
+from tests.fixtures.fake_db import RecordingSession
+
+NODE_TYPES = ["compute", "storage", "database", "network", "serverless"]
+EDGE_TYPES = ["references", "routes_to", "reads_from", "writes_to"]
+
+
+class LegacyDiscoveryManager(DiscoveryManager):
+    """The per-row merge DiscoveryManager used before the bulk upsert."""
+
+    async def _merge_result(self, client_id, graph_id, result):
+        for d_node in result.nodes:
+            statement = select(Node).where(
+                Node.client_id == client_id, Node.graph_id == graph_id, Node.key == d_node.key
+            )
+            existing_node = self.session.exec(statement).first()
+            node_type_id = await self._get_node_type_id(client_id, graph_id, d_node.node_type)
+            if existing_node:
+                existing_node.properties.update(d_node.properties)
+                existing_node.source = result.source
+                existing_node.source_metadata.update(d_node.source_metadata)
+                self.session.add(existing_node)
+            else:
+                self.session.add(Node(
+                    client_id=client_id, graph_id=graph_id, node_type_id=node_type_id, key=d_node.key,
+                    display_name=d_node.display_name or d_node.key, properties=d_node.properties,
+                    source=result.source, source_metadata=d_node.source_metadata,
+                ))
+        self.session.commit()
+
+        for d_edge in result.edges:
+            from_node = self.session.exec(select(Node).where(Node.key == d_edge.from_node_key, Node.graph_id == graph_id)).first()
+            to_node = self.session.exec(select(Node).where(Node.key == d_edge.to_node_key, Node.graph_id == graph_id)).first()
+            if not from_node or not to_node:
+                continue
+            edge_type_id = await self._get_type_id(EdgeType, client_id, graph_id, d_edge.edge_type)
+            statement = select(Edge).where(
+                Edge.from_node_id == from_node.id, Edge.to_node_id == to_node.id, Edge.edge_type_id == edge_type_id
+            )
+            if not self.session.exec(statement).first():
+                self.session.add(Edge(
+                    client_id=client_id, graph_id=graph_id, edge_type_id=edge_type_id,
+                    from_node_id=from_node.id, to_node_id=to_node.id, properties=d_edge.properties,
+                ))
+        self.session.commit()
+
+    async def _get_node_type_id(self, client_id, graph_id, type_name):
+        return await self._get_type_id(NodeType, client_id, graph_id, type_name)
+
+    async def _get_type_id(self, model, client_id, graph_id, type_name):
+        found = self.session.exec(select(model).where(model.name == type_name, model.graph_id == graph_id)).first()
+        if not found:
+            found = model(client_id=client_id, graph_id=graph_id, name=type_name)
+            self.session.add(found)
+            self.session.commit()
+            self.session.refresh(found)
+        return found.id
+
+
+def make_result(nodes: int, edges: int, seed: int = 7) -> DiscoveryResult:
+    rng = random.Random(seed)
+    keys = [f"arn:aws:synthetic:{i}" for i in range(nodes)]
+    return DiscoveryResult(
+        source="aws",
+        nodes=[
+            DiscoveryNode(key=key, node_type=NODE_TYPES[i % len(NODE_TYPES)], display_name=f"res-{i}",
+                          properties={"index": i, "region": "us-east-1"}, source_metadata={"account": "123"})
+            for i, key in enumerate(keys)
+        ],
+        edges=[
+            DiscoveryEdge(from_node_key=rng.choice(keys), to_node_key=rng.choice(keys),
+                          edge_type=EDGE_TYPES[i % len(EDGE_TYPES)])
+            for i in range(edges)
+        ],
+    )
+
+
+def run(manager_cls, result, latency_s: float):
+    session = RecordingSession()
+    manager = manager_cls(session)
+    client_id, graph_id = uuid4(), uuid4()
+    timings = []
+    for _ in range(2): # first import, then a re-scan of the same resources
+        trips, start = session.round_trips, time.perf_counter()
+        asyncio.run(manager._merge_result(client_id, graph_id, result))
+        timings.append(time.perf_counter() - start + (session.round_trips - trips) * latency_s)
+    return timings, session
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=10_000)
+    parser.add_argument("--edges", type=int, default=30_000)
+    parser.add_argument("--latency-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    result = make_result(args.nodes, args.edges)
+    print(f"_merge_result, {args.nodes} nodes / {args.edges} edges, {args.latency_ms}ms per round trip")
+    print(f"{'variant':<9}{'import s':>10}{'rescan s':>10}{'round trips':>13}{'nodes':>8}{'edges':>8}")
+    for name, cls in [("legacy", LegacyDiscoveryManager), ("bulk", DiscoveryManager)]:
+        (first, second), session = run(cls, result, args.latency_ms / 1000)
+        print(f"{name:<9}{first:>10.2f}{second:>10.2f}{session.round_trips:>13}"
+              f"{len(session.nodes):>8}{len(session.edges):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Parser result cache benchmark: ingesting a fork of an already-ingested repo.
+
+Builds the bench_repo_cache remote (default 1000 Terraform files) and a
+fork of it with --changed files edited, then times
+GitHubIngestionPipeline.run:
+
+  * upstream    — first ingestion, empty parse cache
+  * fork cold   — the fork with an empty parse cache (what every new
+                  repository, branch or tenant cost before: every file
+                  parsed)
+  * fork warm   — the fork with the parse cache the upstream ingestion
+                  filled: only the edited files are parsed
+
+Each run gets its own repository cache, so neither the mirror nor the
+per-branch ingestion state carries over — only the parse cache does.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_parse_cache [--files 1000] [--changed 20]
+"""
+
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+from apps.api.ingestors.github.parse_cache import ParseCache
+from apps.api.ingestors.github.pipeline import GitHubIngestionPipeline
+from apps.api.ingestors.github.repo_cache import RepoCache
+from tests.benchmarks.bench_repo_cache import build_remote, git
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--changed", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        remote, work, paths, rng, write = build_remote(root, args.files, commits=2)
+        fork = root / "fork.git"
+        git("clone", "--bare", "--quiet", str(remote), str(fork))
+        write(rng.sample(paths, args.changed))
+        git("push", "--quiet", str(fork), "main", cwd=work)
+
+        warm = ParseCache(root / "warm.sqlite3")
+        print(f"{args.files} Terraform files, fork with {args.changed} edited")
+        print(f"{'':<12}{'seconds':>9}{'parsed':>8}{'cache hits':>12}")
+        for name, url, cache in (
+            ("upstream", remote, warm),
+            ("fork cold", fork, ParseCache(root / "cold.sqlite3")),
+            ("fork warm", fork, warm),
+        ):
+            pipeline = GitHubIngestionPipeline(f"file://{url}", "main", repo_cache=RepoCache(root / name),
+                                               parse_cache=cache)
+            start = time.perf_counter()
+            result = asyncio.run(pipeline.run())
+            elapsed = time.perf_counter() - start
+            hits = sum(c["hits"] for c in result.metadata["parse_cache"].values())
+            print(f"{name:<12}{elapsed:>9.2f}{result.metadata['reparsed_files']:>8}{hits:>12}")
+
+        stats = warm.stats()
+        print(f"parse cache: {stats['entries']} entries, {stats['bytes'] / 2**20:.1f} MB, "
+              f"terraform hit rate {stats['parsers']['terraform']['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
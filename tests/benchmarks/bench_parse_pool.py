@@ -0,0 +1,111 @@
+"""
+Tier-1 parsing benchmark: sequential on the event loop vs ParsePool.
+
+Writes a synthetic Terraform tree (default 3000 files of 8 resources,
+~5 KB each, as in bench_repo_cache) and parses every file:
+
+  * inline     — what GitHubIngestionPipeline.run used to do: parse_file()
+                 in a loop on the event loop thread
+  * thread     — ParsePool(workers=0): chunks on a worker thread
+  * pool N     — ParsePool(workers=N) for each --workers value, timed cold
+                 (spawning the workers) and warm (pool already running)
+
+While parsing, a ticker coroutine wakes every 10 ms; the longest gap
+between its wake-ups is how long any other request to the API would have
+waited. Per-file-type timings from summarize_timings() are printed for
+the last run.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_parse_pool [--files 3000] [--workers 1 2 4]
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+from apps.api.ingestors.github.models import FileMetadata
+from apps.api.ingestors.github.parse_pool import ParsePool, parse_file, summarize_timings
+from tests.benchmarks.bench_repo_cache import terraform_file
+
+TICK_S = 0.01
+
+
+async def measure(work) -> tuple[float, float, list]:
+    """(seconds, longest event-loop stall, results) for the coroutine function work."""
+    stalls = [0.0]
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(TICK_S)
+            now = time.perf_counter()
+            stalls.append(now - last - TICK_S)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    results = await work()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    return elapsed, max(stalls), results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=3000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        rng = random.Random(3)
+        files = []
+        for i in range(args.files):
+            path = f"modules/m{i % 60:02d}/f{i:05d}.tf"
+            (root / path).parent.mkdir(parents=True, exist_ok=True)
+            content = terraform_file(rng, i % 60, i)
+            (root / path).write_text(content)
+            files.append(FileMetadata(path=path, extension=".tf", size_bytes=len(content)))
+        print(f"{args.files} Terraform files, {sum(f.size_bytes for f in files) / 2**20:.1f} MB, "
+              f"{os.cpu_count()} CPUs")
+        print(f"{'':<16}{'seconds':>9}{'files/s':>9}{'max loop stall s':>18}")
+
+        def report(name, elapsed, stall):
+            print(f"{name:<16}{elapsed:>9.2f}{args.files / elapsed:>9.0f}{stall:>18.3f}")
+
+        async def inline():
+            return [parse_file(str(root), f) for f in files]
+
+        elapsed, stall, _ = asyncio.run(measure(inline))
+        report("inline", elapsed, stall)
+
+        def pooled(pool):
+            async def work():
+                return [r for chunk in [c async for c in pool.parse(str(root), files)] for r in chunk]
+            return work
+
+        elapsed, stall, results = asyncio.run(measure(pooled(ParsePool(workers=0))))
+        report("thread", elapsed, stall)
+
+        for workers in args.workers:
+            pool = ParsePool(workers=workers)
+            for label in ("cold", "warm"):
+                elapsed, stall, results = asyncio.run(measure(pooled(pool)))
+                report(f"pool {workers} {label}", elapsed, stall)
+            pool._replace_executor(pool._get_executor())
+
+        for kind, timing in summarize_timings(results).items():
+            print(f"{kind}: {timing}")
+
+
+if __name__ == "__main__":
+    main()
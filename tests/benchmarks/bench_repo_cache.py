@@ -0,0 +1,117 @@
+"""
+Repository cache benchmark: fresh shallow clone per run vs RepoCache.
+
+Builds a local bare repository standing in for a large GitHub repo
+(default 5000 files of ~5 KB across 60 modules, --commits commits of
+history touching ~2% of files each), served over file:// so git packs
+and transfers objects as it would over the network. Then times:
+
+  * clone    — what every ingestion used to do: git clone --depth=1 into
+               a new directory
+  * first    — RepoCache.checkout with an empty cache (full branch fetch
+               into the mirror + worktree)
+  * push     — RepoCache.checkout after a push touching --changed files
+  * same     — RepoCache.checkout with nothing new on the branch
+
+reporting total seconds, seconds spent getting the objects (the clone
+minus its checkout, the mirror update) and bytes received (pack size for
+the clone, mirror object-store growth for the cache). Both write the same
+working tree, so the rest of the time is checkout I/O either way.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_repo_cache [--files 5000] [--commits 20] [--changed 10]
+"""
+
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from apps.api.ingestors.github.repo_cache import RepoCache, _dir_size
+
+GIT = ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com", "-c", "commit.gpgsign=false"]
+
+
+def git(*args, cwd=None) -> None:
+    subprocess.run([*GIT, *args], cwd=cwd, check=True, capture_output=True)
+
+
+def terraform_file(rng: random.Random, module: int, index: int) -> str:
+    blocks = []
+    for b in range(8):
+        blocks.append(
+            f'resource "aws_instance" "m{module}_r{index}_{b}" {{\n'
+            f'  ami           = "ami-{rng.getrandbits(32):08x}"\n'
+            f'  instance_type = "{rng.choice(["t3.micro", "m5.large", "c5.xlarge"])}"\n'
+            f'  tags = {{ Name = "svc-{module}-{index}-{b}", owner = "team-{rng.randrange(40)}" }}\n'
+            f'  user_data_base64 = "{rng.getrandbits(1536):0384x}"\n'
+            f'}}\n'
+        )
+    return "\n".join(blocks)
+
+
+def build_remote(root: Path, files: int, commits: int, seed: int = 3) -> tuple:
+    rng = random.Random(seed)
+    remote, work = root / "remote.git", root / "work"
+    git("init", "--bare", "--quiet", "-b", "main", str(remote))
+    git("init", "--quiet", "-b", "main", str(work))
+    paths = [f"modules/m{i % 60:02d}/f{i:05d}.tf" for i in range(files)]
+
+    def write(selected):
+        for path in selected:
+            target = work / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(terraform_file(rng, int(path[9:11]), int(path[-8:-3])))
+        git("add", "-A", cwd=work)
+        git("commit", "--quiet", "-m", "update", cwd=work)
+
+    write(paths)
+    for _ in range(commits - 1):
+        write(rng.sample(paths, max(1, files // 50)))
+    git("push", "--quiet", str(remote), "main", cwd=work)
+    return remote, work, paths, rng, write
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--commits", type=int, default=20)
+    parser.add_argument("--changed", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        remote, work, paths, rng, write = build_remote(root, args.files, args.commits)
+        url = f"file://{remote}"
+        print(f"remote: {args.files} files, {args.commits} commits, {_dir_size(remote) / 2**20:.1f} MB on disk")
+        print(f"{'':<8}{'seconds':>9}{'objects s':>11}{'MB received':>13}")
+
+        dest = root / "clone"
+        start = time.perf_counter()
+        git("clone", "--quiet", "--no-checkout", "--depth=1", "--branch", "main", url, str(dest))
+        fetched = time.perf_counter() - start
+        git("checkout", "--quiet", "main", cwd=dest)
+        print(f"{'clone':<8}{time.perf_counter() - start:>9.2f}{fetched:>11.2f}"
+              f"{_dir_size(dest / '.git' / 'objects') / 2**20:>13.2f}")
+        shutil.rmtree(dest)
+
+        cache = RepoCache(root / "cache")
+        for name in ("first", "push", "same"):
+            if name == "push":
+                write(rng.sample(paths, args.changed))
+                git("push", "--quiet", str(remote), "main", cwd=work)
+            dest = root / f"checkout-{name}"
+            start = time.perf_counter()
+            stats = cache.checkout(url, "main", dest)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<8}{elapsed:>9.2f}{stats.seconds:>11.2f}{stats.bytes_received / 2**20:>13.2f}")
+            cache.remove_checkout(url, dest)
+
+        print(f"mirror: {_dir_size(cache.mirror_path(url)) / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+S3Exporter benchmark: uncompressed double upload vs compressed,
+content-addressed snapshots.
+
+Exports a synthetic AWS result (default 20k nodes) plus a small GitHub
+result three times — first export, unchanged re-export, and a re-export
+where one AWS node changed — with:
+
+  * legacy — the previous exporter: indent=2 JSON uploaded to both
+             current/ and history/ on every run
+  * zstd / gzip — manifest in current/, compressed blob per content hash
+             in history/, unchanged sources skipped
+
+against tests.fixtures.fake_s3.InMemoryS3, reporting bytes uploaded,
+PUT-type requests and wall time per run, and the total bucket size.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_s3_export [--nodes 20000]
+"""
+
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime, timezone
+
+from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult, DiscoveryNode
+from tests.fixtures.fake_s3 import InMemoryS3
+from tests.fixtures.synthetic import make_scan
+
+CLIENT_ID = "bench-client"
+UPLOAD_CALLS = ("put_object", "upload_part")
+
+
+class LegacyS3Exporter(S3Exporter):
+    """The previous export(): full indent=2 payload to current/ and history/."""
+
+    async def export(self, client_id, results, label=None):
+        now = datetime.now(timezone.utc)
+        by_source = {}
+        for r in results:
+            by_source.setdefault(r.source, []).append(r)
+        for source, source_results in by_source.items():
+            payload = {
+                "schema_version": "raw_v1",
+                "label": label or f"{source}_export",
+                "exported_at": now.isoformat(),
+                "sources": [self._result_to_dict(r) for r in source_results],
+            }
+            body = json.dumps(payload, indent=2, default=str).encode("utf-8")
+            for key in (f"{client_id}/current/{source}.json",
+                        f"{client_id}/history/{source}/{now.strftime('%Y-%m-%d-%H-%M-%S-%f')}.json"):
+                self.s3.put_object(Bucket=self.bucket, Key=key, Body=body, ContentType="application/json")
+        return ""
+
+
+def make_results(nodes: int, changed: bool = False):
+    aws = make_scan(nodes).to_discovery_result()
+    aws = DiscoveryResult(**aws.model_dump())
+    if changed:
+        aws.nodes[0].properties["state"] = "stopped"
+    github = DiscoveryResult(source="github", nodes=[
+        DiscoveryNode(key=f"github:acme/app:service:svc-{i}", display_name=f"svc-{i}", node_type="compute",
+                      properties={"language": "python", "port": 8000 + i})
+        for i in range(200)
+    ], metadata={"repo_url": "https://github.com/acme/app", "commit_sha": "abc123"})
+    return [aws, github]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=20_000)
+    args = parser.parse_args()
+
+    runs = [("first", make_results(args.nodes)), ("unchanged", make_results(args.nodes)),
+            ("changed", make_results(args.nodes, changed=True))]
+
+    print(f"S3Exporter.export, {args.nodes} AWS nodes + 200 GitHub nodes")
+    print(f"{'variant':<8}{'run':<11}{'uploaded MB':>12}{'puts':>6}{'seconds':>9}")
+    for name, exporter_cls, kwargs in [("legacy", LegacyS3Exporter, {}),
+                                       ("zstd", S3Exporter, {"compression": "zstd"}),
+                                       ("gzip", S3Exporter, {"compression": "gzip"})]:
+        s3 = InMemoryS3()
+        exporter = exporter_cls(s3_client=s3, bucket="bench", **kwargs)
+        for run, results in runs:
+            s3.reset_counters()
+            start = time.perf_counter()
+            asyncio.run(exporter.export(CLIENT_ID, results))
+            secs = time.perf_counter() - start
+            puts = sum(s3.requests[c] for c in UPLOAD_CALLS)
+            print(f"{name:<8}{run:<11}{s3.bytes_uploaded / 2**20:>12.2f}{puts:>6}{secs:>9.2f}")
+        stored = sum(len(o["Body"]) for o in s3.objects.values())
+        print(f"{name:<8}{'bucket':<11}{stored / 2**20:>12.2f}")
+
+        loaded = asyncio.run(exporter.load_current(CLIENT_ID))
+        assert sum(len(r.nodes) for r in loaded) == args.nodes + 200
+
+
+if __name__ == "__main__":
+    main()
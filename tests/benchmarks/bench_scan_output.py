@@ -0,0 +1,86 @@
+"""
+Output benchmark: indent=2 JSON vs streaming NDJSON (plain / gzip / zstd).
+
+Each variant runs in a fresh subprocess so ru_maxrss reflects only that
+variant. Reports peak RSS after building the scan (baseline), peak RSS
+after writing it, and the output size.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_scan_output [--nodes 50000]
+"""
+
+import os
+import sys
+import json
+import argparse
+import resource
+import tempfile
+import subprocess
+
+from apps.api.ingestors.aws.schema import _json_default
+from apps.api.ingestors.aws.ndjson import write_ndjson
+from tests.fixtures.synthetic import make_scan
+
+VARIANTS = {
+    "json indent=2": "scan.json",
+    "json streamed": "scan.json",
+    "ndjson": "scan.ndjson",
+    "ndjson.gz": "scan.ndjson.gz",
+    "ndjson.zst": "scan.ndjson.zst",
+}
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def run_variant(variant: str, nodes: int, out_dir: str) -> None:
+    scan = make_scan(nodes)
+    baseline = _rss_mb()
+    path = os.path.join(out_dir, VARIANTS[variant])
+
+    if variant == "json indent=2":
+        # The pre-streaming scan_to_json path
+        body = json.dumps(scan.to_dict(), indent=2, default=_json_default)
+        with open(path, "w") as f:
+            f.write(body)
+    elif variant == "json streamed":
+        with open(path, "w") as f:
+            scan.write_json(f)
+    else:
+        write_ndjson(scan, path)
+
+    print(json.dumps({"baseline": baseline, "peak": _rss_mb(), "size": os.path.getsize(path)}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=50_000)
+    parser.add_argument("--variant", choices=list(VARIANTS))
+    parser.add_argument("--out-dir")
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.nodes, args.out_dir)
+        return
+
+    print(f"TopologyScan output, {args.nodes} nodes")
+    print(f"{'variant':<16}{'rss baseline':>14}{'rss peak':>12}{'write delta':>14}{'size':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for variant in VARIANTS:
+            out = subprocess.run(
+                [sys.executable, "-m", "tests.benchmarks.bench_scan_output",
+                 "--nodes", str(args.nodes), "--variant", variant, "--out-dir", tmp],
+                check=True, capture_output=True, text=True,
+            ).stdout.strip().splitlines()[-1]
+            r = json.loads(out)
+            print(
+                f"{variant:<16}{r['baseline']:>11.1f} MB{r['peak']:>9.1f} MB"
+                f"{r['peak'] - r['baseline']:>11.1f} MB{r['size'] / (1024 * 1024):>9.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Infrastructure-only scan benchmark: full checkout vs blobless sparse checkout.
+
+Builds the bench_repo_cache remote (default 2000 Terraform files) and adds
+--assets binary files of --asset-mb MB each, rewritten over --revisions
+commits, like a repository that keeps media or model weights next to its
+infrastructure code. The remote allows partial-clone filters, as GitHub
+does. Then times walking the repository into a ParseableFileSet:
+
+  * clone      — git clone --depth=1 and os.walk (the walker before the
+                 repository cache)
+  * mirror     — a full, unfiltered mirror fetch plus a full worktree (the
+                 repository cache before mirrors became blobless)
+  * full       — RepositoryWalker: blobless mirror, full checkout (every
+                 blob at the commit fetched on demand, none from history)
+  * infra      — RepositoryWalker(infra_only=True): blobless mirror,
+                 git ls-tree for the paths, sparse checkout of tier-1 files
+
+reporting seconds, MB received (object store growth) and MB written to
+the working tree.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_sparse_checkout [--files 2000] [--assets 24] [--asset-mb 4] [--revisions 2]
+"""
+
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+from apps.api.ingestors.github.repo_cache import RepoCache, _dir_size
+from apps.api.ingestors.github.walker import RepositoryWalker
+from tests.benchmarks.bench_repo_cache import build_remote, git
+
+
+def worktree_bytes(path: Path) -> int:
+    return _dir_size(path) - _dir_size(path / ".git") if (path / ".git").is_dir() else _dir_size(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--assets", type=int, default=24)
+    parser.add_argument("--asset-mb", type=float, default=4)
+    parser.add_argument("--revisions", type=int, default=2)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        remote, work, _, rng, _ = build_remote(root, args.files, commits=2)
+        for _ in range(args.revisions):
+            for i in range(args.assets):
+                target = work / "assets" / f"asset{i:03d}.bin"
+                target.parent.mkdir(exist_ok=True)
+                target.write_bytes(rng.randbytes(int(args.asset_mb * 2**20)))
+            git("add", "-A", cwd=work)
+            git("commit", "--quiet", "-m", "assets", cwd=work)
+        git("push", "--quiet", str(remote), "main", cwd=work)
+        git("config", "uploadpack.allowFilter", "true", cwd=remote)
+        url = f"file://{remote}"
+        print(f"remote: {args.files} Terraform files + {args.assets} x {args.asset_mb:g} MB assets "
+              f"x {args.revisions} revisions, {_dir_size(remote) / 2**20:.0f} MB on disk")
+        print(f"{'':<8}{'seconds':>9}{'MB received':>13}{'MB written':>12}{'tier-1':>8}")
+
+        def report(name, elapsed, received, dest, tier_1):
+            print(f"{name:<8}{elapsed:>9.2f}{received / 2**20:>13.1f}{worktree_bytes(dest) / 2**20:>12.1f}{tier_1:>8}")
+
+        dest = root / "clone"
+        start = time.perf_counter()
+        git("clone", "--quiet", "--depth=1", "--branch", "main", url, str(dest))
+        tier_1 = sum(1 for p in dest.rglob("*.tf"))
+        report("clone", time.perf_counter() - start, _dir_size(dest / ".git" / "objects"), dest, tier_1)
+
+        mirror, dest = root / "full-mirror.git", root / "mirror-worktree"
+        start = time.perf_counter()
+        git("init", "--bare", "--quiet", str(mirror))
+        git("fetch", "--quiet", "--no-tags", url, "+refs/heads/main:refs/heads/main", cwd=mirror)
+        git("worktree", "add", "--quiet", "--detach", str(dest), "main", cwd=mirror)
+        tier_1 = sum(1 for p in dest.rglob("*.tf"))
+        report("mirror", time.perf_counter() - start, _dir_size(mirror / "objects"), dest, tier_1)
+
+        for name, infra_only in (("full", False), ("infra", True)):
+            cache, dest = RepoCache(root / f"cache-{name}"), root / f"walk-{name}"
+            walker = RepositoryWalker(url, "main", repo_cache=cache, infra_only=infra_only)
+            start = time.perf_counter()
+            file_set = asyncio.run(walker.walk(str(dest)))
+            report(name, time.perf_counter() - start, walker.fetch_stats.bytes_received, dest,
+                   len(file_set.tier_1_files))
+
+
+if __name__ == "__main__":
+    main()
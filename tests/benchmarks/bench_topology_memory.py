@@ -0,0 +1,109 @@
+"""
+Memory benchmark: TopologyScan representation and JSON serialization.
+
+Compares, on a synthetic 50k-resource scan:
+  - legacy  plain dataclasses + asdict() to_dict + json.dumps(indent=2)
+  - slots   __slots__ nodes + streaming write_json, for each raw policy
+
+Reports tracemalloc's retained size after building the scan and the peak
+during serialization.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_topology_memory [--nodes 50000]
+"""
+
+import os
+import json
+import argparse
+import tempfile
+import tracemalloc
+from dataclasses import dataclass, field, asdict
+
+from apps.api.ingestors.aws.raw_store import RawPayloadStore, RAW_POLICIES
+from apps.api.ingestors.aws.schema import _json_default
+from tests.fixtures.synthetic import make_scan
+
+
+@dataclass
+class LegacyTopologyNode:
+    """The pre-slots TopologyNode shape, kept here only for comparison."""
+    uid: str
+    provider: str
+    service: str
+    resource_type: str
+    category: str
+    name: str
+    region: str
+    account_id: str
+    tags: dict = field(default_factory=dict)
+    merge_hints: dict = field(default_factory=dict)
+    properties: dict = field(default_factory=dict)
+    raw: dict = field(default_factory=dict)
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):8.1f} MB"
+
+
+def bench_legacy(count: int, out_path: str) -> tuple[int, int]:
+    tracemalloc.start()
+    scan = make_scan(count)
+    nodes = [LegacyTopologyNode(*(getattr(n, f) for f in LegacyTopologyNode.__dataclass_fields__)) for n in scan.nodes]
+    scan.nodes = []
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    doc = {
+        "schema_version": "1.0",
+        "scan": scan.header(),
+        "nodes": [asdict(n) for n in nodes],
+        "edges": [e.to_dict() for e in scan.edges],
+    }
+    body = json.dumps(doc, indent=2, default=_json_default)
+    with open(out_path, "w") as f:
+        f.write(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained, peak
+
+
+def bench_slots(count: int, policy: str, out_path: str) -> tuple[int, int]:
+    tracemalloc.start()
+    scan = make_scan(count)
+    store = RawPayloadStore(policy)
+    store.apply(scan.nodes)
+    store.close()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    with open(out_path, "w") as f:
+        scan.write_json(f)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if store.spill_path:
+        os.remove(store.spill_path)
+    return retained, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "scan.json")
+        print(f"TopologyScan memory, {args.nodes} nodes")
+        print(f"{'variant':<16}{'retained':>12}{'serialize peak':>18}{'file size':>14}")
+
+        retained, peak = bench_legacy(args.nodes, out_path)
+        print(f"{'legacy':<16}{_mb(retained):>12}{_mb(peak):>18}{_mb(os.path.getsize(out_path)):>14}")
+
+        for policy in RAW_POLICIES:
+            retained, peak = bench_slots(args.nodes, policy, out_path)
+            label = f"slots/{policy}"
+            print(f"{label:<16}{_mb(retained):>12}{_mb(peak):>18}{_mb(os.path.getsize(out_path)):>14}")
+
+
+if __name__ == "__main__":
+    main()
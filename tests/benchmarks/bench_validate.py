@@ -0,0 +1,113 @@
+"""
+ValidateStage benchmark: hard-coded checks vs the rule registry.
+
+Runs normalize / resolve / enrich once on a synthetic graph (default 50k
+raw nodes, 100k edges; the raw AWS edges are then hidden so the
+partial-scan rule fires on every AWS node), then times validation on fresh copies of it:
+
+  * legacy — the previous three hard-coded checks, one warning object
+             per finding
+  * rules  — ValidateStage over GraphView columns with interned warnings
+
+and reports warning objects allocated plus the tracemalloc peak and the
+memory still held afterwards (measured on a separate run, so tracing does
+not skew the timings).
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_validate [--nodes 50000] [--edges 100000]
+"""
+
+import copy
+import time
+import argparse
+import tracemalloc
+
+from apps.api.infrastructure.processor.base import ValidationWarning
+from apps.api.infrastructure.processor.pipeline import InfrastructurePipeline
+from apps.api.infrastructure.processor.containment import CONTAINER_ID_PROPS
+from apps.api.infrastructure.processor.validate import ValidateStage
+from tests.fixtures.synthetic import make_raw_sources
+
+
+def legacy_validate(context):
+    aws_edges = []
+    if context.raw_aws and "sources" in context.raw_aws:
+        for source in context.raw_aws["sources"]:
+            aws_edges.extend(source.get("edges", []))
+    if not aws_edges:
+        context.graph_metadata["source_completeness"] = "partial"
+        context.graph_metadata["warnings"].append(ValidationWarning(
+            type="partial_scan", message="AWS export returns zero edges; data may be incomplete", severity="warn"))
+        for node in context.nodes.values():
+            if node.source == "aws":
+                node.source_completeness = "partial"
+                node.validation_warnings.append(ValidationWarning(
+                    type="partial_scan", message="Potential partial scan", severity="warn"))
+
+    containers = [n for n in context.nodes.values()
+                  if n.node_type == "group" or n.template_id == "vpc-group"
+                  or n.properties.get("resource_type") in CONTAINER_ID_PROPS]
+    for container in containers:
+        if not context.children.get(container.id):
+            container.validation_warnings.append(ValidationWarning(
+                type="empty_container", message="Container has no child resources", severity="warn"))
+
+    for from_id in context.edges.source_ids():
+        from_node = context.nodes.get(from_id)
+        if not from_node or from_node.environment == "both":
+            continue
+        for edge in context.edges.outgoing(from_id):
+            to_node = context.nodes.get(edge.to_node_id)
+            if to_node and to_node.environment != "both" and from_node.environment != to_node.environment:
+                from_node.validation_warnings.append(ValidationWarning(
+                    type="cross_environment_edge",
+                    message=f"Resource links to {to_node.environment} resource: {to_node.id}", severity="warn"))
+    return context
+
+
+def measure(fn, base):
+    context = copy.deepcopy(base)
+    start = time.perf_counter()
+    fn(context)
+    secs = time.perf_counter() - start
+
+    traced = copy.deepcopy(base)
+    tracemalloc.start()
+    fn(traced)
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    attached = sum(len(n.validation_warnings) for n in context.nodes.values())
+    distinct = len({id(w) for n in context.nodes.values() for w in n.validation_warnings})
+    return secs, peak / (1024 * 1024), kept / (1024 * 1024), attached, distinct
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=50_000)
+    parser.add_argument("--edges", type=int, default=100_000)
+    parser.add_argument("--github-share", type=float, default=0.1)
+    args = parser.parse_args()
+
+    github_nodes = int(args.nodes * args.github_share)
+    raw_github, raw_aws = make_raw_sources(args.nodes - github_nodes, github_nodes, args.edges,
+                                           vpcs=50, subnets_per_vpc=4)
+    pipeline = InfrastructurePipeline(max_workers=1)
+    pipeline.stages = [s for s in pipeline.stages if s.name != "validate"]
+    base = pipeline.execute(raw_github, raw_aws)
+    # Graph keeps its edges, but the raw export looks edge-less to validation
+    base.raw_aws = {"sources": [dict(source, edges=[]) for source in raw_aws["sources"]]}
+    for node in base.nodes.values():
+        node.validation_warnings = []
+
+    rows = [
+        ("legacy",) + measure(legacy_validate, base),
+        ("rules",) + measure(ValidateStage().run, base),
+    ]
+    print(f"ValidateStage, {len(base.nodes)} nodes / {len(base.edges)} edges")
+    print(f"{'variant':<9}{'seconds':>9}{'peak MB':>9}{'kept MB':>9}{'attached':>10}{'objects':>9}")
+    for name, secs, peak, kept, attached, distinct in rows:
+        print(f"{name:<9}{secs:>9.3f}{peak:>9.1f}{kept:>9.1f}{attached:>10}{distinct:>9}")
+
+
+if __name__ == "__main__":
+    main()
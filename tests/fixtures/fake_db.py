@@ -0,0 +1,160 @@
+"""
+In-memory stand-in for a sqlmodel Session on the graph tables.
+
+Understands just the statements DiscoveryManager issues (the bulk merge
+and the previous per-row merge kept in bench_merge_result) and counts
+round trips. Inserts are compiled against the PostgreSQL dialect (their
+SQL is kept in .sql); selects are answered from their WHERE clause.
+"""
+
+import re
+from collections import Counter
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+from sqlalchemy.sql.dml import Insert
+
+from apps.api.models import Node, Edge, NodeType, EdgeType
+
+_MULTI_PARAM_RE = re.compile(r"^(?P<col>.+)_m(?P<row>\d+)$")
+
+
+def _where_params(stmt) -> dict:
+    """column name -> bound value for the ``column == value`` / ``column IN (...)`` terms of a select."""
+    params = {}
+    for criterion in stmt._where_criteria:
+        terms = criterion.clauses if not isinstance(criterion, BinaryExpression) else [criterion]
+        for term in terms:
+            if isinstance(term, BinaryExpression) and isinstance(term.right, BindParameter):
+                params[term.left.name] = term.right.value
+    return params
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def all(self):
+        return list(self._rows)
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+
+class RecordingSession:
+    def __init__(self):
+        self.round_trips = 0
+        self.statements: Counter = Counter()
+        self.nodes: dict = {} # key -> row namespace
+        self.types: dict = {} # (table, name) -> id
+        self.edges: set = set() # (from_id, to_id, edge_type_id)
+        self.sql: list = []
+        self._pending: list = []
+
+    # ── Session API ──
+
+    def add(self, obj):
+        self._pending.append(obj)
+
+    def add_all(self, objs):
+        self._pending.extend(objs)
+
+    def flush(self):
+        self._flush()
+
+    def commit(self):
+        self._flush()
+        self._trip("commit")
+
+    def rollback(self):
+        self._pending = []
+        self._trip("rollback")
+
+    def refresh(self, obj):
+        self._trip("refresh")
+
+    def exec(self, stmt, params=None):
+        self._flush()
+        if isinstance(stmt, Insert):
+            compiled = stmt.compile(dialect=postgresql.dialect())
+            self.sql.append(str(compiled))
+            self._trip(f"insert {stmt.table.name}")
+            return self._insert(stmt, compiled, params)
+        self._trip("select")
+        return self._select(stmt, _where_params(stmt))
+
+    # ── Internals ──
+
+    def _trip(self, kind: str):
+        self.round_trips += 1
+        self.statements[kind] += 1
+
+    def _flush(self):
+        if not self._pending:
+            return
+        self._trip("flush")
+        for obj in self._pending:
+            if isinstance(obj, Node):
+                self.nodes.setdefault(obj.key, obj)
+            elif isinstance(obj, (NodeType, EdgeType)):
+                self.types[(obj.__tablename__, obj.name)] = obj.id
+            elif isinstance(obj, Edge):
+                self.edges.add((obj.from_node_id, obj.to_node_id, obj.edge_type_id))
+        self._pending = []
+
+    def _insert(self, stmt, compiled, params):
+        table = stmt.table.name
+        if params is not None:
+            rows = params
+        else:
+            grouped: dict = {}
+            for name, value in compiled.params.items():
+                m = _MULTI_PARAM_RE.match(name)
+                if m:
+                    grouped.setdefault(int(m["row"]), {})[m["col"]] = value
+            rows = [grouped[i] for i in sorted(grouped)] or [compiled.params]
+
+        returned = []
+        for row in rows:
+            if table == "node":
+                existing = self.nodes.get(row["key"])
+                if existing is None:
+                    self.nodes[row["key"]] = SimpleNamespace(**row)
+                else: # ON CONFLICT DO UPDATE: jsonb || excluded
+                    existing.properties = {**(existing.properties or {}), **row["properties"]}
+                    existing.source_metadata = {**(existing.source_metadata or {}), **row["source_metadata"]}
+                    existing.source = row["source"]
+                returned.append((row["key"], self.nodes[row["key"]].id))
+            elif table in ("node_type", "edge_type"):
+                self.types[(table, row["name"])] = row["id"]
+            elif table == "edge":
+                self.edges.add((row["from_node_id"], row["to_node_id"], row["edge_type_id"]))
+        return FakeResult(returned)
+
+    def _select(self, stmt, params):
+        described = stmt.column_descriptions
+        entity = described[0]["entity"]
+        whole = len(described) == 1 and described[0]["type"] is entity
+
+        if entity is Node:
+            keys = params.get("key")
+            keys = keys if isinstance(keys, (list, tuple)) else [keys]
+            found = [self.nodes[k] for k in keys if k in self.nodes]
+            return FakeResult(found if whole else [(n.key, n.id) for n in found])
+        if entity in (NodeType, EdgeType):
+            table = entity.__tablename__
+            names = params.get("name")
+            names = names if isinstance(names, (list, tuple)) else [names]
+            found = [(n, self.types[(table, n)]) for n in names if (table, n) in self.types]
+            if whole:
+                return FakeResult([SimpleNamespace(id=type_id, name=n) for n, type_id in found])
+            return FakeResult(found)
+        if entity is Edge:
+            if whole: # per-edge existence check
+                triple = (params.get("from_node_id"), params.get("to_node_id"), params.get("edge_type_id"))
+                return FakeResult([triple] if triple in self.edges else [])
+            from_ids = params.get("from_node_id")
+            from_ids = None if from_ids is None else set(from_ids)
+            return FakeResult(sorted((e for e in self.edges if from_ids is None or e[0] in from_ids), key=str))
+        raise NotImplementedError(str(stmt))
@@ -0,0 +1,196 @@
+"""
+In-memory stand-in for a boto3 S3 client (moto is not a dependency).
+
+Implements the calls the exporters make — put/get/head/list/delete objects,
+multipart uploads, list_objects_v2 pagination and ranged gets — and
+counts requests plus bytes sent to and read from the "bucket". Reads can
+be given a per-request latency and a bandwidth so concurrent fetches
+behave as they would over a network (sleeping releases the GIL).
+"""
+
+import io
+import time
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+
+def _error(code: str, operation: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class FakeBody(io.BytesIO):
+    """StreamingBody look-alike: read(), iter_chunks(), close()."""
+
+    def iter_chunks(self, chunk_size: int = 1024 * 1024):
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class InMemoryS3:
+    def __init__(self, latency_s: float = 0.0, bandwidth_bps: float = 0.0):
+        self.latency_s = latency_s
+        self.bandwidth_bps = bandwidth_bps
+        self.objects: dict = {} # (bucket, key) -> {"Body", "Metadata", "ContentType", "LastModified"}
+        self.requests: Counter = Counter()
+        self.bytes_uploaded = 0
+        self.bytes_downloaded = 0
+        self._uploads: dict = {}
+        self._lock = threading.Lock()
+
+    def reset_counters(self) -> None:
+        self.requests.clear()
+        self.bytes_uploaded = self.bytes_downloaded = 0
+
+    # ── Objects ──
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, Metadata=None, **kwargs):
+        body = Body.encode("utf-8") if isinstance(Body, str) else bytes(Body)
+        with self._lock:
+            self.requests["put_object"] += 1
+            self.bytes_uploaded += len(body)
+            self._store(Bucket, Key, body, ContentType, Metadata)
+        return {"ETag": hashlib.md5(body).hexdigest()}
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        with self._lock:
+            self.requests["get_object"] += 1
+            obj = self.objects.get((Bucket, Key))
+            if obj is None:
+                raise _error("NoSuchKey", "GetObject")
+            body = obj["Body"]
+            if Range:
+                start, _, end = Range.removeprefix("bytes=").partition("-")
+                body = body[int(start):int(end) + 1 if end else None]
+            self.bytes_downloaded += len(body)
+        if self.latency_s or self.bandwidth_bps:
+            time.sleep(self.latency_s + (len(body) / self.bandwidth_bps if self.bandwidth_bps else 0))
+        return {
+            "Body": FakeBody(body),
+            "ContentLength": len(body),
+            "ContentType": obj["ContentType"],
+            "Metadata": dict(obj["Metadata"]),
+            "LastModified": obj["LastModified"],
+        }
+
+    def head_object(self, Bucket, Key, **kwargs):
+        with self._lock:
+            self.requests["head_object"] += 1
+            obj = self.objects.get((Bucket, Key))
+            if obj is None:
+                raise _error("404", "HeadObject")
+        return {
+            "ContentLength": len(obj["Body"]),
+            "ContentType": obj["ContentType"],
+            "Metadata": dict(obj["Metadata"]),
+            "LastModified": obj["LastModified"],
+        }
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        with self._lock:
+            self.requests["delete_objects"] += 1
+            for obj in Delete["Objects"]:
+                self.objects.pop((Bucket, obj["Key"]), None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix="", MaxKeys=1000, ContinuationToken=None, Delimiter=None, **kwargs):
+        with self._lock:
+            self.requests["list_objects_v2"] += 1
+            keys = sorted(k for b, k in self.objects if b == Bucket and k.startswith(Prefix))
+        if ContinuationToken: # the last key or common prefix returned
+            keys = [k for k in keys if k > ContinuationToken and not
+                    (ContinuationToken.endswith(Delimiter or "\0") and k.startswith(ContinuationToken))]
+
+        contents, prefixes, last = [], [], None
+        for key in keys:
+            if len(contents) + len(prefixes) >= MaxKeys:
+                break
+            if Delimiter and Delimiter in key[len(Prefix):]:
+                common = key[:len(Prefix) + key[len(Prefix):].index(Delimiter) + 1]
+                if common not in prefixes:
+                    prefixes.append(common)
+                    last = common
+                continue
+            contents.append(key)
+            last = key
+
+        response = {"KeyCount": len(contents) + len(prefixes), "IsTruncated": False}
+        if contents:
+            response["Contents"] = [
+                {"Key": k, "Size": len(self.objects[(Bucket, k)]["Body"]),
+                 "LastModified": self.objects[(Bucket, k)]["LastModified"]}
+                for k in contents
+            ]
+        if prefixes:
+            response["CommonPrefixes"] = [{"Prefix": p} for p in prefixes]
+        if last is not None and any(k > last and not (last.endswith(Delimiter or "\0") and k.startswith(last))
+                                    for k in keys):
+            response["IsTruncated"] = True
+            response["NextContinuationToken"] = last
+        return response
+
+    def get_paginator(self, operation):
+        if operation != "list_objects_v2":
+            raise NotImplementedError(operation)
+        return _ListPaginator(self)
+
+    # ── Multipart ──
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None, Metadata=None, **kwargs):
+        with self._lock:
+            self.requests["create_multipart_upload"] += 1
+            upload_id = f"upload-{len(self._uploads) + 1}"
+            self._uploads[upload_id] = {"parts": {}, "ContentType": ContentType, "Metadata": Metadata}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        body = bytes(Body)
+        with self._lock:
+            self.requests["upload_part"] += 1
+            self.bytes_uploaded += len(body)
+            self._uploads[UploadId]["parts"][PartNumber] = body
+        return {"ETag": hashlib.md5(body).hexdigest()}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        with self._lock:
+            self.requests["complete_multipart_upload"] += 1
+            upload = self._uploads.pop(UploadId)
+            body = b"".join(upload["parts"][p["PartNumber"]] for p in MultipartUpload["Parts"])
+            self._store(Bucket, Key, body, upload["ContentType"], upload["Metadata"])
+        return {"Key": Key}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        with self._lock:
+            self.requests["abort_multipart_upload"] += 1
+            self._uploads.pop(UploadId, None)
+        return {}
+
+    def _store(self, bucket, key, body, content_type, metadata):
+        self.objects[(bucket, key)] = {
+            "Body": body,
+            "ContentType": content_type or "binary/octet-stream",
+            "Metadata": dict(metadata or {}),
+            "LastModified": datetime.now(timezone.utc),
+        }
+
+
+class _ListPaginator:
+    def __init__(self, s3: InMemoryS3):
+        self._s3 = s3
+
+    def paginate(self, Bucket, Prefix="", PaginationConfig=None, **kwargs):
+        page_size = (PaginationConfig or {}).get("PageSize", 1000)
+        token = None
+        while True:
+            page = self._s3.list_objects_v2(Bucket=Bucket, Prefix=Prefix, MaxKeys=page_size,
+                                            ContinuationToken=token, **kwargs)
+            yield page
+            if not page.get("IsTruncated"):
+                return
+            token = page["NextContinuationToken"]
@@ -0,0 +1,85 @@
+"""
+Synthetic infrastructure signals for the SignalAggregator tests and benchmark.
+
+Names mimic Terraform, compose and dependency signals in large monorepos:
+environment, service and role words joined with '-' or '_' in varying
+order, plus instance tokens, numbers and a share of 'dep-' package
+signals. greedy() is the previous all-pairs deduplication, kept as the
+reference the blocked aggregator must agree with.
+"""
+
+import random
+
+from thefuzz import fuzz as thefuzz
+
+from apps.api.ingestors.github.models import InfrastructureSignal
+
+ENVS = ["prod", "production", "staging", "stage", "dev", "qa", "sandbox", "perf"]
+WORDS = [
+    "payments", "orders", "billing", "ledger", "checkout", "catalog", "search", "inventory", "shipping",
+    "fraud", "identity", "auth", "session", "profile", "notify", "email", "sms", "push", "reports",
+    "analytics", "events", "audit", "pricing", "quotes", "claims", "policy", "risk", "kyc", "wallet",
+    "refunds", "loyalty", "coupons", "cart", "media", "thumbs", "upload", "export", "import", "sync",
+    "gateway", "partner", "vendor", "tenant", "admin", "backoffice", "support", "chat", "feed", "geo",
+]
+ROLES = {
+    "Database": ["db", "rds", "postgres", "aurora", "mysql", "replica"],
+    "Cache": ["redis", "cache", "memcached", "elasticache"],
+    "Queue": ["queue", "sqs", "topic", "dlq", "stream"],
+    "Storage": ["bucket", "s3", "assets", "backups", "logs"],
+    "Compute": ["api", "worker", "lambda", "service", "cron", "task"],
+    "Network": ["lb", "alb", "vpc", "subnet", "sg", "endpoint"],
+}
+PACKAGES = ["sqlalchemy", "psycopg2", "redis", "celery", "boto3", "kafka-python", "pika", "pymongo"]
+
+
+def signal_names(rng: random.Random, n: int, unique: float = 0.5) -> list:
+    """(component_type, name) pairs for n synthetic signals; unique is the share with an instance token."""
+    services = [f"{a}-{b}" if rng.random() < 0.5 else a for a in WORDS for b in rng.sample(WORDS, 3)]
+    out = []
+    for _ in range(n):
+        kind = rng.choice(list(ROLES))
+        if rng.random() < 0.02:
+            out.append((kind, f"dep-{rng.choice(PACKAGES)}"))
+            continue
+        parts = [rng.choice(ENVS), rng.choice(services), rng.choice(ROLES[kind])]
+        if rng.random() < unique:
+            parts.insert(2, f"{rng.choice(WORDS)[:3]}{rng.randrange(1000):03d}")
+        if rng.random() < 0.3:
+            rng.shuffle(parts)
+        if rng.random() < 0.5:
+            parts.append(str(rng.randrange(20)))
+        out.append((kind, rng.choice("-_").join(parts)))
+    return out
+
+
+def make_signals(names: list) -> list:
+    return [
+        InfrastructureSignal(component_type=kind, name=name, config={"n": i}, source_location=f"f{i}.tf",
+                             confidence_score=0.5 + (i % 5) / 10)
+        for i, (kind, name) in enumerate(names)
+    ]
+
+
+def greedy(signals: list, threshold: int) -> list:
+    """The previous SignalAggregator._deduplicate_group, applied per component type."""
+    groups = {}
+    for sig in signals:
+        groups.setdefault(sig.component_type, []).append(sig)
+    result = []
+    for group in groups.values():
+        merged = []
+        for incoming in group:
+            for existing in merged:
+                if thefuzz.token_set_ratio(incoming.name.lower(), existing.name.lower()) >= threshold \
+                        or "dep" in incoming.name.lower():
+                    if incoming.confidence_score > existing.confidence_score:
+                        existing.name = incoming.name
+                        existing.confidence_score = incoming.confidence_score
+                        existing.source_location = f"{incoming.source_location}, {existing.source_location}"
+                    existing.config.update(incoming.config)
+                    break
+            else:
+                merged.append(incoming)
+        result.extend(merged)
+    return result
@@ -0,0 +1,204 @@
+"""
+Synthetic AWS topology generators shared by the benchmarks and unit tests.
+
+Payload shapes loosely follow what the collectors emit: curated
+``properties`` plus a ``raw`` boto3-style response several times larger.
+Generation is deterministic for a given size.
+"""
+
+import random
+from datetime import datetime, timezone
+
+from apps.api.ingestors.aws.schema import TopologyNode, TopologyEdge, TopologyScan
+
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1"]
+ACCOUNT_ID = "123456789012"
+
+
+def _raw_instance(iid: str, vpc_id: str, subnet_id: str, rng: random.Random) -> dict:
+    return {
+        "InstanceId": iid,
+        "InstanceType": rng.choice(["t3.micro", "m5.large", "c6g.xlarge"]),
+        "ImageId": f"ami-{rng.getrandbits(32):08x}",
+        "State": {"Code": 16, "Name": "running"},
+        "PrivateDnsName": f"ip-10-0-{rng.randint(0, 255)}-{rng.randint(0, 255)}.ec2.internal",
+        "VpcId": vpc_id,
+        "SubnetId": subnet_id,
+        "LaunchTime": datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat(),
+        "BlockDeviceMappings": [
+            {"DeviceName": f"/dev/xvd{c}", "Ebs": {"VolumeId": f"vol-{rng.getrandbits(32):08x}", "Status": "attached"}}
+            for c in "ab"
+        ],
+        "NetworkInterfaces": [{
+            "NetworkInterfaceId": f"eni-{rng.getrandbits(32):08x}",
+            "PrivateIpAddresses": [{"PrivateIpAddress": f"10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}"}],
+            "Groups": [{"GroupId": f"sg-{rng.getrandbits(32):08x}", "GroupName": "default"}],
+        }],
+        "Tags": [{"Key": "Name", "Value": iid}, {"Key": "team", "Value": "platform"}],
+    }
+
+
+def make_nodes(count: int, seed: int = 7) -> list[TopologyNode]:
+    """Build *count* EC2-like nodes spread over a few VPCs and subnets."""
+    rng = random.Random(seed)
+    vpcs = [f"vpc-{i:08x}" for i in range(max(1, count // 1000))]
+    subnets = {v: [f"subnet-{i:04x}{j:04x}" for j in range(4)] for i, v in enumerate(vpcs)}
+
+    nodes: list[TopologyNode] = []
+    for i in range(count):
+        region = REGIONS[i % len(REGIONS)]
+        iid = f"i-{i:017x}"
+        vpc_id = vpcs[i % len(vpcs)]
+        subnet_id = subnets[vpc_id][i % 4]
+        nodes.append(TopologyNode(
+            uid=f"aws::{region}::ec2::{iid}",
+            provider="aws",
+            service="EC2",
+            resource_type="compute/instance",
+            category="compute",
+            name=iid,
+            region=region,
+            account_id=ACCOUNT_ID,
+            tags={"Name": iid, "team": "platform"},
+            merge_hints={
+                "arn": f"arn:aws:ec2:{region}:{ACCOUNT_ID}:instance/{iid}",
+                "resource_id": iid,
+                "name_tag": iid,
+            },
+            properties={
+                "instance_type": "m5.large",
+                "state": "running",
+                "vpc_id": vpc_id,
+                "subnet_id": subnet_id,
+                "security_groups": [f"sg-{i % 97:08x}"],
+            },
+            raw=_raw_instance(iid, vpc_id, subnet_id, rng),
+        ))
+    return nodes
+
+
+def make_scan(count: int, edges_per_node: int = 1, seed: int = 7) -> TopologyScan:
+    nodes = make_nodes(count, seed=seed)
+    edges: list[TopologyEdge] = []
+    for i, n in enumerate(nodes):
+        for k in range(1, edges_per_node + 1):
+            target = nodes[(i + k) % len(nodes)]
+            edges.append(TopologyEdge(
+                uid=TopologyEdge.make_uid(n.uid, target.uid, "references"),
+                source_uid=n.uid,
+                target_uid=target.uid,
+                relation="references",
+                confidence="inferred",
+                source="property_scan",
+            ))
+    return TopologyScan(
+        scan_id="bench",
+        provider="aws",
+        account_id=ACCOUNT_ID,
+        regions_scanned=REGIONS,
+        scanned_at=datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat(),
+        nodes=nodes,
+        edges=edges,
+    )
+
+
+# ---------------------------------------------------------------------------
+# IR pipeline inputs (raw_aws / raw_github payloads as built by run_export)
+# ---------------------------------------------------------------------------
+
+_AWS_SERVICES = ["EC2", "EC2", "EC2", "RDS", "S3", "IAM", "Lambda"]
+
+
+def make_raw_sources(
+    aws_nodes: int,
+    github_nodes: int,
+    edges: int,
+    vpcs: int = 10,
+    containers: int = 5,
+    seed: int = 7,
+    subnets_per_vpc: int = 0,
+) -> tuple[dict, dict]:
+    """Build (raw_github, raw_aws) source payloads for InfrastructurePipeline.
+
+    AWS nodes cycle through a few services; EC2 / RDS / Lambda nodes carry
+    vpc_id and subnet_id (Lambda: subnet_ids) properties, round-robin over
+    the VPCs and 4 subnets each. subnets_per_vpc > 0 also emits that many
+    subnet nodes per VPC (counted in aws_nodes, like the VPCs). GitHub nodes are mostly dependency packages (some of which
+    ResolveStage folds into canonical sql-db / object-storage nodes) plus
+    a handful of containers. Edges connect random node pairs across both.
+    """
+    rng = random.Random(seed)
+
+    aws: list[dict] = []
+    for v in range(vpcs):
+        aws.append({
+            "key": f"aws::us-east-1::vpc::vpc-{v:08x}",
+            "display_name": f"vpc-{v}",
+            "node_type": "networking",
+            "properties": {"service": "VPC", "resource_type": "network/vpc", "vpc_id": f"vpc-{v:08x}"},
+            "source_metadata": {},
+        })
+        for s in range(subnets_per_vpc):
+            aws.append({
+                "key": f"aws::us-east-1::subnet::subnet-{v:04x}{s:04x}",
+                "display_name": f"subnet-{v}-{s}",
+                "node_type": "networking",
+                "properties": {"service": "VPC", "resource_type": "network/subnet",
+                               "subnet_id": f"subnet-{v:04x}{s:04x}", "vpc_id": f"vpc-{v:08x}"},
+                "source_metadata": {},
+            })
+    for i in range(max(0, aws_nodes - len(aws))):
+        service = _AWS_SERVICES[i % len(_AWS_SERVICES)]
+        vpc = i % vpcs
+        props = {"service": service, "resource_type": f"{service.lower()}/resource"}
+        subnet = f"subnet-{vpc:04x}{(i // vpcs) % 4:04x}"
+        if service in ("EC2", "RDS"):
+            props.update(vpc_id=f"vpc-{vpc:08x}", subnet_id=subnet)
+        elif service == "Lambda":
+            props.update(vpc_id=f"vpc-{vpc:08x}", subnet_ids=[subnet])
+        aws.append({
+            "key": f"aws::us-east-1::{service.lower()}::res-{i:08x}",
+            "display_name": f"{service.lower()}-{i}",
+            "node_type": "compute",
+            "properties": props,
+            "source_metadata": {},
+        })
+
+    packages = ["psycopg2", "pgvector", "minio", "boto3", "fastapi", "requests", "postgres-client"]
+    github: list[dict] = []
+    for i in range(containers):
+        github.append({
+            "key": f"github::compose::service-{i}",
+            "display_name": f"service-{i}",
+            "node_type": "service",
+            "properties": {"image": ["postgres:15", "minio/minio", "python:3.11"][i % 3],
+                           "source_location": "api/docker-compose.yml"},
+            "source_metadata": {},
+        })
+    for i in range(max(0, github_nodes - containers)):
+        github.append({
+            "key": f"github::dep::{i}",
+            "display_name": f"dep-{i}",
+            "node_type": "dependency",
+            "properties": {"package": f"{packages[i % len(packages)]}",
+                           "source_location": f"svc{i % 20}/requirements.txt"},
+            "source_metadata": {},
+        })
+
+    keys = [n["key"] for n in aws] + [n["key"] for n in github]
+    all_edges = [
+        {
+            "from_node_key": rng.choice(keys),
+            "to_node_key": rng.choice(keys),
+            "edge_type": "references",
+            "properties": {},
+        }
+        for _ in range(edges)
+    ]
+    aws_keys = {n["key"] for n in aws}
+    aws_edges = [e for e in all_edges if e["from_node_key"] in aws_keys]
+    github_edges = [e for e in all_edges if e["from_node_key"] not in aws_keys]
+
+    raw_aws = {"sources": [{"source": "aws", "nodes": aws, "edges": aws_edges, "metadata": {}}]}
+    raw_github = {"sources": [{"source": "github", "nodes": github, "edges": github_edges, "metadata": {}}]}
+    return raw_github, raw_aws
@@ -0,0 +1,141 @@
+"""
+Tests for DiscoveryManager's bulk merge of DiscoveryResults into a graph.
+"""
+
+import asyncio
+from uuid import uuid4
+
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import Insert
+
+from apps.api.ingestors.aws.manager import DiscoveryManager, NODE_KEY_CONSTRAINT
+from apps.api.ingestors.aws.schemas import DiscoveryResult, DiscoveryNode, DiscoveryEdge
+from apps.api.models import Node, Edge
+from tests.fixtures.fake_db import RecordingSession
+
+CLIENT_ID = uuid4()
+GRAPH_ID = uuid4()
+
+
+def make_result(nodes: int, edges: list, properties=None) -> DiscoveryResult:
+    return DiscoveryResult(
+        source="aws",
+        nodes=[
+            DiscoveryNode(key=f"n{i}", node_type="compute" if i % 2 else "storage",
+                          properties=dict(properties or {}, index=i))
+            for i in range(nodes)
+        ],
+        edges=[DiscoveryEdge(from_node_key=a, to_node_key=b, edge_type=t) for a, b, t in edges],
+    )
+
+
+class StatementSession(RecordingSession):
+    """RecordingSession that also keeps the statement objects it ran."""
+
+    def __init__(self):
+        super().__init__()
+        self.executed = []
+
+    def exec(self, stmt, params=None):
+        self.executed.append(stmt)
+        return super().exec(stmt, params)
+
+
+def merge(session, result, batch_size=1000):
+    asyncio.run(DiscoveryManager(session, batch_size=batch_size)._merge_result(CLIENT_ID, GRAPH_ID, result))
+
+
+class TestBulkMerge:
+
+    def test_round_trips_scale_with_batches_not_rows(self):
+        session = RecordingSession()
+        edges = [(f"n{i}", f"n{(i + 1) % 2500}", "references") for i in range(2500)]
+        merge(session, make_result(2500, edges), batch_size=1000)
+
+        assert len(session.nodes) == 2500 and len(session.edges) == 2500
+        assert session.statements["insert node"] == 3
+        assert session.statements["insert edge"] == 3
+        # 2 type selects + 2 type flushes + 3 upserts + 3 edge selects + 3 edge inserts + commit
+        assert session.round_trips == 14
+
+    def test_upsert_statement_merges_on_the_unique_key(self):
+        session = RecordingSession()
+        merge(session, make_result(2, []))
+        upsert = next(sql for sql in session.sql if sql.startswith("INSERT INTO node "))
+        assert f"ON CONFLICT ON CONSTRAINT {NODE_KEY_CONSTRAINT} DO UPDATE" in upsert
+        assert "RETURNING node.key, node.id" in upsert
+
+    def test_upsert_compiles_for_postgres_against_the_node_key_constraint(self):
+        session = StatementSession()
+        merge(session, make_result(2, []))
+        stmt = next(s for s in session.executed if isinstance(s, Insert) and s.table is Node.__table__)
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+
+        # The conflict target is the model's unique key, by name
+        constraint = next(c for c in Node.__table__.constraints if c.name == NODE_KEY_CONSTRAINT)
+        assert isinstance(constraint, UniqueConstraint)
+        assert [c.name for c in constraint.columns] == ["client_id", "graph_id", "key"]
+        assert f"ON CONFLICT ON CONSTRAINT {NODE_KEY_CONSTRAINT} DO UPDATE SET" in sql
+
+        # Existing JSONB documents merge with the incoming ones, NULLs included
+        assert "properties = (coalesce(node.properties, '{}'::jsonb) || excluded.properties)" in sql
+        assert "source_metadata = (coalesce(node.source_metadata, '{}'::jsonb) || excluded.source_metadata)" in sql
+        for column in ("properties", "source_metadata"):
+            assert isinstance(compiled.binds[column].type, postgresql.JSONB)
+
+        # Type and display name are left alone on conflict; the key -> id map comes back
+        assert "node_type_id = " not in sql.split("DO UPDATE SET")[1]
+        assert sql.endswith("RETURNING node.key, node.id")
+
+    def test_remerge_updates_nodes_and_skips_known_edges(self):
+        session = RecordingSession()
+        merge(session, make_result(3, [("n0", "n1", "references")], {"state": "running"}))
+        ids = {k: n.id for k, n in session.nodes.items()}
+
+        merge(session, make_result(3, [("n0", "n1", "references"), ("n1", "n2", "routes_to")], {"state": "stopped"}))
+
+        assert {k: n.id for k, n in session.nodes.items()} == ids
+        assert session.nodes["n0"].properties == {"state": "stopped", "index": 0}
+        assert session.edges == {
+            (ids["n0"], ids["n1"], session.types[("edge_type", "references")]),
+            (ids["n1"], ids["n2"], session.types[("edge_type", "routes_to")]),
+        }
+
+    def test_edges_resolve_nodes_from_earlier_runs_and_drop_unknown_keys(self):
+        session = RecordingSession()
+        merge(session, make_result(2, []))
+        later = DiscoveryResult(
+            source="aws",
+            nodes=[DiscoveryNode(key="new", node_type="compute")],
+            edges=[
+                DiscoveryEdge(from_node_key="new", to_node_key="n1", edge_type="references"),
+                DiscoveryEdge(from_node_key="new", to_node_key="ghost", edge_type="references"),
+            ],
+        )
+        merge(session, later)
+        assert session.edges == {(session.nodes["new"].id, session.nodes["n1"].id,
+                                  session.types[("edge_type", "references")])}
+
+    def test_edge_preload_reads_only_edges_leaving_this_results_nodes(self):
+        session = StatementSession()
+        merge(session, make_result(4, [("n2", "n3", "references")]))
+        session.executed.clear()
+
+        merge(session, make_result(2, [("n0", "n1", "references"), ("n1", "ghost", "references")]))
+        preload = [s for s in session.executed if isinstance(s, Select)
+                   and s.column_descriptions[0]["entity"] is Edge]
+        assert len(preload) == 1
+        params = preload[0].compile(dialect=postgresql.dialect()).params
+        assert params["from_node_id_1"] == [session.nodes["n0"].id]
+
+    def test_duplicate_keys_fold_into_one_row(self):
+        session = RecordingSession()
+        result = DiscoveryResult(source="aws", nodes=[
+            DiscoveryNode(key="dup", node_type="compute", properties={"a": 1}),
+            DiscoveryNode(key="dup", node_type="compute", properties={"b": 2}),
+        ])
+        merge(session, result)
+        assert session.nodes["dup"].properties == {"a": 1, "b": 2}
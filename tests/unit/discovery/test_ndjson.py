@@ -0,0 +1,99 @@
+"""
+Tests for the streaming NDJSON TopologyScan writer and reader.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from apps.api.ingestors.aws.schema import TopologyNode, TopologyEdge, TopologyScan
+from apps.api.ingestors.aws.ndjson import (
+    NDJSONScanReader, iter_ndjson, write_ndjson, compression_for_path,
+)
+
+
+def make_scan(count: int = 3) -> TopologyScan:
+    nodes = [
+        TopologyNode(
+            uid=f"aws::us-east-1::ec2::i-{i}",
+            provider="aws",
+            service="EC2",
+            resource_type="compute/instance",
+            category="compute",
+            name=f"i-{i}",
+            region="us-east-1",
+            account_id="123456789012",
+            properties={"vpc_id": "vpc-1", "security_groups": ["sg-1"]},
+            raw={"InstanceId": f"i-{i}"},
+        )
+        for i in range(count)
+    ]
+    edges = [
+        TopologyEdge(
+            uid=TopologyEdge.make_uid(a.uid, b.uid, "references"),
+            source_uid=a.uid, target_uid=b.uid, relation="references",
+            confidence="inferred", source="property_scan",
+        )
+        for a, b in zip(nodes, nodes[1:])
+    ]
+    return TopologyScan(
+        scan_id="s1",
+        provider="aws",
+        account_id="123456789012",
+        regions_scanned=["us-east-1"],
+        scanned_at="2024-01-01T00:00:00Z",
+        nodes=nodes,
+        edges=edges,
+        scan_plan={"mode": "pruned"},
+    )
+
+
+class TestNDJSON:
+
+    @pytest.mark.parametrize("filename", ["scan.ndjson", "scan.ndjson.gz", "scan.ndjson.zst"])
+    def test_round_trip(self, tmp_path, filename):
+        scan = make_scan()
+        path = str(tmp_path / filename)
+        write_ndjson(scan, path)
+
+        reader = NDJSONScanReader(path)
+        assert reader.header["node_count"] == 3
+        assert reader.to_scan().to_dict() == scan.to_dict()
+
+    def test_one_record_per_line(self, tmp_path):
+        path = str(tmp_path / "scan.ndjson.gz")
+        write_ndjson(make_scan(), path)
+
+        with gzip.open(path, "rt") as f:
+            records = [json.loads(line) for line in f]
+        assert [r["type"] for r in records] == ["header", "node", "node", "node", "edge", "edge"]
+
+    def test_iterator_matches_file(self, tmp_path):
+        scan = make_scan()
+        path = str(tmp_path / "scan.ndjson")
+        write_ndjson(scan, path)
+
+        with open(path, "rb") as f:
+            assert b"".join(iter_ndjson(scan)) == f.read()
+
+    def test_reader_is_lazy_and_reiterable(self, tmp_path):
+        path = str(tmp_path / "scan.ndjson")
+        write_ndjson(make_scan(), path)
+
+        reader = NDJSONScanReader(path)
+        nodes = reader.iter_nodes()
+        assert next(nodes).uid == "aws::us-east-1::ec2::i-0"
+        assert len(list(reader.iter_edges())) == 2
+        assert len(list(reader.iter_nodes())) == 3
+
+    def test_rejects_file_without_header(self, tmp_path):
+        path = tmp_path / "bad.ndjson"
+        path.write_text('{"type": "node", "data": {}}\n')
+        with pytest.raises(ValueError):
+            NDJSONScanReader(str(path))
+
+    def test_compression_inferred_from_extension(self):
+        assert compression_for_path("a.ndjson.gz") == "gzip"
+        assert compression_for_path("a.ndjson.zst") == "zstd"
+        assert compression_for_path("a.ndjson") == "none"
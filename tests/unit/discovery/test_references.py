@@ -0,0 +1,122 @@
+"""
+Tests for the property cross-reference extractor used by RelationshipDetector.
+"""
+
+from apps.api.ingestors.aws.schema import TopologyNode
+from apps.api.ingestors.aws.references import ReferenceExtractor, candidate_keys, get_reference_extractor
+from apps.api.ingestors.aws.relationships import RelationshipDetector
+
+
+def make_node(uid: str, properties: dict, **hints) -> TopologyNode:
+    return TopologyNode(
+        uid=uid,
+        provider="aws",
+        service="EC2",
+        resource_type="compute/instance",
+        category="compute",
+        name=uid.split("::")[-1],
+        region="us-east-1",
+        account_id="123456789012",
+        properties=properties,
+        merge_hints=hints,
+    )
+
+
+class TestCandidateKeys:
+
+    def test_finds_nested_references(self):
+        props = {
+            "vpc_id": "vpc-0a1b",
+            "nested": [{"deep": [{"role": "arn:aws:iam::123456789012:role/app"}]}],
+            "queue": "https://sqs.us-east-1.amazonaws.com/123456789012/jobs",
+            "count": 3,
+        }
+        assert sorted(candidate_keys(props)) == ["arn:aws:iam::123456789012:role/app", "jobs", "vpc-0a1b"]
+
+    def test_skips_ignored_keys_and_non_ids(self):
+        props = {"name": "vpc-0a1b", "tags": {"x": "i-0abc"}, "note": "i-not-hex", "sg": "sg-zz"}
+        assert candidate_keys(props) == []
+
+    def test_prefix_without_id_still_checks_sqs(self):
+        assert candidate_keys(["i-x.sqs.amazonaws.com/q1"]) == ["q1"]
+
+
+class TestReferenceExtractor:
+
+    def test_cache_reuses_unchanged_properties(self):
+        ext = ReferenceExtractor()
+        node = make_node("aws::us-east-1::ec2::i-1", {"vpc_id": "vpc-1"})
+        ext.candidates(node)
+        ext.candidates(node)
+        assert (ext.hits, ext.misses) == (1, 1)
+
+        node.properties = {"vpc_id": "vpc-2"}
+        assert ext.candidates(node) == ("vpc-2",)
+        assert ext.misses == 2
+
+    def test_prune_drops_missing_nodes(self):
+        ext = ReferenceExtractor()
+        ext.candidates(make_node("aws::us-east-1::ec2::i-1", {}))
+        ext.prune(set())
+        assert ext._cache == {}
+
+    def test_accounts_are_cached_and_pruned_separately(self):
+        ext = ReferenceExtractor()
+        a = make_node("aws::us-east-1::ec2::i-1", {"vpc_id": "vpc-1"})
+        b = make_node("aws::us-east-1::ec2::i-1", {"vpc_id": "vpc-2"})
+        b.account_id = "210987654321"
+        ext.candidates(a)
+        ext.candidates(b)
+        ext.prune(set(), "210987654321")
+
+        assert ext.candidates(a) == ("vpc-1",)
+        assert (ext.hits, ext.misses) == (1, 2)
+
+    def test_least_recently_scanned_accounts_are_evicted(self):
+        ext = ReferenceExtractor(max_accounts=2)
+        nodes = []
+        for account in ("111111111111", "222222222222", "333333333333"):
+            node = make_node("aws::us-east-1::ec2::i-1", {"vpc_id": "vpc-1"})
+            node.account_id = account
+            nodes.append(node)
+            ext.candidates(node)
+            if account == "222222222222":
+                ext.candidates(nodes[0]) # touch the first account again
+
+        assert list(ext._cache) == ["111111111111", "333333333333"]
+        assert (ext.hits, ext.misses) == (1, 3)
+
+    def test_detectors_share_the_process_wide_extractor(self):
+        node = make_node("aws::us-east-1::ec2::i-shared", {"vpc_id": "vpc-1"})
+        first, second = RelationshipDetector(factory=None), RelationshipDetector(factory=None)
+        assert first._extractor is second._extractor is get_reference_extractor()
+
+        first._from_property_scan([node], {}, {})
+        hits = second._extractor.hits
+        second._from_property_scan([node], {}, {})
+        assert second._extractor.hits == hits + 1
+
+        own = ReferenceExtractor()
+        assert RelationshipDetector(factory=None, extractor=own)._extractor is own
+
+
+class TestPropertyScan:
+
+    def test_detects_arn_and_id_references(self):
+        vpc = make_node("aws::us-east-1::ec2::vpc-1", {}, resource_id="vpc-1")
+        role = make_node(
+            "aws::global::iam::role/app", {},
+            arn="arn:aws:iam::123456789012:role/app", resource_id="app",
+        )
+        fn = make_node(
+            "aws::us-east-1::lambda::fn",
+            {"vpc_id": "vpc-1", "role": "arn:aws:iam::123456789012:role/app", "self": "aws"},
+        )
+        detector = RelationshipDetector(factory=None)
+        edges = detector._from_property_scan(
+            [vpc, role, fn],
+            {"vpc-1": vpc.uid, "app": role.uid},
+            {"arn:aws:iam::123456789012:role/app": role.uid},
+        )
+        assert {(e.source_uid, e.target_uid) for e in edges} == {(fn.uid, vpc.uid), (fn.uid, role.uid)}
+        assert all(e.source == "property_scan" and e.confidence == "inferred" for e in edges)
@@ -0,0 +1,150 @@
+"""
+Tests for pre-scan region probing and scan planning.
+
+AWSClientFactory is patched so each region gets a MagicMock client whose
+probe responses are configured per region.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from apps.api.ingestors.aws.detector import AWSDetector
+from apps.api.ingestors.aws.region_probe import (
+    PRESENCE_PROBES, RegionProbe, ScanPlanner, REGION_ACTIVE, REGION_EMPTY, REGION_UNKNOWN,
+)
+from apps.api.ingestors.aws.schema import TopologyScan
+
+
+def make_factory_cls(region_clients):
+    """Return a fake AWSClientFactory class routing get_client to per-region mocks."""
+    def factory_cls(region, credentials):
+        factory = MagicMock()
+        factory.get_client.side_effect = lambda service: region_clients[region]
+        return factory
+    return factory_cls
+
+
+def empty_client():
+    client = MagicMock()
+    client.get_resources.return_value = {"ResourceTagMappingList": []}
+    client.describe_vpcs.return_value = {"Vpcs": []}
+    client.list_functions.return_value = {"Functions": []}
+    client.describe_instances.return_value = {"Reservations": []}
+    client.describe_db_instances.return_value = {"DBInstances": []}
+    client.list_queues.return_value = {}
+    client.list_tables.return_value = {"TableNames": []}
+    return client
+
+
+def active_client():
+    client = empty_client()
+    client.get_resources.return_value = {"ResourceTagMappingList": [{"ResourceARN": "arn:aws:sqs:x"}]}
+    return client
+
+
+class TestRegionProbe:
+
+    def test_active_region_stops_at_first_hit(self):
+        clients = {"us-east-1": active_client()}
+        with patch("apps.api.ingestors.aws.region_probe.AWSClientFactory", make_factory_cls(clients)):
+            result = RegionProbe().probe("us-east-1")
+
+        assert result.status == REGION_ACTIVE
+        assert result.evidence == "tagging"
+        assert result.calls == 1
+        clients["us-east-1"].describe_vpcs.assert_not_called()
+
+    def test_empty_region_runs_every_probe(self):
+        clients = {"eu-west-3": empty_client()}
+        with patch("apps.api.ingestors.aws.region_probe.AWSClientFactory", make_factory_cls(clients)):
+            result = RegionProbe().probe("eu-west-3")
+
+        assert result.status == REGION_EMPTY
+        assert result.calls == len(PRESENCE_PROBES)
+
+    @pytest.mark.parametrize("configure, evidence", [
+        (lambda c: c.describe_instances.configure_mock(
+            return_value={"Reservations": [{"Instances": [{"InstanceId": "i-1"}]}]}), "ec2"),
+        (lambda c: c.describe_db_instances.configure_mock(
+            return_value={"DBInstances": [{"DBInstanceIdentifier": "db"}]}), "rds"),
+        (lambda c: c.list_queues.configure_mock(
+            return_value={"QueueUrls": ["https://sqs.eu-west-3.amazonaws.com/1/q"]}), "sqs"),
+        (lambda c: c.list_tables.configure_mock(return_value={"TableNames": ["orders"]}), "dynamodb"),
+    ])
+    def test_untagged_resources_keep_a_region_active(self, configure, evidence):
+        client = empty_client()
+        configure(client)
+        with patch("apps.api.ingestors.aws.region_probe.AWSClientFactory", make_factory_cls({"eu-west-3": client})):
+            result = RegionProbe().probe("eu-west-3")
+
+        assert result.status == REGION_ACTIVE
+        assert result.evidence == evidence
+
+    def test_probe_error_is_unknown_not_empty(self):
+        client = empty_client()
+        client.get_resources.side_effect = Exception("AccessDenied")
+        with patch("apps.api.ingestors.aws.region_probe.AWSClientFactory", make_factory_cls({"ap-south-1": client})):
+            result = RegionProbe().probe("ap-south-1")
+
+        assert result.status == REGION_UNKNOWN
+        assert result.errors
+
+
+class TestScanPlanner:
+
+    @pytest.mark.asyncio
+    async def test_pruned_mode_skips_empty_regions(self):
+        clients = {
+            "us-east-1": active_client(),
+            "eu-west-1": empty_client(),
+            "ap-south-1": empty_client(),
+        }
+        with patch("apps.api.ingestors.aws.region_probe.AWSClientFactory", make_factory_cls(clients)):
+            plan = await ScanPlanner(collectors_per_region=23).plan(list(clients))
+
+        assert plan.regions_to_scan == ["us-east-1"]
+        assert plan.skipped_regions == ["eu-west-1", "ap-south-1"]
+        probes = len(PRESENCE_PROBES)
+        assert plan.probe_calls == 1 + 2 * probes
+        assert plan.api_calls_saved == 2 * 23 - (1 + 2 * probes)
+
+    @pytest.mark.asyncio
+    async def test_full_mode_does_not_probe(self):
+        clients = {"us-east-1": empty_client(), "eu-west-1": empty_client()}
+        with patch("apps.api.ingestors.aws.region_probe.AWSClientFactory", make_factory_cls(clients)):
+            plan = await ScanPlanner(mode="full", collectors_per_region=23).plan(list(clients))
+
+        assert plan.regions_to_scan == ["us-east-1", "eu-west-1"]
+        assert plan.probe_calls == 0
+        clients["us-east-1"].get_resources.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_allowlist_and_denylist_override_probe(self):
+        clients = {
+            "us-east-1": active_client(),
+            "eu-west-1": empty_client(),
+            "ap-south-1": empty_client(),
+        }
+        with patch("apps.api.ingestors.aws.region_probe.AWSClientFactory", make_factory_cls(clients)):
+            plan = await ScanPlanner(allowlist=["eu-west-1"], denylist=["us-east-1"]).plan(list(clients))
+
+        assert plan.regions_to_scan == ["eu-west-1"]
+        assert plan.region_status["us-east-1"] == "denied"
+        assert plan.region_status["eu-west-1"] == "forced"
+        clients["us-east-1"].get_resources.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_skipped_regions_reach_the_discovery_result(self):
+        clients = {"us-east-1": active_client(), "eu-west-1": empty_client()}
+        with patch("apps.api.ingestors.aws.region_probe.AWSClientFactory", make_factory_cls(clients)):
+            plan = await ScanPlanner().plan(list(clients))
+
+        scan = TopologyScan(scan_id="s", provider="aws", account_id="1", regions_scanned=plan.regions_to_scan,
+                            scanned_at="2026-01-01T00:00:00Z", scan_plan=plan.to_dict())
+        assert scan.to_discovery_result().metadata["skipped_regions"] == ["eu-west-1"]
+
+    def test_rejects_unknown_mode(self):
+        with pytest.raises(ValueError):
+            ScanPlanner(mode="fast")
+        with pytest.raises(ValueError):
+            AWSDetector(scan_mode="fast")
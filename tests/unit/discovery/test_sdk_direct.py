@@ -0,0 +1,192 @@
+"""
+Tests for concurrent SDK-direct relationship lookups.
+
+AWSClientFactory is patched so every region shares one MagicMock client
+per service.
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from apps.api.ingestors.aws.schema import TopologyNode
+from apps.api.ingestors.aws.relationships import RelationshipDetector
+from apps.api.ingestors.aws.sdk_direct import SDKDirectFetcher, call_with_backoff
+
+FACTORY = "apps.api.ingestors.aws.sdk_direct.AWSClientFactory"
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Op")
+
+
+def make_factory_cls(clients):
+    def factory_cls(region, credentials):
+        factory = MagicMock()
+        factory.get_client.side_effect = lambda service: clients[service]
+        return factory
+    return factory_cls
+
+
+def make_node(uid: str, service: str, region: str = "us-east-1", **kwargs) -> TopologyNode:
+    return TopologyNode(
+        uid=uid,
+        provider="aws",
+        service=service,
+        resource_type="x",
+        category="x",
+        name=uid.split("::")[-1],
+        region=region,
+        account_id="123456789012",
+        **kwargs,
+    )
+
+
+def elb_inventory(count: int):
+    lbs = [
+        make_node(
+            f"aws::us-east-1::elb::lb-{i}", "ELB",
+            merge_hints={"arn": f"arn:aws:elasticloadbalancing:us-east-1:1:loadbalancer/app/lb-{i}"},
+        )
+        for i in range(count)
+    ]
+    instances = [
+        make_node(f"aws::us-east-1::ec2::i-{i:04x}", "EC2", merge_hints={"resource_id": f"i-{i:04x}"})
+        for i in range(count)
+    ]
+    return lbs, instances
+
+
+def elbv2_client(delay: float = 0.0):
+    client = MagicMock()
+
+    def describe_target_groups(LoadBalancerArn):
+        time.sleep(delay)
+        i = int(LoadBalancerArn.rsplit("-", 1)[1])
+        return {"TargetGroups": [{"TargetGroupArn": f"tg-{i}"}]}
+
+    def describe_target_health(TargetGroupArn):
+        time.sleep(delay)
+        i = int(TargetGroupArn.split("-")[1])
+        return {"TargetHealthDescriptions": [{"Target": {"Id": f"i-{i:04x}"}}]}
+
+    client.describe_target_groups.side_effect = describe_target_groups
+    client.describe_target_health.side_effect = describe_target_health
+    return client
+
+
+class TestBackoff:
+
+    def test_retries_throttling_then_succeeds(self):
+        fn = MagicMock(side_effect=[client_error("Throttling"), client_error("TooManyRequestsException"), "ok"])
+        assert call_with_backoff(fn, base_delay=0) == "ok"
+        assert fn.call_count == 3
+
+    def test_other_errors_are_not_retried(self):
+        fn = MagicMock(side_effect=client_error("AccessDenied"))
+        with pytest.raises(ClientError):
+            call_with_backoff(fn, base_delay=0)
+        assert fn.call_count == 1
+
+    def test_gives_up_after_attempts(self):
+        fn = MagicMock(side_effect=client_error("Throttling"))
+        with pytest.raises(ClientError):
+            call_with_backoff(fn, attempts=3, base_delay=0)
+        assert fn.call_count == 3
+
+
+class TestSDKDirect:
+
+    def test_elb_and_eventbridge_edges(self):
+        lbs, instances = elb_inventory(3)
+        fn = make_node("aws::us-east-1::lambda::fn", "Lambda", merge_hints={"arn": "arn:aws:lambda:fn"})
+        rule = make_node("aws::us-east-1::events::rule", "EventBridge", properties={"rule_name": "nightly"})
+        events = MagicMock()
+        events.list_targets_by_rule.return_value = {"Targets": [{"Id": "t1", "Arn": "arn:aws:lambda:fn"}]}
+
+        with patch(FACTORY, make_factory_cls({"elbv2": elbv2_client(), "events": events})):
+            edges = RelationshipDetector(factory=None).detect(lbs + instances + [fn, rule])
+
+        routes = {(e.source_uid, e.target_uid) for e in edges if e.relation == "routes_to"}
+        assert routes == {(lb.uid, inst.uid) for lb, inst in zip(lbs, instances)} | {(rule.uid, fn.uid)}
+
+    def test_lookups_run_concurrently_within_bound(self):
+        lbs, instances = elb_inventory(12)
+        in_flight, peak = 0, 0
+        lock = threading.Lock()
+        client = elbv2_client()
+        health = client.describe_target_health.side_effect
+
+        def tracked(**kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            try:
+                return health(**kwargs)
+            finally:
+                with lock:
+                    in_flight -= 1
+
+        client.describe_target_health.side_effect = tracked
+        with patch(FACTORY, make_factory_cls({"elbv2": client})):
+            edges = RelationshipDetector(factory=None, max_workers=4).detect(lbs + instances)
+
+        assert len(edges) == 12
+        assert 1 < peak <= 4
+
+    def test_prefetch_is_reused_by_detect(self):
+        lbs, instances = elb_inventory(2)
+        client = elbv2_client()
+        with patch(FACTORY, make_factory_cls({"elbv2": client})):
+            detector = RelationshipDetector(factory=None)
+            assert detector.prefetch(lbs) == 2
+            edges = detector.detect(lbs + instances)
+
+        assert len(edges) == 2
+        assert client.describe_target_groups.call_count == 2
+
+    def test_failed_lookup_is_isolated(self):
+        lbs, instances = elb_inventory(2)
+        client = elbv2_client()
+        ok = client.describe_target_groups.side_effect
+
+        def flaky(LoadBalancerArn):
+            if LoadBalancerArn.endswith("lb-0"):
+                raise client_error("AccessDenied")
+            return ok(LoadBalancerArn=LoadBalancerArn)
+
+        client.describe_target_groups.side_effect = flaky
+        with patch(FACTORY, make_factory_cls({"elbv2": client})):
+            edges = RelationshipDetector(factory=None).detect(lbs + instances)
+
+        assert [(e.source_uid, e.target_uid) for e in edges] == [(lbs[1].uid, instances[1].uid)]
+
+    def test_lookup_outliving_close_schedules_nothing(self):
+        lbs, _ = elb_inventory(1)
+        client = elbv2_client()
+        gate = threading.Event()
+        groups = client.describe_target_groups.side_effect
+
+        def slow_groups(LoadBalancerArn):
+            gate.wait(5)
+            return groups(LoadBalancerArn=LoadBalancerArn)
+
+        client.describe_target_groups.side_effect = slow_groups
+        with patch(FACTORY, make_factory_cls({"elbv2": client})):
+            fetcher = SDKDirectFetcher()
+            fetcher.submit(lbs)
+            future = fetcher._futures[lbs[0].uid]
+            closer = threading.Thread(target=fetcher.close)
+            closer.start()
+            while fetcher._pool is not None:
+                time.sleep(0.01)
+            gate.set()
+            closer.join(5)
+
+        assert future.result() == []
+        client.describe_target_health.assert_not_called()
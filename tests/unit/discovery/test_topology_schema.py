@@ -0,0 +1,137 @@
+"""
+Tests for the TopologyScan serializers and the raw-payload retention policies.
+"""
+
+import json
+import os
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from apps.api.ingestors.aws.schema import TopologyNode, TopologyEdge, TopologyScan, _json_default
+from apps.api.ingestors.aws.raw_store import RawPayloadStore
+from apps.api.ingestors.aws import detector as detector_module
+from apps.api.ingestors.aws.detector import AWSDetector, RegionDiscovery
+
+
+def make_node(uid: str, raw: dict | None = None) -> TopologyNode:
+    return TopologyNode(
+        uid=uid,
+        provider="aws",
+        service="EC2",
+        resource_type="compute/instance",
+        category="compute",
+        name=uid.split("::")[-1],
+        region="us-east-1",
+        account_id="123456789012",
+        tags={"Name": "web"},
+        properties={"vpc_id": "vpc-1"},
+        raw=raw if raw is not None else {"InstanceId": uid, "LaunchTime": datetime(2024, 1, 1, tzinfo=timezone.utc)},
+    )
+
+
+def make_scan(nodes, edges) -> TopologyScan:
+    return TopologyScan(
+        scan_id="s1",
+        provider="aws",
+        account_id="123456789012",
+        regions_scanned=["us-east-1"],
+        scanned_at="2024-01-01T00:00:00Z",
+        nodes=nodes,
+        edges=edges,
+    )
+
+
+class TestTopologySerialization:
+
+    def test_nodes_use_slots(self):
+        node = make_node("aws::us-east-1::ec2::i-1")
+        assert not hasattr(node, "__dict__")
+
+    @pytest.mark.parametrize("indent", [2, None])
+    @pytest.mark.parametrize("size", [0, 1, 3])
+    def test_streamed_json_matches_full_dump(self, indent, size):
+        nodes = [make_node(f"aws::us-east-1::ec2::i-{i}") for i in range(size)]
+        edges = [
+            TopologyEdge(
+                uid=TopologyEdge.make_uid(a.uid, b.uid, "references"),
+                source_uid=a.uid, target_uid=b.uid, relation="references",
+                confidence="inferred", source="property_scan",
+            )
+            for a, b in zip(nodes, nodes[1:])
+        ]
+        scan = make_scan(nodes, edges)
+
+        expected = json.dumps(scan.to_dict(), indent=indent, default=_json_default)
+        assert "".join(scan.iter_json(indent=indent)) == expected
+
+
+class TestRawPayloadStore:
+
+    def test_full_keeps_payload(self):
+        node = make_node("aws::us-east-1::ec2::i-1", raw={"a": 1})
+        RawPayloadStore("full").apply([node])
+        assert node.raw == {"a": 1}
+
+    def test_none_drops_payload(self):
+        node = make_node("aws::us-east-1::ec2::i-1", raw={"a": 1})
+        RawPayloadStore("none").apply([node])
+        assert node.raw == {}
+
+    def test_hashed_is_stable(self):
+        a = make_node("aws::us-east-1::ec2::i-1", raw={"a": 1})
+        b = make_node("aws::us-east-1::ec2::i-2", raw={"a": 1})
+        RawPayloadStore("hashed").apply([a, b])
+        assert a.raw["$raw"] == "hashed"
+        assert a.raw["sha256"] == b.raw["sha256"]
+        assert RawPayloadStore.load(a.raw) is None
+
+    def test_spill_round_trips(self, tmp_path):
+        nodes = [make_node(f"aws::us-east-1::ec2::i-{i}", raw={"i": i, "nested": {"x": [i]}}) for i in range(5)]
+        store = RawPayloadStore("spill", spill_dir=str(tmp_path))
+        store.apply(nodes)
+        store.close()
+
+        assert os.path.dirname(store.spill_path) == str(tmp_path)
+        for i, node in enumerate(nodes):
+            assert node.raw["$raw"] == "spill"
+            assert RawPayloadStore.load(node.raw) == {"i": i, "nested": {"x": [i]}}
+
+    def test_cleanup_deletes_the_spill_file(self, tmp_path):
+        store = RawPayloadStore("spill", spill_dir=str(tmp_path))
+        store.apply([make_node("aws::us-east-1::ec2::i-1", raw={"i": 1})])
+        store.cleanup()
+
+        assert store.spill_path is None and os.listdir(tmp_path) == []
+        store.cleanup() # nothing left to remove
+
+    def test_detector_spills_next_to_the_output_or_inlines(self, tmp_path):
+        spill_dir = tmp_path / "spill"
+        spill_dir.mkdir()
+
+        def scan_region(self, region):
+            nodes = [make_node(f"aws::{region}::ec2::i-1", raw={"region": region})]
+            self._raw_store.apply(nodes)
+            return nodes
+
+        with patch.object(AWSDetector, "_get_account_id", lambda self: "123456789012"), \
+             patch.object(RegionDiscovery, "get_active_regions", lambda self: ["us-east-1"]), \
+             patch.object(AWSDetector, "_scan_region", scan_region), \
+             patch.object(detector_module, "GLOBAL_COLLECTORS", []):
+            detector = AWSDetector(scan_mode="full", raw_payload_policy="spill")
+            detector._raw_store = RawPayloadStore("spill", spill_dir=str(spill_dir))
+            out = str(tmp_path / "scan.json")
+            assert asyncio.run(detector.scan_to_json(out, include_relationships=False)) == out
+            inlined = json.loads(asyncio.run(detector.scan_to_json(include_relationships=False)))
+
+        ref = json.loads(open(out).read())["nodes"][0]["raw"]
+        assert ref["path"] == out + ".raw.jsonl"
+        assert RawPayloadStore.load(ref) == {"region": "us-east-1"}
+        assert inlined["nodes"][0]["raw"] == {"region": "us-east-1"}
+        assert os.listdir(spill_dir) == []
+
+    def test_rejects_unknown_policy(self):
+        with pytest.raises(ValueError):
+            RawPayloadStore("compressed")
@@ -0,0 +1,85 @@
+"""
+Tests for VPC / subnet containment in EnrichStage and the empty-container
+check in ValidateStage.
+"""
+
+from apps.api.infrastructure.processor.base import IRNode, ProcessingContext
+from apps.api.infrastructure.processor.containment import ContainmentIndex
+from apps.api.infrastructure.processor.enrich import EnrichStage
+from apps.api.infrastructure.processor.validate import ValidateStage
+
+
+def aws_node(node_id: str, template_id: str = "vm", **props) -> IRNode:
+    return IRNode(id=node_id, template_id=template_id, display_name=node_id, node_type="compute",
+                  source="aws", properties=props)
+
+
+def vpc(vpc_id: str) -> IRNode:
+    return aws_node(f"vpc:{vpc_id}", "vpc", resource_type="network/vpc", vpc_id=vpc_id)
+
+
+def subnet(subnet_id: str, vpc_id: str) -> IRNode:
+    return aws_node(f"subnet:{subnet_id}", "vpc", resource_type="network/subnet", subnet_id=subnet_id, vpc_id=vpc_id)
+
+
+def build(*nodes) -> ContainmentIndex:
+    return ContainmentIndex.build(nodes)
+
+
+class TestContainmentIndex:
+
+    def test_resources_follow_their_own_vpc_and_subnet(self):
+        index = build(
+            vpc("vpc-a"), vpc("vpc-b"), subnet("subnet-b1", "vpc-b"),
+            aws_node("ec2-1", vpc_id="vpc-b", subnet_id="subnet-b1"),
+            aws_node("rds-1", "sql-db", vpc_id="vpc-a", subnet_ids=["subnet-a1", "subnet-a2"]),
+        )
+        assert index.parent == {
+            "subnet:subnet-b1": "vpc:vpc-b",
+            "ec2-1": "subnet:subnet-b1",
+            "rds-1": "vpc:vpc-a",
+        }
+        assert index.children["vpc:vpc-b"] == ["subnet:subnet-b1"]
+        assert index.containers == ["vpc:vpc-a", "vpc:vpc-b", "subnet:subnet-b1"]
+
+    def test_multi_subnet_resources_go_to_the_vpc(self):
+        index = build(
+            vpc("vpc-a"), subnet("subnet-1", "vpc-a"), subnet("subnet-2", "vpc-a"),
+            aws_node("lambda-1", "unknown", vpc_id="vpc-a", subnet_ids=["subnet-1", "subnet-2"]),
+            aws_node("lambda-2", "unknown", subnet_ids=["subnet-1", "subnet-2"]),
+            aws_node("eks-1", "unknown", vpc_id="vpc-a", subnet_ids=["subnet-2"]),
+        )
+        assert index.parent["lambda-1"] == "vpc:vpc-a"
+        assert index.parent["lambda-2"] == "vpc:vpc-a"
+        assert index.parent["eks-1"] == "subnet:subnet-2"
+
+    def test_unknown_or_missing_network_gets_no_parent(self):
+        index = build(
+            vpc("vpc-a"),
+            aws_node("ec2-other", vpc_id="vpc-elsewhere"),
+            aws_node("s3-1", "object-storage"),
+            IRNode(id="gh", template_id="container", display_name="gh", node_type="compute",
+                   source="github", properties={"vpc_id": "vpc-a"}),
+        )
+        assert index.parent == {}
+
+
+class TestContainmentStages:
+
+    def test_enrich_links_and_validate_flags_empty_containers(self):
+        context = ProcessingContext({}, {})
+        for node in (vpc("vpc-a"), vpc("vpc-empty"), subnet("subnet-a1", "vpc-a"),
+                     aws_node("ec2-1", vpc_id="vpc-a", subnet_id="subnet-a1")):
+            context.nodes[node.id] = node
+
+        stage = EnrichStage()
+        stage._apply_containment(context, stage._plan_containment(context))
+
+        assert context.nodes["ec2-1"].parent_id == "subnet:subnet-a1"
+        contains = sorted((e.from_node_id, e.to_node_id) for e in context.edges if e.edge_type == "contains")
+        assert contains == [("subnet:subnet-a1", "ec2-1"), ("vpc:vpc-a", "subnet:subnet-a1")]
+
+        ValidateStage().run(context)
+        empty = [n.id for n in context.nodes.values()
+                 if any(w.type == "empty_container" for w in n.validation_warnings)]
+        assert empty == ["vpc:vpc-empty"]
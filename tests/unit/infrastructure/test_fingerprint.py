@@ -0,0 +1,57 @@
+"""
+Tests for DiscoveryResult content hashes and the IR pipeline input fingerprint.
+"""
+
+from apps.api.ingestors.aws import schemas as aws_schemas
+from apps.api.ingestors.pipeline import schemas as pipeline_schemas
+from apps.api.infrastructure.processor import pipeline as ir_pipeline
+from apps.api.infrastructure.processor.pipeline import input_fingerprint
+
+
+def make_result(schemas, bucket: str = "orders", metadata: dict = None):
+    return schemas.DiscoveryResult(
+        source="aws",
+        nodes=[schemas.DiscoveryNode(
+            key=f"aws::us-east-1::s3::{bucket}",
+            display_name=bucket,
+            node_type="storage",
+            properties={"service": "S3", "tags": {"b": "2", "a": "1"}},
+        )],
+        edges=[schemas.DiscoveryEdge(from_node_key="x", to_node_key=f"aws::us-east-1::s3::{bucket}", edge_type="accesses")],
+        metadata=metadata or {},
+    )
+
+
+def raw(*hashes):
+    return {"sources": [{"source": "aws", "content_hash": h, "nodes": []} for h in hashes]}
+
+
+class TestContentHash:
+
+    def test_ignores_metadata(self):
+        a = make_result(pipeline_schemas, metadata={"scan_id": "1", "scanned_at": "2024-01-01"})
+        b = make_result(pipeline_schemas, metadata={"scan_id": "2", "scanned_at": "2024-01-02"})
+        assert a.content_hash() == b.content_hash()
+
+    def test_changes_with_content(self):
+        assert make_result(pipeline_schemas).content_hash() != make_result(pipeline_schemas, "billing").content_hash()
+
+    def test_matches_across_schema_modules(self):
+        # load_current yields pipeline schemas, detectors emit aws schemas
+        assert make_result(aws_schemas).content_hash() == make_result(pipeline_schemas).content_hash()
+
+
+class TestInputFingerprint:
+
+    def test_stable_and_sensitive_to_each_source(self):
+        github = {"sources": [{"source": "github", "content_hash": "g1"}]}
+        assert input_fingerprint(github, raw("a1", "a2")) == input_fingerprint(github, raw("a1", "a2"))
+        assert input_fingerprint(github, raw("a1", "a2")) != input_fingerprint(github, raw("a1", "a3"))
+
+    def test_none_without_hashes(self):
+        assert input_fingerprint({"sources": [{"source": "github", "nodes": []}]}, raw("a1")) is None
+
+    def test_pipeline_version_invalidates(self, monkeypatch):
+        before = input_fingerprint({}, raw("a1"))
+        monkeypatch.setattr(ir_pipeline, "PIPELINE_VERSION", "ir-test")
+        assert input_fingerprint({}, raw("a1")) != before
@@ -0,0 +1,66 @@
+"""
+Tests for evidence-based GitHub → AWS edge inference in EnrichStage.
+"""
+
+from apps.api.infrastructure.processor.pipeline import InfrastructurePipeline
+
+QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123456789012/orders-queue"
+
+
+def raw_aws() -> dict:
+    return {"sources": [{"nodes": [
+        {"key": "aws::us-east-1::s3::acme-uploads", "properties": {"service": "S3"},
+         "source_metadata": {"arn": "arn:aws:s3:::acme-uploads", "resource_id": "acme-uploads"}},
+        {"key": "aws::us-east-1::sqs::orders-queue", "properties": {"service": "SQS"},
+         "source_metadata": {"resource_id": "orders-queue", "queue_url": QUEUE_URL}},
+        {"key": "aws::us-east-1::rds::main-db", "properties": {"service": "RDS"},
+         "source_metadata": {"resource_id": "main-db", "endpoint": "main-db.abc.us-east-1.rds.amazonaws.com"}},
+        {"key": "aws::us-east-1::ec2::i-0abc", "properties": {"service": "EC2"},
+         "source_metadata": {"resource_id": "i-0abc"}},
+    ], "edges": [{"from_node_key": "aws::us-east-1::ec2::i-0abc", "to_node_key": "aws::us-east-1::rds::main-db"}]}]}
+
+
+def github_service(environment) -> dict:
+    return {"sources": [{"nodes": [
+        {"key": "github:org/repo:compute:api", "properties": {"image": "python:3.11", "environment": environment}},
+    ], "edges": []}]}
+
+
+def inferred(context) -> dict:
+    return {e.to_node_id: e for e in context.edges if e.source == "inferred" and e.edge_type != "contains"}
+
+
+class TestCrossProviderInference:
+
+    def test_links_only_resources_with_evidence(self):
+        env = {
+            "UPLOAD_BUCKET": "acme-uploads",
+            "ORDERS_QUEUE_URL": QUEUE_URL,
+            "DATABASE_URL": "postgresql://app:pw@main-db.abc.us-east-1.rds.amazonaws.com:5432/app",
+            "LOG_LEVEL": "info",
+        }
+        edges = inferred(InfrastructurePipeline().execute(github_service(env), raw_aws()))
+
+        assert set(edges) == {
+            "aws::us-east-1::s3::acme-uploads",
+            "aws::us-east-1::sqs::orders-queue",
+            "aws::us-east-1::rds::main-db",
+        }
+        assert edges["aws::us-east-1::rds::main-db"].edge_type == "connects_to"
+        kinds = {ev["kind"] for ev in edges["aws::us-east-1::sqs::orders-queue"].properties["evidence"]}
+        assert {"queue_url", "env_var_name"} <= kinds
+
+    def test_list_style_environment_and_arn(self):
+        env = ["BUCKET_ARN=arn:aws:s3:::acme-uploads"]
+        edges = inferred(InfrastructurePipeline().execute(github_service(env), raw_aws()))
+        assert list(edges) == ["aws::us-east-1::s3::acme-uploads"]
+        assert edges["aws::us-east-1::s3::acme-uploads"].confidence == 1.0
+
+    def test_weak_evidence_is_below_threshold(self):
+        # Env var name alone (orders_queue) scores 0.3
+        env = {"ORDERS_QUEUE_NAME": "unset"}
+        assert inferred(InfrastructurePipeline().execute(github_service(env), raw_aws())) == {}
+
+    def test_no_evidence_means_no_edges(self):
+        env = {"LOG_LEVEL": "debug"}
+        assert inferred(InfrastructurePipeline().execute(github_service(env), raw_aws())) == {}
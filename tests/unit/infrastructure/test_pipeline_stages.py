@@ -0,0 +1,68 @@
+"""
+Tests for stage scheduling, concurrent execution and per-stage metrics in
+InfrastructurePipeline.
+"""
+
+import pytest
+
+from apps.api.infrastructure.processor.base import BaseStage
+from apps.api.infrastructure.processor.pipeline import InfrastructurePipeline, schedule
+from tests.fixtures.synthetic import make_raw_sources
+
+
+def stage(name, *deps):
+    s = BaseStage()
+    s.name, s.depends_on = name, deps
+    return s
+
+
+def snapshot(context):
+    nodes = [(n.id, n.template_id, n.parent_id, len(n.validation_warnings)) for n in context.nodes.values()]
+    edges = [(e.id, e.from_node_id, e.to_node_id, e.edge_type) for e in context.edges]
+    return nodes, edges
+
+
+class TestSchedule:
+
+    def test_default_stages_form_a_chain(self):
+        waves = schedule(InfrastructurePipeline().stages)
+        assert [[s.name for s in w] for w in waves] == [["normalize"], ["resolve"], ["enrich"], ["validate"]]
+
+    def test_independent_stages_share_a_wave(self):
+        waves = schedule([stage("a"), stage("b"), stage("c", "a", "b")])
+        assert [[s.name for s in w] for w in waves] == [["a", "b"], ["c"]]
+
+    def test_rejects_unknown_dependency_and_cycles(self):
+        with pytest.raises(ValueError):
+            schedule([stage("a", "missing")])
+        with pytest.raises(ValueError):
+            schedule([stage("a", "b"), stage("b", "a")])
+
+
+class TestPipelineExecution:
+
+    def test_parallel_matches_sequential(self):
+        raw_github, raw_aws = make_raw_sources(300, 200, 1000)
+        sequential = InfrastructurePipeline(max_workers=1).execute(raw_github, raw_aws)
+        parallel = InfrastructurePipeline(max_workers=4).execute(raw_github, raw_aws)
+        assert snapshot(parallel) == snapshot(sequential)
+
+    def test_stage_metrics_recorded(self):
+        raw_github, raw_aws = make_raw_sources(30, 20, 50)
+        context = InfrastructurePipeline(trace_memory=True).execute(raw_github, raw_aws)
+
+        metrics = context.graph_metadata["stage_metrics"]
+        assert [m["stage"] for m in metrics] == ["normalize", "resolve", "enrich", "validate"]
+        assert metrics[0]["nodes_in"] == 0 and metrics[0]["nodes_out"] == 50
+        assert metrics[1]["edges_out"] == 50
+        assert metrics[-1]["nodes_out"] == len(context.nodes)
+        assert all(m["duration_ms"] >= 0 and m["traced_peak_mb"] >= 0 for m in metrics)
+        pipeline = context.graph_metadata["pipeline"]
+        assert pipeline["waves"] == [["normalize"], ["resolve"], ["enrich"], ["validate"]]
+        assert pipeline["traced_peak_mb"] == max(m["traced_peak_mb"] for m in metrics)
+
+    def test_memory_is_only_reported_when_traced(self):
+        raw_github, raw_aws = make_raw_sources(30, 20, 50)
+        context = InfrastructurePipeline().execute(raw_github, raw_aws)
+        assert all("traced_peak_mb" not in m for m in context.graph_metadata["stage_metrics"])
+        assert "traced_peak_mb" not in context.graph_metadata["pipeline"]
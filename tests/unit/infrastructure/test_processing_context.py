@@ -0,0 +1,77 @@
+"""
+Tests for the indexed node / edge stores on ProcessingContext.
+"""
+
+from apps.api.infrastructure.processor.base import IRNode, IREdge, NodeStore, EdgeStore
+from apps.api.infrastructure.processor.pipeline import InfrastructurePipeline
+
+
+def make_node(node_id: str, template_id: str) -> IRNode:
+    return IRNode(id=node_id, template_id=template_id, display_name=node_id, node_type="compute")
+
+
+def make_edge(edge_id: str, from_id: str, to_id: str) -> IREdge:
+    return IREdge(id=edge_id, from_node_id=from_id, to_node_id=to_id, edge_type="depends_on",
+                  source="github", confidence=0.9)
+
+
+class TestNodeStore:
+
+    def test_template_index_follows_mutations(self):
+        nodes = NodeStore()
+        nodes["a"] = make_node("a", "sql-db")
+        nodes["b"] = make_node("b", "sql-db")
+        nodes["c"] = make_node("c", "vm")
+        assert nodes.first_by_template("sql-db").id == "a"
+
+        del nodes["a"]
+        assert [n.id for n in nodes.by_template("sql-db")] == ["b"]
+
+        nodes["b"] = make_node("b", "vm")
+        assert nodes.first_by_template("sql-db") is None
+        assert [n.id for n in nodes.by_template("vm")] == ["c", "b"]
+
+        nodes.pop("c")
+        assert [n.id for n in nodes.by_template("vm")] == ["b"]
+
+    def test_is_a_dict(self):
+        nodes = NodeStore()
+        nodes.update({"a": make_node("a", "vm")})
+        assert isinstance(nodes, dict)
+        assert list(nodes) == ["a"]
+
+
+class TestEdgeStore:
+
+    def test_list_view(self):
+        edges = EdgeStore([make_edge("e0", "a", "b")])
+        edges.append(make_edge("e1", "b", "c"))
+        assert len(edges) == 2
+        assert edges[-1].id == "e1"
+        assert [e.id for e in edges] == ["e0", "e1"]
+
+    def test_redirect_updates_edges_and_indexes(self):
+        edges = EdgeStore([make_edge("e0", "dep", "x"), make_edge("e1", "y", "dep"), make_edge("e2", "dep", "dep")])
+        assert edges.redirect("dep", "db") == 3
+
+        assert [(e.from_node_id, e.to_node_id) for e in edges] == [("db", "x"), ("y", "db"), ("db", "db")]
+        assert edges.outgoing("dep") == [] and edges.incoming("dep") == []
+        assert {e.id for e in edges.outgoing("db")} == {"e0", "e2"}
+        assert {e.id for e in edges.incoming("db")} == {"e1", "e2"}
+
+
+class TestPipelineUsesIndexes:
+
+    def test_dependency_edges_redirect_to_canonical_node(self):
+        raw_aws = {"sources": [{"nodes": [
+            {"key": "aws::rds::db", "properties": {"service": "RDS"}},
+        ], "edges": [{"from_node_key": "aws::rds::db", "to_node_key": "aws::rds::db"}]}]}
+        raw_github = {"sources": [{"nodes": [
+            {"key": "github::dep::pgvector", "properties": {"package": "pgvector"}},
+            {"key": "github::svc", "properties": {"image": "python:3.11"}},
+        ], "edges": [{"from_node_key": "github::svc", "to_node_key": "github::dep::pgvector"}]}]}
+
+        context = InfrastructurePipeline().execute(raw_github, raw_aws)
+
+        assert "github::dep::pgvector" not in context.nodes
+        assert [e.to_node_id for e in context.edges.outgoing("github::svc") if e.source == "github"] == ["aws::rds::db"]
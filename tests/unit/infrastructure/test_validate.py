@@ -0,0 +1,81 @@
+"""
+Tests for the ValidateStage rule registry, columnar view and warning interning.
+"""
+
+import pytest
+
+from apps.api.infrastructure.processor.base import IRNode, IREdge, ProcessingContext
+from apps.api.infrastructure.processor import validate
+from apps.api.infrastructure.processor.validate import ValidateStage, VALIDATION_RULES, validation_rule
+
+
+def make_context(edges_in_raw: bool = False) -> ProcessingContext:
+    raw_aws = {"sources": [{"source": "aws", "edges": [{"from_node_key": "a"}] if edges_in_raw else []}]}
+    context = ProcessingContext({}, raw_aws)
+    for node_id, source, env in [("ec2-1", "aws", "aws-prod"), ("ec2-2", "aws", "aws-prod"),
+                                 ("svc", "github", "local-dev"), ("ghost", "inferred", "both")]:
+        context.nodes[node_id] = IRNode(id=node_id, template_id="vm", display_name=node_id, node_type="compute",
+                                        source=source, environment=env)
+    return context
+
+
+def edge(edge_id: str, from_id: str, to_id: str) -> IREdge:
+    return IREdge(id=edge_id, from_node_id=from_id, to_node_id=to_id, edge_type="accesses",
+                  source="inferred", confidence=1.0)
+
+
+def warning_types(node):
+    return [w.type for w in node.validation_warnings]
+
+
+class TestValidateStage:
+
+    def test_partial_scan_shares_one_warning_instance(self):
+        context = ValidateStage().run(make_context())
+
+        first, second = context.nodes["ec2-1"].validation_warnings[0], context.nodes["ec2-2"].validation_warnings[0]
+        assert first.type == "partial_scan" and first is second
+        assert context.nodes["ec2-1"].source_completeness == "partial"
+        assert context.graph_metadata["source_completeness"] == "partial"
+        assert warning_types(context.nodes["svc"]) == []
+
+    def test_cross_environment_once_per_pair(self):
+        context = make_context(edges_in_raw=True)
+        context.edges.extend([
+            edge("e1", "svc", "ec2-1"), edge("e2", "svc", "ec2-1"), # parallel edges
+            edge("e3", "ghost", "ec2-1"), edge("e4", "ec2-1", "ec2-2"), edge("e5", "svc", "missing"),
+        ])
+        context = ValidateStage().run(context)
+
+        assert [w.message for w in context.nodes["svc"].validation_warnings] == [
+            "Resource links to aws-prod resource: ec2-1",
+        ]
+        assert warning_types(context.nodes["ghost"]) == []
+        assert warning_types(context.nodes["ec2-1"]) == []
+        stats = context.graph_metadata["validation"]["rules"]
+        assert stats["cross_environment_edge"]["warnings"] == 1 and stats["partial_scan"]["warnings"] == 0
+
+    def test_rule_selection_and_unknown_rules(self):
+        context = ValidateStage(rules=["cross_environment_edge"]).run(make_context())
+        assert warning_types(context.nodes["ec2-1"]) == []
+        assert list(context.graph_metadata["validation"]["rules"]) == ["cross_environment_edge"]
+
+        with pytest.raises(ValueError):
+            ValidateStage(rules=["no_such_rule"])
+
+    def test_registered_rule_runs_by_default(self, monkeypatch):
+        monkeypatch.setattr(validate, "VALIDATION_RULES", dict(VALIDATION_RULES))
+
+        @validation_rule("github_only")
+        def github_only(view, context, pool):
+            warning = pool.get("github_only", "No AWS counterpart", "info")
+            for i, source in enumerate(view.source):
+                if source == "github":
+                    yield i, warning
+
+        with pytest.raises(ValueError):
+            validation_rule("github_only")(github_only)
+
+        context = ValidateStage().run(make_context(edges_in_raw=True))
+        assert warning_types(context.nodes["svc"]) == ["github_only"]
+        assert "github_only" not in VALIDATION_RULES # registered on the patched copy only
@@ -0,0 +1,77 @@
+"""
+Tests for SignalAggregator: first-match deduplication with blocked
+candidates, checked against the previous all-pairs thefuzz loop.
+"""
+
+import random
+
+import pytest
+
+from apps.api.ingestors.github.aggregator import FIRST_CHUNK, SignalAggregator
+from apps.api.ingestors.github.models import InfrastructureSignal
+from tests.fixtures.signals import greedy, make_signals, signal_names
+
+
+def signal(name: str, confidence: float = 0.5, **config) -> InfrastructureSignal:
+    return InfrastructureSignal(component_type="Database", name=name, config=config,
+                                source_location=f"{name}.tf", confidence_score=confidence)
+
+
+def dump(signals: list) -> list:
+    return [s.model_dump() for s in signals]
+
+
+@pytest.mark.parametrize("threshold", [65, 70, 85])
+def test_matches_scoring_every_merged_signal(threshold):
+    names = signal_names(random.Random(threshold), 1500)
+    assert dump(SignalAggregator(threshold).aggregate(make_signals(names))) == \
+        dump(greedy(make_signals(names), threshold))
+
+
+@pytest.mark.parametrize("threshold", [50, 60, 70, 85])
+def test_separators_do_not_hide_matches(threshold):
+    rng = random.Random(threshold)
+    names = [(kind, name.replace(rng.choice("-_"), rng.choice(["", "-", "_", " "])))
+             for kind, name in signal_names(rng, 1500)]
+    names += [("Compute", n) for n in ["api-gateway", "apigateway", "web_server", "webserver", "ApiGateway-v2"]]
+    assert dump(SignalAggregator(threshold).aggregate(make_signals(names))) == \
+        dump(greedy(make_signals(names), threshold))
+
+
+@pytest.mark.parametrize("pair", [("api-gateway", "apigateway"), ("web_server", "webserver"), ("db", "prod db")])
+@pytest.mark.parametrize("threshold", [60, 85])
+def test_pairs_merge_as_before(pair, threshold):
+    names = [("Compute", n) for n in pair]
+    assert dump(SignalAggregator(threshold).aggregate(make_signals(names))) == \
+        dump(greedy(make_signals(names), threshold))
+
+
+def test_names_are_compared_as_thefuzz_did():
+    names = [("Cache", n) for n in ["Prod-Rédis", "prod_rdis", "PROD redis", "prod-redis-ä", "café", "caf", "ü", "ö"]]
+    for threshold in (70, 100):
+        assert dump(SignalAggregator(threshold).aggregate(make_signals(names))) == \
+            dump(greedy(make_signals(names), threshold))
+
+
+def test_merge_keeps_the_more_confident_name_and_all_config():
+    merged = SignalAggregator(70).aggregate([
+        signal("prod-db", 0.6, engine="postgres"),
+        signal("prod_db_primary", 0.9, port=5432),
+        signal("prod db", 0.7, engine="aurora"),
+        signal("dep-psycopg2", 0.5, driver="psycopg2"),
+        signal("billing-cache"),
+    ])
+    assert [(s.name, s.confidence_score, s.source_location) for s in merged] == [
+        ("prod_db_primary", 0.9, "prod_db_primary.tf, prod-db.tf"),
+        ("billing-cache", 0.5, "billing-cache.tf"),
+    ]
+    assert merged[0].config == {"engine": "aurora", "port": 5432, "driver": "psycopg2"}
+
+
+def test_matches_past_the_first_chunk_are_found():
+    merged = [signal(f"orders-x{i}-replica") for i in range(FIRST_CHUNK * 3)]
+    merged[FIRST_CHUNK + 5].name = "orders-ledger-replica"
+    result = SignalAggregator(100).aggregate(merged + [signal("replica_ledger_orders", 0.9, hit=True)])
+    assert len(result) == FIRST_CHUNK * 3
+    assert result[FIRST_CHUNK + 5].name == "replica_ledger_orders"
+    assert result[FIRST_CHUNK + 5].config == {"hit": True}
@@ -0,0 +1,174 @@
+"""
+Tests for concurrent multi-source ingestion: run_ingestors, the bounded
+repository pool in GitHubIngestor and DiscoveryManager.run_discovery.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from apps.api.ingestors.aws.base import BaseDetector
+from apps.api.ingestors.aws.manager import DiscoveryManager
+from apps.api.ingestors.aws.schemas import DiscoveryResult, DiscoveryNode
+from apps.api.ingestors.pipeline import ingestors as ingestors_module
+from apps.api.ingestors.pipeline.base import BaseIngestor, run_ingestors
+from apps.api.ingestors.pipeline.ingestors import AWSIngestor, GitHubIngestor, GitHubLinkIngestor
+from tests.fixtures.fake_db import RecordingSession
+
+
+def result(source: str) -> DiscoveryResult:
+    return DiscoveryResult(source=source, nodes=[DiscoveryNode(key=f"{source}-1", node_type="compute")])
+
+
+class SleepyIngestor(BaseIngestor):
+    def __init__(self, name: str, delay: float, error: Exception = None, timeout: float = None):
+        self.name, self.delay, self.error, self.timeout = name, delay, error, timeout
+
+    @property
+    def source_name(self) -> str:
+        return self.name
+
+    async def ingest(self):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [result(self.name)]
+
+
+class SleepyDetector(BaseDetector):
+    def __init__(self, name: str, delay: float, error: Exception = None):
+        self.name, self.delay, self.error = name, delay, error
+
+    @property
+    def source_name(self) -> str:
+        return self.name
+
+    async def discover(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return result(self.name)
+
+
+class TestRunIngestors:
+
+    def test_sources_run_concurrently_in_order(self):
+        start = time.perf_counter()
+        results, errors = asyncio.run(run_ingestors([SleepyIngestor("aws", 0.2), SleepyIngestor("github", 0.2)]))
+        assert time.perf_counter() - start < 0.35
+        assert [r.source for r in results] == ["aws", "github"] and errors == {}
+
+    def test_failures_and_timeouts_are_isolated(self):
+        results, errors = asyncio.run(run_ingestors([
+            SleepyIngestor("aws", 5, timeout=0.05),
+            SleepyIngestor("github", 0, error=RuntimeError("boom")),
+            SleepyIngestor("github_link", 0.01),
+        ], timeout=1))
+        assert [r.source for r in results] == ["github_link"]
+        assert errors == {"aws": "timed out", "github": "boom"}
+
+    def test_errors_of_ingestors_sharing_a_name_are_kept_apart(self):
+        results, errors = asyncio.run(run_ingestors([
+            SleepyIngestor("github_link", 0, error=RuntimeError("repo a")),
+            SleepyIngestor("aws", 0),
+            SleepyIngestor("github_link", 0, error=RuntimeError("repo b")),
+        ]))
+        assert [r.source for r in results] == ["aws"]
+        assert errors == {"github_link[0]": "repo a", "github_link[2]": "repo b"}
+
+    def test_github_link_failures_reach_source_errors(self):
+        class FailingPipeline:
+            def __init__(self, **kwargs):
+                pass
+
+            async def run(self):
+                raise RuntimeError("clone failed")
+
+        with patch.object(ingestors_module, "GitHubIngestionPipeline", FailingPipeline):
+            _, errors = asyncio.run(run_ingestors([GitHubLinkIngestor("https://github.com/acme/app")]))
+        assert errors == {"github_link": "clone failed"}
+
+    def test_aws_ingestor_failures_reach_source_errors(self):
+        async def fail(self, **kwargs):
+            raise RuntimeError("no credentials")
+
+        with patch.object(ingestors_module.AWSDetector, "discover", fail):
+            results, errors = asyncio.run(run_ingestors([AWSIngestor(), SleepyIngestor("github", 0)]))
+        assert [r.source for r in results] == ["github"]
+        assert errors == {"aws": "no credentials"}
+
+
+class FakeRepoSession:
+    def __init__(self, repos):
+        self.repos = repos
+        self.tasks = set() # asyncio tasks the session was used from
+
+    def _used(self):
+        self.tasks.add(asyncio.current_task())
+
+    def exec(self, statement):
+        self._used()
+        return SimpleNamespace(all=lambda: self.repos)
+
+    def add(self, obj):
+        self._used()
+
+    def commit(self):
+        self._used()
+
+
+class TestGitHubIngestorPool:
+
+    def test_bounded_concurrency_and_isolated_failures(self):
+        repos = [SimpleNamespace(repo_url=f"https://github.com/acme/r{i}", installation_id="1",
+                                 default_branch="main", ingestion_status=None, last_ingested_at=None,
+                                 last_ingested_branch=None, last_ingested_sha=None, last_content_hash=None)
+                 for i in range(6)]
+        in_flight = peak = 0
+
+        class FakePipeline:
+            def __init__(self, repo_url, branch, access_token, **kwargs):
+                self.repo_url = repo_url
+
+            async def run(self):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.02)
+                in_flight -= 1
+                if self.repo_url.endswith("r3"):
+                    raise RuntimeError("clone failed")
+                return result("github")
+
+        async def fake_token(installation_id, client_id, session):
+            session.exec(None) # reads the app credentials
+            return "token"
+
+        session = FakeRepoSession(repos)
+        with patch.object(ingestors_module, "GitHubIngestionPipeline", FakePipeline), \
+             patch.object(ingestors_module, "get_installation_token", fake_token):
+            ingestor = GitHubIngestor(client_id="c1", session=session, max_concurrency=2)
+            results = asyncio.run(ingestor.ingest())
+
+        assert peak == 2
+        assert len(session.tasks) == 1 # never from the per-repo tasks
+        assert [r.metadata["repo_full_name"] for r in results] == [f"acme/r{i}" for i in (0, 1, 2, 4, 5)]
+        assert [r.ingestion_status for r in repos].count("failed") == 1
+
+
+class TestRunDiscovery:
+
+    def test_detectors_run_concurrently_and_fail_independently(self):
+        session = RecordingSession()
+        manager = DiscoveryManager(session, timeout=0.3)
+        for detector in [SleepyDetector("aws", 0.1), SleepyDetector("github", 0.1),
+                         SleepyDetector("slow", 5), SleepyDetector("broken", 0, RuntimeError("no creds"))]:
+            manager.register_detector(detector)
+
+        start = time.perf_counter()
+        status = asyncio.run(manager.run_discovery("client", "graph"))
+
+        assert time.perf_counter() - start < 1
+        assert status == {"aws": "merged", "github": "merged", "slow": "timed out", "broken": "no creds"}
+        assert set(session.nodes) == {"aws-1", "github-1"}
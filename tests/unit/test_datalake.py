@@ -0,0 +1,131 @@
+"""
+Tests for DatalakeBrowser: cursor pagination, folder totals, the TTL
+metadata cache and range-read previews.
+"""
+
+import json
+import random
+import asyncio
+
+from apps.api.ingestors.pipeline.datalake import DatalakeBrowser, TTLCache
+from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult, DiscoveryNode
+from tests.fixtures.fake_s3 import InMemoryS3
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def result(source: str, nodes: int, blob_bits: int = 0) -> DiscoveryResult:
+    rng = random.Random(0)
+    return DiscoveryResult(source=source, nodes=[
+        DiscoveryNode(key=f"{source}:{i}", display_name=f"n{i}", node_type="compute",
+                      properties={"i": i, "blob": f"{rng.getrandbits(blob_bits):x}" if blob_bits else ""})
+        for i in range(nodes)
+    ])
+
+
+def exported(*results) -> InMemoryS3:
+    s3 = InMemoryS3()
+    asyncio.run(S3Exporter(s3_client=s3, bucket="b", record_history=False).export("c1", list(results)))
+    return s3
+
+
+def test_pages_follow_the_cursor_and_folders_carry_totals():
+    s3 = exported(result("aws", 3), result("github", 2))
+    for i in range(5):
+        s3.put_object(Bucket="b", Key=f"c1/notes-{i}.txt", Body=b"x" * (i + 1))
+    browser = DatalakeBrowser(s3, "b")
+
+    seen, cursor = [], None
+    while True:
+        page = browser.list("c1", cursor=cursor, limit=3)
+        seen += [f["prefix"] for f in page["folders"]] + [f["key"] for f in page["files"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["c1/current/", "c1/history/"] + [f"c1/notes-{i}.txt" for i in range(5)]
+
+    [current, history] = browser.list("c1", limit=2)["folders"]
+    assert (current["name"], current["objects"]) == ("current", 2)
+    assert history["objects"] == 2 and history["size_bytes"] > 0
+    assert browser.folder_totals("c1")[""]["objects"] == 9
+
+    page = browser.list("c1", path="history/")
+    assert [f["name"] for f in page["folders"]] == ["aws", "github"]
+
+
+def test_one_capped_walk_serves_every_folder_total():
+    s3 = exported(result("aws", 3), result("github", 2))
+    for i in range(5):
+        s3.put_object(Bucket="b", Key=f"c1/notes-{i}.txt", Body=b"x")
+    browser = DatalakeBrowser(s3, "b")
+
+    s3.reset_counters()
+    page = browser.list("c1", path="history/")
+    assert browser.folder_totals("c1")[""]["objects"] == page["total"]["objects"] == 9
+    assert [f["objects"] for f in page["folders"]] == [1, 1]
+    assert s3.requests["list_objects_v2"] == 2 # the page and one walk of c1/
+
+    capped = DatalakeBrowser(s3, "b", max_totals_keys=3).list("c1")
+    [current, history] = capped["folders"]
+    assert (current["objects"], current["truncated"]) == (2, False)
+    assert (history["objects"], history["truncated"]) == (1, True)
+    assert (capped["total"]["objects"], capped["total"]["truncated"]) == (3, True)
+    assert not page["total"]["truncated"]
+
+
+def test_metadata_is_cached_until_the_ttl_expires():
+    s3 = exported(result("aws", 3))
+    clock = Clock()
+    browser = DatalakeBrowser(s3, "b", cache_ttl=10, clock=clock)
+
+    s3.reset_counters()
+    for _ in range(3):
+        browser.list("c1")
+        browser.sources("c1")
+    assert s3.requests["list_objects_v2"] == 3 # page, folder totals, current/ listing
+    assert browser.sources("c1")[0]["summary"]["total_nodes"] == 3
+
+    clock.now = 11
+    browser.list("c1")
+    assert s3.requests["list_objects_v2"] == 5
+
+    cache = TTLCache(ttl=10, max_entries=2, clock=clock)
+    for key in "abc":
+        cache.get_or_set(key, lambda: key)
+    assert len(cache._entries) == 2 and cache.get_or_set("c", lambda: "new") == "c"
+
+
+def test_preview_range_reads_only_the_first_nodes():
+    s3 = exported(result("github", 2000, blob_bits=8000)) # random hex, poorly compressible
+    browser = DatalakeBrowser(s3, "b")
+    manifest = browser.sources("c1")[0]
+
+    s3.reset_counters()
+    preview = browser.preview("c1", "github", nodes=5)
+    assert [n["key"] for n in preview["nodes"]] == [f"github:{i}" for i in range(5)]
+    assert preview["nodes"][0]["properties"]["i"] == 0 and preview["truncated"]
+    assert preview["summary"]["total_nodes"] == 2000
+    assert s3.bytes_downloaded == preview["bytes_read"] < manifest["stored_bytes"] / 4
+
+    full = browser.preview("c1", "github", nodes=5000)
+    assert len(full["nodes"]) == 2000 and not full["truncated"]
+    assert browser.preview("c1", "aws") is None
+
+
+def test_old_full_payload_documents_are_previewed():
+    s3 = InMemoryS3()
+    exporter = S3Exporter(s3_client=s3, bucket="b")
+    payload = {"schema_version": "raw_v1", "summary": {"total_nodes": 3},
+               "sources": [exporter._result_to_dict(result("github", 3))]}
+    s3.put_object(Bucket="b", Key="c1/current/github.json", Body=json.dumps(payload))
+
+    preview = DatalakeBrowser(s3, "b").preview("c1", "github", nodes=2)
+    assert preview["format"] == "document" and "sources" not in preview
+    assert [n["key"] for n in preview["nodes"]] == ["github:0", "github:1"] and preview["truncated"]
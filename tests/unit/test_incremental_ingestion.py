@@ -0,0 +1,112 @@
+"""
+Tests for skip-unchanged / changed-files-only GitHub ingestion against a
+local bare repository standing in for GitHub.
+"""
+
+import asyncio
+
+import pytest
+
+from apps.api.ingestors.github.parse_cache import ParseCache
+from apps.api.ingestors.github.parse_pool import ParsedFile, ParsePool
+from apps.api.ingestors.github.pipeline import GitHubIngestionPipeline
+from apps.api.ingestors.github.repo_cache import RepoCache
+from tests.unit.test_repo_cache import commit, git, make_remote
+
+COMPOSE = "services:\n  api:\n    image: node:20\n    depends_on: [db]\n  db:\n    image: postgres:16\n"
+
+
+def tf(name: str, engine: str = "postgres") -> str:
+    return f'resource "aws_db_instance" "{name}" {{\n  engine = "{engine}"\n}}\n'
+
+
+@pytest.fixture
+def repo(tmp_path):
+    remote, work = make_remote(tmp_path)
+    commit(work, {
+        "docker-compose.yml": COMPOSE,
+        "requirements.txt": "redis\n",
+        **{f"infra/db{i}.tf": tf(f"db{i}") for i in range(5)},
+    })
+    return remote, work, RepoCache(tmp_path / "cache")
+
+
+def run(remote, cache, monkeypatch, **kwargs):
+    parsed = []
+    real = ParsePool.parse
+
+    def spy(self, root, files):
+        parsed.extend(f.path for f in files)
+        return real(self, root, files)
+
+    monkeypatch.setattr(ParsePool, "parse", spy)
+    kwargs.setdefault("parse_cache", ParseCache(cache.root / "parse-cache.sqlite3"))
+    result = asyncio.run(GitHubIngestionPipeline(remote, "main", repo_cache=cache, **kwargs).run())
+    return result, sorted(parsed)
+
+
+def test_only_changed_files_are_reparsed(repo, tmp_path, monkeypatch):
+    remote, work, cache = repo
+    first, parsed = run(remote, cache, monkeypatch)
+    assert len(parsed) == 7 and first.metadata["reparsed_files"] == 7
+
+    commit(work, {"infra/db2.tf": tf("db2", "mysql"), "infra/db9.tf": tf("db9")})
+    git("rm", "--quiet", "infra/db4.tf", cwd=work)
+    git("commit", "--quiet", "-m", "rm", cwd=work)
+    git("push", "--quiet", "origin", "main", cwd=work)
+
+    second, parsed = run(remote, cache, monkeypatch)
+    assert parsed == ["infra/db2.tf", "infra/db9.tf"]
+    names = {n.display_name.strip('"') for n in second.nodes} # hcl2 keeps the quotes
+    assert "db9" in names and "db4" not in names
+
+    fresh, parsed = run(remote, RepoCache(tmp_path / "fresh-cache"), monkeypatch)
+    assert len(parsed) == 7
+    assert fresh.metadata["content_hash"] == second.metadata["content_hash"]
+    assert [n.model_dump() for n in fresh.nodes] == [n.model_dump() for n in second.nodes]
+
+
+def test_unchanged_branch_short_circuits_before_checkout(repo, monkeypatch):
+    remote, _, cache = repo
+    first, _ = run(remote, cache, monkeypatch)
+
+    checkouts = []
+    monkeypatch.setattr(RepoCache, "checkout", lambda self, *a, **k: checkouts.append(a))
+    again, parsed = run(remote, cache, monkeypatch, last_commit_sha=first.metadata["commit_sha"],
+                        last_content_hash=first.metadata["content_hash"])
+    assert again.metadata["unchanged"] and not parsed and not checkouts
+    assert [n.key for n in again.nodes] == [n.key for n in first.nodes]
+
+
+def test_without_a_recorded_ingestion_the_repo_is_walked_but_nothing_reparsed(repo, monkeypatch):
+    remote, _, cache = repo
+    first, _ = run(remote, cache, monkeypatch)
+
+    # DB has no record (or a different hash): no short-circuit, but every file's signals are reused
+    again, parsed = run(remote, cache, monkeypatch, last_commit_sha=first.metadata["commit_sha"],
+                        last_content_hash="something-else")
+    assert "unchanged" not in again.metadata and parsed == []
+    assert again.metadata["content_hash"] == first.metadata["content_hash"]
+
+
+def test_files_that_failed_to_parse_are_retried_on_an_unchanged_branch(repo, monkeypatch):
+    remote, _, cache = repo
+    real = ParsePool.parse
+
+    async def lose_one(self, root, files):
+        async for results in real(self, root, files):
+            yield [ParsedFile(r.path, r.file_type, None, 30.0, True) if r.path == "infra/db3.tf" else r
+                   for r in results]
+
+    monkeypatch.setattr(ParsePool, "parse", lose_one)
+    first = asyncio.run(GitHubIngestionPipeline(
+        remote, "main", repo_cache=cache, parse_cache=ParseCache(cache.root / "parse-cache.sqlite3"),
+    ).run())
+    assert first.metadata["unparsed_files"] == ["infra/db3.tf"]
+    monkeypatch.undo()
+
+    again, parsed = run(remote, cache, monkeypatch, last_commit_sha=first.metadata["commit_sha"],
+                        last_content_hash=first.metadata["content_hash"])
+    assert not again.metadata.get("unchanged") and parsed == ["infra/db3.tf"]
+    assert again.metadata["unparsed_files"] == [] and again.metadata["reparsed_files"] == 1
+    assert len(again.nodes) == len(first.nodes) + 1
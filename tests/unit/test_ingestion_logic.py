@@ -57,8 +57,6 @@ async def test_aws_ingestor_failure():
         # 2. Initialize Ingestor
         ingestor = AWSIngestor(region_name="us-east-1", credentials={"aws_access_key_id": "test"})
         
-        # 3. Run Ingestion
-        results = await ingestor.ingest()
-        
-        # 4. Verify (should return empty list on failure)
-        assert results == []
+        # 3. Run Ingestion: the error propagates so run_ingestors can record it
+        with pytest.raises(Exception, match="AWS Error"):
+            await ingestor.ingest()
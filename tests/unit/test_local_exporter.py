@@ -0,0 +1,198 @@
+"""
+Tests for LocalExporter and the columnar snapshot format it writes.
+"""
+
+import json
+import asyncio
+
+import pytest
+import pyarrow as pa
+
+from apps.api.ingestors.pipeline import columnar
+from apps.api.ingestors.pipeline.columnar import (
+    ColumnarSnapshot, columnar_to_raw_v1, edges_path, encode_snapshot, raw_v1_to_columnar, snapshot_size,
+    write_snapshot,
+)
+from apps.api.ingestors.pipeline.exporters import get_exporter
+from apps.api.ingestors.pipeline.local_exporter import LocalExporter
+from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult, DiscoveryNode, DiscoveryEdge
+
+
+def results(state: str = "running"):
+    return [
+        DiscoveryResult(source="aws", nodes=[
+            DiscoveryNode(key="aws:i-0", display_name="café", node_type="compute", node_subtype="compute/instance",
+                          properties={"state": state, "raw": {"Reservations": [{"Id": "r-0"}]}},
+                          source_metadata={"arn": "arn:i-0"}),
+            DiscoveryNode(key="aws:vpc-0", display_name="vpc-0", node_type="network"),
+        ], edges=[DiscoveryEdge(from_node_key="aws:i-0", to_node_key="aws:vpc-0", edge_type="contained_in",
+                                properties={"confidence": 1.0})],
+           metadata={"scan_id": state}),
+        DiscoveryResult(source="github", nodes=[
+            DiscoveryNode(key="github:acme/app:service:api", display_name="api", node_type="compute"),
+        ]),
+    ]
+
+
+def load(exporter, projection="full"):
+    return {r.source: r for r in asyncio.run(exporter.load_current("c1", projection=projection))}
+
+
+def test_roundtrip_and_unchanged_sources_are_skipped(tmp_path):
+    exporter = LocalExporter(tmp_path)
+    asyncio.run(exporter.export("c1", results()))
+    assert {s["status"] for s in exporter.last_export["sources"].values()} == {"written"}
+
+    manifest = json.loads((tmp_path / "c1/current/aws.json").read_text())
+    assert manifest["format"] == "arrow_ipc" and manifest["summary"]["total_nodes"] == 2
+    assert snapshot_size(tmp_path / manifest["blob_key"]) == manifest["stored_bytes"]
+
+    loaded = load(exporter)
+    assert [r.content_hash() for r in loaded.values()] == [r.content_hash() for r in results()]
+    assert loaded["aws"].metadata == {"scan_id": "running"} and loaded["aws"].nodes[1].node_subtype is None
+
+    asyncio.run(exporter.export("c1", results()))
+    assert exporter.last_export["bytes_written"] == 0
+    asyncio.run(exporter.export("c1", results("stopped")))
+    assert exporter.last_export["sources"]["aws"]["status"] == "written"
+    assert exporter.last_export["sources"]["github"]["status"] == "unchanged"
+    assert load(exporter)["aws"].nodes[0].properties["state"] == "stopped"
+
+
+def track_snapshots(monkeypatch) -> dict:
+    """Record which snapshots get opened and closed."""
+    seen = {"opened": [], "closed": []}
+    init, close = ColumnarSnapshot.__init__, ColumnarSnapshot.close
+
+    def tracked_init(self, path):
+        init(self, path)
+        seen["opened"].append(self.source)
+
+    def tracked_close(self):
+        seen["closed"].append(self.source)
+        close(self)
+
+    monkeypatch.setattr(ColumnarSnapshot, "__init__", tracked_init)
+    monkeypatch.setattr(ColumnarSnapshot, "close", tracked_close)
+    return seen
+
+
+def test_failed_loads_unmap_every_snapshot(tmp_path, monkeypatch):
+    exporter = LocalExporter(tmp_path)
+    asyncio.run(exporter.export("c1", results()))
+    seen = track_snapshots(monkeypatch)
+
+    def broken(self, projection):
+        raise RuntimeError("decode failed")
+
+    monkeypatch.setattr(ColumnarSnapshot, "to_results", broken)
+    with pytest.raises(RuntimeError):
+        load(exporter)
+    # Snapshots are mapped one at a time: the failure stops before the next one
+    assert seen == {"opened": ["aws"], "closed": ["aws"]}
+
+
+def test_open_current_closes_what_it_opened_when_a_snapshot_is_corrupt(tmp_path, monkeypatch):
+    exporter = LocalExporter(tmp_path)
+    asyncio.run(exporter.export("c1", results()))
+    github = json.loads((tmp_path / "c1/current/github.json").read_text())
+    (tmp_path / github["blob_key"]).write_bytes(b"not arrow")
+    seen = track_snapshots(monkeypatch)
+
+    with pytest.raises(ValueError):
+        exporter.open_current("c1")
+    assert seen == {"opened": ["aws"], "closed": ["aws"]}
+
+    (tmp_path / "c1/current/github.json").unlink()
+    snapshots = exporter.open_current("c1")
+    assert list(snapshots) == ["aws"] and seen["closed"] == ["aws"]
+    snapshots["aws"].close()
+
+
+def test_projections_only_decode_the_columns_they_need(tmp_path, monkeypatch):
+    exporter = LocalExporter(tmp_path)
+    asyncio.run(exporter.export("c1", results()))
+
+    decoded = []
+    real_column = ColumnarSnapshot._column
+
+    def spy(self, table, name):
+        decoded.append((table, name))
+        return real_column(self, table, name)
+
+    monkeypatch.setattr(ColumnarSnapshot, "_column", spy)
+
+    assert load(exporter, "no_heavy")["aws"].nodes[0].properties == {"state": "running"}
+    assert ("nodes", "heavy_properties") not in decoded
+
+    decoded.clear()
+    node = load(exporter, "structure")["aws"].nodes[0]
+    assert (node.key, node.node_subtype, node.properties, node.source_metadata) == \
+        ("aws:i-0", "compute/instance", {}, {})
+    assert not {("nodes", "properties"), ("nodes", "heavy_properties"), ("nodes", "source_metadata")} & set(decoded)
+
+    with pytest.raises(ValueError):
+        asyncio.run(exporter.load_current("c1", projection="columns"))
+
+
+def test_single_cells_read_without_decoding_columns(tmp_path):
+    path = tmp_path / "aws.arrow"
+    write_snapshot(path, encode_snapshot([results()[0]], {"label": "x"}))
+
+    with ColumnarSnapshot(path) as snapshot:
+        assert (snapshot.source, snapshot.num_nodes, snapshot.num_edges) == ("aws", 2, 1)
+        assert snapshot.envelope == {"label": "x"}
+        assert snapshot.value("nodes", "display_name", 0) == "café"
+        assert snapshot.value("nodes", "heavy_properties", 0) == {"raw": {"Reservations": [{"Id": "r-0"}]}}
+        assert snapshot.value("nodes", "node_type", 1) == "network"
+        assert snapshot.value("edges", "properties", 0) == {"confidence": 1.0}
+        assert snapshot.column("nodes", "key") == ["aws:i-0", "aws:vpc-0"]
+
+    (tmp_path / "not.arrow").write_bytes(b"{}")
+    with pytest.raises(ValueError):
+        ColumnarSnapshot(tmp_path / "not.arrow")
+
+
+def test_snapshots_are_plain_arrow_ipc_files(tmp_path):
+    path = tmp_path / "aws.arrow"
+    write_snapshot(path, encode_snapshot([results()[0]]))
+
+    nodes = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    edges = pa.ipc.open_file(pa.memory_map(str(edges_path(path)))).read_all()
+    assert nodes.column("key").to_pylist() == ["aws:i-0", "aws:vpc-0"]
+    assert json.loads(nodes.column("properties")[0].as_py()) == {"state": "running"}
+    assert edges.column("edge_type").to_pylist() == ["contained_in"]
+
+
+def test_raw_v1_json_converts_to_columnar_and_back(tmp_path):
+    exporter = S3Exporter(s3_client=object(), bucket="b")
+    payload = json.loads(json.dumps({
+        "schema_version": "raw_v1",
+        "label": "export",
+        "sources": [exporter._result_to_dict(r) for r in results() + [results("stopped")[0]]],
+    }))
+
+    paths = raw_v1_to_columnar(payload, tmp_path)
+    assert sorted(p.name for p in paths) == ["aws.arrow", "github.arrow"]
+    with ColumnarSnapshot(tmp_path / "aws.arrow") as snapshot:
+        assert len(snapshot.header["results"]) == 2 # both aws blocks, one file
+
+    back = columnar_to_raw_v1(paths)
+    assert back["label"] == "export"
+    by_source = sorted(payload["sources"], key=lambda b: b["source"]) # blocks come back grouped per file
+    expected = [DiscoveryResult(**b).content_hash() for b in by_source]
+    assert [DiscoveryResult(**b).content_hash() for b in back["sources"]] == expected
+
+    with pytest.raises(ValueError):
+        columnar.encode_blocks(payload["sources"])
+
+
+def test_backend_is_picked_from_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPSCRIBE_EXPORT_BACKEND", "local")
+    monkeypatch.setenv("OPSCRIBE_LOCAL_EXPORT_DIR", str(tmp_path))
+    exporter = get_exporter()
+    assert isinstance(exporter, LocalExporter) and exporter.backend_name == "local"
+    assert exporter.root == tmp_path
+    with pytest.raises(ValueError):
+        get_exporter("ftp")
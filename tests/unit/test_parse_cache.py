@@ -0,0 +1,113 @@
+"""
+Tests for ParseCache: tier-1 parser results keyed by git blob SHA and
+parser version, shared across paths, branches and repositories.
+"""
+
+import asyncio
+
+from apps.api.ingestors.github import parse_cache as parse_cache_module
+from apps.api.ingestors.github.deterministic import IaCParser
+from apps.api.ingestors.github.models import FileMetadata
+from apps.api.ingestors.github.parse_cache import ParseCache, git_blob_sha
+from apps.api.ingestors.github.parse_pool import ParsePool, parse_file
+from apps.api.ingestors.github.pipeline import GitHubIngestionPipeline
+from apps.api.ingestors.github.repo_cache import RepoCache
+from tests.unit.test_repo_cache import commit, git, make_remote
+
+
+def tf(name: str) -> str:
+    return f'resource "aws_elasticache_cluster" "{name}" {{\n  engine = "redis"\n}}\n'
+
+
+def write(root, files: dict) -> list:
+    metas = []
+    for path, content in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(content)
+        metas.append(FileMetadata(path=path, extension="." + path.rsplit(".", 1)[-1], size_bytes=len(content)))
+    return metas
+
+
+def test_blob_ids_match_git(tmp_path):
+    (tmp_path / "main.tf").write_text(tf("c"))
+    assert git_blob_sha(tf("c").encode()) == git("hash-object", str(tmp_path / "main.tf"))
+
+
+def test_same_content_at_another_path_is_a_hit(tmp_path):
+    cache = ParseCache(tmp_path / "cache.sqlite3")
+    first = write(tmp_path, {"a/main.tf": tf("c"), "requirements.txt": "redis\n", "a/vars.json": "{}"})
+    lookup = cache.lookup(str(tmp_path), first)
+    assert not lookup.signals and len(lookup.misses) == 3
+    cache.store((f, parse_file(str(tmp_path), f)) for f in lookup.misses)
+
+    again = write(tmp_path, {"b/copy.tf": tf("c"), "requirements.txt": "redis\n", "b/new.tf": tf("d")})
+    lookup = cache.lookup(str(tmp_path), again)
+    assert sorted(lookup.signals) == ["b/copy.tf", "requirements.txt"]
+    assert [f.path for f in lookup.misses] == ["b/new.tf"]
+    assert [s.source_location for s in lookup.signals["b/copy.tf"]] == ["b/copy.tf"]
+    assert [s.model_dump() for s in lookup.signals["b/copy.tf"]] == \
+        [s.model_dump() for s in parse_file(str(tmp_path), again[0])]
+
+    stats = cache.stats()["parsers"]
+    assert stats["terraform"] == {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+    assert stats["requirements"]["hit_rate"] == 0.5 and "other" not in stats
+
+
+def test_a_new_parser_version_misses(tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path / "cache.sqlite3")
+    files = write(tmp_path, {"main.tf": tf("c")})
+    cache.store((f, parse_file(str(tmp_path), f)) for f in cache.lookup(str(tmp_path), files).misses)
+    assert cache.lookup(str(tmp_path), files).signals
+
+    monkeypatch.setattr(IaCParser, "VERSION", IaCParser.VERSION + 1)
+    parse_cache_module.parser_version.cache_clear()
+    try:
+        assert not cache.lookup(str(tmp_path), files).signals
+    finally:
+        monkeypatch.undo()
+        parse_cache_module.parser_version.cache_clear()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ParseCache(tmp_path / "cache.sqlite3")
+    for i in range(20):
+        cache.get_or_parse("terraform", f"m{i}.tf", tf(f"c{i}"), IaCParser().parse_terraform)
+    cache.get_or_parse("terraform", "m0.tf", tf("c0"), IaCParser().parse_terraform) # m0 is now the most recent
+
+    cache.max_bytes = cache.stats()["bytes"] // 2
+    assert cache.evict() >= 10
+    assert cache.stats()["bytes"] <= cache.max_bytes * 0.9
+
+    calls = []
+    def parse(path, content):
+        calls.append(path)
+        return IaCParser().parse_terraform(path, content)
+    cache.get_or_parse("terraform", "m0.tf", tf("c0"), parse)
+    cache.get_or_parse("terraform", "m1.tf", tf("c1"), parse)
+    assert calls == ["m1.tf"]
+
+
+def test_a_fork_is_ingested_from_the_cache(tmp_path, monkeypatch):
+    files = {f"infra/c{i}.tf": tf(f"c{i}") for i in range(6)}
+    upstream, work = make_remote(tmp_path, "upstream")
+    commit(work, files)
+    fork, fork_work = make_remote(tmp_path, "fork")
+    commit(fork_work, {**files, "infra/extra.tf": tf("extra")})
+    parse_cache = ParseCache(tmp_path / "parse-cache.sqlite3")
+
+    parsed = []
+    real = ParsePool.parse
+    def spy(self, root, batch):
+        parsed.append(sorted(f.path for f in batch))
+        return real(self, root, batch)
+    monkeypatch.setattr(ParsePool, "parse", spy)
+
+    def ingest(url):
+        pipeline = GitHubIngestionPipeline(url, "main", repo_cache=RepoCache(tmp_path / "repos"),
+                                           parse_cache=parse_cache)
+        return asyncio.run(pipeline.run())
+
+    first, second = ingest(upstream), ingest(fork)
+    assert parsed == [sorted(files), ["infra/extra.tf"]]
+    assert second.metadata["parse_cache"] == {"terraform": {"hits": 6, "misses": 1}}
+    assert second.metadata["reparsed_files"] == 1 and len(second.nodes) == len(first.nodes) + 1
@@ -0,0 +1,76 @@
+"""
+Tests for ParsePool: chunked tier-1 parsing in worker processes, streamed
+results, per-file timeouts and per-type timings.
+"""
+
+import asyncio
+
+import pytest
+
+from apps.api.ingestors.github.models import FileMetadata
+from apps.api.ingestors.github.parse_pool import ParsePool, parse_file, summarize_timings
+
+COMPOSE = "services:\n  cache:\n    image: redis:7\n"
+
+
+def tf(name: str) -> str:
+    return f'resource "aws_sqs_queue" "{name}" {{\n  name = "{name}"\n}}\n'
+
+
+@pytest.fixture(scope="module")
+def pool():
+    return ParsePool(workers=2, timeout=5)
+
+
+def write_tree(root, files: dict) -> list:
+    metas = []
+    for path, content in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(content)
+        metas.append(FileMetadata(path=path, extension="." + path.rsplit(".", 1)[-1], size_bytes=len(content)))
+    return metas
+
+
+def collect(pool, root, files):
+    async def go():
+        return [results async for results in pool.parse(str(root), files)]
+    return asyncio.run(go())
+
+
+def test_chunks_stream_back_with_the_same_signals_as_in_process(pool, tmp_path):
+    files = write_tree(tmp_path, {
+        **{f"infra/q{i}.tf": tf(f"q{i}") for i in range(40)},
+        "docker-compose.yml": COMPOSE,
+        "requirements.txt": "celery\n",
+        "config/settings.json": "{}",
+    })
+    chunks = collect(pool, tmp_path, files)
+    assert len(chunks) == -(-len(files) // pool.chunk_size(len(files))) > 1
+
+    results = {r.path: r for chunk in chunks for r in chunk}
+    assert set(results) == {f.path for f in files}
+    for f in files:
+        assert [s.model_dump() for s in results[f.path].signals] == [s.model_dump() for s in parse_file(str(tmp_path), f)]
+
+    timing = summarize_timings(list(results.values()))
+    assert {k: v["files"] for k, v in timing.items()} == {"terraform": 40, "compose": 1, "requirements": 1, "other": 1}
+    assert all(v["timeouts"] == 0 for v in timing.values())
+
+
+def test_a_pathological_file_times_out_without_losing_the_rest(tmp_path):
+    huge = "".join(tf(f"q{i}") for i in range(20_000))
+    files = write_tree(tmp_path, {"a.tf": tf("a"), "huge.tf": huge, "z.tf": tf("z")})
+    chunks = collect(ParsePool(workers=1, timeout=0.2), tmp_path, files)
+
+    results = {r.path: r for chunk in chunks for r in chunk}
+    assert results["huge.tf"].timed_out and results["huge.tf"].signals is None
+    assert [s.name for s in results["a.tf"].signals] == ['"a"'] and len(results["z.tf"].signals) == 1
+    assert summarize_timings(list(results.values()))["terraform"]["timeouts"] == 1
+
+
+def test_in_process_mode_and_unreadable_files(tmp_path):
+    files = write_tree(tmp_path, {"main.tf": tf("q")})
+    files.append(FileMetadata(path="missing.tf", extension=".tf", size_bytes=0))
+    results = {r.path: r for chunk in collect(ParsePool(workers=0), tmp_path, files) for r in chunk}
+    assert len(results["main.tf"].signals) == 1
+    assert results["missing.tf"].signals is None and not results["missing.tf"].timed_out
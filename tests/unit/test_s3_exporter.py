@@ -0,0 +1,180 @@
+"""
+Tests for S3Exporter's compressed, content-addressed snapshot layout and
+the concurrent, projecting load_current.
+"""
+
+import gzip
+import json
+import asyncio
+import threading
+
+import pytest
+
+from apps.api.ingestors.pipeline import s3_exporter
+from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult, DiscoveryNode, DiscoveryEdge
+from tests.fixtures.fake_s3 import InMemoryS3
+
+BUCKET = "test-bucket"
+
+
+def results(state: str = "running", nodes: int = 3):
+    return [
+        DiscoveryResult(source="aws", nodes=[
+            DiscoveryNode(key=f"aws:i-{i}", display_name=f"i-{i}", node_type="compute", properties={"state": state})
+            for i in range(nodes)
+        ], edges=[DiscoveryEdge(from_node_key="aws:i-0", to_node_key="aws:i-1", edge_type="references")],
+           metadata={"scan_id": state}),
+        DiscoveryResult(source="github", nodes=[
+            DiscoveryNode(key="github:acme/app:service:api", display_name="api", node_type="compute"),
+        ]),
+    ]
+
+
+def export(exporter, res):
+    asyncio.run(exporter.export("c1", res))
+    return exporter.last_export
+
+
+def manifest(s3, source="aws"):
+    return json.loads(s3.objects[(BUCKET, f"c1/current/{source}.json")]["Body"])
+
+
+@pytest.mark.parametrize("compression", ["zstd", "gzip"])
+def test_roundtrip_through_manifest_and_blob(compression):
+    s3 = InMemoryS3()
+    exporter = S3Exporter(s3_client=s3, bucket=BUCKET, compression=compression)
+    export(exporter, results())
+
+    m = manifest(s3)
+    assert m["blob_key"] == f"c1/history/aws/{m['content_hash']}{'.ndjson.zst' if compression == 'zstd' else '.ndjson.gz'}"
+    assert m["format"] == "ndjson" and m["compression"] == compression and m["summary"]["total_nodes"] == 3
+    assert "sources" not in m # the manifest stays small
+    assert m["stored_bytes"] == len(s3.objects[(BUCKET, m["blob_key"])]["Body"]) < m["raw_bytes"]
+
+    loaded = asyncio.run(exporter.load_current("c1"))
+    assert sorted(r.source for r in loaded) == ["aws", "github"]
+    aws = next(r for r in loaded if r.source == "aws")
+    assert aws.nodes[0].properties == {"state": "running"} and aws.metadata == {"scan_id": "running"}
+    assert [(e.from_node_key, e.to_node_key) for e in aws.edges] == [("aws:i-0", "aws:i-1")]
+
+
+def test_unchanged_sources_are_not_uploaded():
+    s3 = InMemoryS3()
+    exporter = S3Exporter(s3_client=s3, bucket=BUCKET)
+    first = export(exporter, results())
+    assert first["bytes_uploaded"] > 0
+
+    s3.reset_counters()
+    # Run metadata differs, nodes and edges do not
+    again = export(exporter, [r.model_copy(update={"metadata": {"scan_id": "other"}}) for r in results()])
+    assert again["bytes_uploaded"] == 0 and s3.requests["put_object"] == 0
+    assert {s["status"] for s in again["sources"].values()} == {"unchanged"}
+
+    original = manifest(s3)["content_hash"]
+    changed = export(exporter, results(state="stopped"))
+    assert changed["sources"]["aws"]["status"] == "uploaded"
+    assert changed["sources"]["github"]["status"] == "unchanged"
+    assert manifest(s3)["previous_content_hash"] == original
+
+
+def test_reverting_reuses_the_archived_blob():
+    s3 = InMemoryS3()
+    exporter = S3Exporter(s3_client=s3, bucket=BUCKET, record_history=False) # count blob/manifest writes only
+    export(exporter, results("running"))
+    export(exporter, results("stopped"))
+
+    s3.reset_counters()
+    reverted = export(exporter, results("running"))
+    m = manifest(s3)
+    assert reverted["sources"]["aws"]["bytes_uploaded"] == s3.bytes_uploaded # manifest only
+    assert s3.requests["put_object"] == 1
+    assert m["stored_bytes"] == len(s3.objects[(BUCKET, m["blob_key"])]["Body"])
+    assert len([k for _, k in s3.objects if k.startswith("c1/history/aws/")]) == 2
+
+
+def test_large_blobs_use_multipart(monkeypatch):
+    monkeypatch.setattr(s3_exporter, "MULTIPART_THRESHOLD", 1024)
+    monkeypatch.setattr(s3_exporter, "MULTIPART_PART_SIZE", 512)
+    s3 = InMemoryS3()
+    exporter = S3Exporter(s3_client=s3, bucket=BUCKET, compression="gzip")
+    export(exporter, results(nodes=400))
+
+    assert s3.requests["create_multipart_upload"] == 1 and s3.requests["upload_part"] > 1
+    assert s3.requests["complete_multipart_upload"] == 1
+    assert len(next(r for r in asyncio.run(exporter.load_current("c1")) if r.source == "aws").nodes) == 400
+
+
+def test_export_makes_no_s3_calls_on_the_event_loop(monkeypatch):
+    monkeypatch.setattr(s3_exporter, "MULTIPART_THRESHOLD", 1024)
+    monkeypatch.setattr(s3_exporter, "MULTIPART_PART_SIZE", 512)
+    s3 = InMemoryS3()
+    threads = set()
+    for name in ("get_object", "head_object", "put_object", "create_multipart_upload", "upload_part",
+                 "complete_multipart_upload"):
+        def spy(*args, _call=getattr(s3, name), **kwargs):
+            threads.add(threading.get_ident())
+            return _call(*args, **kwargs)
+        monkeypatch.setattr(s3, name, spy)
+
+    async def run():
+        await S3Exporter(s3_client=s3, bucket=BUCKET, compression="gzip").export("c1", results(nodes=400))
+        return threading.get_ident()
+
+    assert asyncio.run(run()) not in threads
+    assert s3.requests["upload_part"] > 1 and s3.requests["head_object"] == 2
+
+
+def test_load_current_reads_the_previous_full_payload_layout():
+    s3 = InMemoryS3()
+    legacy = {"schema_version": "raw_v1", "sources": [results()[0].model_dump()]}
+    s3.put_object(Bucket=BUCKET, Key="c1/current/aws.json", Body=json.dumps(legacy))
+    exporter = S3Exporter(s3_client=s3, bucket=BUCKET)
+
+    assert [len(r.nodes) for r in asyncio.run(exporter.load_current("c1"))] == [3]
+    # A legacy object is not a manifest: the next export writes one
+    assert export(exporter, results())["sources"]["aws"]["status"] == "uploaded"
+
+
+def test_projection_drops_heavy_properties_or_all_of_them():
+    s3 = InMemoryS3()
+    exporter = S3Exporter(s3_client=s3, bucket=BUCKET)
+    heavy = DiscoveryResult(source="aws", nodes=[DiscoveryNode(
+        key="aws:i-0", display_name="i-0", node_type="compute", node_subtype="compute/instance",
+        properties={"state": "running", "raw": {"Reservations": ["..."]}}, source_metadata={"arn": "arn:i-0"},
+    )])
+    export(exporter, [heavy])
+
+    def node(projection):
+        return asyncio.run(exporter.load_current("c1", projection=projection))[0].nodes[0]
+
+    assert node("full").properties == {"state": "running", "raw": {"Reservations": ["..."]}}
+    assert node("no_heavy").properties == {"state": "running"}
+    structure = node("structure")
+    assert (structure.key, structure.node_subtype, structure.properties, structure.source_metadata) == \
+        ("aws:i-0", "compute/instance", {}, {})
+    with pytest.raises(ValueError):
+        asyncio.run(exporter.load_current("c1", projection="columns"))
+
+
+def test_listing_is_paginated_past_one_page():
+    s3 = InMemoryS3()
+    exporter = S3Exporter(s3_client=s3, bucket=BUCKET)
+    for i in range(1005):
+        payload = {"sources": [{"source": f"repo-{i:04d}", "nodes": [], "edges": []}]}
+        s3.put_object(Bucket=BUCKET, Key=f"c1/current/repo-{i:04d}.json", Body=json.dumps(payload))
+
+    loaded = asyncio.run(exporter.load_current("c1", max_concurrency=4))
+    assert [r.source for r in loaded] == [f"repo-{i:04d}" for i in range(1005)]
+    assert s3.requests["list_objects_v2"] == 2
+
+
+def test_load_current_reads_single_document_json_blobs():
+    s3 = InMemoryS3()
+    payload = {"schema_version": "raw_v1", "sources": [results()[0].model_dump()]}
+    s3.put_object(Bucket=BUCKET, Key="c1/history/aws/abc.json.gz", Body=gzip.compress(json.dumps(payload).encode()))
+    s3.put_object(Bucket=BUCKET, Key="c1/current/aws.json", Body=json.dumps(
+        {"blob_key": "c1/history/aws/abc.json.gz", "compression": "gzip", "content_hash": "abc"}))
+
+    loaded = asyncio.run(S3Exporter(s3_client=s3, bucket=BUCKET).load_current("c1", projection="structure"))
+    assert [n.properties for n in loaded[0].nodes] == [{}, {}, {}]
@@ -0,0 +1,152 @@
+"""
+Tests for the base + delta snapshot timeline: time-travel reads, diffs,
+compaction, and S3Exporter's use of it.
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from apps.api.ingestors.pipeline.history import LocalObjectStore, S3ObjectStore, SnapshotHistory
+from apps.api.ingestors.pipeline.s3_exporter import S3Exporter
+from apps.api.ingestors.pipeline.schemas import DiscoveryResult, DiscoveryNode, DiscoveryEdge
+from tests.fixtures.fake_s3 import InMemoryS3
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def day(n: int, hours: int = 0) -> datetime:
+    return T0 + timedelta(days=n, hours=hours)
+
+
+def state(n: int):
+    """Day n: nodes 0..n%5, node 0 changes every day, one edge on odd days."""
+    return [DiscoveryResult(source="aws", nodes=[
+        DiscoveryNode(key=f"aws:{i}", display_name=f"n{i}", node_type="compute",
+                      properties={"day": n if i == 0 else 0})
+        for i in range(n % 5 + 1)
+    ], edges=[DiscoveryEdge(from_node_key="aws:0", to_node_key="aws:1", edge_type="references")] if n % 2 else [],
+       metadata={"day": n})]
+
+
+def record_days(history, days):
+    for n in days:
+        history.record("c1", "aws", state(n), at=day(n))
+
+
+@pytest.mark.parametrize("max_chain", [1, 3, 100])
+def test_load_at_rebuilds_every_recorded_state(max_chain):
+    history = SnapshotHistory(S3ObjectStore(InMemoryS3(), "b"), max_chain=max_chain)
+    record_days(history, range(12))
+
+    kinds = [e["kind"] for e in history.timeline("c1", "aws")]
+    assert kinds[0] == "base" and (max_chain == 100 or kinds.count("base") > 1)
+    for n in range(12):
+        [loaded] = history.load_at("c1", day(n, hours=6))
+        assert loaded.content_hash() == state(n)[0].content_hash() and loaded.metadata == {"day": n}
+    assert history.load_at("c1", day(-1)) == []
+
+
+def test_unchanged_and_out_of_order_records():
+    history = SnapshotHistory(S3ObjectStore(InMemoryS3(), "b"))
+    assert history.record("c1", "aws", state(1), at=day(1))["kind"] == "base"
+    assert history.record("c1", "aws", state(1), at=day(2)) is None
+    with pytest.raises(ValueError):
+        history.record("c1", "aws", state(3), at=day(0))
+
+
+def test_entries_keep_the_compression_they_were_written_with():
+    store = S3ObjectStore(InMemoryS3(), "b")
+    record_days(SnapshotHistory(store, compression="gzip", max_chain=100), range(3))
+    history = SnapshotHistory(store, compression="zstd", max_chain=100)
+    record_days(history, range(3, 6))
+
+    entries = history.timeline("c1", "aws")
+    assert [e["compression"] for e in entries] == ["gzip"] * 3 + ["zstd"] * 3
+    assert all(e["key"].endswith(".json.gz") for e in entries[:3])
+    assert all(e["key"].endswith(".json.zst") for e in entries[3:])
+    for n in range(6):
+        assert history.load_at("c1", day(n))[0].content_hash() == state(n)[0].content_hash()
+    with pytest.raises(ValueError):
+        SnapshotHistory(store, compression="lz4")
+
+
+def test_diff_between_two_times():
+    history = SnapshotHistory(S3ObjectStore(InMemoryS3(), "b"))
+    record_days(history, [1, 3, 4])
+
+    d = history.diff("c1", day(1), day(3))
+    assert (d.nodes_added, d.nodes_removed, d.nodes_changed) == (["aws:2", "aws:3"], [], ["aws:0"])
+    assert d.edges_added == d.edges_removed == []
+
+    d = history.diff("c1", day(3), day(4))
+    assert d.nodes_added == ["aws:4"] and len(d.edges_removed) == 1
+    assert history.diff("c1", day(3), day(3, hours=5)).is_empty
+    assert history.diff("c1", day(0), day(1)).nodes_added == ["aws:0", "aws:1"]
+
+
+def test_compaction_thins_old_entries_and_keeps_recent_ones(tmp_path):
+    store = LocalObjectStore(tmp_path)
+    record_days(SnapshotHistory(store, max_chain=4), range(30))
+    old_keys = set(store.list("c1/timeline/aws/g0000/"))
+
+    history = SnapshotHistory(store, max_chain=4)
+    stats = history.compact("c1", "aws", older_than=day(20), keep_every=timedelta(days=7))
+    assert stats["entries_before"] == 30 and stats["entries_after"] == 3 + 10
+    assert stats["bytes_after"] < stats["bytes_before"]
+
+    kept = [datetime.fromisoformat(e["at"]).day - 1 for e in history.timeline("c1", "aws")]
+    assert kept == [6, 13, 19] + list(range(20, 30)) # last day of each week, then every day
+    for n in kept:
+        assert history.load_at("c1", day(n))[0].content_hash() == state(n)[0].content_hash()
+    assert history.load_at("c1", day(10))[0].metadata == {"day": 6}
+    assert not old_keys & set(store.list("c1/timeline/"))
+
+
+def test_exporter_records_the_timeline_and_prunes_blobs_on_compaction():
+    s3 = InMemoryS3()
+    exporter = S3Exporter(s3_client=s3, bucket="b")
+
+    async def run():
+        times = []
+        for n in range(4):
+            await exporter.export("c1", state(n))
+            assert exporter.last_export["sources"]["aws"]["timeline"]["seq"] == n
+            times.append(exporter.history.timeline("c1", "aws")[-1]["at"])
+
+        assert (await exporter.load_at("c1", times[2]))[0].content_hash() == state(2)[0].content_hash()
+        assert (await exporter.diff("c1", times[0], times[1])).nodes_added == ["aws:1"]
+        assert len([k for _, k in s3.objects if k.startswith("c1/history/aws/")]) == 4
+
+        stats = await exporter.compact_history("c1", older_than=times[2], keep_every=timedelta(days=7))
+        assert (stats["aws"]["entries_after"], stats["aws"]["blobs_pruned"]) == (3, 3)
+        assert [k for _, k in s3.objects if k.startswith("c1/history/aws/")] == \
+            [exporter._read_manifest("c1/current/aws.json")["blob_key"]]
+        assert (await exporter.load_current("c1"))[0].content_hash() == state(3)[0].content_hash()
+
+    asyncio.run(run())
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(S3Exporter(s3_client=s3, bucket="b", record_history=False).load_at("c1", day(1)))
+
+
+def test_exporter_records_the_timeline_off_the_event_loop(monkeypatch):
+    threads = []
+    real_record = SnapshotHistory.record
+
+    def spy(self, *args, **kwargs):
+        threads.append(threading.get_ident())
+        return real_record(self, *args, **kwargs)
+
+    monkeypatch.setattr(SnapshotHistory, "record", spy)
+    exporter = S3Exporter(s3_client=InMemoryS3(), bucket="b")
+
+    async def run():
+        await exporter.export("c1", state(0))
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert threads and loop_thread not in threads
+    assert exporter.last_export["sources"]["aws"]["timeline"]["seq"] == 0